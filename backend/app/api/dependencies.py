@@ -2,47 +2,51 @@
 FastAPI dependencies for authentication and database access.
 """
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.security import EVENTS_TOKEN_SCOPE, verify_token
 from app.repositories.mysql_user_repository import MySQLUserRepository
 from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
 from app.models.user import User
 
 # Security scheme for Bearer token
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def authenticate_token(token: str, db: Session) -> User:
     """
-    Dependency to get the current authenticated user from JWT token.
+    Resolve a JWT access token to its user.
     
     Args:
-        credentials: HTTP Bearer token credentials
+        token: JWT access token
         db: Database session
         
     Returns:
-        Current authenticated user
+        Authenticated user
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
     payload = verify_token(token)
     
-    if payload is None:
+    # Scoped tokens (stream tokens) are not access tokens
+    if payload is None or "scope" in payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    return _get_token_user(payload, db)
+
+
+def _get_token_user(payload: dict, db: Session) -> User:
+    """Load the user a verified token was issued to."""
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -64,6 +68,96 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token.
+    
+    Args:
+        credentials: HTTP Bearer token credentials
+        db: Database session
+        
+    Returns:
+        Current authenticated user
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return authenticate_token(credentials.credentials, db)
+
+
+async def get_current_user_for_stream(
+    recording_id: str,
+    stream_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency to authenticate a recording's event stream.
+    
+    Browsers' EventSource cannot set headers, so it passes a stream token
+    from ``POST /recordings/{id}/events/token`` as the ``stream_token``
+    query parameter. Clients that can set headers may send their access
+    token as usual.
+    
+    Args:
+        recording_id: Recording whose events are requested
+        stream_token: Stream token from the query string
+        credentials: HTTP Bearer token credentials, if sent
+        db: Database session
+        
+    Returns:
+        Current authenticated user
+        
+    Raises:
+        HTTPException: If no token was sent, the token is invalid or not for
+            this recording, or user not found
+    """
+    if credentials:
+        return authenticate_token(credentials.credentials, db)
+    return authenticate_stream_token(stream_token, recording_id, EVENTS_TOKEN_SCOPE, db)
+
+
+def authenticate_stream_token(token: Optional[str], recording_id: str, scope: str, db: Session) -> User:
+    """
+    Resolve a stream token to its user.
+    
+    Args:
+        token: Stream token from ``create_stream_token``
+        recording_id: Recording whose stream is being opened
+        scope: Scope the token must carry
+        db: Database session
+        
+    Returns:
+        Authenticated user
+        
+    Raises:
+        HTTPException: If no token was sent, the token is invalid, has
+            another scope or is for another recording, or user not found
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    payload = verify_token(token)
+    if (
+        payload is None
+        or payload.get("scope") != scope
+        or payload.get("recording_id") != recording_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid stream token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _get_token_user(payload, db)
+
+
 def get_user_repository(db: Session = Depends(get_db)) -> MySQLUserRepository:
     """
     Dependency to get user repository.
@@ -88,3 +182,16 @@ def get_recording_repository(db: Session = Depends(get_db)) -> MySQLRecordingRep
         Recording repository instance
     """
     return MySQLRecordingRepository(db)
+
+
+def get_transcription_job_repository(db: Session = Depends(get_db)) -> MySQLTranscriptionJobRepository:
+    """
+    Dependency to get transcription job repository.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Transcription job repository instance
+    """
+    return MySQLTranscriptionJobRepository(db)
@@ -1,20 +1,37 @@
 """
 Recording API endpoints.
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from typing import AsyncIterable, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import os
-import aiofiles
 import asyncio
 import logging
 
 from app.models.user import User
-from app.models.recording import Recording
+from app.models.recording import Recording, RecordingChunk
 from app.repositories.mysql_recording_repository import MySQLRecordingRepository
-from app.api.dependencies import get_current_user, get_recording_repository
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+from app.api.dependencies import (
+    authenticate_stream_token, get_current_user, get_current_user_for_stream, get_recording_repository,
+    get_transcription_job_repository
+)
+from app.core.database import get_db
 from app.core.config import settings
-from app.services.transcription_service import TranscriptionService
+from app.core.lifecycle import get_drain_coordinator
+from app.core.security import EVENTS_TOKEN_SCOPE, INGEST_TOKEN_SCOPE, create_stream_token
+from app.core.upload_limits import chunk_too_large, max_chunk_bytes
+from app.services.job_scheduling import classify_priority, estimate_recording_seconds
+from app.services.live_transcription import get_live_transcription_queue
+from app.services.recording_events import event_from_state, get_recording_event_broker, stream_recording_events
+from app.services.recording_stream import RecordingStreamSession, recording_streams_closed
+from app.audio.engine import get_audio_engine
+from app.audio.chunk_writer import (
+    ChunkConflictError, ChunkTooLargeError, StoredChunk, StreamedChunk, discard_chunk,
+    file_sha256, pending_stream_chunks, publish_chunk, read_upload, store_chunk
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -47,6 +64,12 @@ class UpdateNotesRequest(BaseModel):
     notes: str
 
 
+class StreamTokenResponse(BaseModel):
+    """Response model for event stream tokens."""
+    stream_token: str
+    expires_in: int
+
+
 @router.post("/", response_model=RecordingResponse)
 async def create_recording(
     current_user: User = Depends(get_current_user),
@@ -156,33 +179,121 @@ async def get_recording(
     return RecordingResponse(**recording.to_dict())
 
 
-@router.post("/{recording_id}/chunks")
-async def upload_chunk(
+@router.post("/{recording_id}/events/token", response_model=StreamTokenResponse)
+async def create_recording_events_token(
     recording_id: str,
-    chunk_index: int = Form(...),
-    audio_chunk: UploadFile = File(...),
-    duration_seconds: Optional[float] = Form(None),
     current_user: User = Depends(get_current_user),
     recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
 ):
     """
-    Upload an audio chunk for a recording.
+    Issue a short-lived token for opening the recording's event stream.
+    
+    EventSource cannot send the Authorization header, so the token goes in
+    the stream URL. It only opens this recording's events and expires
+    quickly, so URLs that end up in logs do not leak the access token.
     
     Args:
         recording_id: Recording ID
-        chunk_index: Sequential index of the chunk
-        audio_chunk: Audio file chunk
-        duration_seconds: Optional duration of the chunk
         current_user: Current authenticated user
-        recording_repository: Recording repository dependency
+        recording_repository: Recording repository
         
     Returns:
-        Success message with chunk information
+        Stream token and its lifetime in seconds
         
     Raises:
-        HTTPException: If recording not found, access denied, or upload fails
+        HTTPException: If recording not found or access denied
+    """
+    recording = recording_repository.get_recording(recording_id)
+    
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+    
+    if recording.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return StreamTokenResponse(
+        stream_token=create_stream_token(
+            current_user.id, recording_id, EVENTS_TOKEN_SCOPE, settings.recording_events_token_seconds
+        ),
+        expires_in=settings.recording_events_token_seconds
+    )
+
+
+@router.get("/{recording_id}/events")
+async def recording_events(
+    recording_id: str,
+    current_user: User = Depends(get_current_user_for_stream),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream transcription status, progress and the final transcript as Server-Sent Events.
+    
+    Replaces polling ``GET /recordings/{id}``: the stream sends the current
+    state, then each change, and closes once the transcription has
+    succeeded or failed. EventSource clients pass a token from
+    ``POST /recordings/{id}/events/token`` as the ``stream_token`` query
+    parameter.
+    
+    Args:
+        recording_id: Recording ID
+        current_user: Current authenticated user
+        db: Database session, used only before streaming starts
+        
+    Returns:
+        ``text/event-stream`` response
+        
+    Raises:
+        HTTPException: If recording not found, access denied or the server is shutting down
+    """
+    if get_drain_coordinator().draining:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down",
+            headers={"Retry-After": str(int(settings.recording_events_retry_seconds))}
+        )
+    
+    recording = MySQLRecordingRepository(db).get_recording(recording_id)
+    
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+    
+    if recording.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    initial = event_from_state(recording, MySQLTranscriptionJobRepository(db).get_latest_job(recording_id))
+    # Release the connection; an idle stream must not hold one from the pool
+    db.close()
+    
+    return StreamingResponse(
+        stream_recording_events(initial, get_recording_event_broker()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _get_uploadable_recording(
+    recording_id: str,
+    current_user: User,
+    recording_repository: MySQLRecordingRepository
+) -> Recording:
+    """
+    Get a recording that the current user may upload chunks to.
+    
+    Raises:
+        HTTPException: If recording not found, access denied, or recording not active
     """
-    # Verify recording exists and belongs to user
     recording = recording_repository.get_recording(recording_id)
     
     if not recording:
@@ -203,41 +314,528 @@ async def upload_chunk(
             detail="Cannot upload chunks to non-active recording"
         )
     
+    return recording
+
+
+async def _chunk_stored(recording_id: str, chunk_index: int, stored: StoredChunk):
+    """
+    Hand a recorded chunk to assembly and live transcription.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_index: Sequential index of the chunk
+        stored: The chunk file
+    """
+    # Append PCM chunks to the recording's assembled-so-far file so finishing is cheap
+    if stored.container_info.container == "wav":
+        try:
+            await get_audio_engine().append_chunk(os.path.dirname(stored.path), chunk_index, stored.path)
+        except Exception as e:
+            logger.warning(f"Incremental assembly failed for recording {recording_id}: {e}")
+    
+    if settings.live_transcription_enabled:
+        get_live_transcription_queue().submit(recording_id, chunk_index)
+    
+    logger.info(f"Uploaded chunk {chunk_index} for recording {recording_id} ({stored.size} bytes)")
+
+
+def _chunk_info(chunk_id: str, chunk_index: int, stored: StoredChunk) -> dict:
+    """Describe a stored chunk in an upload response."""
+    return {
+        "chunk_id": chunk_id,
+        "chunk_index": chunk_index,
+        "file_size": stored.size,
+        "sha256": stored.sha256,
+        "container": stored.container_info.container,
+        "codec": stored.container_info.codec
+    }
+
+
+async def _existing_sha256(chunk: Optional[RecordingChunk]) -> Optional[str]:
+    """Checksum of a recorded chunk; chunks recorded before checksums were kept are hashed from disk."""
+    if chunk is None:
+        return None
+    if chunk.sha256 is None:
+        return await asyncio.to_thread(file_sha256, chunk.audio_blob_path)
+    return chunk.sha256
+
+
+async def _register_chunk(
+    recording_id: str,
+    chunk_index: int,
+    stored: StoredChunk,
+    duration_seconds: Optional[float],
+    recording_repository: MySQLRecordingRepository
+) -> dict:
+    """
+    Record a staged chunk, publish its file and hand it to assembly and live transcription.
+    
+    Idempotent per chunk index. The row is inserted before the file is
+    renamed into place, so only the upload whose row wins the index ever
+    writes the chunk file. An upload identical to the recorded chunk is
+    dropped and answered with it; one with different content is refused.
+    Either way the stored chunk is left as it was.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_index: Sequential index of the chunk
+        stored: The staged chunk file
+        duration_seconds: Optional duration of the chunk
+        recording_repository: Recording repository
+        
+    Returns:
+        Chunk information, including its size, SHA-256 and whether it was a duplicate
+        
+    Raises:
+        ChunkConflictError: If the index is recorded with different content
+    """
     try:
-        # Save chunk file
+        # Add chunk to database
+        try:
+            chunk = recording_repository.add_chunk(
+                recording_id=recording_id,
+                chunk_index=chunk_index,
+                audio_blob_path=stored.path,
+                duration_seconds=duration_seconds,
+                container=stored.container_info.container,
+                codec=stored.container_info.codec,
+                sha256=stored.sha256
+            )
+        except ValueError:
+            # The index is recorded already, by a retried or a concurrent upload
+            existing = recording_repository.get_chunk(recording_id, chunk_index)
+            if existing is None:
+                raise
+            if await _existing_sha256(existing) != stored.sha256:
+                raise ChunkConflictError(chunk_index)
+            logger.info(f"Chunk {chunk_index} of recording {recording_id} was already uploaded")
+            return {**_chunk_info(existing.id, chunk_index, stored), "duplicate": True}
+        
+        try:
+            stored = await asyncio.to_thread(publish_chunk, stored)
+        except OSError:
+            recording_repository.delete_chunk(chunk.id)
+            raise
+    finally:
+        # Drops the staged file unless it was published
+        await asyncio.to_thread(discard_chunk, stored)
+    
+    await _chunk_stored(recording_id, chunk_index, stored)
+    return {**_chunk_info(chunk.id, chunk_index, stored), "duplicate": False}
+
+
+async def _save_chunk(
+    recording_id: str,
+    chunk_index: int,
+    blocks: AsyncIterable[bytes],
+    content_type: Optional[str],
+    duration_seconds: Optional[float],
+    recording_repository: MySQLRecordingRepository
+) -> dict:
+    """
+    Store an uploaded chunk and register it.
+    
+    Idempotent per chunk index: a retry identical to the stored chunk is
+    answered with it, and a different one is refused; neither rewrites it.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_index: Sequential index of the chunk
+        blocks: The chunk's bytes, block by block
+        content_type: Client-declared type, used only if the container is not recognised
+        duration_seconds: Optional duration of the chunk
+        recording_repository: Recording repository
+        
+    Returns:
+        Success message with chunk information, including its size and SHA-256
+        
+    Raises:
+        HTTPException: If the chunk is over ``max_chunk_size_mb`` (413), the
+            index was already uploaded with different content (409), or upload fails
+    """
+    try:
+        # Stream the chunk to disk block by block; size and checksum are computed on the way
         recording_dir = os.path.join(settings.audio_storage_path, recording_id)
-        os.makedirs(recording_dir, exist_ok=True)
+        stored = await store_chunk(blocks, recording_dir, chunk_index, max_chunk_bytes(), content_type)
+        chunk_info = await _register_chunk(
+            recording_id, chunk_index, stored, duration_seconds, recording_repository
+        )
+        message = "Chunk already uploaded" if chunk_info["duplicate"] else "Chunk uploaded successfully"
+        return {"message": message, **chunk_info}
         
-        chunk_filename = f"chunk_{chunk_index:04d}.wav"
-        chunk_path = os.path.join(recording_dir, chunk_filename)
+    except ChunkTooLargeError as e:
+        logger.warning(f"Rejected chunk {chunk_index} for recording {recording_id}: {e}")
+        raise chunk_too_large(e.max_bytes)
+    except ChunkConflictError as e:
+        logger.warning(f"Rejected chunk {chunk_index} for recording {recording_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to upload chunk for recording {recording_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload chunk"
+        )
+
+
+async def _commit_pending_stream_chunks(
+    recording_id: str,
+    recording_repository: MySQLRecordingRepository
+) -> int:
+    """
+    Store streamed chunks whose client went away before ending them.
+    
+    Each is kept up to its last checkpoint.
+    
+    Returns:
+        Number of chunks stored
+    """
+    recording_dir = os.path.join(settings.audio_storage_path, recording_id)
+    committed = 0
+    for chunk_index in pending_stream_chunks(recording_dir):
+        chunk = StreamedChunk(recording_dir, chunk_index, max_chunk_bytes())
+        await asyncio.to_thread(chunk.open)
+        stored = await asyncio.to_thread(chunk.finish, None)
+        try:
+            await _register_chunk(recording_id, chunk_index, stored, None, recording_repository)
+        except ChunkConflictError as e:
+            logger.warning(f"Dropped unfinished streamed chunk of recording {recording_id}: {e}")
+            continue
+        committed += 1
+    if committed:
+        logger.info(f"Stored {committed} unfinished streamed chunks of recording {recording_id}")
+    return committed
+
+
+@router.post("/{recording_id}/stream/token", response_model=StreamTokenResponse)
+async def create_recording_stream_token(
+    recording_id: str,
+    current_user: User = Depends(get_current_user),
+    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
+):
+    """
+    Issue a short-lived token for opening the recording's audio WebSocket.
+    
+    Browsers cannot set headers on WebSockets, so the token goes in the
+    URL. It only opens this recording's audio stream and expires quickly;
+    clients fetch a new one for every connection.
+    
+    Args:
+        recording_id: Recording ID
+        current_user: Current authenticated user
+        recording_repository: Recording repository
         
-        async with aiofiles.open(chunk_path, 'wb') as f:
-            content = await audio_chunk.read()
-            await f.write(content)
+    Returns:
+        Stream token and its lifetime in seconds
         
-        # Add chunk to database
-        chunk = recording_repository.add_chunk(
-            recording_id=recording_id,
-            chunk_index=chunk_index,
-            audio_blob_path=chunk_path,
-            duration_seconds=duration_seconds
+    Raises:
+        HTTPException: If recording not found, access denied, or recording not active
+    """
+    _get_uploadable_recording(recording_id, current_user, recording_repository)
+    
+    return StreamTokenResponse(
+        stream_token=create_stream_token(
+            current_user.id, recording_id, INGEST_TOKEN_SCOPE, settings.recording_stream_token_seconds
+        ),
+        expires_in=settings.recording_stream_token_seconds
+    )
+
+
+@router.websocket("/{recording_id}/stream")
+async def stream_recording(
+    websocket: WebSocket,
+    recording_id: str,
+    stream_token: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Receive a recording's audio continuously over a WebSocket.
+    
+    Authenticates once with the ``stream_token`` query parameter (from
+    ``POST /recordings/{id}/stream/token``), then speaks the protocol
+    described in app.services.recording_stream. Failed checks close the
+    socket with 4000 plus the HTTP status code.
+    
+    Args:
+        websocket: WebSocket connection
+        recording_id: Recording ID
+        stream_token: Short-lived token for this recording's audio stream
+        db: Database session, used only at connect and when a chunk is stored
+    """
+    await websocket.accept()
+    recording_repository = MySQLRecordingRepository(db)
+    try:
+        if get_drain_coordinator().draining:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server is shutting down")
+        user = authenticate_stream_token(stream_token, recording_id, INGEST_TOKEN_SCOPE, db)
+        _get_uploadable_recording(recording_id, user, recording_repository)
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=4000 + e.status_code)
+        return
+    finally:
+        # Release the connection; an open stream must not hold one from the pool
+        db.close()
+    
+    async def commit_chunk(chunk_index: int, stored: StoredChunk, duration_seconds: Optional[float]) -> dict:
+        try:
+            return await _register_chunk(recording_id, chunk_index, stored, duration_seconds, recording_repository)
+        finally:
+            db.close()
+    
+    def find_committed(chunk_index: int) -> Optional[dict]:
+        try:
+            chunk = recording_repository.get_chunk(recording_id, chunk_index)
+            if chunk is None:
+                return None
+            return {"chunk_id": chunk.id, "chunk_index": chunk_index, "sha256": chunk.sha256}
+        finally:
+            db.close()
+    
+    session = RecordingStreamSession(
+        websocket,
+        recording_id,
+        os.path.join(settings.audio_storage_path, recording_id),
+        max_chunk_bytes(),
+        commit_chunk,
+        find_committed
+    )
+    logger.info(f"Recording stream opened for recording {recording_id}")
+    await session.run()
+    logger.info(f"Recording stream closed for recording {recording_id}")
+
+
+@router.post("/{recording_id}/chunks")
+async def upload_chunk(
+    recording_id: str,
+    chunk_index: int = Form(...),
+    audio_chunk: UploadFile = File(...),
+    duration_seconds: Optional[float] = Form(None),
+    current_user: User = Depends(get_current_user),
+    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
+):
+    """
+    Upload an audio chunk for a recording as ``multipart/form-data``.
+    
+    ``PUT /recordings/{id}/chunks/{chunk_index}`` takes the same chunk as a
+    raw body and skips multipart parsing.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_index: Sequential index of the chunk
+        audio_chunk: Audio file chunk
+        duration_seconds: Optional duration of the chunk
+        current_user: Current authenticated user
+        recording_repository: Recording repository dependency
+        
+    Returns:
+        Success message with chunk information, including its size and SHA-256
+        
+    Raises:
+        HTTPException: If recording not found, access denied, the chunk is
+            over ``max_chunk_size_mb`` (413), or upload fails
+    """
+    _get_uploadable_recording(recording_id, current_user, recording_repository)
+    return await _save_chunk(
+        recording_id, chunk_index, read_upload(audio_chunk), audio_chunk.content_type,
+        duration_seconds, recording_repository
+    )
+
+
+@router.put("/{recording_id}/chunks/{chunk_index}")
+async def put_chunk(
+    recording_id: str,
+    chunk_index: int,
+    request: Request,
+    duration_seconds: Optional[float] = Query(None),
+    current_user: User = Depends(get_current_user),
+    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
+):
+    """
+    Upload an audio chunk for a recording as the raw request body.
+    
+    The body (``application/octet-stream`` or the audio MIME type) is
+    written to storage as it is received, without multipart parsing.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_index: Sequential index of the chunk
+        request: Request whose body is the chunk
+        duration_seconds: Optional duration of the chunk
+        current_user: Current authenticated user
+        recording_repository: Recording repository dependency
+        
+    Returns:
+        Success message with chunk information, including its size and SHA-256
+        
+    Raises:
+        HTTPException: If recording not found, access denied, the chunk is
+            over ``max_chunk_size_mb`` (413), or upload fails
+    """
+    _get_uploadable_recording(recording_id, current_user, recording_repository)
+    return await _save_chunk(
+        recording_id, chunk_index, request.stream(), request.headers.get("content-type"),
+        duration_seconds, recording_repository
+    )
+
+
+@router.post("/{recording_id}/chunks/batch")
+async def upload_chunks(
+    recording_id: str,
+    chunk_indexes: List[int] = Form(...),
+    audio_chunks: List[UploadFile] = File(...),
+    durations_seconds: List[float] = Form([]),
+    current_user: User = Depends(get_current_user),
+    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
+):
+    """
+    Upload several audio chunks of a recording in one request.
+    
+    Lets a reconnecting client catch up on its backlog in one round trip.
+    The form repeats ``chunk_indexes`` and ``audio_chunks`` (and optionally
+    ``durations_seconds``) once per chunk, in matching order. The files are
+    written concurrently and all chunks are recorded in one transaction:
+    either every chunk is added or none is, and a failed batch can simply
+    be retried. Files are staged and renamed into place only after the
+    insert commits, so a failed batch leaves no files behind. Chunks
+    identical to ones already stored are skipped.
+    
+    Args:
+        recording_id: Recording ID
+        chunk_indexes: Sequential index of each chunk
+        audio_chunks: Audio file of each chunk
+        durations_seconds: Optional duration of each chunk
+        current_user: Current authenticated user
+        recording_repository: Recording repository dependency
+        
+    Returns:
+        Success message with the information of each chunk, in index order
+        
+    Raises:
+        HTTPException: If recording not found, access denied, the batch is
+            malformed or over ``max_chunk_batch_size`` chunks (400), a chunk
+            is over ``max_chunk_size_mb`` (413), a chunk was already uploaded
+            with different content (409), or upload fails
+    """
+    _get_uploadable_recording(recording_id, current_user, recording_repository)
+    
+    if len(audio_chunks) != len(chunk_indexes) or (
+        durations_seconds and len(durations_seconds) != len(chunk_indexes)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Every chunk needs one chunk_indexes and one audio_chunks entry"
+        )
+    if len(set(chunk_indexes)) != len(chunk_indexes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate chunk index in batch"
+        )
+    if len(chunk_indexes) > settings.max_chunk_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may hold at most {settings.max_chunk_batch_size} chunks"
         )
+    
+    durations = durations_seconds or [None] * len(chunk_indexes)
+    batch = sorted(zip(chunk_indexes, audio_chunks, durations), key=lambda item: item[0])
+    recording_dir = os.path.join(settings.audio_storage_path, recording_id)
+    max_bytes = max_chunk_bytes()
+    
+    staged: List[StoredChunk] = []
+    try:
+        # Files are independent; stage them all at once. Every upload runs to
+        # the end, so a failed one leaves no other staged file unaccounted for.
+        results = await asyncio.gather(*(
+            store_chunk(read_upload(upload), recording_dir, chunk_index, max_bytes, upload.content_type)
+            for chunk_index, upload, _ in batch
+        ), return_exceptions=True)
+        staged = [result for result in results if isinstance(result, StoredChunk)]
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            raise next((e for e in failures if isinstance(e, ChunkTooLargeError)), failures[0])
+        stored_chunks = results
         
-        logger.info(f"Uploaded chunk {chunk_index} for recording {recording_id}")
+        # Chunks already recorded must match; they are answered with the recorded row
+        existing = {chunk.chunk_index: chunk for chunk in recording_repository.get_chunks(recording_id)}
+        duplicates = set()
+        for (chunk_index, _, _), stored in zip(batch, stored_chunks):
+            if chunk_index in existing:
+                if await _existing_sha256(existing[chunk_index]) != stored.sha256:
+                    raise ChunkConflictError(chunk_index)
+                duplicates.add(chunk_index)
         
-        return {
-            "message": "Chunk uploaded successfully",
-            "chunk_id": chunk.id,
-            "chunk_index": chunk_index,
-            "file_size": len(content)
+        # One bulk insert and one commit for the chunks not stored yet
+        new_chunks = [
+            {
+                "chunk_index": chunk_index,
+                "audio_blob_path": stored.path,
+                "duration_seconds": duration_seconds,
+                "container": stored.container_info.container,
+                "codec": stored.container_info.codec,
+                "sha256": stored.sha256
+            }
+            for (chunk_index, _, duration_seconds), stored in zip(batch, stored_chunks)
+            if chunk_index not in duplicates
+        ]
+        added = {
+            chunk.chunk_index: chunk
+            for chunk in (recording_repository.add_chunks(recording_id, new_chunks) if new_chunks else [])
         }
         
+        # Files are published only once their rows are committed
+        published = []
+        try:
+            for (chunk_index, _, _), stored in zip(batch, stored_chunks):
+                if chunk_index not in duplicates:
+                    published.append(await asyncio.to_thread(publish_chunk, stored))
+        except OSError:
+            # No row may outlive its file; these indexes were new, so the files are ours
+            for stored in published:
+                await asyncio.to_thread(os.remove, stored.path)
+            for chunk in added.values():
+                recording_repository.delete_chunk(chunk.id)
+            raise
+        
+    except ChunkTooLargeError as e:
+        logger.warning(f"Rejected chunk batch for recording {recording_id}: {e}")
+        raise chunk_too_large(e.max_bytes)
+    except ChunkConflictError as e:
+        logger.warning(f"Rejected chunk batch for recording {recording_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        # Another upload recorded some of the chunks meanwhile; a retry sorts them out
+        logger.warning(f"Rejected chunk batch for recording {recording_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some chunks were uploaded concurrently; retry the batch"
+        )
     except Exception as e:
-        logger.error(f"Failed to upload chunk for recording {recording_id}: {e}")
+        logger.error(f"Failed to upload chunk batch for recording {recording_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload chunk"
+            detail="Failed to upload chunks"
         )
+    finally:
+        # Drops every staged file that was not published: all of them if the batch failed
+        for stored in staged:
+            await asyncio.to_thread(discard_chunk, stored)
+    
+    # Assembly appends in order, so chunks are handed on by index
+    chunk_infos = []
+    for (chunk_index, _, _), stored in zip(batch, stored_chunks):
+        if chunk_index in duplicates:
+            chunk_infos.append({**_chunk_info(existing[chunk_index].id, chunk_index, stored), "duplicate": True})
+            continue
+        await _chunk_stored(recording_id, chunk_index, stored)
+        chunk_infos.append({**_chunk_info(added[chunk_index].id, chunk_index, stored), "duplicate": False})
+    
+    return {"message": "Chunks uploaded successfully", "chunks": chunk_infos}
 
 
 @router.patch("/{recording_id}/pause")
@@ -293,15 +891,17 @@ async def pause_recording(
 async def finish_recording(
     recording_id: str,
     current_user: User = Depends(get_current_user),
-    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository)
+    recording_repository: MySQLRecordingRepository = Depends(get_recording_repository),
+    job_repository: MySQLTranscriptionJobRepository = Depends(get_transcription_job_repository)
 ):
     """
-    Finish a recording and trigger transcription.
+    Finish a recording and queue its transcription.
 
     Args:
         recording_id: Recording ID
         current_user: Current authenticated user
         recording_repository: Recording repository dependency
+        job_repository: Transcription job repository dependency
 
     Returns:
         Updated recording information
@@ -325,14 +925,26 @@ async def finish_recording(
         )
 
     try:
-        # Mark recording as ended
-        updated_recording = recording_repository.update_recording_status(recording_id, "ended")
-
-        # Trigger audio assembly and transcription in background
-        transcription_service = TranscriptionService(recording_repository)
-        asyncio.create_task(transcription_service.process_recording_async(recording_id))
+        # Streams still open are ended first, so no late frame reaches the chunks being stored
+        async with recording_streams_closed(recording_id):
+            # Keep the audio of streams that were cut off, up to their last checkpoint
+            await _commit_pending_stream_chunks(recording_id, recording_repository)
+            
+            # Mark recording as ended
+            updated_recording = recording_repository.update_recording_status(recording_id, "ended")
+
+        # Workers assemble and transcribe the audio; the job survives API restarts
+        audio_seconds = estimate_recording_seconds(recording_repository.get_chunks(recording_id))
+        job = job_repository.enqueue(
+            recording_id,
+            max_attempts=settings.transcription_job_max_attempts,
+            audio_seconds=audio_seconds,
+            priority=classify_priority(audio_seconds)
+        )
 
-        logger.info(f"Finished recording {recording_id} - transcription started")
+        get_recording_event_broker().publish(event_from_state(updated_recording, job))
+        
+        logger.info(f"Finished recording {recording_id} - transcription job {job.id} queued")
 
         return RecordingResponse(**updated_recording.to_dict())
 
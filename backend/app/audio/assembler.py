@@ -0,0 +1,328 @@
+"""
+Streaming, constant-memory assembly of recording chunks into a single file.
+"""
+import os
+import shutil
+import logging
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, List, Optional
+
+from app.audio.formats import sniff_file
+from app.audio.wav import WavFormat, WAV_HEADER_SIZE, probe_wav, write_wav_header
+
+logger = logging.getLogger(__name__)
+
+# Size of the buffer used when copying PCM frames between files.
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass
+class AssemblyResult:
+    """Outcome of assembling a list of chunk files."""
+    output_path: str
+    format: Optional[WavFormat]
+    data_size: int
+    chunk_count: int
+    skipped_chunks: List[str] = field(default_factory=list)
+    decoded_chunks: List[str] = field(default_factory=list)
+    container: str = "wav"
+    strategy: str = "pcm"
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Duration of the assembled audio in seconds (None if not PCM)."""
+        if self.format is None or not self.format.byte_rate:
+            return None
+        return self.data_size / self.format.byte_rate
+
+
+def copy_block_range(src: BinaryIO, dst: BinaryIO, offset: int, size: int, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Copy a byte range from one file to another through a fixed-size buffer.
+
+    Args:
+        src: Source file opened for binary reading
+        dst: Destination file opened for binary writing
+        offset: Position in the source to start copying from
+        size: Number of bytes to copy
+        block_size: Maximum number of bytes held in memory at once
+
+    Returns:
+        Number of bytes actually copied
+    """
+    src.seek(offset)
+    remaining = size
+    copied = 0
+    while remaining > 0:
+        block = src.read(min(block_size, remaining))
+        if not block:
+            break
+        dst.write(block)
+        copied += len(block)
+        remaining -= len(block)
+    return copied
+
+
+def decode_chunk_to_pcm(path: str, target_format: Optional[WavFormat]):
+    """
+    Decode a chunk with pydub, converting it to the target PCM layout.
+
+    This is the slow path for chunks whose header cannot be copied verbatim.
+    Only the single chunk being decoded is held in memory.
+
+    Args:
+        path: Path to the chunk file
+        target_format: Layout to convert to, or None to keep the decoded layout
+
+    Returns:
+        Tuple of (PCM bytes, format of those bytes)
+    """
+    # Imported lazily so the fast path never pays for pydub/ffmpeg discovery.
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(path)
+    if target_format is not None:
+        segment = (
+            segment
+            .set_frame_rate(target_format.sample_rate)
+            .set_channels(target_format.channels)
+            .set_sample_width(target_format.sample_width)
+        )
+    decoded_format = WavFormat(
+        channels=segment.channels,
+        sample_rate=segment.frame_rate,
+        sample_width=segment.sample_width
+    )
+    return segment.raw_data, decoded_format
+
+
+class StreamingWavAssembler:
+    """
+    Concatenate WAV chunks by copying PCM frames straight to the output file.
+
+    Chunks whose header matches the output layout are copied in fixed-size
+    blocks, so memory use is independent of recording length and the total
+    work is linear in the number of bytes. Chunks that are not PCM WAV, or
+    that use a different layout, are decoded with pydub one at a time.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the assembler.
+
+        Args:
+            block_size: Size of the copy buffer in bytes
+        """
+        self.block_size = block_size
+
+    def assemble(self, chunk_paths: Iterable[str], output_path: str) -> Optional[AssemblyResult]:
+        """
+        Assemble chunk files, in the given order, into a single WAV file.
+
+        The output is written to a temporary file and moved into place once
+        complete, so a partially assembled file is never observed at
+        ``output_path``.
+
+        Args:
+            chunk_paths: Paths of the chunk files in playback order
+            output_path: Path of the assembled WAV file
+
+        Returns:
+            Assembly result, or None if no chunk could be read
+        """
+        temp_path = f"{output_path}.part"
+        target_format = None
+        data_size = 0
+        chunk_count = 0
+        skipped = []
+        decoded = []
+
+        try:
+            with open(temp_path, "wb") as out:
+                # Reserve room for the header; it is patched once sizes are known.
+                out.write(b"\x00" * WAV_HEADER_SIZE)
+
+                for path in chunk_paths:
+                    if not os.path.exists(path):
+                        logger.warning(f"Chunk file not found: {path}")
+                        skipped.append(path)
+                        continue
+
+                    info = probe_wav(path)
+                    if info is not None and (target_format is None or info.format == target_format):
+                        target_format = info.format
+                        with open(path, "rb") as src:
+                            data_size += copy_block_range(
+                                src, out, info.data_offset, info.data_size, self.block_size
+                            )
+                        chunk_count += 1
+                        continue
+
+                    try:
+                        pcm, pcm_format = decode_chunk_to_pcm(path, target_format)
+                    except Exception as e:
+                        logger.warning(f"Failed to load chunk {path}: {e}")
+                        skipped.append(path)
+                        continue
+
+                    target_format = pcm_format
+                    out.write(pcm)
+                    data_size += len(pcm)
+                    chunk_count += 1
+                    decoded.append(path)
+
+                if target_format is None:
+                    return None
+
+                write_wav_header(out, target_format, data_size)
+
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return AssemblyResult(
+            output_path=output_path,
+            format=target_format,
+            data_size=data_size,
+            chunk_count=chunk_count,
+            skipped_chunks=skipped,
+            decoded_chunks=decoded
+        )
+
+
+# Containers whose packets can be concatenated without decoding, as long as
+# every chunk carries the same codec.
+STREAM_COPY_CONTAINERS = {"webm": ".webm", "ogg": ".ogg"}
+
+
+def ffmpeg_available() -> bool:
+    """Check whether the ffmpeg binary is on PATH."""
+    return shutil.which("ffmpeg") is not None
+
+
+def stream_copy_concat(chunk_paths: List[str], output_path: str) -> bool:
+    """
+    Concatenate compressed chunks with ffmpeg's concat demuxer, without re-encoding.
+
+    Args:
+        chunk_paths: Paths of the chunk files in playback order
+        output_path: Path of the concatenated file
+
+    Returns:
+        True if ffmpeg produced the output file, False otherwise
+    """
+    temp_path = f"{output_path}.part{os.path.splitext(output_path)[1]}"
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+        for path in chunk_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+        list_path = list_file.name
+
+    try:
+        completed = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-map", "0:a", "-c", "copy", temp_path
+            ],
+            capture_output=True
+        )
+        if completed.returncode != 0:
+            logger.warning(f"ffmpeg stream copy failed: {completed.stderr.decode(errors='replace').strip()}")
+            return False
+        os.replace(temp_path, output_path)
+        return True
+    finally:
+        for path in (list_path, temp_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ContainerAwareAssembler:
+    """
+    Pick the cheapest correct way to assemble a recording's chunks.
+
+    1. All chunks PCM WAV: copy PCM frames (``StreamingWavAssembler``).
+    2. All chunks WebM (or Ogg) with the same codec: ffmpeg stream copy, which
+       remuxes packets without decoding or re-encoding.
+    3. Anything else: decode each chunk to PCM and assemble a WAV file.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the assembler.
+
+        Args:
+            block_size: Size of the copy buffer in bytes
+        """
+        self.wav_assembler = StreamingWavAssembler(block_size=block_size)
+
+    def plan(self, chunk_paths: List[str]) -> str:
+        """
+        Choose an assembly strategy from the chunks' magic bytes.
+
+        Args:
+            chunk_paths: Paths of existing chunk files
+
+        Returns:
+            "pcm", "stream_copy" or "decode"
+        """
+        infos = [sniff_file(path) for path in chunk_paths]
+        containers = {info.container for info in infos}
+        codecs = {info.codec for info in infos}
+
+        if containers == {"wav"} and codecs == {"pcm"}:
+            return "pcm"
+        if (
+            len(containers) == 1
+            and next(iter(containers)) in STREAM_COPY_CONTAINERS
+            and len(codecs) == 1
+            and None not in codecs
+            and ffmpeg_available()
+        ):
+            return "stream_copy"
+        return "decode"
+
+    def assemble(self, chunk_paths: Iterable[str], output_base: str) -> Optional[AssemblyResult]:
+        """
+        Assemble chunk files, in the given order, into a single audio file.
+
+        Args:
+            chunk_paths: Paths of the chunk files in playback order
+            output_base: Output path without extension; the extension is
+                chosen from the strategy (``.wav``, ``.webm`` or ``.ogg``)
+
+        Returns:
+            Assembly result, or None if no chunk could be read
+        """
+        chunk_paths = list(chunk_paths)
+        existing = [path for path in chunk_paths if os.path.exists(path)]
+        missing = [path for path in chunk_paths if not os.path.exists(path)]
+        for path in missing:
+            logger.warning(f"Chunk file not found: {path}")
+        if not existing:
+            return None
+
+        strategy = self.plan(existing)
+        if strategy == "stream_copy":
+            container = sniff_file(existing[0]).container
+            output_path = output_base + STREAM_COPY_CONTAINERS[container]
+            if stream_copy_concat(existing, output_path):
+                return AssemblyResult(
+                    output_path=output_path,
+                    format=None,
+                    data_size=os.path.getsize(output_path),
+                    chunk_count=len(existing),
+                    skipped_chunks=missing,
+                    container=container,
+                    strategy=strategy
+                )
+            strategy = "decode"
+
+        result = self.wav_assembler.assemble(chunk_paths, output_base + ".wav")
+        if result is not None:
+            result.strategy = strategy
+        return result
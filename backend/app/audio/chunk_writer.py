@@ -0,0 +1,352 @@
+"""
+Streaming storage of uploaded audio chunks.
+
+Uploads are written to disk block by block as they are received, so memory
+per upload is one block regardless of chunk size. The size limit is checked
+on every block, and size and SHA-256 are computed on the way. A chunk is
+written to a temporary file and stays staged there once it is complete;
+``publish_chunk`` renames it into place. Callers publish only after the
+chunk's database row was inserted, so a rejected or interrupted upload, or
+a retry of a chunk index that is already stored, never touches the stored
+file.
+
+``StreamedChunk`` is the resumable variant used by the recording stream: its
+bytes become durable at checkpoints, and a reconnecting client continues
+from the last checkpointed offset.
+"""
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+from dataclasses import dataclass, replace
+from typing import AsyncIterable, List, Optional
+
+import aiofiles
+
+from app.audio.formats import SNIFF_BYTES, ContainerInfo, sniff_container
+
+logger = logging.getLogger(__name__)
+
+# Read size for upload bodies; small enough that many concurrent uploads stay cheap
+UPLOAD_BLOCK_SIZE = 64 * 1024
+
+_STREAM_PART = re.compile(r"^stream_(\d+)\.part$")
+
+
+class ChunkTooLargeError(Exception):
+    """Raised when an upload exceeds the chunk size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Chunk exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class ChunkConflictError(Exception):
+    """Raised when a stored chunk index is uploaded again with different content."""
+
+    def __init__(self, chunk_index: int):
+        super().__init__(f"Chunk {chunk_index} was already uploaded with different content")
+        self.chunk_index = chunk_index
+
+
+@dataclass(frozen=True)
+class StoredChunk:
+    """A chunk file written by ``ChunkWriter`` or ``StreamedChunk``."""
+    path: str
+    size: int
+    sha256: str
+    container_info: ContainerInfo
+    staged_path: Optional[str] = None  # Where the chunk waits until it is published to ``path``
+
+
+class ChunkWriter:
+    """
+    Write one uploaded chunk to the recording directory as it streams in.
+
+    The file is named after the container detected from its first bytes,
+    not the client's declared type, as ``chunk_<index><extension>``.
+    """
+
+    def __init__(self, recording_dir: str, chunk_index: int, max_bytes: int):
+        """
+        Initialize the writer.
+
+        Args:
+            recording_dir: Directory holding the recording's chunk files
+            chunk_index: Index of the chunk being written
+            max_bytes: Largest accepted chunk
+        """
+        self.recording_dir = recording_dir
+        self.chunk_index = chunk_index
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._header = b""
+        self._temp_path = os.path.join(recording_dir, f".chunk_{chunk_index:04d}.{uuid.uuid4().hex}.part")
+        self._file = None
+
+    async def write(self, block: bytes):
+        """
+        Append a block of the upload.
+
+        Args:
+            block: Next bytes of the chunk
+
+        Raises:
+            ChunkTooLargeError: If the chunk is now larger than ``max_bytes``
+        """
+        self.size += len(block)
+        if self.size > self.max_bytes:
+            raise ChunkTooLargeError(self.max_bytes)
+        if self._file is None:
+            os.makedirs(self.recording_dir, exist_ok=True)
+            self._file = await aiofiles.open(self._temp_path, "wb")
+        if len(self._header) < SNIFF_BYTES:
+            self._header += block[:SNIFF_BYTES - len(self._header)]
+        self._hash.update(block)
+        await self._file.write(block)
+
+    async def finish(self, declared_mime_type: Optional[str] = None) -> StoredChunk:
+        """
+        Complete the chunk, leaving it staged in its temporary file.
+
+        Args:
+            declared_mime_type: Client-declared type, used only if the container is not recognised
+
+        Returns:
+            The staged chunk, to be published with ``publish_chunk``
+        """
+        if self._file is None:
+            # Empty upload
+            await self.write(b"")
+        await self._file.close()
+        container_info = sniff_container(self._header, declared_mime_type)
+        path = os.path.join(self.recording_dir, f"chunk_{self.chunk_index:04d}{container_info.extension}")
+        return StoredChunk(path, self.size, self._hash.hexdigest(), container_info, self._temp_path)
+
+    async def discard(self):
+        """Remove the partial file of an abandoned upload."""
+        if self._file is not None:
+            await self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+async def store_chunk(
+    blocks: AsyncIterable[bytes],
+    recording_dir: str,
+    chunk_index: int,
+    max_bytes: int,
+    declared_mime_type: Optional[str] = None
+) -> StoredChunk:
+    """
+    Write a streamed chunk to a staging file in the recording directory.
+
+    Args:
+        blocks: The upload body, block by block
+        recording_dir: Directory holding the recording's chunk files
+        chunk_index: Index of the chunk
+        max_bytes: Largest accepted chunk
+        declared_mime_type: Client-declared type, used only if the container is not recognised
+
+    Returns:
+        The staged chunk, to be published with ``publish_chunk`` or dropped with ``discard_chunk``
+
+    Raises:
+        ChunkTooLargeError: As soon as the upload passes ``max_bytes``; nothing is kept
+    """
+    writer = ChunkWriter(recording_dir, chunk_index, max_bytes)
+    try:
+        async for block in blocks:
+            await writer.write(block)
+        return await writer.finish(declared_mime_type)
+    except BaseException:
+        await writer.discard()
+        raise
+
+
+async def read_upload(upload, block_size: int = UPLOAD_BLOCK_SIZE) -> AsyncIterable[bytes]:
+    """
+    Read an ``UploadFile`` block by block.
+
+    Args:
+        upload: Uploaded file
+        block_size: Bytes per block
+
+    Yields:
+        Blocks of the file
+    """
+    while True:
+        block = await upload.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+class StreamedChunk:
+    """
+    A chunk received over a stream, durable up to its last checkpoint.
+
+    Bytes are appended to ``stream_<index>.part``. ``checkpoint`` syncs them
+    to disk and records the offset in ``stream_<index>.json``. Reopening the
+    chunk drops anything after the last checkpoint, so a client that
+    reconnects resends from the offset it was last acknowledged. ``finish``
+    stages the complete chunk like ``ChunkWriter``.
+    File operations block and are meant to run in a thread.
+    """
+
+    def __init__(self, recording_dir: str, chunk_index: int, max_bytes: int):
+        """
+        Initialize the chunk.
+
+        Args:
+            recording_dir: Directory holding the recording's chunk files
+            chunk_index: Index of the chunk
+            max_bytes: Largest accepted chunk
+        """
+        self.recording_dir = recording_dir
+        self.chunk_index = chunk_index
+        self.max_bytes = max_bytes
+        self.part_path = os.path.join(recording_dir, f"stream_{chunk_index:04d}.part")
+        self.state_path = os.path.join(recording_dir, f"stream_{chunk_index:04d}.json")
+        self.offset = 0
+        self.size = 0
+        self._file = None
+
+    def open(self) -> int:
+        """
+        Open the chunk, resuming from its last checkpoint.
+
+        Returns:
+            Offset the client should continue from
+        """
+        os.makedirs(self.recording_dir, exist_ok=True)
+        if os.path.exists(self.state_path) and os.path.exists(self.part_path):
+            with open(self.state_path) as f:
+                self.offset = json.load(f)["offset"]
+            self._file = open(self.part_path, "r+b")
+            self._file.truncate(self.offset)
+            self._file.seek(self.offset)
+        else:
+            self.offset = 0
+            self._file = open(self.part_path, "wb")
+        self.size = self.offset
+        return self.offset
+
+    @property
+    def pending(self) -> int:
+        """Bytes received since the last checkpoint."""
+        return self.size - self.offset
+
+    def append(self, data: bytes):
+        """
+        Append received bytes.
+
+        Raises:
+            ChunkTooLargeError: If the chunk is now larger than ``max_bytes``
+        """
+        if self.size + len(data) > self.max_bytes:
+            raise ChunkTooLargeError(self.max_bytes)
+        self._file.write(data)
+        self.size += len(data)
+
+    def checkpoint(self) -> int:
+        """
+        Make everything received so far durable.
+
+        Returns:
+            The durable offset
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"offset": self.size}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+        self.offset = self.size
+        return self.offset
+
+    def close(self):
+        """Close the file, keeping the chunk resumable from its last checkpoint."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self, declared_mime_type: Optional[str] = None) -> StoredChunk:
+        """
+        Complete the chunk and stage it for publishing.
+
+        Args:
+            declared_mime_type: Client-declared type, used only if the container is not recognised
+
+        Returns:
+            The staged chunk, to be published with ``publish_chunk``
+        """
+        self.checkpoint()
+        self.close()
+        digest = hashlib.sha256()
+        with open(self.part_path, "rb") as f:
+            header = f.read(SNIFF_BYTES)
+            digest.update(header)
+            for block in iter(lambda: f.read(UPLOAD_BLOCK_SIZE), b""):
+                digest.update(block)
+        container_info = sniff_container(header, declared_mime_type)
+        path = os.path.join(self.recording_dir, f"chunk_{self.chunk_index:04d}{container_info.extension}")
+        staged_path = os.path.join(self.recording_dir, f".chunk_{self.chunk_index:04d}.{uuid.uuid4().hex}.part")
+        os.replace(self.part_path, staged_path)
+        os.remove(self.state_path)
+        return StoredChunk(path, self.offset, digest.hexdigest(), container_info, staged_path)
+
+
+def publish_chunk(stored: StoredChunk) -> StoredChunk:
+    """
+    Rename a staged chunk into place.
+
+    Args:
+        stored: Chunk from ``store_chunk`` or ``StreamedChunk.finish``
+
+    Returns:
+        The published chunk
+    """
+    if stored.staged_path is not None:
+        os.replace(stored.staged_path, stored.path)
+    return replace(stored, staged_path=None)
+
+
+def discard_chunk(stored: StoredChunk):
+    """Remove a staged chunk that will not be published."""
+    if stored.staged_path is not None and os.path.exists(stored.staged_path):
+        os.remove(stored.staged_path)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a stored chunk file, for chunks recorded before checksums were kept."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pending_stream_chunks(recording_dir: str) -> List[int]:
+    """
+    Indexes of streamed chunks that were never committed, e.g. after the client went away.
+
+    Args:
+        recording_dir: Directory holding the recording's chunk files
+
+    Returns:
+        Chunk indexes in order
+    """
+    if not os.path.isdir(recording_dir):
+        return []
+    indexes = []
+    for name in os.listdir(recording_dir):
+        match = _STREAM_PART.match(name)
+        if match and os.path.exists(os.path.join(recording_dir, f"stream_{match.group(1)}.json")):
+            indexes.append(int(match.group(1)))
+    return sorted(indexes)
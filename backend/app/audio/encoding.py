@@ -0,0 +1,330 @@
+"""
+Transcription encoding profile: shrink assembled audio before provider upload.
+
+Speech models work at 16 kHz mono, so browser-rate stereo PCM is mostly
+wasted bandwidth. The profile downmixes and resamples the assembled audio,
+then encodes it with the most compact codec the provider accepts.
+"""
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from app.audio.assembler import ffmpeg_available
+from app.audio.engine import AudioEngine
+from app.audio.vad import VadConfig, VadResult
+from app.audio.wav import probe_wav
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EncoderSpec:
+    """How to produce one transcription payload format with ffmpeg."""
+    extension: str
+    container: str
+    codec: str
+    accepted_extensions: Tuple[str, ...]
+    parameters: Tuple[str, ...] = ()
+
+
+ENCODERS = {
+    "flac": EncoderSpec(
+        extension=".flac",
+        container="flac",
+        codec="flac",
+        accepted_extensions=(".flac",),
+        parameters=("-compression_level", "5")
+    ),
+    "opus": EncoderSpec(
+        extension=".ogg",
+        container="ogg",
+        codec="libopus",
+        accepted_extensions=(".ogg", ".opus"),
+        parameters=("-application", "voip")
+    ),
+}
+
+
+def source_pcm_path(payload_path: str) -> str:
+    """
+    Get the PCM WAV file a payload was encoded from.
+
+    ``TranscriptionEncoder.encode`` writes each payload next to its PCM
+    input, replacing only the ``.wav`` extension.
+
+    Args:
+        payload_path: Path of an encoded payload
+
+    Returns:
+        Path of the PCM WAV file (the payload itself if it is that file)
+    """
+    return f"{os.path.splitext(payload_path)[0]}.wav"
+
+
+@dataclass(frozen=True)
+class TranscriptionEncodingProfile:
+    """Target layout and codec preferences for transcription uploads."""
+    sample_rate: int = 16000
+    channels: int = 1
+    preferred_formats: Tuple[str, ...] = ("flac", "opus")
+    # Bitrate for Opus; FLAC is lossless and takes none
+    opus_bitrate: str = "24k"
+
+    @classmethod
+    def from_settings(cls) -> "TranscriptionEncodingProfile":
+        """Build the profile from application settings."""
+        return cls(
+            sample_rate=settings.transcription_sample_rate,
+            channels=settings.transcription_channels,
+            preferred_formats=tuple(settings.transcription_formats),
+            opus_bitrate=settings.transcription_opus_bitrate
+        )
+
+    def choose_format(self, supported_formats: Iterable[str]) -> Optional[str]:
+        """
+        Pick the first preferred format the provider accepts.
+
+        Args:
+            supported_formats: File extensions accepted by the provider
+
+        Returns:
+            Format name from ``ENCODERS``, or None if none is accepted
+        """
+        supported = {extension.lower() for extension in supported_formats}
+        for name in self.preferred_formats:
+            spec = ENCODERS.get(name)
+            if spec and supported.intersection(spec.accepted_extensions):
+                return name
+        return None
+
+
+@dataclass
+class EncodedAudio:
+    """Transcription payload produced from an assembled recording."""
+    path: str
+    format: str
+    original_bytes: int
+    encoded_bytes: int
+    encoding_seconds: float
+    duration_seconds: Optional[float] = None
+    vad: Optional[VadResult] = None
+    intermediate_paths: list = field(default_factory=list)
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes saved compared with uploading the assembled file."""
+        return self.original_bytes - self.encoded_bytes
+
+    @property
+    def compression_ratio(self) -> float:
+        """Assembled size divided by payload size."""
+        return self.original_bytes / self.encoded_bytes if self.encoded_bytes else 0.0
+
+    def cleanup(self):
+        """Remove the payload and any intermediate files."""
+        for path in [self.path] + self.intermediate_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class TranscriptionEncoder:
+    """
+    Produce a compact transcription payload from an assembled recording.
+
+    Stages run in the audio engine's worker processes:
+
+    1. Downmix/resample to the profile's PCM layout (``*.pcm.wav``).
+    2. Optionally trim long non-speech spans (``*.vad.wav``), saving an
+       offset map (``*.offsets.json``) next to the assembled audio.
+    3. Encode to FLAC or Opus, whichever the provider accepts first.
+
+    Without ffmpeg, or when the provider accepts neither codec, the
+    normalized PCM WAV is used as the payload.
+    """
+
+    def __init__(
+        self,
+        audio_engine: AudioEngine,
+        profile: Optional[TranscriptionEncodingProfile] = None,
+        vad_config: Optional[VadConfig] = None
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            audio_engine: Engine that runs the resample and encode tasks
+            profile: Encoding profile (built from settings if not provided)
+            vad_config: Silence trimming parameters (None disables trimming)
+        """
+        self.audio_engine = audio_engine
+        self.profile = profile or TranscriptionEncodingProfile.from_settings()
+        self.vad_config = vad_config
+
+    async def trim(self, normalized_path: str, offsets_path: str) -> Optional[VadResult]:
+        """
+        Remove long non-speech spans from normalized PCM.
+
+        Args:
+            normalized_path: Path of the normalized PCM WAV file
+            offsets_path: Where to save the offset map
+
+        Returns:
+            Trimming result, or None if trimming failed or found no speech
+        """
+        trimmed_path = f"{normalized_path[:-len('.pcm.wav')]}.vad.wav"
+        try:
+            result = await self.audio_engine.trim_silence(normalized_path, trimmed_path, self.vad_config)
+        except Exception as e:
+            logger.warning(f"Silence trimming failed for {normalized_path}: {e}")
+            return None
+
+        if not result.spans:
+            # Never drop a whole recording on a VAD decision; send it untrimmed.
+            os.remove(trimmed_path)
+            return None
+
+        result.offset_map.save(offsets_path)
+        metrics.increment("vad.removed_seconds", result.removed_seconds)
+        metrics.increment("vad.original_seconds", result.original_seconds)
+        return result
+
+    async def normalize(self, audio_path: str) -> str:
+        """
+        Downmix and resample an audio file to the profile's PCM layout.
+
+        Args:
+            audio_path: Path of the assembled audio
+
+        Returns:
+            Path of the normalized PCM WAV file
+        """
+        normalized_path = f"{os.path.splitext(audio_path)[0]}.pcm.wav"
+        await self.audio_engine.resample(
+            audio_path,
+            normalized_path,
+            sample_rate=self.profile.sample_rate,
+            channels=self.profile.channels
+        )
+        return normalized_path
+
+    async def encode(self, normalized_path: str, supported_formats: Iterable[str]) -> Tuple[str, str]:
+        """
+        Encode normalized PCM into the best format the provider accepts.
+
+        Args:
+            normalized_path: Path of the normalized PCM WAV file
+            supported_formats: File extensions accepted by the provider
+
+        Returns:
+            Tuple of (payload path, payload format name)
+        """
+        format_name = self.profile.choose_format(supported_formats)
+        if format_name is None or not ffmpeg_available():
+            return normalized_path, "wav"
+
+        spec = ENCODERS[format_name]
+        payload_path = f"{normalized_path[:-len('.wav')]}{spec.extension}"
+        try:
+            await self.audio_engine.encode(
+                normalized_path,
+                payload_path,
+                spec.container,
+                codec=spec.codec,
+                bitrate=self.profile.opus_bitrate if format_name == "opus" else None,
+                parameters=list(spec.parameters)
+            )
+        except Exception as e:
+            logger.warning(f"Encoding {normalized_path} as {format_name} failed, uploading PCM: {e}")
+            return normalized_path, "wav"
+        return payload_path, format_name
+
+    async def prepare_pcm(self, audio_path: str) -> Tuple[List[str], Optional[VadResult]]:
+        """
+        Run the PCM stages (normalize, then optionally trim) on an assembled recording.
+
+        Args:
+            audio_path: Path of the assembled audio
+
+        Returns:
+            Tuple of (PCM files written, the last being the one to upload;
+            trimming result or None)
+        """
+        normalized_path = await self.normalize(audio_path)
+        pcm_paths = [normalized_path]
+
+        vad = None
+        if self.vad_config is not None:
+            vad = await self.trim(normalized_path, f"{os.path.splitext(audio_path)[0]}.offsets.json")
+            if vad is not None:
+                pcm_paths.append(vad.output_path)
+        return pcm_paths, vad
+
+    async def prepare(self, audio_path: str, supported_formats: Iterable[str]) -> EncodedAudio:
+        """
+        Run the full profile on an assembled recording.
+
+        Args:
+            audio_path: Path of the assembled audio
+            supported_formats: File extensions accepted by the provider
+
+        Returns:
+            Encoded payload with size and timing statistics
+        """
+        started = time.perf_counter()
+        original_bytes = os.path.getsize(audio_path)
+
+        intermediate_paths, vad = await self.prepare_pcm(audio_path)
+        pcm_path = intermediate_paths[-1]
+        pcm_info = probe_wav(pcm_path)
+        payload_path, format_name = await self.encode(pcm_path, supported_formats)
+
+        encoded = EncodedAudio(
+            path=payload_path,
+            format=format_name,
+            original_bytes=original_bytes,
+            encoded_bytes=os.path.getsize(payload_path),
+            encoding_seconds=time.perf_counter() - started,
+            duration_seconds=pcm_info.duration_seconds if pcm_info else None,
+            vad=vad,
+            intermediate_paths=[path for path in intermediate_paths if path != payload_path]
+        )
+
+        self.record(audio_path, format_name, encoded.original_bytes, encoded.encoded_bytes,
+                    encoded.encoding_seconds, vad)
+        return encoded
+
+    def record(
+        self,
+        audio_path: str,
+        format_name: str,
+        original_bytes: int,
+        encoded_bytes: int,
+        encoding_seconds: float,
+        vad: Optional[VadResult] = None
+    ):
+        """
+        Publish size and timing statistics for one encoded recording.
+
+        Args:
+            audio_path: Path of the assembled audio
+            format_name: Payload format name(s)
+            original_bytes: Size of the assembled audio
+            encoded_bytes: Total size of the payloads uploaded for it
+            encoding_seconds: Time spent preparing the payloads
+            vad: Trimming result, if silence was trimmed
+        """
+        metrics.increment("transcription_encoding.jobs")
+        metrics.increment("transcription_encoding.original_bytes", original_bytes)
+        metrics.increment("transcription_encoding.encoded_bytes", encoded_bytes)
+        metrics.observe("transcription_encoding.seconds", encoding_seconds)
+        ratio = original_bytes / encoded_bytes if encoded_bytes else 0.0
+        logger.info(
+            f"Encoded {audio_path} for transcription as {format_name}: "
+            f"{original_bytes} -> {encoded_bytes} bytes "
+            f"({ratio:.1f}x) in {encoding_seconds:.2f}s"
+            + (f", {vad.removed_seconds:.1f}s of silence removed" if vad else "")
+        )
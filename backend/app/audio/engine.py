@@ -0,0 +1,173 @@
+"""
+Process-pool executor for CPU- and disk-bound audio work.
+
+Decoding, concatenation, encoding and resampling are synchronous and can
+take seconds to minutes for long recordings. Running them on the event loop
+stalls every other request on the worker, so they are submitted to a pool of
+worker processes and awaited instead.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, List, Optional
+
+from app.audio.assembler import DEFAULT_BLOCK_SIZE, AssemblyResult, ContainerAwareAssembler
+from app.audio.incremental import IncrementalAssembler
+from app.audio.segments import SegmentFile, split_at_silence
+from app.audio.transforms import build_context_clip, decode_to_wav, encode_audio, resample_wav
+from app.audio.vad import VadConfig, VadResult, trim_silence
+from app.audio.wav import WavFormat, WavInfo
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Task functions live at module level so they can be pickled into workers.
+
+def _concat_task(chunk_paths: List[str], output_base: str, block_size: int) -> Optional[AssemblyResult]:
+    return ContainerAwareAssembler(block_size=block_size).assemble(chunk_paths, output_base)
+
+
+def _append_chunk_task(recording_dir: str, chunk_index: int, chunk_path: str, block_size: int) -> dict:
+    return IncrementalAssembler(recording_dir, block_size=block_size).add_chunk(chunk_index, chunk_path)
+
+
+def _finalize_task(recording_dir: str, output_path: str, expected_indices: List[int], block_size: int) -> Optional[AssemblyResult]:
+    return IncrementalAssembler(recording_dir, block_size=block_size).finalize(output_path, expected_indices)
+
+
+class AudioEngine:
+    """
+    Asynchronous task API over a pool of audio worker processes.
+
+    The pool is created lazily on first use. A ``max_workers`` of 0 runs
+    tasks on a single background thread instead, which keeps them off the
+    event loop without spawning processes (useful for tests and tiny
+    deployments).
+    """
+
+    def __init__(self, max_workers: int, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the engine.
+
+        Args:
+            max_workers: Number of worker processes (0 for a thread fallback)
+            block_size: Copy buffer size used by assembly tasks
+        """
+        self.max_workers = max_workers
+        self.block_size = block_size
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.max_workers > 0:
+                # spawn avoids forking a process that already runs threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+            logger.info(f"Started audio engine with {self.max_workers} worker processes")
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a picklable callable in the pool and await its result.
+
+        Args:
+            func: Module-level function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    async def decode(self, input_path: str, output_path: str, target_format: Optional[WavFormat] = None) -> WavInfo:
+        """Decode an audio file into PCM WAV."""
+        return await self.run(decode_to_wav, input_path, output_path, target_format)
+
+    async def concat(self, chunk_paths: Iterable[str], output_base: str) -> Optional[AssemblyResult]:
+        """Concatenate chunk files; the extension of ``output_base`` is chosen by strategy."""
+        return await self.run(_concat_task, list(chunk_paths), output_base, self.block_size)
+
+    async def encode(self, input_path: str, output_path: str, format: str, **kwargs) -> int:
+        """Encode an audio file into another format; returns the output size."""
+        return await self.run(encode_audio, input_path, output_path, format, **kwargs)
+
+    async def resample(self, input_path: str, output_path: str, sample_rate: int, channels: int = 1, sample_width: int = 2) -> WavInfo:
+        """Downmix and resample an audio file into PCM WAV."""
+        return await self.run(
+            resample_wav, input_path, output_path, sample_rate, channels, sample_width, self.block_size
+        )
+
+    async def context_clip(
+        self,
+        chunk_path: str,
+        output_path: str,
+        previous_path: Optional[str],
+        context_seconds: float,
+        sample_rate: int,
+        channels: int = 1
+    ) -> float:
+        """Convert a chunk to PCM prefixed with the end of the previous chunk; returns the context length."""
+        return await self.run(
+            build_context_clip, chunk_path, output_path, previous_path, context_seconds,
+            sample_rate, channels, self.block_size
+        )
+
+    async def trim_silence(self, input_path: str, output_path: str, config: Optional[VadConfig] = None) -> VadResult:
+        """Remove long non-speech spans from a PCM WAV file."""
+        return await self.run(trim_silence, input_path, output_path, config, self.block_size)
+
+    async def split(self, input_path: str, output_base: str, segment_seconds: float, overlap_seconds: float, search_seconds: float) -> List[SegmentFile]:
+        """Split a PCM WAV file into overlapping segments cut at quiet points."""
+        return await self.run(
+            split_at_silence, input_path, output_base, segment_seconds, overlap_seconds, search_seconds, self.block_size
+        )
+
+    async def append_chunk(self, recording_dir: str, chunk_index: int, chunk_path: str) -> dict:
+        """Append an uploaded chunk to the recording's incremental assembly."""
+        return await self.run(_append_chunk_task, recording_dir, chunk_index, chunk_path, self.block_size)
+
+    async def finalize(self, recording_dir: str, output_path: str, expected_indices: Iterable[int]) -> Optional[AssemblyResult]:
+        """Finalize the recording's incremental assembly."""
+        return await self.run(
+            _finalize_task, recording_dir, output_path, list(expected_indices), self.block_size
+        )
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the worker pool.
+
+        Args:
+            wait: Whether to wait for running tasks to complete
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+            logger.info("Audio engine stopped")
+
+
+_audio_engine: Optional[AudioEngine] = None
+
+
+def get_audio_engine() -> AudioEngine:
+    """
+    Get the process-wide audio engine, sized from settings.
+
+    Returns:
+        Shared audio engine instance
+    """
+    global _audio_engine
+    if _audio_engine is None:
+        _audio_engine = AudioEngine(
+            max_workers=settings.audio_worker_processes,
+            block_size=settings.audio_copy_block_size_kb * 1024
+        )
+    return _audio_engine
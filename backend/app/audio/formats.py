@@ -0,0 +1,148 @@
+"""
+Audio container detection from magic bytes.
+"""
+import os
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+# Enough bytes to cover the RIFF fmt chunk, the Ogg identification header and
+# the Matroska track entry that MediaRecorder writes near the start of a file.
+SNIFF_BYTES = 4096
+
+
+@dataclass(frozen=True)
+class ContainerInfo:
+    """Container and codec of an audio file."""
+    container: str
+    extension: str
+    mime_type: str
+    codec: Optional[str] = None
+
+
+UNKNOWN_CONTAINER = ContainerInfo("unknown", ".bin", "application/octet-stream")
+
+# Containers keyed by name, used when only a declared MIME type is known.
+_CONTAINERS_BY_MIME = {
+    "audio/wav": ContainerInfo("wav", ".wav", "audio/wav"),
+    "audio/x-wav": ContainerInfo("wav", ".wav", "audio/wav"),
+    "audio/wave": ContainerInfo("wav", ".wav", "audio/wav"),
+    "audio/webm": ContainerInfo("webm", ".webm", "audio/webm"),
+    "video/webm": ContainerInfo("webm", ".webm", "audio/webm"),
+    "audio/ogg": ContainerInfo("ogg", ".ogg", "audio/ogg"),
+    "audio/flac": ContainerInfo("flac", ".flac", "audio/flac"),
+    "audio/mpeg": ContainerInfo("mp3", ".mp3", "audio/mpeg"),
+    "audio/mp4": ContainerInfo("mp4", ".m4a", "audio/mp4"),
+}
+
+_MIME_BY_EXTENSION = {
+    ".wav": "audio/wav",
+    ".webm": "audio/webm",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".flac": "audio/flac",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".mp4": "audio/mp4",
+}
+
+_WAV_CODECS = {0x0001: "pcm", 0x0003: "pcm_float", 0x0006: "alaw", 0x0007: "mulaw", 0xFFFE: "pcm"}
+
+
+def _sniff_wav_codec(header: bytes) -> Optional[str]:
+    position = 12
+    while position + 8 <= len(header):
+        chunk_id = header[position:position + 4]
+        chunk_size = struct.unpack("<I", header[position + 4:position + 8])[0]
+        if chunk_id == b"fmt " and position + 10 <= len(header):
+            format_tag = struct.unpack("<H", header[position + 8:position + 10])[0]
+            return _WAV_CODECS.get(format_tag, f"wav_{format_tag:#06x}")
+        position += 8 + chunk_size + (chunk_size % 2)
+    return None
+
+
+def _sniff_matroska_codec(header: bytes) -> Optional[str]:
+    # CodecID strings are stored as plain ASCII inside the Tracks element.
+    for marker, codec in ((b"A_OPUS", "opus"), (b"A_VORBIS", "vorbis"), (b"A_AAC", "aac"), (b"A_PCM", "pcm")):
+        if marker in header:
+            return codec
+    return None
+
+
+def _sniff_ogg_codec(header: bytes) -> Optional[str]:
+    for marker, codec in ((b"OpusHead", "opus"), (b"\x01vorbis", "vorbis"), (b"\x7fFLAC", "flac")):
+        if marker in header:
+            return codec
+    return None
+
+
+def sniff_container(header: bytes, declared_mime_type: Optional[str] = None) -> ContainerInfo:
+    """
+    Identify an audio container from the first bytes of a file.
+
+    Args:
+        header: Leading bytes of the file (``SNIFF_BYTES`` is enough)
+        declared_mime_type: Client-declared MIME type, used only when the
+            magic bytes are not recognised
+
+    Returns:
+        Detected container information
+    """
+    if header[0:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return ContainerInfo("wav", ".wav", "audio/wav", _sniff_wav_codec(header))
+
+    if header[0:4] == b"\x1a\x45\xdf\xa3":
+        codec = _sniff_matroska_codec(header)
+        if b"webm" in header[:64]:
+            return ContainerInfo("webm", ".webm", "audio/webm", codec)
+        return ContainerInfo("matroska", ".mka", "audio/x-matroska", codec)
+
+    if header[0:4] == b"OggS":
+        return ContainerInfo("ogg", ".ogg", "audio/ogg", _sniff_ogg_codec(header))
+
+    if header[0:4] == b"fLaC":
+        return ContainerInfo("flac", ".flac", "audio/flac", "flac")
+
+    if header[4:8] == b"ftyp":
+        return ContainerInfo("mp4", ".m4a", "audio/mp4", "aac")
+
+    if header[0:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return ContainerInfo("mp3", ".mp3", "audio/mpeg", "mp3")
+
+    if declared_mime_type:
+        base_type = declared_mime_type.split(";")[0].strip().lower()
+        if base_type in _CONTAINERS_BY_MIME:
+            return _CONTAINERS_BY_MIME[base_type]
+
+    return UNKNOWN_CONTAINER
+
+
+def sniff_file(path: str) -> ContainerInfo:
+    """
+    Identify the container of an audio file on disk.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        Detected container information
+    """
+    try:
+        with open(path, "rb") as f:
+            return sniff_container(f.read(SNIFF_BYTES))
+    except OSError:
+        return UNKNOWN_CONTAINER
+
+
+def mime_type_for_path(path: str) -> str:
+    """
+    Get the MIME type to declare when uploading an audio file.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        MIME type derived from the file extension
+    """
+    extension = os.path.splitext(path)[1].lower()
+    return _MIME_BY_EXTENSION.get(extension, "application/octet-stream")
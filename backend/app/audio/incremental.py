@@ -0,0 +1,214 @@
+"""
+Incremental, per-recording audio assembly performed as chunks are uploaded.
+"""
+import os
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+from app.audio.assembler import DEFAULT_BLOCK_SIZE, AssemblyResult, copy_block_range
+from app.audio.wav import WavFormat, WAV_HEADER_SIZE, probe_wav, write_wav_header
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalAssembler:
+    """
+    Append chunks to an "assembled so far" WAV file as they arrive.
+
+    Chunks are appended in ``chunk_index`` order. A chunk that arrives ahead
+    of a gap is held (its file stays where it was uploaded) until the missing
+    index shows up. Finishing a recording then only has to patch the WAV
+    header and rename the file, independent of how long the recording is.
+
+    State is kept next to the partial file and guarded by a file lock, so
+    any process handling an upload for the recording can pick it up.
+    Assembly is disabled for the recording as soon as a chunk cannot be
+    appended verbatim; callers then fall back to a full assembly pass.
+    """
+
+    PARTIAL_FILENAME = "assembled_audio.partial.wav"
+    STATE_FILENAME = "assembly_state.json"
+    LOCK_FILENAME = ".assembly.lock"
+
+    def __init__(self, recording_dir: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the assembler for a recording.
+
+        Args:
+            recording_dir: Directory holding the recording's chunk files
+            block_size: Size of the copy buffer in bytes
+        """
+        self.recording_dir = recording_dir
+        self.block_size = block_size
+        self.partial_path = os.path.join(recording_dir, self.PARTIAL_FILENAME)
+        self.state_path = os.path.join(recording_dir, self.STATE_FILENAME)
+        self.lock_path = os.path.join(recording_dir, self.LOCK_FILENAME)
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the recording's assembly state."""
+        os.makedirs(self.recording_dir, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _initial_state(self) -> Dict:
+        return {
+            "next_index": 0,
+            "pending": {},
+            "appended": [],
+            "format": None,
+            "data_size": 0,
+            "disabled": False
+        }
+
+    def load_state(self) -> Dict:
+        """
+        Load the persisted assembly state.
+
+        Returns:
+            State dictionary (a fresh state if nothing was persisted yet)
+        """
+        if not os.path.exists(self.state_path):
+            return self._initial_state()
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def _disable(self, state: Dict, reason: str):
+        logger.info(f"Incremental assembly disabled for {self.recording_dir}: {reason}")
+        state["disabled"] = True
+
+    def _append(self, state: Dict, chunk_index: int, chunk_path: str) -> bool:
+        """Append a single chunk to the partial file; returns False on failure."""
+        info = probe_wav(chunk_path)
+        if info is None:
+            self._disable(state, f"chunk {chunk_index} is not PCM WAV")
+            return False
+
+        wav_format = WavFormat(**state["format"]) if state["format"] else info.format
+        if info.format != wav_format:
+            self._disable(state, f"chunk {chunk_index} uses a different sample layout")
+            return False
+
+        mode = "r+b" if os.path.exists(self.partial_path) else "w+b"
+        with open(self.partial_path, mode) as out:
+            # Drop anything past the last recorded append (e.g. an interrupted write).
+            out.truncate(WAV_HEADER_SIZE + state["data_size"])
+            if state["format"] is None:
+                write_wav_header(out, wav_format, 0)
+            out.seek(0, os.SEEK_END)
+            with open(chunk_path, "rb") as src:
+                copied = copy_block_range(src, out, info.data_offset, info.data_size, self.block_size)
+
+        state["format"] = {
+            "channels": wav_format.channels,
+            "sample_rate": wav_format.sample_rate,
+            "sample_width": wav_format.sample_width
+        }
+        state["data_size"] += copied
+        state["appended"].append(chunk_index)
+        return True
+
+    def _drain(self, state: Dict):
+        """Append held chunks that have become contiguous."""
+        pending = state["pending"]
+        while not state["disabled"] and str(state["next_index"]) in pending:
+            index = state["next_index"]
+            path = pending.pop(str(index))
+            if self._append(state, index, path):
+                state["next_index"] = index + 1
+
+    def add_chunk(self, chunk_index: int, chunk_path: str) -> Dict:
+        """
+        Hand a newly stored chunk to the assembler.
+
+        Args:
+            chunk_index: Sequential index of the chunk
+            chunk_path: Path of the stored chunk file
+
+        Returns:
+            Assembly state after the chunk was processed
+        """
+        with self._locked():
+            state = self.load_state()
+            if state["disabled"]:
+                return state
+
+            if chunk_index < state["next_index"] or str(chunk_index) in state["pending"]:
+                # Retry of a chunk that is already appended or held.
+                return state
+
+            state["pending"][str(chunk_index)] = chunk_path
+            self._drain(state)
+            self._save_state(state)
+            return state
+
+    def finalize(self, output_path: str, expected_indices: Iterable[int]) -> Optional[AssemblyResult]:
+        """
+        Turn the partial file into the final assembled WAV file.
+
+        Held chunks left behind a gap that never filled are appended in index
+        order, so only chunks that arrived out of order are copied here.
+
+        Args:
+            output_path: Path of the assembled WAV file
+            expected_indices: Chunk indices recorded for the recording
+
+        Returns:
+            Assembly result, or None if incremental assembly cannot produce
+            the complete recording and a full assembly pass is required
+        """
+        with self._locked():
+            state = self.load_state()
+            expected = set(expected_indices)
+            known = set(state["appended"]) | {int(index) for index in state["pending"]}
+
+            if state["disabled"] or not expected or not expected <= known:
+                return None
+
+            for index in sorted(int(index) for index in state["pending"]):
+                path = state["pending"].pop(str(index))
+                if not os.path.exists(path):
+                    logger.warning(f"Chunk file not found: {path}")
+                    continue
+                if not self._append(state, index, path):
+                    self._save_state(state)
+                    return None
+                state["next_index"] = index + 1
+
+            if state["format"] is None or not os.path.exists(self.partial_path):
+                return None
+
+            wav_format = WavFormat(**state["format"])
+            with open(self.partial_path, "r+b") as out:
+                out.truncate(WAV_HEADER_SIZE + state["data_size"])
+                write_wav_header(out, wav_format, state["data_size"])
+
+            os.replace(self.partial_path, output_path)
+            os.remove(self.state_path)
+
+            return AssemblyResult(
+                output_path=output_path,
+                format=wav_format,
+                data_size=state["data_size"],
+                chunk_count=len(state["appended"])
+            )
+
+    def discard(self):
+        """Remove the partial file and its state."""
+        with self._locked():
+            for path in (self.partial_path, self.state_path):
+                if os.path.exists(path):
+                    os.remove(path)
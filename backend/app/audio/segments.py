@@ -0,0 +1,141 @@
+"""
+Split long PCM recordings into overlapping segments at quiet points.
+
+Each cut is placed at the quietest frame within a search window around the
+target segment length, so words are rarely split. Segments overlap by a few
+seconds so that a word cut anyway appears whole in at least one of them;
+the duplicated words are removed when the transcripts are stitched.
+"""
+import os
+import logging
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from app.audio.assembler import DEFAULT_BLOCK_SIZE, copy_block_range
+from app.audio.vad import frame_features
+from app.audio.wav import WAV_HEADER_SIZE, probe_wav, write_wav_header
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_FRAME_MS = 30
+
+
+@dataclass
+class SegmentFile:
+    """One segment of a split recording."""
+    index: int
+    path: str
+    start_seconds: float
+    end_seconds: float
+
+    @property
+    def duration_seconds(self) -> float:
+        """Length of the segment in seconds."""
+        return self.end_seconds - self.start_seconds
+
+
+def plan_cut_frames(energy_db: np.ndarray, segment_frames: int, search_frames: int, smooth_frames: int = 10) -> List[int]:
+    """
+    Choose cut points at the quietest frames near each segment boundary.
+
+    Energy is averaged over ``smooth_frames`` first so that cuts fall in the
+    middle of pauses rather than on their first quiet frame.
+
+    Args:
+        energy_db: Per-frame energy in dBFS
+        segment_frames: Target segment length in frames
+        search_frames: Frames searched on each side of the target boundary
+        smooth_frames: Width of the moving average applied to the energy
+
+    Returns:
+        Frame indices of the cuts, in increasing order
+    """
+    total = energy_db.size
+    if smooth_frames > 1 and total:
+        energy_db = np.convolve(energy_db, np.ones(smooth_frames) / smooth_frames, mode="same")
+    cuts = []
+    position = 0
+    while total - position > segment_frames + search_frames:
+        target = position + segment_frames
+        low = max(position + 1, target - search_frames)
+        high = min(total, target + search_frames + 1)
+        cut = low + int(np.argmin(energy_db[low:high]))
+        cuts.append(cut)
+        position = cut
+    return cuts
+
+
+def split_at_silence(
+    input_path: str,
+    output_base: str,
+    segment_seconds: float,
+    overlap_seconds: float = 2.0,
+    search_seconds: float = 15.0,
+    block_size: int = DEFAULT_BLOCK_SIZE
+) -> List[SegmentFile]:
+    """
+    Split a PCM WAV file into overlapping segments cut at quiet points.
+
+    A recording no longer than ``segment_seconds`` plus the search window is
+    returned as a single segment pointing at the input file.
+
+    Args:
+        input_path: Path of the PCM WAV file
+        output_base: Path prefix for segment files (``<base>_0000.wav``...)
+        segment_seconds: Target segment length
+        overlap_seconds: Audio repeated after each cut at the start of the next segment
+        search_seconds: How far from the target boundary to look for a quiet point
+        block_size: Approximate number of bytes processed at once
+
+    Returns:
+        Segments in order
+
+    Raises:
+        ValueError: If the input is not PCM WAV
+    """
+    info = probe_wav(input_path)
+    if info is None:
+        raise ValueError(f"Segmenting requires PCM WAV input: {input_path}")
+
+    wav_format = info.format
+    frame_samples = max(2, wav_format.sample_rate * ANALYSIS_FRAME_MS // 1000)
+    frame_bytes = frame_samples * wav_format.block_align
+    frame_seconds = frame_samples / wav_format.sample_rate
+
+    energy_db, _ = frame_features(info, input_path, frame_samples, block_size)
+    cuts = plan_cut_frames(
+        energy_db,
+        segment_frames=max(1, int(segment_seconds / frame_seconds)),
+        search_frames=int(search_seconds / frame_seconds)
+    )
+    if not cuts:
+        return [SegmentFile(index=0, path=input_path, start_seconds=0.0, end_seconds=info.duration_seconds)]
+
+    # Segment i starts ``overlap`` before its cut so the previous segment's tail repeats.
+    overlap_bytes = int(overlap_seconds / frame_seconds) * frame_bytes
+    boundaries = [0] + [cut * frame_bytes for cut in cuts] + [info.data_size]
+
+    segments = []
+    with open(input_path, "rb") as src:
+        for index in range(len(boundaries) - 1):
+            start = max(0, boundaries[index] - overlap_bytes) if index else 0
+            end = boundaries[index + 1]
+            path = f"{output_base}_{index:04d}.wav"
+            with open(path, "wb") as out:
+                out.write(b"\x00" * WAV_HEADER_SIZE)
+                size = copy_block_range(src, out, info.data_offset + start, end - start, block_size)
+                write_wav_header(out, wav_format, size)
+            segments.append(SegmentFile(
+                index=index,
+                path=path,
+                start_seconds=start / wav_format.byte_rate,
+                end_seconds=end / wav_format.byte_rate
+            ))
+
+    logger.info(
+        f"Split {os.path.basename(input_path)} ({info.duration_seconds:.1f}s) "
+        f"into {len(segments)} segments"
+    )
+    return segments
@@ -0,0 +1,251 @@
+"""
+File-to-file audio transforms: decode, resample and encode.
+
+Every transform reads its input from disk and writes its output to disk so
+that it can run in a worker process without shipping audio through pickles.
+"""
+import os
+import logging
+import subprocess
+from typing import List, Optional
+
+from app.audio.assembler import DEFAULT_BLOCK_SIZE, copy_block_range, ffmpeg_available
+from app.audio.wav import WavFormat, WavInfo, WAV_HEADER_SIZE, probe_wav, write_wav_header
+
+logger = logging.getLogger(__name__)
+
+
+def run_ffmpeg(arguments: List[str]):
+    """
+    Run ffmpeg with the given arguments.
+
+    Args:
+        arguments: Arguments following the ``ffmpeg`` executable
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error
+    """
+    completed = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"] + arguments,
+        capture_output=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode(errors='replace').strip()}")
+
+
+def decode_to_wav(input_path: str, output_path: str, target_format: Optional[WavFormat] = None) -> WavInfo:
+    """
+    Decode any audio file pydub/ffmpeg understands into a PCM WAV file.
+
+    When ffmpeg is available it streams the conversion; otherwise pydub
+    decodes the whole file in memory.
+
+    Args:
+        input_path: Path of the audio file to decode
+        output_path: Path of the WAV file to write
+        target_format: Optional sample layout to convert to while decoding
+
+    Returns:
+        Header information of the written WAV file
+    """
+    if ffmpeg_available():
+        arguments = ["-i", input_path, "-vn"]
+        if target_format is not None:
+            arguments += [
+                "-ac", str(target_format.channels),
+                "-ar", str(target_format.sample_rate),
+                "-c:a", f"pcm_s{target_format.sample_width * 8}le" if target_format.sample_width > 1 else "pcm_u8"
+            ]
+        run_ffmpeg(arguments + ["-f", "wav", output_path])
+        return probe_wav(output_path)
+
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(input_path)
+    if target_format is not None:
+        segment = (
+            segment
+            .set_frame_rate(target_format.sample_rate)
+            .set_channels(target_format.channels)
+            .set_sample_width(target_format.sample_width)
+        )
+    segment.export(output_path, format="wav")
+    return probe_wav(output_path)
+
+
+def resample_wav(
+    input_path: str,
+    output_path: str,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    sample_width: int = 2,
+    block_size: int = DEFAULT_BLOCK_SIZE
+) -> WavInfo:
+    """
+    Downmix, resample and requantize a PCM WAV file block by block.
+
+    Memory use is bounded by ``block_size`` regardless of file length; the
+    resampler state is carried across blocks so there are no seams. Inputs
+    that are not PCM WAV, or have more than two channels, are decoded with
+    ``decode_to_wav`` instead.
+
+    Args:
+        input_path: Path of the source audio file
+        output_path: Path of the WAV file to write
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count (1 or 2)
+        sample_width: Output sample width in bytes
+        block_size: Approximate number of input bytes processed at once
+
+    Returns:
+        Header information of the written WAV file
+    """
+    from pydub.utils import audioop
+
+    target = WavFormat(channels=channels, sample_rate=sample_rate, sample_width=sample_width)
+    info = probe_wav(input_path)
+    if info is None or info.format.channels > 2 or target.channels > 2:
+        return decode_to_wav(input_path, output_path, target)
+
+    source = info.format
+    # Keep every block frame-aligned so no sample is split across reads.
+    frames_per_block = max(1, block_size // source.block_align)
+    read_size = frames_per_block * source.block_align
+
+    data_size = 0
+    rate_state = None
+    with open(input_path, "rb") as src, open(output_path, "wb") as out:
+        out.write(b"\x00" * WAV_HEADER_SIZE)
+        src.seek(info.data_offset)
+        remaining = info.data_size
+
+        while remaining > 0:
+            block = src.read(min(read_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+
+            width = source.sample_width
+            if width == 1:
+                # 8-bit WAV is unsigned; audioop works on signed samples.
+                block = audioop.bias(block, 1, -128)
+            if width != sample_width:
+                block = audioop.lin2lin(block, width, sample_width)
+                width = sample_width
+
+            if source.channels == 2 and channels == 1:
+                block = audioop.tomono(block, width, 0.5, 0.5)
+            elif source.channels == 1 and channels == 2:
+                block = audioop.tostereo(block, width, 1, 1)
+
+            if source.sample_rate != sample_rate:
+                block, rate_state = audioop.ratecv(
+                    block, width, channels, source.sample_rate, sample_rate, rate_state
+                )
+
+            if sample_width == 1:
+                block = audioop.bias(block, 1, 128)
+
+            out.write(block)
+            data_size += len(block)
+
+        write_wav_header(out, target, data_size)
+
+    return WavInfo(format=target, data_offset=WAV_HEADER_SIZE, data_size=data_size)
+
+
+def build_context_clip(
+    chunk_path: str,
+    output_path: str,
+    previous_path: Optional[str] = None,
+    context_seconds: float = 2.0,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    block_size: int = DEFAULT_BLOCK_SIZE
+) -> float:
+    """
+    Convert a chunk to PCM WAV, prefixed with the end of the previous chunk.
+
+    The context lets a word cut at the chunk boundary be transcribed whole.
+
+    Args:
+        chunk_path: Path of the chunk to transcribe
+        output_path: Path of the WAV file to write
+        previous_path: Path of the previous chunk (None for no context)
+        context_seconds: Seconds taken from the end of the previous chunk
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+        block_size: Approximate number of bytes processed at once
+
+    Returns:
+        Seconds of context at the start of the clip
+    """
+    base = os.path.splitext(output_path)[0]
+    chunk_pcm = f"{base}.chunk.wav"
+    previous_pcm = f"{base}.previous.wav"
+    try:
+        chunk_info = resample_wav(chunk_path, chunk_pcm, sample_rate, channels, block_size=block_size)
+        target = chunk_info.format
+
+        context_size = 0
+        if previous_path and context_seconds > 0:
+            previous_info = resample_wav(previous_path, previous_pcm, sample_rate, channels, block_size=block_size)
+            context_size = min(previous_info.data_size, int(context_seconds * target.sample_rate) * target.block_align)
+
+        with open(output_path, "wb") as out:
+            out.write(b"\x00" * WAV_HEADER_SIZE)
+            data_size = 0
+            if context_size:
+                with open(previous_pcm, "rb") as src:
+                    offset = previous_info.data_offset + previous_info.data_size - context_size
+                    data_size += copy_block_range(src, out, offset, context_size, block_size)
+            with open(chunk_pcm, "rb") as src:
+                data_size += copy_block_range(src, out, chunk_info.data_offset, chunk_info.data_size, block_size)
+            write_wav_header(out, target, data_size)
+    finally:
+        for path in (chunk_pcm, previous_pcm):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return context_size / target.byte_rate
+
+
+def encode_audio(
+    input_path: str,
+    output_path: str,
+    format: str,
+    codec: Optional[str] = None,
+    bitrate: Optional[str] = None,
+    parameters: Optional[List[str]] = None
+) -> int:
+    """
+    Encode an audio file into another container/codec with ffmpeg.
+
+    ffmpeg streams from input to output, so memory use does not depend on
+    the length of the recording.
+
+    Args:
+        input_path: Path of the source audio file
+        output_path: Path of the encoded file to write
+        format: Output container format understood by ffmpeg (e.g. "flac")
+        codec: Optional ffmpeg codec name (e.g. "libopus")
+        bitrate: Optional target bitrate (e.g. "24k")
+        parameters: Extra ffmpeg output parameters
+
+    Returns:
+        Size of the encoded file in bytes
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or fails
+    """
+    if not ffmpeg_available():
+        raise RuntimeError("ffmpeg is required to encode audio")
+
+    arguments = ["-i", input_path, "-vn"]
+    if codec:
+        arguments += ["-c:a", codec]
+    if bitrate:
+        arguments += ["-b:a", bitrate]
+    arguments += list(parameters or [])
+    run_ffmpeg(arguments + ["-f", format, output_path])
+    return os.path.getsize(output_path)
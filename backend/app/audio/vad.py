@@ -0,0 +1,282 @@
+"""
+Vectorized voice-activity detection and silence trimming.
+
+Frame energy and zero-crossing rate are computed with NumPy over whole blocks
+of PCM at once. Non-speech spans longer than a threshold are shortened, and an
+offset map records where every kept span came from so timestamps on the
+trimmed audio can be mapped back to the original recording.
+"""
+import os
+import json
+import bisect
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.audio.assembler import DEFAULT_BLOCK_SIZE, copy_block_range
+from app.audio.wav import WavInfo, WAV_HEADER_SIZE, probe_wav, write_wav_header
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+@dataclass(frozen=True)
+class VadConfig:
+    """Voice-activity detection and trimming parameters."""
+    frame_ms: int = 30
+    # Frames louder than max(noise floor + margin, absolute floor) are speech.
+    energy_margin_db: float = 12.0
+    energy_floor_db: float = -55.0
+    # Quieter frames with a high zero-crossing rate (unvoiced consonants)
+    # still count as speech when within this many dB of the threshold.
+    unvoiced_margin_db: float = 8.0
+    unvoiced_min_zcr: float = 0.25
+    noise_floor_percentile: float = 10.0
+    hangover_ms: int = 200
+    min_silence_seconds: float = 1.0
+    keep_silence_seconds: float = 0.25
+
+
+@dataclass
+class OffsetMap:
+    """
+    Mapping from the trimmed timeline back to the original recording.
+
+    Each segment is ``(trimmed_start, original_start, duration)`` in seconds.
+    """
+    segments: List[Tuple[float, float, float]] = field(default_factory=list)
+
+    def to_original(self, trimmed_seconds: float) -> float:
+        """
+        Map a timestamp on the trimmed audio to the original recording.
+
+        Args:
+            trimmed_seconds: Time offset into the trimmed audio
+
+        Returns:
+            Corresponding time offset into the original recording
+        """
+        if not self.segments:
+            return trimmed_seconds
+        starts = [segment[0] for segment in self.segments]
+        index = max(0, bisect.bisect_right(starts, trimmed_seconds) - 1)
+        trimmed_start, original_start, duration = self.segments[index]
+        return original_start + min(max(trimmed_seconds - trimmed_start, 0.0), duration)
+
+    def save(self, path: str):
+        """Write the map to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({"segments": self.segments}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "OffsetMap":
+        """Read a map written by ``save``."""
+        with open(path) as f:
+            return cls(segments=[tuple(segment) for segment in json.load(f)["segments"]])
+
+
+@dataclass
+class VadResult:
+    """Outcome of trimming silence from a recording."""
+    output_path: str
+    original_seconds: float
+    kept_seconds: float
+    offset_map: OffsetMap
+    # Kept (start, end) analysis frames; empty when no speech was found, even
+    # though the partial frame at the end is still copied
+    spans: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def removed_seconds(self) -> float:
+        """Seconds of non-speech removed."""
+        return self.original_seconds - self.kept_seconds
+
+
+def frame_features(info: WavInfo, path: str, frame_samples: int, block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame energy (dBFS) and zero-crossing rate over a PCM WAV file.
+
+    Args:
+        info: Header information of the file
+        path: Path of the PCM WAV file
+        frame_samples: Samples per analysis frame
+        block_size: Approximate number of bytes read per block
+
+    Returns:
+        Tuple of (energy_db, zcr) arrays with one entry per full frame
+    """
+    wav_format = info.format
+    dtype = _SAMPLE_DTYPES.get(wav_format.sample_width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width for VAD: {wav_format.sample_width}")
+    full_scale = float(2 ** (8 * wav_format.sample_width - 1))
+
+    frame_bytes = frame_samples * wav_format.block_align
+    frames_per_block = max(1, block_size // frame_bytes)
+    energies = []
+    crossings = []
+
+    with open(path, "rb") as f:
+        f.seek(info.data_offset)
+        remaining = info.data_size - info.data_size % frame_bytes
+        while remaining > 0:
+            raw = f.read(min(frames_per_block * frame_bytes, remaining))
+            usable = len(raw) - len(raw) % frame_bytes
+            if usable <= 0:
+                break
+            remaining -= usable
+
+            samples = np.frombuffer(raw[:usable], dtype=dtype).astype(np.float32)
+            if wav_format.sample_width == 1:
+                samples -= 128.0
+            samples = samples.reshape(-1, frame_samples, wav_format.channels).mean(axis=2) / full_scale
+
+            power = np.mean(samples * samples, axis=1)
+            energies.append(10.0 * np.log10(power + 1e-12))
+            signs = np.signbit(samples)
+            crossings.append(np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_samples - 1))
+
+    if not energies:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    return np.concatenate(energies), np.concatenate(crossings)
+
+
+def classify_speech(energy_db: np.ndarray, zcr: np.ndarray, config: VadConfig) -> np.ndarray:
+    """
+    Classify frames as speech from their energy and zero-crossing rate.
+
+    Args:
+        energy_db: Per-frame energy in dBFS
+        zcr: Per-frame zero-crossing rate (0..1)
+        config: Detection parameters
+
+    Returns:
+        Boolean array, True for speech frames (after hangover smoothing)
+    """
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool)
+
+    noise_floor = np.percentile(energy_db, config.noise_floor_percentile)
+    threshold = max(noise_floor + config.energy_margin_db, config.energy_floor_db)
+
+    voiced = energy_db > threshold
+    unvoiced = (energy_db > threshold - config.unvoiced_margin_db) & (zcr > config.unvoiced_min_zcr)
+    speech = voiced | unvoiced
+
+    # Extend speech by the hangover on both sides so word edges are kept.
+    hangover = max(0, int(round(config.hangover_ms / config.frame_ms)))
+    if hangover:
+        kernel = np.ones(2 * hangover + 1, dtype=np.int32)
+        speech = np.convolve(speech.astype(np.int32), kernel, mode="same") > 0
+    return speech
+
+
+def plan_kept_spans(speech: np.ndarray, config: VadConfig) -> List[Tuple[int, int]]:
+    """
+    Choose which frame ranges to keep.
+
+    Non-speech runs longer than ``min_silence_seconds`` are shortened to
+    ``keep_silence_seconds`` of padding on each side; everything else is kept.
+
+    Args:
+        speech: Per-frame speech flags
+        config: Trimming parameters
+
+    Returns:
+        List of ``(start_frame, end_frame)`` ranges, end exclusive
+    """
+    total = speech.size
+    if total == 0:
+        return []
+
+    frame_seconds = config.frame_ms / 1000.0
+    min_silence = int(np.ceil(config.min_silence_seconds / frame_seconds))
+    keep = int(round(config.keep_silence_seconds / frame_seconds))
+
+    # Boundaries of non-speech runs, found with a single diff over the flags.
+    padded = np.concatenate(([0], (~speech).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    long_runs = (run_ends - run_starts) > max(min_silence, 2 * keep)
+
+    spans = []
+    position = 0
+    for start, end in zip(run_starts[long_runs], run_ends[long_runs]):
+        cut_start = start + keep if start > 0 else start
+        cut_end = end - keep if end < total else end
+        if cut_end <= cut_start:
+            continue
+        if cut_start > position:
+            spans.append((position, int(cut_start)))
+        position = int(cut_end)
+    if position < total:
+        spans.append((position, total))
+    return spans
+
+
+def trim_silence(input_path: str, output_path: str, config: Optional[VadConfig] = None, block_size: int = DEFAULT_BLOCK_SIZE) -> VadResult:
+    """
+    Remove long non-speech spans from a PCM WAV file.
+
+    Args:
+        input_path: Path of the PCM WAV file (normally the 16 kHz mono payload)
+        output_path: Path of the trimmed WAV file to write
+        config: Detection and trimming parameters
+        block_size: Approximate number of bytes processed at once
+
+    Returns:
+        Trimmed file, durations and offset map
+
+    Raises:
+        ValueError: If the input is not PCM WAV
+    """
+    config = config or VadConfig()
+    info = probe_wav(input_path)
+    if info is None:
+        raise ValueError(f"VAD requires PCM WAV input: {input_path}")
+
+    wav_format = info.format
+    frame_samples = max(2, wav_format.sample_rate * config.frame_ms // 1000)
+    frame_bytes = frame_samples * wav_format.block_align
+    frame_seconds = frame_samples / wav_format.sample_rate
+
+    energy_db, zcr = frame_features(info, input_path, frame_samples, block_size)
+    speech = classify_speech(energy_db, zcr, config)
+    spans = plan_kept_spans(speech, config)
+
+    # The partial frame at the end (if any) is always kept.
+    tail_bytes = info.data_size - speech.size * frame_bytes
+    offset_map = OffsetMap()
+    data_size = 0
+    with open(input_path, "rb") as src, open(output_path, "wb") as out:
+        out.write(b"\x00" * WAV_HEADER_SIZE)
+        for start, end in spans:
+            size = (end - start) * frame_bytes
+            if end == speech.size:
+                size += tail_bytes
+            offset_map.segments.append((
+                data_size / wav_format.byte_rate,
+                start * frame_seconds,
+                size / wav_format.byte_rate
+            ))
+            data_size += copy_block_range(src, out, info.data_offset + start * frame_bytes, size, block_size)
+        if not spans and tail_bytes:
+            offset_map.segments.append((0.0, 0.0, tail_bytes / wav_format.byte_rate))
+            data_size += copy_block_range(src, out, info.data_offset, tail_bytes, block_size)
+        write_wav_header(out, wav_format, data_size)
+
+    result = VadResult(
+        output_path=output_path,
+        original_seconds=info.duration_seconds,
+        kept_seconds=data_size / wav_format.byte_rate,
+        offset_map=offset_map,
+        spans=spans
+    )
+    logger.info(
+        f"VAD trimmed {os.path.basename(input_path)}: removed {result.removed_seconds:.1f}s "
+        f"of {result.original_seconds:.1f}s"
+    )
+    return result
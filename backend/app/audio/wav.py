@@ -0,0 +1,187 @@
+"""
+RIFF/WAVE header parsing and writing helpers.
+
+These helpers only look at headers; PCM frames are never decoded, which lets
+callers copy audio data between files without loading it into memory.
+"""
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+WAV_HEADER_SIZE = 44
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# RIFF sizes are unsigned 32-bit; larger payloads are clamped to this value.
+MAX_RIFF_SIZE = 0xFFFFFFFF
+
+# Streaming writers (including MediaRecorder polyfills) leave the data size as
+# 0 or 0xFFFFFFFF when the final length is unknown at header time.
+_UNKNOWN_DATA_SIZES = (0, MAX_RIFF_SIZE)
+
+
+class WavFormatError(ValueError):
+    """Raised when a file is not a PCM WAV file that can be copied verbatim."""
+
+
+@dataclass(frozen=True)
+class WavFormat:
+    """PCM sample layout of a WAV file."""
+    channels: int
+    sample_rate: int
+    sample_width: int
+
+    @property
+    def block_align(self) -> int:
+        """Number of bytes in a single frame (one sample for every channel)."""
+        return self.channels * self.sample_width
+
+    @property
+    def byte_rate(self) -> int:
+        """Number of bytes per second of audio."""
+        return self.sample_rate * self.block_align
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    """Location and layout of the PCM data inside a WAV file."""
+    format: WavFormat
+    data_offset: int
+    data_size: int
+
+    @property
+    def duration_seconds(self) -> float:
+        """Duration of the PCM data in seconds."""
+        if not self.format.byte_rate:
+            return 0.0
+        return self.data_size / self.format.byte_rate
+
+
+def read_wav_info(f: BinaryIO) -> WavInfo:
+    """
+    Parse the RIFF header of an open WAV file.
+
+    Args:
+        f: Binary file object positioned anywhere; it is rewound first
+
+    Returns:
+        Format and data chunk location of the file
+
+    Raises:
+        WavFormatError: If the file is not an uncompressed PCM WAV file
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    f.seek(0)
+
+    riff = f.read(12)
+    if len(riff) < 12 or riff[0:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise WavFormatError("Missing RIFF/WAVE header")
+
+    wav_format = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            raise WavFormatError("No data chunk found")
+
+        chunk_id = chunk_header[0:4]
+        chunk_size = struct.unpack("<I", chunk_header[4:8])[0]
+
+        if chunk_id == b"fmt ":
+            fmt_body = f.read(chunk_size)
+            if len(fmt_body) < 16:
+                raise WavFormatError("Truncated fmt chunk")
+            format_tag, channels, sample_rate, _, _, bits_per_sample = struct.unpack(
+                "<HHIIHH", fmt_body[:16]
+            )
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt_body) >= 26:
+                # The real format tag is the first two bytes of the SubFormat GUID.
+                format_tag = struct.unpack("<H", fmt_body[24:26])[0]
+            if format_tag != WAVE_FORMAT_PCM:
+                raise WavFormatError(f"Unsupported WAV format tag: {format_tag:#06x}")
+            if channels < 1 or sample_rate < 1 or bits_per_sample % 8:
+                raise WavFormatError("Invalid PCM parameters in fmt chunk")
+            wav_format = WavFormat(
+                channels=channels,
+                sample_rate=sample_rate,
+                sample_width=bits_per_sample // 8
+            )
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if wav_format is None:
+                raise WavFormatError("data chunk precedes fmt chunk")
+            data_offset = f.tell()
+            available = file_size - data_offset
+            if chunk_size in _UNKNOWN_DATA_SIZES or chunk_size > available:
+                chunk_size = available
+            # Never hand out a partial trailing frame.
+            chunk_size -= chunk_size % wav_format.block_align
+            return WavInfo(format=wav_format, data_offset=data_offset, data_size=chunk_size)
+        else:
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def probe_wav(path: str) -> Optional[WavInfo]:
+    """
+    Read the header of a WAV file on disk.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        Header information, or None if the file is not a PCM WAV file
+    """
+    try:
+        with open(path, "rb") as f:
+            return read_wav_info(f)
+    except (OSError, WavFormatError, struct.error):
+        return None
+
+
+def build_wav_header(wav_format: WavFormat, data_size: int) -> bytes:
+    """
+    Build a canonical 44-byte PCM WAV header.
+
+    Args:
+        wav_format: Sample layout of the PCM data
+        data_size: Size of the PCM data in bytes
+
+    Returns:
+        Header bytes
+    """
+    data_size = min(data_size, MAX_RIFF_SIZE - (WAV_HEADER_SIZE - 8))
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        data_size + WAV_HEADER_SIZE - 8,
+        b"WAVE",
+        b"fmt ",
+        16,
+        WAVE_FORMAT_PCM,
+        wav_format.channels,
+        wav_format.sample_rate,
+        wav_format.byte_rate,
+        wav_format.block_align,
+        wav_format.sample_width * 8,
+        b"data",
+        data_size
+    )
+
+
+def write_wav_header(f: BinaryIO, wav_format: WavFormat, data_size: int):
+    """
+    Write (or overwrite) the header at the start of an open WAV file.
+
+    The file position is restored afterwards.
+
+    Args:
+        f: Binary file object opened for writing
+        wav_format: Sample layout of the PCM data
+        data_size: Size of the PCM data in bytes
+    """
+    position = f.tell()
+    f.seek(0)
+    f.write(build_wav_header(wav_format, data_size))
+    f.seek(position)
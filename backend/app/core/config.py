@@ -29,13 +29,107 @@ class Settings(BaseSettings):
     
     # LLM Provider
     llm_api_key: str = Field(..., env="LLM_API_KEY")
-    llm_provider: str = "requestyai"
+    llm_provider: str = "requestyai"  # Comma-separated list routes between several providers
+    
+    # Routing between several providers (hedging applies to short recordings only)
+    llm_hedging_enabled: bool = True
+    llm_hedge_max_audio_seconds: float = 60.0
+    llm_hedge_quantile: float = 0.95
+    llm_hedge_min_delay_seconds: float = 1.0
+    
+    # LLM provider HTTP connection pool
+    llm_http_timeout_seconds: float = 300.0
+    llm_http_connect_timeout_seconds: float = 10.0
+    llm_http_max_connections: int = 20
+    llm_http_max_keepalive_connections: int = 10
+    llm_http_keepalive_expiry_seconds: float = 60.0
+    llm_http2: bool = True  # Used only when the h2 package is installed
+    llm_upload_block_size_kb: int = 256
+    
+    # LLM provider retries, per-job deadline and circuit breaker
+    llm_retry_max_attempts: int = 4
+    llm_retry_base_delay_seconds: float = 1.0
+    llm_retry_max_delay_seconds: float = 30.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_recovery_seconds: float = 30.0
+    transcription_deadline_seconds: float = 900.0
+    
+    # Provider admission control ("file" shares the budget between workers; 0 disables a bucket)
+    llm_rate_limit_enabled: bool = True
+    llm_rate_limit_backend: str = "file"
+    llm_rate_limit_state_path: Optional[str] = None  # Defaults to <audio_storage_path>/llm_rate_limit; one file per provider
+    llm_rate_limit_requests_per_minute: float = 0
+    llm_rate_limit_audio_seconds_per_minute: float = 0
+    llm_concurrency_initial: int = 4
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 16
     
     # Audio Storage
     audio_storage_path: str = Field(default="/tmp/audio_storage", env="AUDIO_STORAGE_PATH")
     max_chunk_size_mb: int = 10
+    max_chunk_batch_size: int = 20  # Chunks per POST /recordings/{id}/chunks/batch
     max_recording_duration_hours: int = 8
     
+    # Audio Processing
+    audio_worker_processes: int = Field(default=2, env="AUDIO_WORKER_PROCESSES")
+    audio_copy_block_size_kb: int = 1024
+    
+    # Transcription encoding profile
+    transcription_encoding_enabled: bool = True
+    transcription_sample_rate: int = 16000
+    transcription_channels: int = 1
+    transcription_formats: list[str] = ["flac", "opus"]
+    transcription_opus_bitrate: str = "24k"
+    
+    # Voice-activity trimming (applied to the normalized transcription payload)
+    vad_enabled: bool = False
+    vad_min_silence_seconds: float = 1.0
+    vad_keep_silence_seconds: float = 0.25
+    vad_energy_margin_db: float = 12.0
+    
+    # Segmented transcription (requires transcription encoding; 0 seconds disables)
+    transcription_segment_seconds: float = 300.0
+    transcription_segment_overlap_seconds: float = 2.0
+    transcription_segment_search_seconds: float = 15.0
+    transcription_max_concurrency: int = 4
+    
+    # Live transcription of chunks while a recording is active
+    live_transcription_enabled: bool = False
+    live_transcription_context_seconds: float = 2.0
+    live_transcription_finish_timeout_seconds: float = 30.0
+    live_transcription_lease_seconds: float = 120.0  # A chunk claimed by a process that died is retried after this
+    
+    # Transcription result cache (disk tier defaults to <audio_storage_path>/transcription_cache)
+    transcription_cache_enabled: bool = True
+    transcription_cache_max_entries: int = 1024
+    transcription_cache_max_disk_entries: int = 50000
+    transcription_cache_path: Optional[str] = None
+    
+    # Durable transcription job queue, run by app.workers.transcription_worker
+    transcription_job_max_attempts: int = 3
+    transcription_job_retry_delay_seconds: float = 30.0  # Doubles with each attempt
+    transcription_job_lease_seconds: float = 120.0
+    transcription_job_heartbeat_seconds: float = 30.0
+    transcription_worker_concurrency: int = 2
+    transcription_worker_poll_seconds: float = 1.0
+    transcription_worker_embedded: bool = False  # Also run a worker inside the API process
+    transcription_fair_scheduling_enabled: bool = True  # False claims jobs first in, first out
+    transcription_short_recording_seconds: float = 120.0  # Recordings up to this long are claimed first
+    
+    # Transcription status pushed to clients (GET /recordings/{id}/events)
+    recording_events_backend: str = "database"  # "memory" when the only worker is embedded in the API
+    recording_events_poll_seconds: float = 1.0  # Database relay interval, shared by all open streams
+    recording_events_keepalive_seconds: float = 15.0
+    recording_events_retry_seconds: float = 3.0  # Client reconnect delay
+    recording_events_token_seconds: int = 60  # Lifetime of the token that opens one stream
+    
+    # Continuous audio ingest (WebSocket /recordings/{id}/stream)
+    recording_stream_checkpoint_seconds: float = 1.0  # At most this much received audio is not yet durable
+    recording_stream_token_seconds: int = 60  # Lifetime of the token that opens one connection
+    
+    # Graceful shutdown (python -m app.server); keep below the platform's stop grace period
+    shutdown_drain_timeout_seconds: float = 60.0
+    
     # CORS
     allowed_origins: list[str] = ["http://localhost:3000", "https://localhost:3000"]
     
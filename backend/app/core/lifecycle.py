@@ -0,0 +1,182 @@
+"""
+Graceful shutdown: drain in-flight work before the process exits.
+
+On SIGTERM the process starts draining:
+
+* new uploads, finishes and other writes get ``503`` with ``Retry-After``,
+  and ``/health`` reports 503 so load balancers stop routing here;
+* open event streams end, and their clients reconnect to another instance;
+* in-flight writes and tracked background tasks (live chunk transcriptions)
+  get up to ``shutdown_drain_timeout_seconds`` to finish. Anything still
+  running after that is cancelled. Cancelled work is not lost: chunk
+  transcripts are stored as each one completes, and transcription jobs
+  go back to the queue (see app.workers.transcription_worker).
+"""
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Methods that start work; reads keep being served while draining
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class DrainCoordinator:
+    """
+    Tracks in-flight requests and background tasks, and drains them on shutdown.
+    """
+
+    def __init__(self):
+        self._draining_since: Optional[float] = None
+        self._requests = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._on_drain: List[Callable[[], None]] = []
+
+    def reset(self):
+        """Accept work again and forget drain callbacks, for an application starting up."""
+        self._draining_since = None
+        self._on_drain = []
+        metrics.set_gauge("shutdown.draining", 0)
+
+    @property
+    def draining(self) -> bool:
+        """Whether the process has stopped accepting new work."""
+        return self._draining_since is not None
+
+    @property
+    def in_flight(self) -> int:
+        """In-flight write requests plus unfinished background tasks."""
+        return self._requests + len(self._tasks)
+
+    def on_drain(self, callback: Callable[[], None]):
+        """Call ``callback`` when draining starts."""
+        self._on_drain.append(callback)
+
+    def begin_drain(self):
+        """Stop accepting new work. Safe to call more than once."""
+        if self.draining:
+            return
+        self._draining_since = time.monotonic()
+        metrics.set_gauge("shutdown.draining", 1)
+        logger.info(f"Draining: {self._requests} requests and {len(self._tasks)} background tasks in flight")
+        for callback in self._on_drain:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Drain callback failed: {e}")
+
+    def remaining(self, timeout: Optional[float] = None) -> float:
+        """Seconds left of the drain timeout, counted from when draining started."""
+        timeout = settings.shutdown_drain_timeout_seconds if timeout is None else timeout
+        if not self.draining:
+            return timeout
+        return max(0.0, timeout - (time.monotonic() - self._draining_since))
+
+    @contextmanager
+    def request(self):
+        """Count a request as in flight for as long as the block runs."""
+        self._requests += 1
+        try:
+            yield
+        finally:
+            self._requests -= 1
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """
+        Register a background task that shutdown should wait for.
+
+        Args:
+            task: Task to track; it is forgotten once done
+
+        Returns:
+            The same task
+        """
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for in-flight requests and background tasks to finish.
+
+        Args:
+            timeout: Seconds to wait; defaults to what is left of the drain timeout
+
+        Returns:
+            True if nothing is left in flight
+        """
+        deadline = time.monotonic() + (self.remaining() if timeout is None else timeout)
+        while self.in_flight and time.monotonic() < deadline:
+            if self._tasks:
+                await asyncio.wait(set(self._tasks), timeout=min(0.1, max(0.0, deadline - time.monotonic())))
+            else:
+                await asyncio.sleep(0.05)
+        return self.in_flight == 0
+
+    async def cancel_remaining(self) -> int:
+        """
+        Cancel background tasks still running after the drain timeout.
+
+        Returns:
+            Number of tasks cancelled
+        """
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.warning(f"Cancelled {len(tasks)} background tasks at the end of the drain timeout")
+            metrics.increment("shutdown.cancelled_tasks", len(tasks))
+        return len(tasks)
+
+
+class DrainMiddleware:
+    """
+    ASGI middleware refusing new writes while draining and counting those in flight.
+    """
+
+    def __init__(self, app, coordinator: Optional[DrainCoordinator] = None, retry_after_seconds: int = 5):
+        self.app = app
+        self.coordinator = coordinator or get_drain_coordinator()
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        if self.coordinator.draining:
+            metrics.increment("shutdown.rejected_requests")
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(self.retry_after_seconds).encode()),
+                    (b"connection", b"close"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Server is shutting down"}'})
+            return
+
+        with self.coordinator.request():
+            await self.app(scope, receive, send)
+
+
+_drain_coordinator = DrainCoordinator()
+
+
+def get_drain_coordinator() -> DrainCoordinator:
+    """
+    Get the process-wide drain coordinator.
+
+    Returns:
+        Shared drain coordinator
+    """
+    return _drain_coordinator
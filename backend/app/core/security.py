@@ -11,6 +11,10 @@ from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Scope claims of stream tokens: each opens only one kind of stream of one recording
+EVENTS_TOKEN_SCOPE = "recording_events"
+INGEST_TOKEN_SCOPE = "recording_stream"
+
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -44,6 +48,30 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
+def create_stream_token(user_id: str, recording_id: str, scope: str, lifetime_seconds: int) -> str:
+    """
+    Create a short-lived token that only opens one stream of one recording.
+    
+    Browsers cannot set headers on EventSource or WebSocket connections, so
+    this token travels in the URL and may end up in access logs. It is
+    scoped to a single recording and stream kind and expires quickly; the
+    access token is never put in a URL.
+    
+    Args:
+        user_id: Owner of the recording
+        recording_id: Recording whose stream the token opens
+        scope: ``EVENTS_TOKEN_SCOPE`` or ``INGEST_TOKEN_SCOPE``
+        lifetime_seconds: How long the token can be used to connect
+        
+    Returns:
+        Encoded JWT token string
+    """
+    return create_access_token(
+        {"sub": user_id, "scope": scope, "recording_id": recording_id},
+        expires_delta=timedelta(seconds=lifetime_seconds)
+    )
+
+
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verify and decode a JWT token.
@@ -0,0 +1,109 @@
+"""
+Request body size limits for chunk uploads.
+
+Multipart bodies are parsed before the endpoint runs, so the endpoint alone
+cannot stop an oversized upload early. ``ChunkUploadLimitMiddleware``
+rejects a chunk upload whose ``Content-Length`` is over the limit before
+reading any of it, and stops reading a body (chunked transfer, or a lying
+``Content-Length``) as soon as it passes the limit. A batch upload may carry
+up to ``max_chunk_batch_size`` chunks.
+"""
+import re
+import logging
+from typing import Optional, Pattern
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Single-chunk upload endpoints
+CHUNK_UPLOAD_PATH = re.compile(r"^/recordings/[^/]+/chunks(/\d+)?/?$")
+
+# Batch upload endpoint
+CHUNK_BATCH_UPLOAD_PATH = re.compile(r"^/recordings/[^/]+/chunks/batch/?$")
+
+# Allowance for multipart boundaries and the other form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def max_chunk_bytes() -> int:
+    """Largest accepted audio chunk, from ``max_chunk_size_mb``."""
+    return settings.max_chunk_size_mb * 1024 * 1024
+
+
+def chunk_too_large(max_bytes: int) -> HTTPException:
+    """The 413 error returned for an oversized chunk."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Chunk exceeds the maximum size of {max_bytes // (1024 * 1024)} MB"
+    )
+
+
+class ChunkUploadLimitMiddleware:
+    """
+    ASGI middleware enforcing the chunk size limit while the body is received.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_bytes: Optional[int] = None,
+        path_pattern: Pattern = CHUNK_UPLOAD_PATH,
+        batch: bool = False
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            max_bytes: Largest accepted chunk; defaults to ``max_chunk_size_mb``
+            path_pattern: Paths the limit applies to
+            batch: Whether a body holds up to ``max_chunk_batch_size`` chunks
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_pattern = path_pattern
+        self.batch = batch
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not self.path_pattern.match(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.max_bytes or max_chunk_bytes()
+        if self.batch:
+            max_bytes *= settings.max_chunk_batch_size
+        limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            metrics.increment("uploads.rejected_too_large")
+            logger.warning(f"Rejected {content_length.decode()} byte upload to {scope['path']} before reading it")
+            detail = chunk_too_large(max_bytes).detail
+            await send({
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+            })
+            await send({"type": "http.response.body", "body": f'{{"detail":"{detail}"}}'.encode()})
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    metrics.increment("uploads.rejected_too_large")
+                    raise chunk_too_large(max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,359 @@
+"""
+Content-addressed transcription cache.
+
+Retries, repeated finish requests and re-runs send identical audio to the
+provider. Results are cached under a hash of the PCM samples the upload was
+encoded from and the settings that affect the transcript, in a bounded
+in-memory LRU tier backed by a bounded on-disk tier.
+
+The encoded bytes themselves are not a stable key: Ogg streams get a random
+serial number, so encoding the same audio twice gives different files.
+"""
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.audio.encoding import source_pcm_path
+from app.audio.wav import probe_wav
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.llm.interface import DelegatingLLMProvider, LLMProvider
+from app.llm.router import RoutingLLMProvider
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str, block_size: int = HASH_BLOCK_SIZE, offset: int = 0, size: Optional[int] = None) -> str:
+    """
+    Compute the SHA-256 of a file without reading it into memory at once.
+
+    Args:
+        path: Path of the file
+        block_size: Bytes read per block
+        offset: First byte to hash
+        size: Number of bytes to hash (None for the rest of the file)
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        remaining = size
+        while remaining is None or remaining > 0:
+            block = f.read(block_size if remaining is None else min(block_size, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def audio_digest(audio_path: str) -> str:
+    """
+    Hash the audio content of a transcription payload.
+
+    WAV files are hashed by sample layout and PCM data, so header-only
+    differences do not matter. A compressed payload is hashed through the
+    PCM file it was encoded from while that file exists, and by its own
+    bytes otherwise. The payload format is part of the digest because a
+    lossy encoding can change the transcript.
+
+    Args:
+        audio_path: Path of the payload about to be uploaded
+
+    Returns:
+        Hex digest identifying the audio
+    """
+    extension = os.path.splitext(audio_path)[1].lower()
+    pcm_path = source_pcm_path(audio_path)
+    info = probe_wav(pcm_path) if os.path.exists(pcm_path) else None
+    if info is None:
+        return f"{extension}:{hash_file(audio_path)}"
+    data = hash_file(pcm_path, offset=info.data_offset, size=info.data_size)
+    layout = f"{info.format.channels}x{info.format.sample_rate}x{info.format.sample_width}"
+    return f"{extension}:{layout}:{data}"
+
+
+def provider_identity(provider: LLMProvider) -> str:
+    """
+    Describe the provider settings that affect a transcript.
+
+    Wrappers (retries, rate limiting) are looked through to the provider
+    that produces the text. For a router, every provider it may pick is
+    included.
+
+    Args:
+        provider: Provider the request is sent to
+
+    Returns:
+        Provider class, model, language and temperature
+    """
+    while isinstance(provider, DelegatingLLMProvider):
+        provider = provider.provider
+    if isinstance(provider, RoutingLLMProvider):
+        return "|".join(provider_identity(routed) for _, routed in provider.providers)
+    return ":".join([
+        type(provider).__name__,
+        str(getattr(provider, "model", None)),
+        str(getattr(provider, "language", None)),
+        str(getattr(provider, "temperature", None))
+    ])
+
+
+def cache_key(audio_digest: str, provider_identity: str) -> str:
+    """
+    Build the cache key for a transcription request.
+
+    Args:
+        audio_digest: Digest from ``audio_digest``
+        provider_identity: Description from ``provider_identity``
+
+    Returns:
+        Hex digest identifying the request
+    """
+    identity = "\x1f".join([audio_digest, provider_identity])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Two-tier transcription cache: in-memory LRU in front of files on disk.
+
+    Counters ``transcription_cache.hits`` (with ``.memory_hits`` and
+    ``.disk_hits``), ``.misses``, ``.evictions`` and ``.disk_evictions`` are
+    recorded in the metrics registry, with the memory tier size as a gauge.
+
+    The disk tier is shared by all processes. Each entry's modification time
+    is its last use; when the tier grows past ``max_disk_entries`` the least
+    recently used entries are deleted.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None, max_disk_entries: int = 50000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum transcripts kept in memory
+            directory: Directory of the persistent tier (None for memory only)
+            max_disk_entries: Maximum transcripts kept on disk
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Estimated disk tier size; None until the directory has been scanned
+        self._disk_entries: Optional[int] = None
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment("transcription_cache.evictions")
+            metrics.set_gauge("transcription_cache.entries", len(self._entries))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a transcript.
+
+        Args:
+            key: Cache key from ``cache_key``
+
+        Returns:
+            Cached transcript, or None on a miss
+        """
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+        if text is not None:
+            metrics.increment("transcription_cache.hits")
+            metrics.increment("transcription_cache.memory_hits")
+            return text
+
+        if self.directory:
+            path = self._disk_path(key)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                # Mark the entry as recently used so pruning keeps it
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to read transcription cache entry {key}: {e}")
+        if text is not None:
+            self._remember(key, text)
+            metrics.increment("transcription_cache.hits")
+            metrics.increment("transcription_cache.disk_hits")
+            return text
+
+        metrics.increment("transcription_cache.misses")
+        return None
+
+    def put(self, key: str, text: str):
+        """
+        Store a transcript in both tiers.
+
+        Args:
+            key: Cache key from ``cache_key``
+            text: Transcript to store
+        """
+        self._remember(key, text)
+        if not self.directory:
+            return
+
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial entry
+            temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write transcription cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_entries is not None and self._disk_entries < self.max_disk_entries:
+                self._disk_entries += 1
+                return
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete least recently used disk entries once the tier is over its bound."""
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_disk_entries:
+            self._disk_entries = len(entries)
+            return
+
+        # Prune to 90% of the bound so the next writes do not rescan at once
+        target = int(self.max_disk_entries * 0.9)
+        entries.sort()
+        for _, path in entries[:len(entries) - target]:
+            try:
+                os.remove(path)
+                metrics.increment("transcription_cache.disk_evictions")
+            except OSError:
+                continue
+        self._disk_entries = target
+        logger.info(f"Pruned transcription cache in {self.directory} to {target} entries")
+
+    def clear_memory(self):
+        """Drop the in-memory tier."""
+        with self._lock:
+            self._entries.clear()
+            metrics.set_gauge("transcription_cache.entries", 0)
+
+
+class CachingLLMProvider(DelegatingLLMProvider):
+    """
+    Provider wrapper that answers repeated requests from a transcription cache.
+
+    A hit returns without calling the wrapped provider. Failures are not
+    cached.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: TranscriptionCache, **kwargs):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider: Provider to call on cache misses
+            cache: Cache to consult
+            **kwargs: Additional configuration parameters
+        """
+        super().__init__(provider, **kwargs)
+        self.cache = cache
+
+    def _key(self, audio_path: str) -> str:
+        return cache_key(audio_digest(audio_path), provider_identity(self.provider))
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        """
+        Transcribe audio, using the cache when possible.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+        """
+        if not self.validate_audio_file(audio_path):
+            raise ValueError(f"Invalid audio file: {audio_path}")
+
+        key = self._key(audio_path)
+        text = self.cache.get(key)
+        if text is None:
+            text = self.provider.transcribe_audio(audio_path)
+            self.cache.put(key, text)
+        return text
+
+    async def transcribe_audio_async(self, audio_path: str) -> str:
+        """
+        Asynchronously transcribe audio, using the cache when possible.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+        """
+        if not self.validate_audio_file(audio_path):
+            raise ValueError(f"Invalid audio file: {audio_path}")
+
+        # Hashing and disk reads are blocking; keep them off the event loop
+        key = await asyncio.to_thread(self._key, audio_path)
+        text = await asyncio.to_thread(self.cache.get, key)
+        if text is not None:
+            logger.info(f"Transcription cache hit for {audio_path}")
+            return text
+
+        text = await self.provider.transcribe_audio_async(audio_path)
+        await asyncio.to_thread(self.cache.put, key, text)
+        return text
+
+
+_transcription_cache: Optional[TranscriptionCache] = None
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """
+    Get the process-wide transcription cache, configured from settings.
+
+    Returns:
+        Shared transcription cache
+    """
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = TranscriptionCache(
+            max_entries=settings.transcription_cache_max_entries,
+            max_disk_entries=settings.transcription_cache_max_disk_entries,
+            directory=settings.transcription_cache_path or os.path.join(
+                settings.audio_storage_path, "transcription_cache"
+            )
+        )
+    return _transcription_cache
@@ -0,0 +1,129 @@
+"""
+Construction and lifecycle of the application's LLM provider.
+
+The provider owns pooled HTTP connections, so one instance is shared by the
+whole process: it is created and warmed at startup and closed at shutdown.
+"""
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.llm.cache import CachingLLMProvider, get_transcription_cache
+from app.llm.interface import LLMProvider
+from app.llm.mock_provider import MockLLMProvider
+from app.llm.requestyai_provider import RequestYaiProvider
+from app.llm.rate_limiter import RateLimitedLLMProvider, get_provider_rate_limiter
+from app.llm.resilience import create_resilient_provider
+from app.llm.router import RoutingLLMProvider
+
+logger = logging.getLogger(__name__)
+
+_llm_provider: Optional[LLMProvider] = None
+
+
+def create_base_provider(name: str) -> LLMProvider:
+    """
+    Create a single provider by name.
+
+    Args:
+        name: Provider name ("requestyai" or "mock")
+
+    Returns:
+        LLM provider instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "mock":
+        return MockLLMProvider()
+    if name == "requestyai":
+        return RequestYaiProvider(
+            api_key=settings.llm_api_key,
+            timeout=settings.llm_http_timeout_seconds,
+            connect_timeout=settings.llm_http_connect_timeout_seconds,
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+            keepalive_expiry=settings.llm_http_keepalive_expiry_seconds,
+            http2=settings.llm_http2,
+            upload_block_size=settings.llm_upload_block_size_kb * 1024
+        )
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def configured_provider_names() -> list[str]:
+    """
+    Names of the configured providers in order of preference.
+
+    Returns:
+        Provider names from ``llm_provider`` (only "mock" in debug mode)
+    """
+    if settings.debug:
+        return ["mock"]
+    names = [name.strip() for name in settings.llm_provider.split(",") if name.strip()]
+    return names or ["requestyai"]
+
+
+def create_llm_provider() -> LLMProvider:
+    """
+    Create an LLM provider based on configuration.
+
+    Returns:
+        LLM provider instance
+    """
+    providers = []
+    for name in configured_provider_names():
+        provider = create_base_provider(name)
+        # Every attempt, including retries, goes through its provider's admission control
+        if settings.llm_rate_limit_enabled:
+            provider = RateLimitedLLMProvider(provider, get_provider_rate_limiter(name))
+        providers.append((name, provider))
+    
+    if len(providers) == 1:
+        provider = providers[0][1]
+    else:
+        provider = RoutingLLMProvider(
+            providers,
+            hedging_enabled=settings.llm_hedging_enabled,
+            hedge_max_audio_seconds=settings.llm_hedge_max_audio_seconds,
+            hedge_quantile=settings.llm_hedge_quantile,
+            hedge_min_delay=settings.llm_hedge_min_delay_seconds
+        )
+    
+    # Retries sit inside the cache so a cache hit never waits on a broken provider
+    provider = create_resilient_provider(provider)
+    
+    if settings.transcription_cache_enabled:
+        provider = CachingLLMProvider(provider, get_transcription_cache())
+    return provider
+
+
+def get_llm_provider() -> LLMProvider:
+    """
+    Get the process-wide LLM provider.
+
+    Returns:
+        Shared LLM provider instance
+    """
+    global _llm_provider
+    if _llm_provider is None:
+        _llm_provider = create_llm_provider()
+    return _llm_provider
+
+
+async def start_llm_provider():
+    """Create the shared provider and open its connections ahead of the first request."""
+    warm_up = getattr(get_llm_provider(), "warm_up", None)
+    if warm_up is not None:
+        await warm_up()
+
+
+async def stop_llm_provider():
+    """Close the shared provider's connections."""
+    global _llm_provider
+    if _llm_provider is None:
+        return
+    aclose = getattr(_llm_provider, "aclose", None)
+    if aclose is not None:
+        await aclose()
+    _llm_provider = None
+    logger.info("LLM provider closed")
@@ -1,10 +1,49 @@
 """
 LLM Provider interface for audio transcription.
 """
-from typing import Protocol, Optional
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List, Protocol, Optional
 from abc import ABC, abstractmethod
 
 
+class ProviderError(Exception):
+    """
+    Error response from a transcription provider.
+    
+    Attributes:
+        status_code: HTTP status returned by the provider, if any
+        retry_after: Seconds the provider asked clients to wait, if given
+    """
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class TranscriptionResult:
+    """
+    Outcome of one item of a batch transcription.
+    
+    Attributes:
+        index: Position of the item in the input
+        audio_path: Path of the audio file
+        text: Transcribed text, if the item succeeded
+        error: Exception raised for the item, if it failed
+    """
+    index: int
+    audio_path: str
+    text: Optional[str] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the item was transcribed."""
+        return self.error is None
+
+
 class LLMProvider(Protocol):
     """
     Protocol for LLM providers that can transcribe audio.
@@ -39,6 +78,32 @@ class LLMProvider(Protocol):
             Exception: If transcription fails
         """
         ...
+    
+    async def transcribe_many(self, audio_paths: Iterable[str], max_concurrency: int = 4) -> List[TranscriptionResult]:
+        """
+        Transcribe several audio files.
+        
+        Args:
+            audio_paths: Paths of the audio files to transcribe
+            max_concurrency: Maximum files transcribed at once
+            
+        Returns:
+            One result per file, in input order; failed items carry their error
+        """
+        ...
+    
+    def transcribe_as_completed(self, audio_paths: Iterable[str], max_concurrency: int = 4) -> AsyncIterator[TranscriptionResult]:
+        """
+        Transcribe several audio files, yielding each result as it finishes.
+        
+        Args:
+            audio_paths: Paths of the audio files to transcribe
+            max_concurrency: Maximum files transcribed at once
+            
+        Yields:
+            One result per file in completion order; failed items carry their error
+        """
+        ...
 
 
 class BaseLLMProvider(ABC):
@@ -89,6 +154,70 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    async def transcribe_as_completed(self, audio_paths: Iterable[str], max_concurrency: int = 4) -> AsyncIterator[TranscriptionResult]:
+        """
+        Transcribe several audio files, yielding each result as it finishes.
+        
+        The default implementation runs up to ``max_concurrency`` single-file
+        transcriptions at a time and reads ``audio_paths`` lazily, so large
+        backfills do not create one task per file up front. An error in one
+        item is reported in its result and does not stop the others.
+        Providers with a native batch endpoint override this method.
+        
+        Args:
+            audio_paths: Paths of the audio files to transcribe
+            max_concurrency: Maximum files transcribed at once
+            
+        Yields:
+            One result per file in completion order
+        """
+        items = enumerate(audio_paths)
+        results: asyncio.Queue = asyncio.Queue()
+        
+        async def worker():
+            # Workers share one iterator; next() never awaits, so items are not duplicated
+            for index, audio_path in items:
+                try:
+                    text = await self.transcribe_audio_async(audio_path)
+                except Exception as e:
+                    results.put_nowait(TranscriptionResult(index, audio_path, error=e))
+                else:
+                    results.put_nowait(TranscriptionResult(index, audio_path, text=text))
+        
+        async def run():
+            try:
+                await asyncio.gather(*[worker() for _ in range(max(1, max_concurrency))])
+            finally:
+                results.put_nowait(None)
+        
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+            await runner
+        finally:
+            # The caller stopped early or was cancelled: stop the workers too
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+    
+    async def transcribe_many(self, audio_paths: Iterable[str], max_concurrency: int = 4) -> List[TranscriptionResult]:
+        """
+        Transcribe several audio files.
+        
+        Args:
+            audio_paths: Paths of the audio files to transcribe
+            max_concurrency: Maximum files transcribed at once
+            
+        Returns:
+            One result per file, in input order; failed items carry their error
+        """
+        results = [result async for result in self.transcribe_as_completed(audio_paths, max_concurrency)]
+        return sorted(results, key=lambda result: result.index)
+    
     def validate_audio_file(self, audio_path: str) -> bool:
         """
         Validate that the audio file exists and is readable.
@@ -110,3 +239,48 @@ class BaseLLMProvider(ABC):
             List of supported file extensions
         """
         return ['.wav', '.mp3', '.m4a', '.ogg', '.flac']
+
+
+class DelegatingLLMProvider(BaseLLMProvider):
+    """
+    Base class for providers that wrap another provider.
+    
+    Every call is forwarded to the wrapped provider; subclasses override the
+    calls they add behaviour to. Unknown attributes (``model``, ``language``
+    and so on) are read from the wrapped provider.
+    """
+    
+    def __init__(self, provider: LLMProvider, **kwargs):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            provider: Provider to forward calls to
+            **kwargs: Additional configuration parameters
+        """
+        super().__init__(getattr(provider, "api_key", ""), **kwargs)
+        self.provider = provider
+    
+    def __getattr__(self, name: str):
+        # Only called for attributes not found on the wrapper itself
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+    
+    def transcribe_audio(self, audio_path: str) -> str:
+        """Forward synchronous transcription to the wrapped provider."""
+        return self.provider.transcribe_audio(audio_path)
+    
+    async def transcribe_audio_async(self, audio_path: str) -> str:
+        """Forward asynchronous transcription to the wrapped provider."""
+        return await self.provider.transcribe_audio_async(audio_path)
+    
+    def validate_audio_file(self, audio_path: str) -> bool:
+        """Validate with the wrapped provider's rules."""
+        validate = getattr(self.provider, "validate_audio_file", None)
+        return validate(audio_path) if validate else super().validate_audio_file(audio_path)
+    
+    def get_supported_formats(self) -> list[str]:
+        """Formats supported by the wrapped provider."""
+        formats = getattr(self.provider, "get_supported_formats", None)
+        return formats() if formats else super().get_supported_formats()
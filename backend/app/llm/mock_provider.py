@@ -1,9 +1,9 @@
 """
 Mock LLM provider for testing purposes.
 """
+import random
 import asyncio
 import logging
-from typing import Optional
 
 from app.llm.interface import BaseLLMProvider
 
@@ -32,6 +32,13 @@ class MockLLMProvider(BaseLLMProvider):
         self.delay_seconds = kwargs.get('delay_seconds', 2.0)
         self.should_fail = kwargs.get('should_fail', False)
         self.failure_message = kwargs.get('failure_message', "Mock transcription failure")
+        self.failure_rate = kwargs.get('failure_rate', 0.0)
+        self._random = random.Random(kwargs.get('seed'))
+    
+    def _maybe_fail(self):
+        """Raise the configured failure at the configured rate."""
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise Exception(self.failure_message)
     
     def transcribe_audio(self, audio_path: str) -> str:
         """
@@ -56,6 +63,8 @@ class MockLLMProvider(BaseLLMProvider):
             import time
             time.sleep(self.delay_seconds)
         
+        self._maybe_fail()
+        
         logger.info(f"Mock transcription completed for: {audio_path}")
         return f"{self.mock_transcription} [File: {audio_path}]"
     
@@ -81,6 +90,8 @@ class MockLLMProvider(BaseLLMProvider):
         if self.simulate_delay:
             await asyncio.sleep(self.delay_seconds)
         
+        self._maybe_fail()
+        
         logger.info(f"Mock async transcription completed for: {audio_path}")
         return f"{self.mock_transcription} [File: {audio_path}]"
     
@@ -0,0 +1,96 @@
+"""
+Streaming multipart/form-data request body for file uploads.
+
+The body is produced in bounded blocks read from disk, so an upload holds
+one block of the file in memory regardless of its size. All part headers
+are built up front, which makes the total length known before the first
+byte is sent and lets the request carry a Content-Length instead of
+chunked transfer encoding.
+"""
+import os
+import uuid
+from typing import AsyncIterator, Dict, Mapping, Optional
+
+import aiofiles
+import httpx
+
+DEFAULT_UPLOAD_BLOCK_SIZE = 256 * 1024
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", " ").replace("\n", " ")
+
+
+class MultipartFileStream(httpx.AsyncByteStream):
+    """
+    Multipart body with form fields followed by one file streamed from disk.
+
+    The stream can be iterated more than once (each iteration reopens the
+    file), so a retried request can reuse it.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, object],
+        file_field: str,
+        file_path: str,
+        content_type: str,
+        filename: Optional[str] = None,
+        block_size: int = DEFAULT_UPLOAD_BLOCK_SIZE
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            fields: Plain form fields sent before the file
+            file_field: Form field name of the file part
+            file_path: Path of the file to upload
+            content_type: MIME type of the file part
+            filename: File name sent to the server (base name of the path by default)
+            block_size: Bytes read from disk per block
+        """
+        self.file_path = file_path
+        self.block_size = block_size
+        self.boundary = uuid.uuid4().hex
+
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        parts.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote(file_field)}"; '
+            f'filename="{_quote(filename or os.path.basename(file_path))}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self.preamble = "".join(parts).encode("utf-8")
+        self.epilogue = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self.file_size = os.path.getsize(file_path)
+
+    @property
+    def content_length(self) -> int:
+        """Total body length in bytes."""
+        return len(self.preamble) + self.file_size + len(self.epilogue)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Content-Type (with boundary) and Content-Length headers for the request."""
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(self.content_length),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.preamble
+        remaining = self.file_size
+        async with aiofiles.open(self.file_path, "rb") as f:
+            while remaining > 0:
+                block = await f.read(min(self.block_size, remaining))
+                if not block:
+                    raise IOError(f"{self.file_path} shrank while being uploaded")
+                remaining -= len(block)
+                yield block
+        yield self.epilogue
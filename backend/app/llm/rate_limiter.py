@@ -0,0 +1,492 @@
+"""
+Provider admission control shared by all worker processes.
+
+Every provider call must first be admitted by the limiter:
+
+* a token bucket for requests per minute;
+* a token bucket for audio seconds per minute;
+* an AIMD concurrency limit. It grows by about one slot per round of
+  healthy calls and is multiplied down when the provider throttles (429/503),
+  times out, or a call is much slower than usual for its audio length.
+
+The limiter keeps its state in a store. ``InMemoryLimiterStore`` serves a
+single process. ``FileLimiterStore`` keeps the state in a JSON file behind
+an ``fcntl`` lock, so all uvicorn workers on a host share one budget.
+In-flight calls are leases with an expiry, which means a worker that dies
+mid-call cannot leak concurrency slots.
+"""
+import os
+import json
+import time
+import uuid
+import fcntl
+import asyncio
+import functools
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.audio.wav import probe_wav
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.llm.interface import DelegatingLLMProvider, LLMProvider, ProviderError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+OVERLOAD_STATUS_CODES = frozenset({429, 503})
+
+# Rough payload byte rates used to estimate the audio length of compressed files
+_BYTES_PER_SECOND = {
+    ".flac": 16000,
+    ".mp3": 16000,
+    ".m4a": 8000,
+    ".opus": 3000,
+    ".ogg": 3000,
+    ".webm": 3000,
+}
+_DEFAULT_BYTES_PER_SECOND = 16000
+
+# Longest sleep between admission attempts while waiting for a slot
+MAX_POLL_SECONDS = 1.0
+
+
+def estimate_audio_seconds(audio_path: str) -> float:
+    """
+    Estimate the length of an audio file without decoding it.
+
+    WAV files are measured from their header. Other formats are estimated from
+    the file size and a typical bitrate for their format.
+
+    Args:
+        audio_path: Path to the audio file
+
+    Returns:
+        Estimated duration in seconds
+    """
+    info = probe_wav(audio_path)
+    if info is not None:
+        return info.duration_seconds
+    extension = os.path.splitext(audio_path)[1].lower()
+    return os.path.getsize(audio_path) / _BYTES_PER_SECOND.get(extension, _DEFAULT_BYTES_PER_SECOND)
+
+
+class InMemoryLimiterStore:
+    """Limiter state held in this process."""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def update(self, fn: Callable[[Dict[str, Any]], T]) -> T:
+        """
+        Apply ``fn`` to the state atomically.
+
+        Args:
+            fn: Function that reads and mutates the state dictionary
+
+        Returns:
+            Whatever ``fn`` returned
+        """
+        with self._lock:
+            return fn(self._state)
+
+
+class FileLimiterStore:
+    """
+    Limiter state in a JSON file shared by every process on the host.
+
+    Each update holds an exclusive ``flock`` on the file while it reads,
+    changes and rewrites the state. A thread lock serializes threads within
+    the process as well.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: State file; created on first use
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def update(self, fn: Callable[[Dict[str, Any]], T]) -> T:
+        """
+        Apply ``fn`` to the state atomically across processes.
+
+        Args:
+            fn: Function that reads and mutates the state dictionary
+
+        Returns:
+            Whatever ``fn`` returned
+        """
+        with self._lock, open(self.path, "a+") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    logger.warning(f"Discarding unreadable rate limiter state in {self.path}")
+                    state = {}
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ProviderRateLimiter:
+    """
+    Token buckets plus an AIMD concurrency limit for provider calls.
+
+    Call ``acquire`` before calling the provider and ``release`` afterwards
+    with the outcome. The concurrency limit, in-flight count and waits are
+    published under ``llm_rate_limit.*`` in the metrics registry.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        requests_per_minute: float = 0,
+        audio_seconds_per_minute: float = 0,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        decrease_factor: float = 0.5,
+        decrease_cooldown_seconds: float = 2.0,
+        latency_spike_factor: float = 2.5,
+        latency_smoothing: float = 0.2,
+        lease_seconds: float = 900.0,
+        poll_interval: float = 0.05,
+        name: str = "llm_rate_limit"
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            store: State store (in-memory by default)
+            requests_per_minute: Request budget; 0 disables the bucket
+            audio_seconds_per_minute: Audio budget; 0 disables the bucket
+            initial_concurrency: Concurrency limit before any feedback
+            min_concurrency: Lowest the limit may shrink to
+            max_concurrency: Highest the limit may grow to
+            decrease_factor: Multiplier applied to the limit on overload
+            decrease_cooldown_seconds: Minimum time between two decreases, so
+                one burst of 429s counts as a single signal
+            latency_spike_factor: A call slower than this multiple of the
+                usual seconds-per-audio-second counts as overload
+            latency_smoothing: Weight of a new sample in the latency average
+            lease_seconds: How long an unreleased slot is held before it is reclaimed
+            poll_interval: First sleep between admission attempts while the limit
+                is full; it doubles on each attempt up to ``MAX_POLL_SECONDS``
+            name: Metric name prefix
+        """
+        self.store = store or InMemoryLimiterStore()
+        self.requests_per_minute = requests_per_minute
+        self.audio_seconds_per_minute = audio_seconds_per_minute
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_smoothing = latency_smoothing
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.name = name
+
+    def _take(self, state: Dict[str, Any], bucket: str, per_minute: float, cost: float, now: float) -> float:
+        """Refill a bucket and return how long until ``cost`` tokens are available."""
+        if per_minute <= 0:
+            return 0.0
+        entry = state.setdefault(bucket, {"tokens": per_minute, "updated": now})
+        rate = per_minute / 60.0
+        entry["tokens"] = min(per_minute, entry["tokens"] + max(0.0, now - entry["updated"]) * rate)
+        entry["updated"] = now
+        # A request larger than the whole bucket is admitted once the bucket is full
+        cost = min(cost, per_minute)
+        if entry["tokens"] >= cost:
+            return 0.0
+        return (cost - entry["tokens"]) / rate
+
+    def _try_acquire(self, state: Dict[str, Any], lease_id: str, audio_seconds: float) -> float:
+        """Admit the call and record its lease, or return how long to wait."""
+        now = time.time()
+        leases = state.setdefault("leases", {})
+        for expired in [key for key, lease in leases.items() if lease["expires"] <= now]:
+            logger.warning(f"Reclaiming expired provider lease {expired}")
+            del leases[expired]
+
+        limit = state.setdefault("limit", float(self.initial_concurrency))
+        if len(leases) >= int(limit):
+            return self.poll_interval
+
+        wait = max(
+            self._take(state, "requests", self.requests_per_minute, 1.0, now),
+            self._take(state, "audio", self.audio_seconds_per_minute, audio_seconds, now)
+        )
+        if wait > 0:
+            return wait
+
+        if self.requests_per_minute > 0:
+            state["requests"]["tokens"] -= 1.0
+        if self.audio_seconds_per_minute > 0:
+            state["audio"]["tokens"] -= min(audio_seconds, self.audio_seconds_per_minute)
+        leases[lease_id] = {"expires": now + self.lease_seconds, "audio_seconds": audio_seconds}
+        self._publish(state)
+        return 0.0
+
+    def _release(self, state: Dict[str, Any], lease_id: str, latency: Optional[float], overloaded: bool):
+        """Drop the lease and feed the outcome into the concurrency limit."""
+        now = time.time()
+        lease = state.setdefault("leases", {}).pop(lease_id, None)
+        limit = state.get("limit", float(self.initial_concurrency))
+
+        if latency is not None and not overloaded:
+            per_audio_second = latency / max(1.0, lease["audio_seconds"] if lease else 1.0)
+            average = state.get("latency")
+            # Every sample moves the baseline, spikes included; otherwise a provider
+            # that stays slower would count as a spike forever and pin the limit
+            # at its minimum
+            state["latency"] = per_audio_second if average is None else (
+                (1 - self.latency_smoothing) * average + self.latency_smoothing * per_audio_second
+            )
+            if average is not None and per_audio_second > average * self.latency_spike_factor:
+                metrics.increment(f"{self.name}.latency_spikes")
+                overloaded = True
+            else:
+                # Additive increase: about one slot per limit's worth of healthy calls
+                limit = min(float(self.max_concurrency), limit + 1.0 / limit)
+
+        if overloaded and now - state.get("last_decrease", 0.0) >= self.decrease_cooldown_seconds:
+            limit = max(float(self.min_concurrency), limit * self.decrease_factor)
+            state["last_decrease"] = now
+            metrics.increment(f"{self.name}.decreases")
+            logger.warning(f"Provider overloaded; concurrency limit lowered to {limit:.1f}")
+
+        state["limit"] = limit
+        self._publish(state)
+
+    def _publish(self, state: Dict[str, Any]):
+        metrics.set_gauge(f"{self.name}.concurrency_limit", state.get("limit", float(self.initial_concurrency)))
+        metrics.set_gauge(f"{self.name}.in_flight", len(state.get("leases", {})))
+
+    async def acquire(self, audio_seconds: float = 0.0) -> str:
+        """
+        Wait until a provider call may start.
+
+        Args:
+            audio_seconds: Length of the audio the call will send
+
+        Returns:
+            Lease id to pass to ``release``
+        """
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        backoff = self.poll_interval
+        while True:
+            # The file store blocks on flock and disk I/O, so it runs off the event loop
+            update = asyncio.ensure_future(asyncio.to_thread(
+                self.store.update, lambda state: self._try_acquire(state, lease_id, audio_seconds)
+            ))
+            try:
+                # The thread cannot be stopped; if it admits the call after the
+                # caller was cancelled (a hedge loser), nobody else would release the lease
+                wait = await asyncio.shield(update)
+            except asyncio.CancelledError:
+                update.add_done_callback(functools.partial(self._release_abandoned, lease_id))
+                raise
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(max(wait, backoff), MAX_POLL_SECONDS))
+            backoff = min(backoff * 2, MAX_POLL_SECONDS)
+        self._record_wait(time.monotonic() - started)
+        return lease_id
+
+    def _release_abandoned(self, lease_id: str, update: "asyncio.Future[float]"):
+        """Release a lease admitted after its caller was cancelled."""
+        if update.cancelled() or update.exception() is not None or update.result() > 0:
+            return
+        logger.info(f"Releasing provider lease {lease_id} of a cancelled call")
+        asyncio.get_running_loop().run_in_executor(None, self.release, lease_id)
+
+    def acquire_sync(self, audio_seconds: float = 0.0) -> str:
+        """Blocking variant of ``acquire``."""
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        backoff = self.poll_interval
+        while True:
+            wait = self.store.update(lambda state: self._try_acquire(state, lease_id, audio_seconds))
+            if wait <= 0:
+                break
+            time.sleep(min(max(wait, backoff), MAX_POLL_SECONDS))
+            backoff = min(backoff * 2, MAX_POLL_SECONDS)
+        self._record_wait(time.monotonic() - started)
+        return lease_id
+
+    def _record_wait(self, waited: float):
+        metrics.observe(f"{self.name}.wait_seconds", waited)
+        if waited > 0.5:
+            metrics.increment(f"{self.name}.delayed")
+
+    def release(self, lease_id: str, latency: Optional[float] = None, overloaded: bool = False):
+        """
+        Return a slot and report how the call went.
+
+        Args:
+            lease_id: Lease returned by ``acquire``
+            latency: Duration of a successful call; None when it did not succeed
+            overloaded: Whether the provider signalled overload (429/503, timeout)
+        """
+        if overloaded:
+            metrics.increment(f"{self.name}.throttled")
+        self.store.update(lambda state: self._release(state, lease_id, latency, overloaded))
+
+    async def release_async(self, lease_id: str, latency: Optional[float] = None, overloaded: bool = False):
+        """Variant of ``release`` that updates the store off the event loop."""
+        # Shielded so that cancelling the caller cannot leave the slot held
+        await asyncio.shield(asyncio.to_thread(self.release, lease_id, latency, overloaded))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current limit and number of calls in flight.
+
+        Returns:
+            Dictionary with "limit" and "in_flight"
+        """
+        return self.store.update(lambda state: {
+            "limit": state.get("limit", float(self.initial_concurrency)),
+            "in_flight": len(state.get("leases", {}))
+        })
+
+
+def is_overload(error: BaseException) -> bool:
+    """
+    Decide whether a failed call means the provider is overloaded.
+
+    Args:
+        error: Exception raised by the provider
+
+    Returns:
+        True for 429/503 responses and timeouts
+    """
+    if isinstance(error, ProviderError):
+        return error.status_code in OVERLOAD_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError))
+
+
+class RateLimitedLLMProvider(DelegatingLLMProvider):
+    """
+    Provider wrapper that admits each call through a ``ProviderRateLimiter``.
+    """
+
+    def __init__(self, provider: LLMProvider, limiter: ProviderRateLimiter, **kwargs):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider: Provider to call once admitted
+            limiter: Limiter shared by all calls
+            **kwargs: Additional configuration parameters
+        """
+        super().__init__(provider, **kwargs)
+        self.limiter = limiter
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        """
+        Transcribe audio once the limiter admits the call.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+        """
+        lease = self.limiter.acquire_sync(estimate_audio_seconds(audio_path))
+        started = time.monotonic()
+        latency, overloaded = None, False
+        try:
+            text = self.provider.transcribe_audio(audio_path)
+            latency = time.monotonic() - started
+            return text
+        except Exception as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            self.limiter.release(lease, latency=latency, overloaded=overloaded)
+
+    async def transcribe_audio_async(self, audio_path: str) -> str:
+        """
+        Asynchronously transcribe audio once the limiter admits the call.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+        """
+        audio_seconds = await asyncio.to_thread(estimate_audio_seconds, audio_path)
+        lease = await self.limiter.acquire(audio_seconds)
+        started = time.monotonic()
+        latency, overloaded = None, False
+        try:
+            text = await self.provider.transcribe_audio_async(audio_path)
+            latency = time.monotonic() - started
+            return text
+        except Exception as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            # Runs on cancellation too, so an abandoned attempt frees its slot
+            await self.limiter.release_async(lease, latency=latency, overloaded=overloaded)
+
+
+_rate_limiters: Dict[str, ProviderRateLimiter] = {}
+
+
+def get_provider_rate_limiter(provider_name: str = "default") -> ProviderRateLimiter:
+    """
+    Get the process-wide rate limiter for a provider, configured from settings.
+
+    Each provider has its own budget and, with the file backend, its own
+    state file.
+
+    Args:
+        provider_name: Name of the provider as configured in ``llm_provider``
+
+    Returns:
+        Shared rate limiter for the provider
+    """
+    limiter = _rate_limiters.get(provider_name)
+    if limiter is None:
+        if settings.llm_rate_limit_backend == "file":
+            directory = settings.llm_rate_limit_state_path or os.path.join(
+                settings.audio_storage_path, "llm_rate_limit"
+            )
+            store = FileLimiterStore(os.path.join(directory, f"{provider_name}.json"))
+        else:
+            store = InMemoryLimiterStore()
+        limiter = ProviderRateLimiter(
+            store=store,
+            requests_per_minute=settings.llm_rate_limit_requests_per_minute,
+            audio_seconds_per_minute=settings.llm_rate_limit_audio_seconds_per_minute,
+            initial_concurrency=settings.llm_concurrency_initial,
+            min_concurrency=settings.llm_concurrency_min,
+            max_concurrency=settings.llm_concurrency_max,
+            lease_seconds=settings.transcription_deadline_seconds,
+            name=f"llm_rate_limit.{provider_name}"
+        )
+        _rate_limiters[provider_name] = limiter
+    return limiter
@@ -2,15 +2,44 @@
 RequestYAI LLM provider implementation for audio transcription.
 """
 import httpx
-import aiofiles
 import logging
+import importlib.util
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 
-from app.llm.interface import BaseLLMProvider
+from app.audio.formats import mime_type_for_path
+from app.llm.interface import BaseLLMProvider, ProviderError
+from app.llm.multipart import DEFAULT_UPLOAD_BLOCK_SIZE, MultipartFileStream
 
 logger = logging.getLogger(__name__)
 
 
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+    
+    Args:
+        value: Header value
+        
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 class RequestYaiProvider(BaseLLMProvider):
     """
     RequestYAI implementation of the LLM provider interface.
@@ -34,6 +63,89 @@ class RequestYaiProvider(BaseLLMProvider):
         self.language = kwargs.get('language', 'en')
         self.response_format = kwargs.get('response_format', 'text')
         self.temperature = kwargs.get('temperature', 0.0)
+        self.upload_block_size = kwargs.get('upload_block_size', DEFAULT_UPLOAD_BLOCK_SIZE)
+        
+        # Connection pool options; one client per provider is reused for every request
+        self.timeout = httpx.Timeout(
+            kwargs.get('timeout', 300.0),
+            connect=kwargs.get('connect_timeout', 10.0)
+        )
+        self.limits = httpx.Limits(
+            max_connections=kwargs.get('max_connections', 20),
+            max_keepalive_connections=kwargs.get('max_keepalive_connections', 10),
+            keepalive_expiry=kwargs.get('keepalive_expiry', 60.0)
+        )
+        # HTTP/2 needs the optional h2 package
+        self.http2 = kwargs.get('http2', False) and importlib.util.find_spec('h2') is not None
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.Client:
+        """Pooled synchronous HTTP client, created on first use."""
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout, limits=self.limits, http2=self.http2)
+        return self._client
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Pooled asynchronous HTTP client, created on first use."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+        return self._async_client
+    
+    async def warm_up(self):
+        """
+        Open a pooled connection to the API ahead of the first transcription.
+        
+        Failures are logged and ignored; the first request will retry the
+        connection.
+        """
+        try:
+            await self.async_client.head(self.base_url, headers={'Authorization': f'Bearer {self.api_key}'})
+            logger.info(f"Warmed RequestYAI connection pool (http2={self.http2})")
+        except httpx.HTTPError as e:
+            logger.warning(f"RequestYAI connection warm-up failed: {e}")
+    
+    async def aclose(self):
+        """Close the pooled HTTP clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+    
+    def close(self):
+        """Close the pooled synchronous HTTP client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    def _parse_response(self, response: httpx.Response) -> str:
+        """
+        Extract the transcript from an API response.
+        
+        Args:
+            response: Response from the transcription endpoint
+            
+        Returns:
+            Transcribed text
+            
+        Raises:
+            ProviderError: If the API returned an error status
+        """
+        if response.status_code == 200:
+            if self.response_format == 'text':
+                return response.text.strip()
+            else:
+                result = response.json()
+                return result.get('text', '').strip()
+        
+        logger.error(f"RequestYAI API error: {response.status_code} - {response.text}")
+        raise ProviderError(
+            f"Transcription failed: {response.status_code}",
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+        )
     
     def transcribe_audio(self, audio_path: str) -> str:
         """
@@ -54,7 +166,7 @@ class RequestYaiProvider(BaseLLMProvider):
         try:
             with open(audio_path, 'rb') as audio_file:
                 files = {
-                    'file': (audio_path, audio_file, 'audio/wav')
+                    'file': (audio_path, audio_file, mime_type_for_path(audio_path))
                 }
                 
                 data = {
@@ -68,23 +180,14 @@ class RequestYaiProvider(BaseLLMProvider):
                     'Authorization': f'Bearer {self.api_key}'
                 }
                 
-                with httpx.Client(timeout=300.0) as client:
-                    response = client.post(
-                        self.transcription_endpoint,
-                        files=files,
-                        data=data,
-                        headers=headers
-                    )
-                    
-                    if response.status_code == 200:
-                        if self.response_format == 'text':
-                            return response.text.strip()
-                        else:
-                            result = response.json()
-                            return result.get('text', '').strip()
-                    else:
-                        logger.error(f"RequestYAI API error: {response.status_code} - {response.text}")
-                        raise Exception(f"Transcription failed: {response.status_code}")
+                response = self.client.post(
+                    self.transcription_endpoint,
+                    files=files,
+                    data=data,
+                    headers=headers
+                )
+                
+                return self._parse_response(response)
                         
         except Exception as e:
             logger.error(f"Error transcribing audio with RequestYAI: {e}")
@@ -107,41 +210,34 @@ class RequestYaiProvider(BaseLLMProvider):
             raise ValueError(f"Invalid audio file: {audio_path}")
         
         try:
-            async with aiofiles.open(audio_path, 'rb') as audio_file:
-                audio_content = await audio_file.read()
-                
-                files = {
-                    'file': (audio_path, audio_content, 'audio/wav')
-                }
-                
-                data = {
-                    'model': self.model,
-                    'language': self.language,
-                    'response_format': self.response_format,
-                    'temperature': self.temperature
-                }
-                
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}'
-                }
-                
-                async with httpx.AsyncClient(timeout=300.0) as client:
-                    response = await client.post(
-                        self.transcription_endpoint,
-                        files=files,
-                        data=data,
-                        headers=headers
-                    )
-                    
-                    if response.status_code == 200:
-                        if self.response_format == 'text':
-                            return response.text.strip()
-                        else:
-                            result = response.json()
-                            return result.get('text', '').strip()
-                    else:
-                        logger.error(f"RequestYAI API error: {response.status_code} - {response.text}")
-                        raise Exception(f"Transcription failed: {response.status_code}")
+            data = {
+                'model': self.model,
+                'language': self.language,
+                'response_format': self.response_format,
+                'temperature': self.temperature
+            }
+            
+            # Stream the file from disk in blocks rather than reading it into memory
+            body = MultipartFileStream(
+                data,
+                'file',
+                audio_path,
+                mime_type_for_path(audio_path),
+                block_size=self.upload_block_size
+            )
+            
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                **body.headers
+            }
+            
+            response = await self.async_client.post(
+                self.transcription_endpoint,
+                content=body,
+                headers=headers
+            )
+            
+            return self._parse_response(response)
                         
         except Exception as e:
             logger.error(f"Error transcribing audio with RequestYAI: {e}")
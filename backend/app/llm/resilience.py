@@ -0,0 +1,370 @@
+"""
+Resilient provider calls: retries with backoff, deadline budgets and a circuit breaker.
+
+Transient provider failures (429, 5xx, connection errors and timeouts) are
+retried with exponential backoff and full jitter, honouring Retry-After.
+Every job gets a deadline budget shared by all of its provider calls, so a
+brownout cannot hold a job for longer than the budget. A circuit breaker
+opens after repeated transient failures and fails calls fast until the
+provider has had time to recover.
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.llm.interface import DelegatingLLMProvider, LLMProvider, ProviderError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("transcription_deadline", default=None)
+
+
+class DeadlineExceeded(ProviderError):
+    """The job's deadline budget ran out before the provider answered."""
+
+
+class CircuitOpenError(ProviderError):
+    """The circuit breaker is open; the provider is not being called."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed provider call is worth retrying.
+
+    Args:
+        error: Exception raised by the provider
+
+    Returns:
+        True for rate limiting, server errors, timeouts and connection errors
+    """
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        return False
+    if isinstance(error, ProviderError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+@contextmanager
+def deadline_budget(seconds: float) -> Iterator[float]:
+    """
+    Give every provider call made inside the block a shared deadline.
+
+    Nested budgets can only shorten the deadline. The budget follows the
+    context into tasks created inside the block.
+
+    Args:
+        seconds: Budget from now
+
+    Yields:
+        The absolute deadline on the ``time.monotonic`` clock
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current deadline budget, or None if there is none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Time to wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the provider, if any
+
+        Returns:
+            Seconds to sleep
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker.
+
+    The breaker opens after ``failure_threshold`` consecutive transient
+    failures. While open every call fails fast. After ``recovery_seconds``
+    a limited number of trial calls is let through (half-open); a success
+    closes the breaker and a failure opens it again.
+
+    The state is published as the ``llm_circuit.state`` gauge
+    (0 closed, 1 half-open, 2 open).
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0, half_open_calls: int = 1, name: str = "llm"):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive transient failures that open the breaker
+            recovery_seconds: How long the breaker stays open
+            half_open_calls: Trial calls allowed while half-open
+            name: Metric name prefix
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_calls = half_open_calls
+        self.name = name
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge(f"{self.name}_circuit.state", self._GAUGE[self._state])
+
+    def _transition(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit breaker {self.name}: {self._state} -> {state}")
+            self._state = state
+            if state == self.OPEN:
+                self._opened_at = time.monotonic()
+                metrics.increment(f"{self.name}_circuit.opened")
+            self._trials = 0
+            self._publish()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once recovery time has passed."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self._transition(self.HALF_OPEN)
+            return self._state
+
+    def before_call(self):
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the breaker is open or out of half-open trials
+        """
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return
+        metrics.increment(f"{self.name}_circuit.rejected")
+        raise CircuitOpenError("Transcription provider unavailable (circuit open)")
+
+    def record_success(self):
+        """Record a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        """Record a transient failure."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(self.OPEN)
+
+    def record_abandoned(self):
+        """
+        Record a call that ended without an outcome (cancelled or interrupted).
+
+        A half-open trial slot taken by the call is given back, so that
+        another trial can run; otherwise the breaker would stay half-open
+        and reject every call.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+
+class ResilientLLMProvider(DelegatingLLMProvider):
+    """
+    Provider wrapper adding retries, deadline budgets and a circuit breaker.
+
+    Attempts, retries and failures are counted in the metrics registry under
+    ``llm_resilience.*``.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        attempt_timeout: float = 300.0,
+        default_budget: float = 900.0,
+        **kwargs
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider: Provider to call
+            policy: Retry policy
+            breaker: Circuit breaker shared by all calls
+            attempt_timeout: Upper bound for a single attempt
+            default_budget: Budget for calls made outside ``deadline_budget``
+            **kwargs: Additional configuration parameters
+        """
+        super().__init__(provider, **kwargs)
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.attempt_timeout = attempt_timeout
+        self.default_budget = default_budget
+
+    def _next_delay(self, error: BaseException, attempt: int, deadline: float, audio_path: str) -> float:
+        """Decide whether to retry; returns the sleep before the next attempt or re-raises."""
+        if not is_retryable(error):
+            # The request itself was at fault, not the provider's health
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        metrics.increment("llm_resilience.transient_failures")
+
+        if attempt >= self.policy.max_attempts:
+            metrics.increment("llm_resilience.exhausted")
+            raise error
+        delay = self.policy.delay(attempt, getattr(error, "retry_after", None))
+        if time.monotonic() + delay >= deadline:
+            metrics.increment("llm_resilience.deadline_exceeded")
+            raise DeadlineExceeded(f"Transcription deadline exceeded after {attempt} attempts: {error}") from error
+
+        metrics.increment("llm_resilience.retries")
+        logger.warning(
+            f"Transcription attempt {attempt} for {audio_path} failed ({error}); retrying in {delay:.1f}s"
+        )
+        return delay
+
+    def _deadline(self) -> float:
+        remaining = remaining_budget()
+        return time.monotonic() + (self.default_budget if remaining is None else remaining)
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        """
+        Transcribe audio with retries and the circuit breaker.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+        """
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            attempt += 1
+            metrics.increment("llm_resilience.attempts")
+            try:
+                text = self.provider.transcribe_audio(audio_path)
+            except Exception as e:
+                time.sleep(self._next_delay(e, attempt, deadline, audio_path))
+                continue
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            self.breaker.record_success()
+            return text
+
+    async def transcribe_audio_async(self, audio_path: str) -> str:
+        """
+        Asynchronously transcribe audio with retries, deadline and circuit breaker.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+
+        Raises:
+            CircuitOpenError: If the provider is considered unavailable
+            DeadlineExceeded: If the job's budget ran out
+            Exception: The last error once retries are exhausted or not applicable
+        """
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.increment("llm_resilience.deadline_exceeded")
+                raise DeadlineExceeded("Transcription deadline exceeded")
+
+            self.breaker.before_call()
+            attempt += 1
+            metrics.increment("llm_resilience.attempts")
+            try:
+                text = await asyncio.wait_for(
+                    self.provider.transcribe_audio_async(audio_path),
+                    timeout=min(self.attempt_timeout, remaining)
+                )
+            except Exception as e:
+                await asyncio.sleep(self._next_delay(e, attempt, deadline, audio_path))
+                continue
+            except BaseException:
+                # Cancelled (drain, lost lease, hedge loser): the attempt says nothing about the provider
+                self.breaker.record_abandoned()
+                raise
+            self.breaker.record_success()
+            return text
+
+
+def create_resilient_provider(provider: LLMProvider) -> ResilientLLMProvider:
+    """
+    Wrap a provider with retry, deadline and circuit breaker settings.
+
+    Args:
+        provider: Provider to wrap
+
+    Returns:
+        Resilient provider
+    """
+    return ResilientLLMProvider(
+        provider,
+        policy=RetryPolicy(
+            max_attempts=settings.llm_retry_max_attempts,
+            base_delay=settings.llm_retry_base_delay_seconds,
+            max_delay=settings.llm_retry_max_delay_seconds
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            recovery_seconds=settings.llm_circuit_recovery_seconds
+        ),
+        attempt_timeout=settings.llm_http_timeout_seconds,
+        default_budget=settings.transcription_deadline_seconds
+    )
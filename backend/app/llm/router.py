@@ -0,0 +1,329 @@
+"""
+Routing across several transcription providers.
+
+``RoutingLLMProvider`` keeps running averages of latency and error rate for
+every provider it wraps. Each call goes to the provider with the lowest
+expected time to a successful answer. If that provider fails, the call moves
+on to the next one. For short recordings the router can also hedge: when the
+first provider has not answered after its usual p95 latency, a second request
+goes to the next provider and the first answer wins.
+"""
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from app.core.metrics import metrics
+from app.llm.interface import BaseLLMProvider, LLMProvider
+from app.llm.rate_limiter import estimate_audio_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """
+    Latency and error averages for one provider.
+
+    Latency is measured in seconds per second of audio, so short and long
+    recordings are comparable. Errors decay over time, which lets a provider
+    that failed earlier be tried again once it had time to recover.
+    """
+
+    def __init__(self, smoothing: float = 0.2, error_half_life_seconds: float = 60.0, window: int = 100):
+        """
+        Initialize the stats.
+
+        Args:
+            smoothing: Weight of a new sample in the averages
+            error_half_life_seconds: Time for the error rate to halve without new calls
+            window: Number of recent latencies kept for percentiles
+        """
+        self.smoothing = smoothing
+        self.error_half_life_seconds = error_half_life_seconds
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.updated_at = time.monotonic()
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def _decayed_error_rate(self, now: float) -> float:
+        if self.error_half_life_seconds <= 0:
+            return self.error_rate
+        return self.error_rate * 0.5 ** ((now - self.updated_at) / self.error_half_life_seconds)
+
+    def record(self, seconds_per_audio_second: Optional[float], failed: bool):
+        """
+        Record the outcome of a call.
+
+        Args:
+            seconds_per_audio_second: Normalized latency of a successful call
+            failed: Whether the call failed
+        """
+        now = time.monotonic()
+        self.error_rate = (1 - self.smoothing) * self._decayed_error_rate(now) + self.smoothing * float(failed)
+        self.updated_at = now
+        if seconds_per_audio_second is not None:
+            self.recent.append(seconds_per_audio_second)
+            self.latency = seconds_per_audio_second if self.latency is None else (
+                (1 - self.smoothing) * self.latency + self.smoothing * seconds_per_audio_second
+            )
+
+    def score(self, unknown_latency: float = 0.0) -> float:
+        """
+        Expected normalized time to a successful answer (lower is better).
+
+        Args:
+            unknown_latency: Latency assumed for a provider that has only failed so far
+
+        Returns:
+            Latency divided by the chance of success; 0 for an untried provider
+        """
+        if self.latency is None and self.error_rate == 0:
+            return 0.0
+        latency = unknown_latency if self.latency is None else self.latency
+        return latency / max(0.05, 1.0 - self._decayed_error_rate(time.monotonic()))
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Recent normalized latency at ``quantile``.
+
+        Args:
+            quantile: Between 0 and 1
+
+        Returns:
+            Latency, or None without samples
+        """
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1)]
+
+
+class RoutingLLMProvider(BaseLLMProvider):
+    """
+    Provider that routes each call to the best of several providers.
+
+    Per-provider latency and error rates are published as
+    ``llm_router.<name>.latency`` and ``llm_router.<name>.error_rate`` gauges;
+    failovers, hedges and hedge wins are counted under ``llm_router.*``.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, LLMProvider]],
+        hedging_enabled: bool = True,
+        hedge_max_audio_seconds: float = 60.0,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 1.0,
+        hedge_min_samples: int = 5,
+        smoothing: float = 0.2,
+        error_half_life_seconds: float = 60.0,
+        **kwargs
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            providers: Named providers in order of preference
+            hedging_enabled: Whether short recordings may be hedged
+            hedge_max_audio_seconds: Longest recording that is hedged
+            hedge_quantile: Latency percentile of the first provider to wait before hedging
+            hedge_min_delay: Shortest wait before hedging
+            hedge_min_samples: Successful calls needed before a provider's percentile is trusted
+            smoothing: Weight of a new sample in the averages
+            error_half_life_seconds: Time for a provider's error rate to halve
+            **kwargs: Additional configuration parameters
+        """
+        if not providers:
+            raise ValueError("RoutingLLMProvider needs at least one provider")
+        super().__init__("", **kwargs)
+        self.providers = list(providers)
+        self.hedging_enabled = hedging_enabled
+        self.hedge_max_audio_seconds = hedge_max_audio_seconds
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.stats = {
+            name: ProviderStats(smoothing=smoothing, error_half_life_seconds=error_half_life_seconds)
+            for name, _ in self.providers
+        }
+
+    def ranked(self) -> List[Tuple[str, LLMProvider]]:
+        """
+        Providers ordered best first.
+
+        Returns:
+            Named providers; ties keep the configured order
+        """
+        # Untried providers go first; one that has only failed is assumed as
+        # slow as the slowest measured provider, scaled by its error rate
+        known = [stats.latency for stats in self.stats.values() if stats.latency is not None]
+        unknown_latency = max(known, default=1.0)
+        return sorted(self.providers, key=lambda item: self.stats[item[0]].score(unknown_latency))
+
+    def _record(self, name: str, started: float, audio_seconds: float, error: Optional[BaseException]):
+        stats = self.stats[name]
+        latency = None if error else (time.monotonic() - started) / max(1.0, audio_seconds)
+        stats.record(latency, failed=error is not None)
+        metrics.increment(f"llm_router.{name}.calls")
+        if stats.latency is not None:
+            metrics.set_gauge(f"llm_router.{name}.latency", stats.latency)
+        metrics.set_gauge(f"llm_router.{name}.error_rate", stats.error_rate)
+
+    def _hedge_delay(self, name: str, audio_seconds: float) -> Optional[float]:
+        """How long to wait for ``name`` before hedging, or None to not hedge."""
+        stats = self.stats[name]
+        if not self.hedging_enabled or audio_seconds > self.hedge_max_audio_seconds:
+            return None
+        if len(stats.recent) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, stats.percentile(self.hedge_quantile) * max(1.0, audio_seconds))
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        """
+        Transcribe audio with the best provider, failing over on errors.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text
+
+        Raises:
+            Exception: The last provider's error if every provider failed
+        """
+        if not self.validate_audio_file(audio_path):
+            raise ValueError(f"Invalid audio file: {audio_path}")
+
+        audio_seconds = estimate_audio_seconds(audio_path)
+        last_error: Optional[Exception] = None
+        for name, provider in self.ranked():
+            if last_error is not None:
+                metrics.increment("llm_router.failovers")
+                logger.warning(f"Failing over to provider {name} after: {last_error}")
+            started = time.monotonic()
+            try:
+                text = provider.transcribe_audio(audio_path)
+            except Exception as e:
+                self._record(name, started, audio_seconds, e)
+                last_error = e
+                continue
+            self._record(name, started, audio_seconds, None)
+            return text
+        raise last_error
+
+    async def _call(self, name: str, provider: LLMProvider, audio_path: str, audio_seconds: float) -> str:
+        started = time.monotonic()
+        try:
+            text = await provider.transcribe_audio_async(audio_path)
+        except asyncio.CancelledError:
+            # Losing a hedge race says nothing about the provider
+            raise
+        except Exception as e:
+            self._record(name, started, audio_seconds, e)
+            raise
+        self._record(name, started, audio_seconds, None)
+        return text
+
+    async def transcribe_audio_async(self, audio_path: str) -> str:
+        """
+        Asynchronously transcribe audio with failover and optional hedging.
+
+        Args:
+            audio_path: Path to the audio file to transcribe
+
+        Returns:
+            Transcribed text from the first provider to succeed
+
+        Raises:
+            Exception: The last provider's error if every provider failed
+        """
+        if not self.validate_audio_file(audio_path):
+            raise ValueError(f"Invalid audio file: {audio_path}")
+
+        audio_seconds = await asyncio.to_thread(estimate_audio_seconds, audio_path)
+        candidates = iter(self.ranked())
+        running = {}
+        last_error: Optional[BaseException] = None
+
+        def start_next() -> bool:
+            candidate = next(candidates, None)
+            if candidate is None:
+                return False
+            name, provider = candidate
+            task = asyncio.create_task(self._call(name, provider, audio_path, audio_seconds))
+            running[task] = name
+            return True
+
+        start_next()
+        first_name = next(iter(running.values()))
+        hedge_delay = self._hedge_delay(first_name, audio_seconds) if len(self.providers) > 1 else None
+        hedged = False
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # The first provider is slower than usual: hedge once
+                    hedge_delay = None
+                    if start_next():
+                        hedged = True
+                        metrics.increment("llm_router.hedges")
+                        logger.info(f"Hedging transcription of {audio_path} after waiting on {first_name}")
+                    continue
+
+                for task in done:
+                    name = running.pop(task)
+                    if task.exception() is None:
+                        if hedged and name != first_name:
+                            metrics.increment("llm_router.hedge_wins")
+                        return task.result()
+                    last_error = task.exception()
+
+                if not running:
+                    hedge_delay = None
+                    if start_next():
+                        metrics.increment("llm_router.failovers")
+                        logger.warning(f"Failing over after provider error: {last_error}")
+            raise last_error
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def validate_audio_file(self, audio_path: str) -> bool:
+        """Validate with the preferred provider's rules."""
+        validate = getattr(self.providers[0][1], "validate_audio_file", None)
+        return validate(audio_path) if validate else super().validate_audio_file(audio_path)
+
+    def get_supported_formats(self) -> list[str]:
+        """
+        Formats every provider accepts, so any of them can take the payload.
+
+        Returns:
+            List of supported file extensions in the preferred provider's order
+        """
+        formats = None
+        for _, provider in self.providers:
+            supported = getattr(provider, "get_supported_formats", None)
+            provider_formats = supported() if supported else super().get_supported_formats()
+            formats = list(provider_formats) if formats is None else [f for f in formats if f in provider_formats]
+        return formats
+
+    async def warm_up(self):
+        """Warm up every provider that supports it."""
+        for _, provider in self.providers:
+            warm_up = getattr(provider, "warm_up", None)
+            if warm_up is not None:
+                await warm_up()
+
+    async def aclose(self):
+        """Close every provider that holds connections."""
+        for _, provider in self.providers:
+            aclose = getattr(provider, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -1,5 +1,9 @@
 # Database models
 from .user import User
 from .recording import Recording, RecordingChunk, RecordingStatus
+from .transcription_job import TranscriptionJob, TranscriptionJobPriority, TranscriptionJobStatus
 
-__all__ = ["User", "Recording", "RecordingChunk", "RecordingStatus"]
+__all__ = [
+    "User", "Recording", "RecordingChunk", "RecordingStatus",
+    "TranscriptionJob", "TranscriptionJobPriority", "TranscriptionJobStatus"
+]
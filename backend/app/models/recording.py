@@ -1,7 +1,7 @@
 """
 Recording and RecordingChunk models for the Audio Transcription Service.
 """
-from sqlalchemy import Column, String, DateTime, Text, Float, Integer, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Text, Float, Integer, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -37,6 +37,7 @@ class Recording(Base):
     # Relationships
     user = relationship("User", back_populates="recordings")
     chunks = relationship("RecordingChunk", back_populates="recording", cascade="all, delete-orphan")
+    transcription_jobs = relationship("TranscriptionJob", back_populates="recording", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Recording(id={self.id}, user_id={self.user_id}, status={self.status})>"
@@ -62,12 +63,21 @@ class RecordingChunk(Base):
     RecordingChunk model representing individual audio chunks of a recording.
     """
     __tablename__ = "recording_chunks"
+    # One row per chunk index, so a retried upload cannot add a second one
+    __table_args__ = (
+        UniqueConstraint("recording_id", "chunk_index", name="uq_recording_chunks_recording_index"),
+    )
     
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     recording_id = Column(CHAR(36), ForeignKey("recordings.id"), nullable=False, index=True)
     chunk_index = Column(Integer, nullable=False)
     audio_blob_path = Column(Text, nullable=False)
     duration_seconds = Column(Float, nullable=True)
+    container = Column(String(20), nullable=True)  # Detected from magic bytes, e.g. "webm"
+    codec = Column(String(20), nullable=True)  # e.g. "opus" or "pcm"
+    sha256 = Column(CHAR(64), nullable=True)  # Checksum of the chunk file; identifies identical retries
+    transcription_text = Column(Text, nullable=True)  # Live transcription of this chunk
+    transcription_lease_expires_at = Column(DateTime, nullable=True)  # Set while a process transcribes the chunk live
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
@@ -84,5 +94,8 @@ class RecordingChunk(Base):
             "chunk_index": self.chunk_index,
             "audio_blob_path": self.audio_blob_path,
             "duration_seconds": self.duration_seconds,
+            "container": self.container,
+            "codec": self.codec,
+            "transcription_text": self.transcription_text,
             "uploaded_at": self.uploaded_at.isoformat() if self.uploaded_at else None
         }
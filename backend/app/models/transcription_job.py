@@ -0,0 +1,85 @@
+"""
+TranscriptionJob model for the durable transcription queue.
+"""
+from sqlalchemy import Column, String, DateTime, Text, Float, Integer, ForeignKey, Enum
+from sqlalchemy.dialects.mysql import CHAR
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+import enum
+
+from app.core.database import Base
+
+
+class TranscriptionJobStatus(enum.Enum):
+    """Enumeration for transcription job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class TranscriptionJobPriority(enum.IntEnum):
+    """Priority classes; lower values are claimed first."""
+    SHORT = 0  # Short interactive recordings
+    INTERACTIVE = 1  # Recordings finished by a user
+    BACKFILL = 2  # Administrative re-runs, claimed only when nothing else waits
+
+
+class TranscriptionJob(Base):
+    """
+    Transcription job claimed and run by a worker process.
+
+    A running job holds a lease (``lease_owner`` until ``lease_expires_at``)
+    that its worker renews with heartbeats. When a worker dies the lease
+    expires and another worker picks the job up again.
+
+    Within a priority class jobs are claimed in order of ``virtual_finish``,
+    a fair-queuing tag that charges each user for the audio seconds they
+    have queued (see app.services.job_scheduling).
+    """
+    __tablename__ = "transcription_jobs"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    recording_id = Column(CHAR(36), ForeignKey("recordings.id"), nullable=False, index=True)
+    user_id = Column(CHAR(36), ForeignKey("users.id"), nullable=True, index=True)
+    priority = Column(Integer, default=TranscriptionJobPriority.INTERACTIVE, nullable=False, index=True)
+    audio_seconds = Column(Float, default=0.0, nullable=False)  # Estimated; the fair-queuing cost
+    virtual_start = Column(Float, default=0.0, nullable=False)
+    virtual_finish = Column(Float, default=0.0, nullable=False, index=True)
+    status = Column(Enum(TranscriptionJobStatus), default=TranscriptionJobStatus.QUEUED, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    progress = Column(Float, default=0.0, nullable=False)  # Percent of the current attempt
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # Retry backoff
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    recording = relationship("Recording", back_populates="transcription_jobs")
+
+    def __repr__(self):
+        return f"<TranscriptionJob(id={self.id}, recording_id={self.recording_id}, status={self.status})>"
+
+    def to_dict(self):
+        """Convert transcription job to dictionary for API responses."""
+        return {
+            "id": self.id,
+            "recording_id": self.recording_id,
+            "status": self.status.value,
+            "priority": TranscriptionJobPriority(self.priority).name.lower(),
+            "audio_seconds": self.audio_seconds,
+            "attempts": self.attempts,
+            "progress": self.progress,
+            "max_attempts": self.max_attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -1,9 +1,10 @@
 """
 Repository interfaces for the Audio Transcription Service.
 """
-from typing import Protocol, List, Optional
+from typing import Any, Dict, Iterable, Protocol, List, Optional
 from app.models.user import User
 from app.models.recording import Recording, RecordingChunk
+from app.models.transcription_job import TranscriptionJob, TranscriptionJobPriority
 
 
 class UserRepository(Protocol):
@@ -57,14 +58,92 @@ class RecordingRepository(Protocol):
         """Update recording notes."""
         ...
     
-    def add_chunk(self, recording_id: str, chunk_index: int, audio_blob_path: str, duration_seconds: Optional[float] = None) -> RecordingChunk:
-        """Add an audio chunk to a recording."""
+    def add_chunk(self, recording_id: str, chunk_index: int, audio_blob_path: str, duration_seconds: Optional[float] = None, container: Optional[str] = None, codec: Optional[str] = None, sha256: Optional[str] = None) -> RecordingChunk:
+        """Add an audio chunk to a recording; raises ValueError if its index is taken."""
+        ...
+    
+    def add_chunks(self, recording_id: str, chunks: List[dict]) -> List[RecordingChunk]:
+        """Add several audio chunks to a recording in one transaction."""
+        ...
+    
+    def delete_chunk(self, chunk_id: str) -> bool:
+        """Delete a single chunk row."""
+        ...
+    
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get one chunk of a recording by its index."""
         ...
     
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
         """Get all chunks for a recording, ordered by chunk_index."""
         ...
     
+    def update_chunk_transcription(self, chunk_id: str, transcription_text: str) -> Optional[RecordingChunk]:
+        """Update the live transcription of a chunk."""
+        ...
+    
+    def claim_chunk_transcription(self, chunk_id: str, lease_seconds: float) -> bool:
+        """Claim a chunk's live transcription; False if it has text or another process holds it."""
+        ...
+    
+    def release_chunk_transcription(self, chunk_id: str):
+        """Give up a chunk's live transcription claim."""
+        ...
+    
     def delete_recording(self, recording_id: str) -> bool:
         """Delete a recording and all its chunks."""
         ...
+
+
+class TranscriptionJobRepository(Protocol):
+    """Interface for transcription job queue operations."""
+    
+    def enqueue(
+        self,
+        recording_id: str,
+        max_attempts: int = 3,
+        audio_seconds: float = 0.0,
+        priority: TranscriptionJobPriority = TranscriptionJobPriority.INTERACTIVE
+    ) -> TranscriptionJob:
+        """Queue a transcription job, reusing an unfinished job for the same recording."""
+        ...
+    
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Get job by ID."""
+        ...
+    
+    def get_latest_job(self, recording_id: str) -> Optional[TranscriptionJob]:
+        """Get the most recent job for a recording."""
+        ...
+    
+    def get_latest_jobs(self, recording_ids: Iterable[str]) -> Dict[str, TranscriptionJob]:
+        """Get the most recent job of each recording, keyed by recording ID."""
+        ...
+    
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[TranscriptionJob]:
+        """Claim the next runnable job for a worker."""
+        ...
+    
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease on a running job; False if the worker no longer holds it."""
+        ...
+    
+    def update_progress(self, job_id: str, worker_id: str, progress: float) -> bool:
+        """Record the progress of a running job; False if the worker no longer holds it."""
+        ...
+    
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """Mark a running job as succeeded."""
+        ...
+    
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Return a running job to the queue without counting the interrupted attempt."""
+        ...
+    
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[TranscriptionJob]:
+        """Record a failed attempt, queueing a retry while attempts remain."""
+        ...
+    
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, running jobs and oldest wait per priority class."""
+        ...
@@ -2,8 +2,11 @@
 MySQL implementation of RecordingRepository.
 """
 from typing import List, Optional
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, insert, or_
+from sqlalchemy.exc import IntegrityError
+import uuid
 import logging
 
 from app.models.recording import Recording, RecordingChunk, RecordingStatus
@@ -102,34 +105,182 @@ class MySQLRecordingRepository:
             logger.error(f"Failed to update recording {recording_id} notes: {e}")
             raise
     
-    def add_chunk(self, recording_id: str, chunk_index: int, audio_blob_path: str, duration_seconds: Optional[float] = None) -> RecordingChunk:
-        """Add an audio chunk to a recording."""
+    def add_chunk(self, recording_id: str, chunk_index: int, audio_blob_path: str, duration_seconds: Optional[float] = None, container: Optional[str] = None, codec: Optional[str] = None, sha256: Optional[str] = None) -> RecordingChunk:
+        """
+        Add an audio chunk to a recording.
+        
+        Raises:
+            ValueError: If the recording already has a chunk with this index
+        """
         try:
             chunk = RecordingChunk(
                 recording_id=recording_id,
                 chunk_index=chunk_index,
                 audio_blob_path=audio_blob_path,
-                duration_seconds=duration_seconds
+                duration_seconds=duration_seconds,
+                container=container,
+                codec=codec,
+                sha256=sha256
             )
             self.db.add(chunk)
             self.db.commit()
             self.db.refresh(chunk)
             logger.info(f"Added chunk {chunk_index} to recording {recording_id}")
             return chunk
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.warning(f"Chunk {chunk_index} of recording {recording_id} already exists: {e}")
+            raise ValueError(f"Chunk {chunk_index} of recording {recording_id} already exists")
         except Exception as e:
             self.db.rollback()
             logger.error(f"Failed to add chunk to recording {recording_id}: {e}")
             raise
     
+    def add_chunks(self, recording_id: str, chunks: List[dict]) -> List[RecordingChunk]:
+        """
+        Add several audio chunks to a recording in one transaction.
+        
+        Rows are written with a single bulk insert; ids and upload times are
+        assigned here, so nothing is read back afterwards. Either every chunk
+        is added or none is.
+        
+        Args:
+            recording_id: Recording ID
+            chunks: One dict per chunk with ``chunk_index``, ``audio_blob_path``
+                and optionally ``duration_seconds``, ``container``, ``codec``
+                and ``sha256``
+        
+        Raises:
+            ValueError: If the recording already has a chunk with one of the indexes
+        """
+        uploaded_at = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "recording_id": recording_id,
+                "uploaded_at": uploaded_at,
+                "duration_seconds": None,
+                "container": None,
+                "codec": None,
+                "sha256": None,
+                **chunk
+            }
+            for chunk in chunks
+        ]
+        try:
+            self.db.execute(insert(RecordingChunk), rows)
+            self.db.commit()
+            logger.info(f"Added {len(rows)} chunks to recording {recording_id}")
+            return [RecordingChunk(**row) for row in rows]
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.warning(f"Chunk batch for recording {recording_id} overlaps stored chunks: {e}")
+            raise ValueError(f"Recording {recording_id} already has some of these chunks")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to add chunks to recording {recording_id}: {e}")
+            raise
+    
+    def delete_chunk(self, chunk_id: str) -> bool:
+        """Delete a single chunk row."""
+        chunk = self.db.query(RecordingChunk).filter(RecordingChunk.id == chunk_id).first()
+        if not chunk:
+            return False
+        
+        try:
+            self.db.delete(chunk)
+            self.db.commit()
+            logger.info(f"Deleted chunk {chunk_id}")
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to delete chunk {chunk_id}: {e}")
+            raise
+    
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get one chunk of a recording by its index."""
+        return (
+            self.db.query(RecordingChunk)
+            .filter(RecordingChunk.recording_id == recording_id, RecordingChunk.chunk_index == chunk_index)
+            .first()
+        )
+    
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
         """Get all chunks for a recording, ordered by chunk_index."""
+        # Chunks are updated by background live transcription in other sessions
         return (
             self.db.query(RecordingChunk)
             .filter(RecordingChunk.recording_id == recording_id)
             .order_by(RecordingChunk.chunk_index)
+            .populate_existing()
             .all()
         )
     
+    def update_chunk_transcription(self, chunk_id: str, transcription_text: str) -> Optional[RecordingChunk]:
+        """Update the live transcription of a chunk."""
+        chunk = self.db.query(RecordingChunk).filter(RecordingChunk.id == chunk_id).first()
+        if not chunk:
+            return None
+        
+        try:
+            chunk.transcription_text = transcription_text
+            chunk.transcription_lease_expires_at = None
+            self.db.commit()
+            self.db.refresh(chunk)
+            return chunk
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to update chunk {chunk_id} transcription: {e}")
+            raise
+    
+    def claim_chunk_transcription(self, chunk_id: str, lease_seconds: float) -> bool:
+        """
+        Claim a chunk's live transcription for this process.
+        
+        The claim is a conditional UPDATE, so of several processes (the API
+        and the transcription workers) only one wins a chunk. It fails while
+        another process holds an unexpired lease, and once the chunk has text.
+        
+        Returns:
+            True if the chunk was claimed
+        """
+        now = datetime.utcnow()
+        try:
+            claimed = (
+                self.db.query(RecordingChunk)
+                .filter(
+                    RecordingChunk.id == chunk_id,
+                    RecordingChunk.transcription_text.is_(None),
+                    or_(
+                        RecordingChunk.transcription_lease_expires_at.is_(None),
+                        RecordingChunk.transcription_lease_expires_at < now
+                    )
+                )
+                .update({
+                    RecordingChunk.transcription_lease_expires_at: now + timedelta(seconds=lease_seconds)
+                }, synchronize_session=False)
+            )
+            self.db.commit()
+            return claimed == 1
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to claim live transcription of chunk {chunk_id}: {e}")
+            raise
+    
+    def release_chunk_transcription(self, chunk_id: str):
+        """Give up a chunk's live transcription claim, e.g. after the provider failed."""
+        try:
+            (
+                self.db.query(RecordingChunk)
+                .filter(RecordingChunk.id == chunk_id)
+                .update({RecordingChunk.transcription_lease_expires_at: None}, synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to release live transcription of chunk {chunk_id}: {e}")
+            raise
+    
     def delete_recording(self, recording_id: str) -> bool:
         """Delete a recording and all its chunks."""
         recording = self.get_recording(recording_id)
@@ -0,0 +1,384 @@
+"""
+MySQL implementation of TranscriptionJobRepository.
+
+Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent
+workers never wait on each other's rows. On databases without row locking
+(SQLite in tests and local development) the claim falls back to an
+optimistic conditional UPDATE, which only one worker can win.
+
+Claims take the highest priority class first and, within a class, the job
+with the lowest fair-queuing finish tag (see app.services.job_scheduling).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, func, or_
+import logging
+
+from app.core.config import settings
+from app.models.recording import Recording
+from app.models.transcription_job import TranscriptionJob, TranscriptionJobPriority, TranscriptionJobStatus
+from app.repositories.interfaces import TranscriptionJobRepository
+from app.services.job_scheduling import fair_queue_tags
+
+logger = logging.getLogger(__name__)
+
+_SKIP_LOCKED_DIALECTS = ("mysql", "mariadb", "postgresql")
+
+# Candidates tried per claim when losing an optimistic race is possible
+_OPTIMISTIC_CANDIDATES = 5
+
+_UNFINISHED = (TranscriptionJobStatus.QUEUED, TranscriptionJobStatus.RUNNING)
+
+
+class MySQLTranscriptionJobRepository:
+    """MySQL implementation of TranscriptionJobRepository interface."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def _supports_skip_locked(self) -> bool:
+        return self.db.get_bind().dialect.name in _SKIP_LOCKED_DIALECTS
+
+    def enqueue(
+        self,
+        recording_id: str,
+        max_attempts: int = 3,
+        audio_seconds: float = 0.0,
+        priority: TranscriptionJobPriority = TranscriptionJobPriority.INTERACTIVE
+    ) -> TranscriptionJob:
+        """Queue a transcription job, reusing an unfinished job for the same recording."""
+        existing = (
+            self.db.query(TranscriptionJob)
+            .filter(
+                TranscriptionJob.recording_id == recording_id,
+                TranscriptionJob.status.in_(_UNFINISHED)
+            )
+            .first()
+        )
+        if existing:
+            return existing
+
+        try:
+            user_id = self.db.query(Recording.user_id).filter(Recording.id == recording_id).scalar()
+            user_last_finish = None
+            if user_id is not None:
+                user_last_finish = (
+                    self.db.query(func.max(TranscriptionJob.virtual_finish))
+                    .filter(
+                        TranscriptionJob.user_id == user_id,
+                        TranscriptionJob.priority == int(priority),
+                        TranscriptionJob.status.in_(_UNFINISHED)
+                    )
+                    .scalar()
+                )
+            virtual_start, virtual_finish = fair_queue_tags(
+                self._virtual_time(priority), user_last_finish, audio_seconds
+            )
+
+            job = TranscriptionJob(
+                recording_id=recording_id,
+                user_id=user_id,
+                status=TranscriptionJobStatus.QUEUED,
+                priority=int(priority),
+                audio_seconds=audio_seconds,
+                virtual_start=virtual_start,
+                virtual_finish=virtual_finish,
+                max_attempts=max_attempts
+            )
+            self.db.add(job)
+            self.db.commit()
+            self.db.refresh(job)
+            logger.info(
+                f"Queued transcription job {job.id} for recording {recording_id} "
+                f"({priority.name.lower()}, {audio_seconds:.0f}s, finish tag {virtual_finish:.0f})"
+            )
+            return job
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to queue transcription job for recording {recording_id}: {e}")
+            raise
+
+    def _virtual_time(self, priority: TranscriptionJobPriority) -> float:
+        """
+        Virtual time of a priority class.
+
+        This is the lowest start tag among the class's unfinished jobs, i.e.
+        how far the class has progressed. An idle class resumes from the
+        highest finish tag it has handed out.
+        """
+        in_class = TranscriptionJob.priority == int(priority)
+        current = (
+            self.db.query(func.min(TranscriptionJob.virtual_start))
+            .filter(in_class, TranscriptionJob.status.in_(_UNFINISHED))
+            .scalar()
+        )
+        if current is None:
+            current = self.db.query(func.max(TranscriptionJob.virtual_finish)).filter(in_class).scalar()
+        return current or 0.0
+
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Get job by ID."""
+        # Jobs are updated by workers in other sessions
+        return (
+            self.db.query(TranscriptionJob)
+            .filter(TranscriptionJob.id == job_id)
+            .populate_existing()
+            .first()
+        )
+
+    def get_latest_job(self, recording_id: str) -> Optional[TranscriptionJob]:
+        """Get the most recent job for a recording."""
+        return (
+            self.db.query(TranscriptionJob)
+            .filter(TranscriptionJob.recording_id == recording_id)
+            .order_by(desc(TranscriptionJob.created_at))
+            .populate_existing()
+            .first()
+        )
+
+    def get_latest_jobs(self, recording_ids: Iterable[str]) -> Dict[str, TranscriptionJob]:
+        """Get the most recent job of each recording, keyed by recording ID."""
+        jobs = (
+            self.db.query(TranscriptionJob)
+            .filter(TranscriptionJob.recording_id.in_(list(recording_ids)))
+            .order_by(TranscriptionJob.created_at)
+            .populate_existing()
+            .all()
+        )
+        return {job.recording_id: job for job in jobs}
+
+    def _runnable(self, now: datetime):
+        """Queued jobs that are due, and running jobs whose worker stopped renewing the lease."""
+        return or_(
+            and_(
+                TranscriptionJob.status == TranscriptionJobStatus.QUEUED,
+                TranscriptionJob.run_after <= now
+            ),
+            and_(
+                TranscriptionJob.status == TranscriptionJobStatus.RUNNING,
+                TranscriptionJob.lease_expires_at < now,
+                TranscriptionJob.attempts < TranscriptionJob.max_attempts
+            )
+        )
+
+    def _fail_abandoned(self, now: datetime) -> int:
+        """Fail jobs whose lease expired on their last attempt."""
+        return (
+            self.db.query(TranscriptionJob)
+            .filter(
+                TranscriptionJob.status == TranscriptionJobStatus.RUNNING,
+                TranscriptionJob.lease_expires_at < now,
+                TranscriptionJob.attempts >= TranscriptionJob.max_attempts
+            )
+            .update({
+                TranscriptionJob.status: TranscriptionJobStatus.FAILED,
+                TranscriptionJob.last_error: "Worker lease expired on the final attempt",
+                TranscriptionJob.lease_owner: None,
+                TranscriptionJob.lease_expires_at: None,
+                TranscriptionJob.finished_at: now
+            }, synchronize_session=False)
+        )
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[TranscriptionJob]:
+        """Claim the next runnable job for a worker."""
+        now = datetime.utcnow()
+        try:
+            abandoned = self._fail_abandoned(now)
+            if abandoned:
+                logger.warning(f"Failed {abandoned} transcription jobs abandoned on their final attempt")
+
+            query = self.db.query(TranscriptionJob.id).filter(self._runnable(now))
+            if settings.transcription_fair_scheduling_enabled:
+                query = query.order_by(
+                    TranscriptionJob.priority, TranscriptionJob.virtual_finish, TranscriptionJob.created_at
+                )
+            else:
+                query = query.order_by(TranscriptionJob.run_after, TranscriptionJob.created_at)
+            if self._supports_skip_locked:
+                candidates = query.limit(1).with_for_update(skip_locked=True).all()
+            else:
+                candidates = query.limit(_OPTIMISTIC_CANDIDATES).all()
+
+            for (job_id,) in candidates:
+                # Re-checking the predicate makes the update a no-op for a job another worker won
+                claimed = (
+                    self.db.query(TranscriptionJob)
+                    .filter(TranscriptionJob.id == job_id, self._runnable(now))
+                    .update({
+                        TranscriptionJob.status: TranscriptionJobStatus.RUNNING,
+                        TranscriptionJob.attempts: TranscriptionJob.attempts + 1,
+                        TranscriptionJob.progress: 0.0,
+                        TranscriptionJob.lease_owner: worker_id,
+                        TranscriptionJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                        TranscriptionJob.heartbeat_at: now,
+                        TranscriptionJob.started_at: now
+                    }, synchronize_session=False)
+                )
+                if claimed:
+                    self.db.commit()
+                    job = self.get_job(job_id)
+                    logger.info(f"Worker {worker_id} claimed transcription job {job_id} (attempt {job.attempts})")
+                    return job
+
+            self.db.commit()
+            return None
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to claim transcription job for worker {worker_id}: {e}")
+            raise
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease on a running job; False if the worker no longer holds it."""
+        now = datetime.utcnow()
+        try:
+            renewed = (
+                self.db.query(TranscriptionJob)
+                .filter(
+                    TranscriptionJob.id == job_id,
+                    TranscriptionJob.lease_owner == worker_id,
+                    TranscriptionJob.status == TranscriptionJobStatus.RUNNING
+                )
+                .update({
+                    TranscriptionJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                    TranscriptionJob.heartbeat_at: now
+                }, synchronize_session=False)
+            )
+            self.db.commit()
+            return renewed == 1
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to renew lease on transcription job {job_id}: {e}")
+            raise
+
+    def update_progress(self, job_id: str, worker_id: str, progress: float) -> bool:
+        """Record the progress of a running job; False if the worker no longer holds it."""
+        try:
+            updated = (
+                self.db.query(TranscriptionJob)
+                .filter(
+                    TranscriptionJob.id == job_id,
+                    TranscriptionJob.lease_owner == worker_id,
+                    TranscriptionJob.status == TranscriptionJobStatus.RUNNING
+                )
+                .update({TranscriptionJob.progress: progress}, synchronize_session=False)
+            )
+            self.db.commit()
+            return updated == 1
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to record progress of transcription job {job_id}: {e}")
+            raise
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """Mark a running job as succeeded."""
+        try:
+            completed = (
+                self.db.query(TranscriptionJob)
+                .filter(
+                    TranscriptionJob.id == job_id,
+                    TranscriptionJob.lease_owner == worker_id,
+                    TranscriptionJob.status == TranscriptionJobStatus.RUNNING
+                )
+                .update({
+                    TranscriptionJob.status: TranscriptionJobStatus.SUCCEEDED,
+                    TranscriptionJob.progress: 100.0,
+                    TranscriptionJob.lease_owner: None,
+                    TranscriptionJob.lease_expires_at: None,
+                    TranscriptionJob.last_error: None,
+                    TranscriptionJob.finished_at: datetime.utcnow()
+                }, synchronize_session=False)
+            )
+            self.db.commit()
+            return completed == 1
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to complete transcription job {job_id}: {e}")
+            raise
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Return a running job to the queue without counting the interrupted attempt."""
+        try:
+            released = (
+                self.db.query(TranscriptionJob)
+                .filter(
+                    TranscriptionJob.id == job_id,
+                    TranscriptionJob.lease_owner == worker_id,
+                    TranscriptionJob.status == TranscriptionJobStatus.RUNNING
+                )
+                .update({
+                    TranscriptionJob.status: TranscriptionJobStatus.QUEUED,
+                    TranscriptionJob.attempts: TranscriptionJob.attempts - 1,
+                    TranscriptionJob.progress: 0.0,
+                    TranscriptionJob.lease_owner: None,
+                    TranscriptionJob.lease_expires_at: None,
+                    TranscriptionJob.run_after: datetime.utcnow()
+                }, synchronize_session=False)
+            )
+            self.db.commit()
+            if released:
+                logger.info(f"Worker {worker_id} released transcription job {job_id} back to the queue")
+            return released == 1
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to release transcription job {job_id}: {e}")
+            raise
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[TranscriptionJob]:
+        """Record a failed attempt, queueing a retry while attempts remain."""
+        job = self.get_job(job_id)
+        if not job or job.lease_owner != worker_id or job.status != TranscriptionJobStatus.RUNNING:
+            return None
+
+        try:
+            now = datetime.utcnow()
+            job.last_error = error
+            job.lease_owner = None
+            job.lease_expires_at = None
+            if job.attempts < job.max_attempts:
+                # Exponential backoff between attempts
+                job.status = TranscriptionJobStatus.QUEUED
+                job.run_after = now + timedelta(seconds=retry_delay_seconds * 2 ** (job.attempts - 1))
+            else:
+                job.status = TranscriptionJobStatus.FAILED
+                job.finished_at = now
+            self.db.commit()
+            self.db.refresh(job)
+            logger.warning(
+                f"Transcription job {job_id} attempt {job.attempts}/{job.max_attempts} failed "
+                f"({job.status.value}): {error}"
+            )
+            return job
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to record failure of transcription job {job_id}: {e}")
+            raise
+
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, running jobs and oldest wait per priority class."""
+        now = datetime.utcnow()
+        stats = {
+            priority.name.lower(): {"queued": 0, "running": 0, "oldest_wait_seconds": 0.0}
+            for priority in TranscriptionJobPriority
+        }
+        rows = (
+            self.db.query(
+                TranscriptionJob.priority,
+                TranscriptionJob.status,
+                func.count(TranscriptionJob.id),
+                func.min(TranscriptionJob.run_after)
+            )
+            .filter(TranscriptionJob.status.in_(_UNFINISHED))
+            .group_by(TranscriptionJob.priority, TranscriptionJob.status)
+            .all()
+        )
+        for priority, status, count, oldest in rows:
+            entry = stats[TranscriptionJobPriority(priority).name.lower()]
+            if status == TranscriptionJobStatus.QUEUED:
+                entry["queued"] = count
+                if oldest is not None:
+                    entry["oldest_wait_seconds"] = max(0.0, (now - oldest).total_seconds())
+            else:
+                entry["running"] = count
+        return stats
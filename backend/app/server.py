@@ -0,0 +1,65 @@
+"""
+API server entry point with graceful draining.
+
+Plain ``uvicorn main:app`` closes its listening socket on SIGTERM, waits
+for open connections and only then runs the application's shutdown. An
+open event stream can keep it waiting indefinitely. This entry point
+drains first: on SIGTERM it refuses new writes, ends event streams and
+waits up to ``shutdown_drain_timeout_seconds`` for in-flight uploads and
+background tasks. Only then does it hand over to uvicorn's own shutdown.
+A second SIGINT exits immediately.
+
+    python -m app.server
+"""
+import os
+import signal
+import asyncio
+import logging
+from types import FrameType
+from typing import Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.lifecycle import get_drain_coordinator
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains the application before shutting down."""
+
+    _drain_task: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self._drain_task is not None or self.should_exit:
+            # Second signal: skip the rest of the drain
+            super().handle_exit(sig, frame)
+            super().handle_exit(signal.SIGINT, frame)
+            return
+        get_drain_coordinator().begin_drain()
+        self._drain_task = asyncio.get_event_loop().create_task(self._drain_then_exit(sig, frame))
+
+    async def _drain_then_exit(self, sig: int, frame: Optional[FrameType]):
+        drained = await get_drain_coordinator().wait_idle()
+        if drained:
+            logger.info("Drained all in-flight work")
+        else:
+            logger.warning("Drain timeout reached with work still in flight")
+        super().handle_exit(sig, frame)
+
+
+def main():
+    """Entry point for ``python -m app.server``."""
+    config = uvicorn.Config(
+        "main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        # Requests still open after the drain are given a little longer, then cancelled
+        timeout_graceful_shutdown=max(1, int(settings.shutdown_drain_timeout_seconds / 2))
+    )
+    DrainingServer(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Fair, priority-aware ordering of transcription jobs.
+
+Jobs are split into priority classes (short recordings, interactive
+finishes, administrative backfills) and a worker always claims from the
+highest class that has runnable work.
+
+Within a class, users share workers fairly in proportion to audio seconds.
+Each job gets start-time fair queuing tags when it is queued:
+
+    start  = max(class virtual time, finish tag of the user's last queued job)
+    finish = start + audio seconds
+
+Jobs are claimed in order of their finish tag. A user who queues ten long
+recordings at once gets ten tags stacked one after another, while another
+user's recording is tagged from the current virtual time and so slots in
+after the job in progress. This is deficit round robin with an
+audio-second quantum, expressed as one sortable column, which lets
+concurrent workers keep claiming with a single ``ORDER BY ... SKIP LOCKED``
+instead of sharing a round-robin pointer.
+"""
+import os
+import logging
+from typing import Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.llm.rate_limiter import estimate_audio_seconds
+from app.models.recording import RecordingChunk
+from app.models.transcription_job import TranscriptionJobPriority
+
+logger = logging.getLogger(__name__)
+
+# Smallest cost charged per job, so empty or unmeasured recordings still take a turn
+MIN_JOB_COST_SECONDS = 1.0
+
+
+def estimate_recording_seconds(chunks: Iterable[RecordingChunk]) -> float:
+    """
+    Estimate the audio length of a recording from its chunks.
+
+    Args:
+        chunks: Recording chunks
+
+    Returns:
+        Total duration in seconds; chunks without a stored duration are
+        estimated from their files
+    """
+    total = 0.0
+    for chunk in chunks:
+        if chunk.duration_seconds:
+            total += chunk.duration_seconds
+        elif chunk.audio_blob_path and os.path.exists(chunk.audio_blob_path):
+            try:
+                total += estimate_audio_seconds(chunk.audio_blob_path)
+            except OSError as e:
+                logger.warning(f"Could not estimate duration of chunk {chunk.id}: {e}")
+    return total
+
+
+def classify_priority(audio_seconds: float, backfill: bool = False) -> TranscriptionJobPriority:
+    """
+    Choose the priority class for a job.
+
+    Args:
+        audio_seconds: Estimated length of the recording
+        backfill: True for administrative re-runs
+
+    Returns:
+        Priority class
+    """
+    if backfill:
+        return TranscriptionJobPriority.BACKFILL
+    if audio_seconds <= settings.transcription_short_recording_seconds:
+        return TranscriptionJobPriority.SHORT
+    return TranscriptionJobPriority.INTERACTIVE
+
+
+def fair_queue_tags(
+    virtual_time: float,
+    user_last_finish: Optional[float],
+    audio_seconds: float
+) -> Tuple[float, float]:
+    """
+    Compute the fair-queuing tags for a new job.
+
+    Args:
+        virtual_time: Current virtual time of the job's priority class
+        user_last_finish: Finish tag of the user's last unfinished job in the class, if any
+        audio_seconds: Estimated length of the recording
+
+    Returns:
+        (start, finish) tags
+    """
+    start = max(virtual_time, user_last_finish or 0.0)
+    return start, start + max(audio_seconds, MIN_JOB_COST_SECONDS)
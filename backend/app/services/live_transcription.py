@@ -0,0 +1,111 @@
+"""
+Live transcription queue: transcribe chunks while a recording is still active.
+
+Each accepted chunk is transcribed in the background with a little audio
+context from the previous chunk, and the text is stored on the chunk. Work
+for one recording runs in upload order so every chunk can remove the words
+it repeats from its predecessor.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.lifecycle import get_drain_coordinator
+from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+
+logger = logging.getLogger(__name__)
+
+
+class LiveTranscriptionQueue:
+    """
+    Per-recording ordered queue of background chunk transcriptions.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Initialize the queue.
+
+        Args:
+            session_factory: Creates the database session used by each task
+        """
+        self.session_factory = session_factory
+        self._tasks: Dict[str, Set[asyncio.Task]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def submit(self, recording_id: str, chunk_index: int) -> asyncio.Task:
+        """
+        Queue a chunk for transcription.
+
+        Args:
+            recording_id: Recording the chunk belongs to
+            chunk_index: Index of the uploaded chunk
+
+        Returns:
+            Background task transcribing the chunk
+        """
+        lock = self._locks.setdefault(recording_id, asyncio.Lock())
+        task = asyncio.create_task(self._run(recording_id, chunk_index, lock))
+        tasks = self._tasks.setdefault(recording_id, set())
+        tasks.add(task)
+        task.add_done_callback(lambda done: self._forget(recording_id, done))
+        # Shutdown waits for the chunk; if cancelled, the finish transcribes it instead
+        get_drain_coordinator().track(task)
+        return task
+
+    def _forget(self, recording_id: str, task: asyncio.Task):
+        tasks = self._tasks.get(recording_id)
+        if tasks is None:
+            return
+        tasks.discard(task)
+        if not tasks:
+            del self._tasks[recording_id]
+            self._locks.pop(recording_id, None)
+
+    async def _run(self, recording_id: str, chunk_index: int, lock: asyncio.Lock):
+        from app.services.transcription_service import TranscriptionService
+
+        async with lock:
+            db = self.session_factory()
+            try:
+                service = TranscriptionService(MySQLRecordingRepository(db))
+                await service.transcribe_chunk(recording_id, chunk_index)
+            except Exception as e:
+                logger.warning(f"Live transcription of chunk {chunk_index} of recording {recording_id} failed: {e}")
+            finally:
+                db.close()
+
+    def pending(self, recording_id: str) -> int:
+        """Number of queued or running chunk transcriptions for a recording."""
+        return len(self._tasks.get(recording_id, ()))
+
+    async def wait(self, recording_id: str, timeout: float) -> bool:
+        """
+        Wait for a recording's queued chunk transcriptions to finish.
+
+        Args:
+            recording_id: Recording to wait for
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if nothing is left pending
+        """
+        tasks = set(self._tasks.get(recording_id, ()))
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        return all(task.done() for task in self._tasks.get(recording_id, ()))
+
+
+_live_transcription_queue = LiveTranscriptionQueue()
+
+
+def get_live_transcription_queue() -> LiveTranscriptionQueue:
+    """
+    Get the process-wide live transcription queue.
+
+    Returns:
+        Shared live transcription queue
+    """
+    return _live_transcription_queue
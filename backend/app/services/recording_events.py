@@ -0,0 +1,323 @@
+"""
+Recording events: push transcription status to clients instead of polling.
+
+``RecordingEventBroker`` is an in-process publish/subscribe hub keyed by
+recording ID. Each ``GET /recordings/{id}/events`` stream subscribes to it
+and sends its events as Server-Sent Events.
+
+Events reach the broker from two places:
+
+* a worker running in the same process (the embedded worker) publishes
+  status changes, progress and the transcript as they happen;
+* ``DatabaseEventRelay`` watches the transcription jobs of recordings that
+  currently have subscribers, so that workers in other processes reach
+  clients too. It runs one query per interval for all open streams,
+  however many there are, rather than one poll per client.
+
+An event is a dict with the recording ID, its status (the latest job's
+status, or the recording's own status when it has no job), progress as a
+percentage, and the transcript or error once the job has finished. A
+recording that already has a transcript from an earlier job reports its
+new job's status until that job finishes.
+"""
+import json
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.models.recording import Recording
+from app.models.transcription_job import TranscriptionJob, TranscriptionJobStatus
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (TranscriptionJobStatus.SUCCEEDED.value, TranscriptionJobStatus.FAILED.value)
+
+# Delivered instead of an event to end a stream early
+CLOSE_STREAM: Dict[str, Any] = {}
+
+
+def recording_event(
+    recording_id: str,
+    status: str,
+    progress: float = 0.0,
+    transcription_text: Optional[str] = None,
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build a recording event."""
+    return {
+        "recording_id": recording_id,
+        "status": status,
+        "progress": round(progress, 1),
+        "transcription_text": transcription_text,
+        "error": error
+    }
+
+
+def event_from_state(recording: Recording, job: Optional[TranscriptionJob]) -> Dict[str, Any]:
+    """
+    Describe the transcription state of a recording.
+
+    Args:
+        recording: The recording
+        job: Its latest transcription job, if any
+
+    Returns:
+        Recording event
+    """
+    if job is None:
+        if recording.transcription_text:
+            return recording_event(
+                recording.id, TranscriptionJobStatus.SUCCEEDED.value, 100.0, recording.transcription_text
+            )
+        return recording_event(recording.id, recording.status.value)
+    if job.status == TranscriptionJobStatus.SUCCEEDED:
+        return recording_event(recording.id, job.status.value, 100.0, recording.transcription_text)
+    error = job.last_error if job.status == TranscriptionJobStatus.FAILED else None
+    return recording_event(recording.id, job.status.value, job.progress or 0.0, error=error)
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    """Whether no further events will follow for the recording's current job."""
+    return event["status"] in TERMINAL_STATUSES
+
+
+class RecordingEventBroker:
+    """
+    In-process publish/subscribe of recording events.
+
+    ``publish`` may be called from any thread; events are delivered on each
+    subscriber's event loop.
+    """
+
+    def __init__(self, max_queued_events: int = 100):
+        """
+        Initialize the broker.
+
+        Args:
+            max_queued_events: Events buffered per subscriber before the oldest are dropped
+        """
+        self.max_queued_events = max_queued_events
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, recording_id: str) -> asyncio.Queue:
+        """
+        Subscribe to a recording's events on the running event loop.
+
+        Args:
+            recording_id: Recording to follow
+
+        Returns:
+            Queue receiving the recording's events
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued_events)
+        with self._lock:
+            self._subscribers.setdefault(recording_id, set()).add((asyncio.get_running_loop(), queue))
+            count = sum(len(subscribers) for subscribers in self._subscribers.values())
+        metrics.set_gauge("recording_events.subscribers", count)
+        return queue
+
+    def unsubscribe(self, recording_id: str, queue: asyncio.Queue):
+        """Stop delivering a recording's events to ``queue``."""
+        with self._lock:
+            subscribers = self._subscribers.get(recording_id, set())
+            for entry in [entry for entry in subscribers if entry[1] is queue]:
+                subscribers.discard(entry)
+            if not subscribers:
+                self._subscribers.pop(recording_id, None)
+            count = sum(len(subscribers) for subscribers in self._subscribers.values())
+        metrics.set_gauge("recording_events.subscribers", count)
+
+    def subscribed_recording_ids(self) -> List[str]:
+        """Recordings with at least one subscriber."""
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Deliver an event to the recording's subscribers.
+
+        Args:
+            event: Recording event
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["recording_id"], ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(event["recording_id"], queue)
+        if subscribers:
+            metrics.increment("recording_events.published")
+
+
+    def close_all(self):
+        """
+        End every open stream, e.g. when the process starts shutting down.
+
+        Clients reconnect after the SSE retry interval, to another instance.
+        """
+        with self._lock:
+            subscribers = [entry for entries in self._subscribers.values() for entry in entries]
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, CLOSE_STREAM)
+            except RuntimeError:
+                pass
+
+
+def _deliver(queue: asyncio.Queue, event: Dict[str, Any]):
+    if queue.full():
+        # A stuck client only needs the latest state
+        queue.get_nowait()
+        metrics.increment("recording_events.dropped")
+    queue.put_nowait(event)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Encode an event as a Server-Sent Events message.
+
+    The SSE event name is ``transcript`` or ``failed`` for the final event
+    and ``status`` otherwise.
+    """
+    if event["status"] == TranscriptionJobStatus.SUCCEEDED.value:
+        name = "transcript"
+    elif event["status"] == TranscriptionJobStatus.FAILED.value:
+        name = "failed"
+    else:
+        name = "status"
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_recording_events(
+    initial: Dict[str, Any],
+    broker: "RecordingEventBroker",
+    keepalive_seconds: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a recording's events as SSE messages until its job finishes
+    or the broker closes its streams.
+
+    Args:
+        initial: Current state of the recording, sent first
+        broker: Broker to subscribe to
+        keepalive_seconds: Interval of comment lines that keep idle proxies from closing the stream
+
+    Yields:
+        SSE messages; repeated identical states are sent once
+    """
+    keepalive_seconds = keepalive_seconds or settings.recording_events_keepalive_seconds
+    recording_id = initial["recording_id"]
+    queue = broker.subscribe(recording_id)
+    try:
+        yield f"retry: {int(settings.recording_events_retry_seconds * 1000)}\n\n"
+        yield format_sse(initial)
+        last = initial
+        while not is_terminal(last):
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is CLOSE_STREAM:
+                break
+            if event != last:
+                last = event
+                yield format_sse(event)
+    finally:
+        broker.unsubscribe(recording_id, queue)
+
+
+class DatabaseEventRelay:
+    """
+    Publishes the state of subscribed recordings from the database.
+
+    Lets clients of this process see jobs run by workers in other processes.
+    """
+
+    def __init__(
+        self,
+        broker: RecordingEventBroker,
+        session_factory: Callable[[], Session] = SessionLocal,
+        poll_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the relay.
+
+        Args:
+            broker: Broker whose subscriptions are watched
+            session_factory: Creates database sessions
+            poll_seconds: Interval between checks
+        """
+        self.broker = broker
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds or settings.recording_events_poll_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def poll(self) -> int:
+        """
+        Publish the current state of every subscribed recording.
+
+        Returns:
+            Number of events published
+        """
+        recording_ids = self.broker.subscribed_recording_ids()
+        if not recording_ids:
+            return 0
+
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        db = self.session_factory()
+        try:
+            recordings = db.query(Recording).filter(Recording.id.in_(recording_ids)).all()
+            jobs = MySQLTranscriptionJobRepository(db).get_latest_jobs(recording_ids)
+            for recording in recordings:
+                self.broker.publish(event_from_state(recording, jobs.get(recording.id)))
+            return len(recordings)
+        finally:
+            db.close()
+
+    async def run(self):
+        """Poll until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception as e:
+                logger.error(f"Recording event relay failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        """Start polling in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_recording_event_broker = RecordingEventBroker()
+
+
+def get_recording_event_broker() -> RecordingEventBroker:
+    """
+    Get the process-wide recording event broker.
+
+    Returns:
+        Shared recording event broker
+    """
+    return _recording_event_broker
@@ -0,0 +1,261 @@
+"""
+Recording stream: continuous audio ingest over one WebSocket.
+
+Instead of one authenticated HTTP request per chunk, the client opens
+``/recordings/{id}/stream`` once and sends audio frames as they are
+recorded. The protocol, with JSON text messages and binary audio frames:
+
+* client ``{"type": "start", "chunk_index": n}``: begin or resume chunk n.
+  The server answers ``{"type": "ready", "chunk_index": n, "offset": k}``,
+  and the client sends the chunk's bytes from offset k on. A chunk that is
+  already stored is answered with ``committed`` instead;
+* client binary frames: the chunk's next bytes;
+* server ``{"type": "ack", "chunk_index": n, "offset": k}``: the first k
+  bytes of the chunk are on disk, after each checkpoint
+  (``recording_stream_checkpoint_seconds``);
+* client ``{"type": "end", "chunk_index": n, "duration_seconds": d}``:
+  the chunk is complete. The server stores it like an uploaded chunk and
+  answers ``{"type": "committed", "chunk_index": n, ...}``;
+* server ``{"type": "error", "detail": ...}``, followed by closing the socket.
+
+Chunks still bound the container (each MediaRecorder start writes a new
+header), live transcription and the size limit. Because audio is sent
+as it is recorded, a dead tab or dropped connection loses at most the audio
+since the last acknowledged checkpoint. Checkpointed chunks left open are
+stored when the recording is finished; finishing first ends the recording's
+open sessions (``recording_streams_closed``), so no late frame or commit
+races with it.
+"""
+import json
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.audio.chunk_writer import ChunkConflictError, ChunkTooLargeError, StoredChunk, StreamedChunk
+from app.core.config import settings
+from app.core.lifecycle import get_drain_coordinator
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close codes
+CLOSE_PROTOCOL_ERROR = 1008
+CLOSE_TOO_LARGE = 1009
+CLOSE_INTERNAL_ERROR = 1011
+CLOSE_SERVICE_RESTART = 1012
+CLOSE_RECORDING_FINISHED = 4409  # 4000 plus HTTP 409, like the endpoint's rejections
+
+# Stores a complete chunk and returns its description
+CommitChunk = Callable[[int, StoredChunk, Optional[float]], Awaitable[Dict[str, Any]]]
+# Describes a chunk that is already stored, or returns None
+FindCommitted = Callable[[int], Optional[Dict[str, Any]]]
+
+# Open sessions of this process by recording, and how many finishes of each recording are running
+_open_sessions: Dict[str, Set["RecordingStreamSession"]] = {}
+_finishing: Dict[str, int] = {}
+
+
+class RecordingStreamError(Exception):
+    """Raised when a client breaks the stream protocol."""
+
+    def __init__(self, detail: str, code: int = CLOSE_PROTOCOL_ERROR):
+        super().__init__(detail)
+        self.code = code
+
+
+class RecordingStreamSession:
+    """
+    Receives one client's recording stream and writes it to the recording's chunks.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        recording_id: str,
+        recording_dir: str,
+        max_bytes: int,
+        commit_chunk: CommitChunk,
+        find_committed: FindCommitted,
+        checkpoint_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the session.
+
+        Args:
+            websocket: Accepted WebSocket
+            recording_id: Recording the audio belongs to
+            recording_dir: Directory holding the recording's chunk files
+            max_bytes: Largest accepted chunk
+            commit_chunk: Stores a complete chunk
+            find_committed: Looks up a chunk that is already stored
+            checkpoint_seconds: Interval between durable checkpoints
+        """
+        self.websocket = websocket
+        self.recording_id = recording_id
+        self.recording_dir = recording_dir
+        self.max_bytes = max_bytes
+        self.commit_chunk = commit_chunk
+        self.find_committed = find_committed
+        self.checkpoint_seconds = checkpoint_seconds or settings.recording_stream_checkpoint_seconds
+        self.chunk: Optional[StreamedChunk] = None
+        self.stopping = False
+        self.closed = asyncio.Event()
+
+    async def run(self):
+        """Serve the stream until the client disconnects, the recording is finished or the server starts draining."""
+        loop = asyncio.get_running_loop()
+        next_checkpoint = loop.time() + self.checkpoint_seconds
+        sessions = _open_sessions.setdefault(self.recording_id, set())
+        sessions.add(self)
+        try:
+            if self.recording_id in _finishing:
+                raise RecordingStreamError("Recording is being finished", CLOSE_RECORDING_FINISHED)
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        self.websocket.receive(), timeout=max(0.0, next_checkpoint - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message is not None:
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("bytes") is not None:
+                        self._append(message["bytes"])
+                    elif message.get("text") is not None:
+                        await self._command(message["text"])
+
+                if loop.time() >= next_checkpoint:
+                    await self._checkpoint()
+                    next_checkpoint = loop.time() + self.checkpoint_seconds
+
+                if self.stopping:
+                    raise RecordingStreamError("Recording finished", CLOSE_RECORDING_FINISHED)
+
+                if get_drain_coordinator().draining:
+                    # Keep what was received and let the client resume on another instance
+                    await self._checkpoint()
+                    await self.websocket.close(code=CLOSE_SERVICE_RESTART)
+                    return
+        except RecordingStreamError as e:
+            logger.warning(f"Closing recording stream: {e}")
+            await self._send({"type": "error", "detail": str(e)})
+            await self.websocket.close(code=e.code)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            try:
+                await self._close_chunk()
+            finally:
+                sessions.discard(self)
+                if not sessions:
+                    _open_sessions.pop(self.recording_id, None)
+                self.closed.set()
+
+    def _append(self, data: bytes):
+        if self.chunk is None:
+            raise RecordingStreamError("Send start before audio")
+        try:
+            self.chunk.append(data)
+        except ChunkTooLargeError as e:
+            raise RecordingStreamError(str(e), CLOSE_TOO_LARGE)
+        metrics.increment("recording_stream.bytes", len(data))
+
+    async def _command(self, text: str):
+        try:
+            command = json.loads(text)
+            kind = command["type"]
+            chunk_index = int(command["chunk_index"])
+        except (ValueError, KeyError, TypeError):
+            raise RecordingStreamError("Invalid message")
+
+        if kind == "start":
+            await self._start(chunk_index)
+        elif kind == "end":
+            if self.chunk is None or self.chunk.chunk_index != chunk_index:
+                raise RecordingStreamError(f"Chunk {chunk_index} is not open")
+            await self._end(command.get("duration_seconds"))
+        else:
+            raise RecordingStreamError(f"Unknown message type {kind!r}")
+
+    async def _start(self, chunk_index: int):
+        await self._close_chunk()
+        committed = self.find_committed(chunk_index)
+        if committed is not None:
+            await self._send({"type": "committed", **committed})
+            return
+        chunk = StreamedChunk(self.recording_dir, chunk_index, self.max_bytes)
+        offset = await asyncio.to_thread(chunk.open)
+        self.chunk = chunk
+        if offset:
+            metrics.increment("recording_stream.resumed")
+        await self._send({"type": "ready", "chunk_index": chunk_index, "offset": offset})
+
+    async def _end(self, duration_seconds: Optional[float]):
+        chunk, self.chunk = self.chunk, None
+        stored = await asyncio.to_thread(chunk.finish, None)
+        try:
+            committed = await self.commit_chunk(chunk.chunk_index, stored, duration_seconds)
+        except ChunkConflictError as e:
+            raise RecordingStreamError(str(e))
+        except Exception as e:
+            logger.error(f"Failed to store streamed chunk {chunk.chunk_index}: {e}")
+            raise RecordingStreamError("Failed to store chunk", CLOSE_INTERNAL_ERROR)
+        await self._send({"type": "committed", **committed})
+
+    async def _checkpoint(self):
+        if self.chunk is None or not self.chunk.pending:
+            return
+        offset = await asyncio.to_thread(self.chunk.checkpoint)
+        await self._send({"type": "ack", "chunk_index": self.chunk.chunk_index, "offset": offset})
+
+    async def _close_chunk(self):
+        """Checkpoint and close the open chunk; it can be resumed or is stored at finish."""
+        if self.chunk is None:
+            return
+        chunk, self.chunk = self.chunk, None
+        try:
+            await asyncio.to_thread(chunk.checkpoint)
+        finally:
+            chunk.close()
+
+    async def _send(self, message: Dict[str, Any]):
+        try:
+            await self.websocket.send_json(message)
+        except (WebSocketDisconnect, RuntimeError):
+            # The client is gone; it will resume from the last checkpoint
+            pass
+
+
+@asynccontextmanager
+async def recording_streams_closed(recording_id: str) -> AsyncIterator[None]:
+    """
+    End a recording's open stream sessions and keep new ones out while the block runs.
+
+    Each session stops after the message or checkpoint it is handling; a
+    chunk being ended is stored and an open one is checkpointed. Inside the
+    block nothing writes to the recording's chunks, so unfinished streamed
+    chunks can be stored without a late frame tearing them.
+
+    Only this process's sessions are tracked.
+
+    Args:
+        recording_id: Recording being finished
+    """
+    _finishing[recording_id] = _finishing.get(recording_id, 0) + 1
+    try:
+        sessions = list(_open_sessions.get(recording_id, ()))
+        for session in sessions:
+            session.stopping = True
+        if sessions:
+            logger.info(f"Ending {len(sessions)} open streams of recording {recording_id}")
+            await asyncio.gather(*(session.closed.wait() for session in sessions))
+        yield
+    finally:
+        _finishing[recording_id] -= 1
+        if not _finishing[recording_id]:
+            del _finishing[recording_id]
@@ -0,0 +1,221 @@
+"""
+Segmented transcription: split long recordings and transcribe the parts concurrently.
+
+A single request for a multi-hour recording can exceed provider size limits
+and fails as a whole. Splitting the normalized PCM into overlapping segments
+bounds the size of every request, and transcribing them concurrently makes
+wall-clock time depend on the concurrency limit rather than on the length.
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from app.audio.encoding import TranscriptionEncoder
+from app.audio.engine import AudioEngine
+from app.audio.segments import SegmentFile
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.llm.interface import LLMProvider, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[^\w']+")
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD_PATTERN.sub("", word.lower())
+
+
+def find_overlap(previous: List[str], following: List[str], max_overlap_words: int = 20) -> Tuple[int, int]:
+    """
+    Find the words a later transcript repeats from the end of an earlier one.
+
+    The end of ``previous`` is matched against the start of ``following``
+    (ignoring case and punctuation) and the longest match wins. A clipped
+    last word in ``previous`` is tolerated; the complete word in
+    ``following`` should then replace it.
+
+    Args:
+        previous: Words of the earlier transcript
+        following: Words of the later transcript
+        max_overlap_words: Longest duplicated run searched for
+
+    Returns:
+        Tuple of (words to drop from the end of ``previous``,
+        words to skip at the start of ``following``)
+    """
+    tail = [_normalize_word(word) for word in previous[-(max_overlap_words + 1):]]
+    head = [_normalize_word(word) for word in following[:max_overlap_words]]
+
+    for length in range(min(len(tail), len(head)), 0, -1):
+        if tail[-length:] == head[:length]:
+            return 0, length
+        # Require two words when skipping a clipped word to avoid chance matches
+        if length >= 2 and length < len(tail) and tail[-length - 1:-1] == head[:length]:
+            return 1, length
+    return 0, 0
+
+
+def stitch_transcripts(texts: Iterable[str], max_overlap_words: int = 20) -> str:
+    """
+    Join segment transcripts, removing words repeated across each boundary.
+
+    Args:
+        texts: Segment transcripts in order
+        max_overlap_words: Longest duplicated run searched for
+
+    Returns:
+        Combined transcript
+    """
+    words: List[str] = []
+    for text in texts:
+        following = text.split()
+        dropped, skipped = find_overlap(words, following, max_overlap_words)
+        words = words[:len(words) - dropped] + following[skipped:]
+    return " ".join(words)
+
+
+class SegmentedTranscriber:
+    """
+    Transcribe a recording as concurrently processed, overlapping segments.
+    """
+
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        audio_engine: AudioEngine,
+        encoder: TranscriptionEncoder,
+        segment_seconds: float = 300.0,
+        overlap_seconds: float = 2.0,
+        search_seconds: float = 15.0,
+        max_concurrency: int = 4
+    ):
+        """
+        Initialize the transcriber.
+
+        Args:
+            llm_provider: Provider that transcribes each segment
+            audio_engine: Engine that runs the split and encode tasks
+            encoder: Encoder producing the PCM and per-segment payloads
+            segment_seconds: Target segment length
+            overlap_seconds: Audio repeated at the start of each following segment
+            search_seconds: How far from each target boundary to look for a quiet point
+            max_concurrency: Maximum segments transcribed at once
+        """
+        self.llm_provider = llm_provider
+        self.audio_engine = audio_engine
+        self.encoder = encoder
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.max_concurrency = max(1, max_concurrency)
+
+    @classmethod
+    def from_settings(
+        cls,
+        llm_provider: LLMProvider,
+        audio_engine: AudioEngine,
+        encoder: TranscriptionEncoder
+    ) -> "SegmentedTranscriber":
+        """Build a transcriber configured from application settings."""
+        return cls(
+            llm_provider,
+            audio_engine,
+            encoder,
+            segment_seconds=settings.transcription_segment_seconds,
+            overlap_seconds=settings.transcription_segment_overlap_seconds,
+            search_seconds=settings.transcription_segment_search_seconds,
+            max_concurrency=settings.transcription_max_concurrency
+        )
+
+    async def _encode_segment(self, segment: SegmentFile, supported_formats: List[str]) -> Tuple[str, str]:
+        return await self.encoder.encode(segment.path, supported_formats)
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        supported_formats: Iterable[str],
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> str:
+        """
+        Transcribe an assembled recording segment by segment.
+
+        Recordings shorter than one segment are sent as a single request.
+
+        Args:
+            audio_path: Path of the assembled audio
+            supported_formats: File extensions accepted by the provider
+            on_progress: Called with the fraction of segments transcribed
+
+        Returns:
+            Stitched transcript
+
+        Raises:
+            Exception: If any segment fails to transcribe
+        """
+        started = time.perf_counter()
+        supported_formats = list(supported_formats)
+        original_bytes = os.path.getsize(audio_path)
+        pcm_paths, vad = await self.encoder.prepare_pcm(audio_path)
+        segments: List[SegmentFile] = []
+        payload_paths: List[str] = []
+        try:
+            segments = await self.audio_engine.split(
+                pcm_paths[-1],
+                f"{os.path.splitext(audio_path)[0]}.segment",
+                self.segment_seconds,
+                self.overlap_seconds,
+                self.search_seconds
+            )
+            # Encoding is bounded by the engine's worker pool
+            encoded = await asyncio.gather(*[
+                self._encode_segment(segment, supported_formats) for segment in segments
+            ], return_exceptions=True)
+            payloads = [payload for payload in encoded if isinstance(payload, tuple)]
+            payload_paths = [path for path, _ in payloads]
+            for error in encoded:
+                if isinstance(error, BaseException):
+                    raise error
+            self.encoder.record(
+                audio_path,
+                ", ".join(sorted({format_name for _, format_name in payloads})),
+                original_bytes,
+                sum(os.path.getsize(path) for path in payload_paths),
+                time.perf_counter() - started,
+                vad
+            )
+            results: List[TranscriptionResult] = [None] * len(payload_paths)
+            done = 0
+            async for result in self.llm_provider.transcribe_as_completed(
+                payload_paths, max_concurrency=self.max_concurrency
+            ):
+                results[result.index] = result
+                done += 1
+                if on_progress is not None:
+                    on_progress(done / len(payload_paths))
+        finally:
+            for path in set(pcm_paths + [segment.path for segment in segments] + payload_paths):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        failed = [result for result in results if not result.ok]
+        if failed:
+            segment = segments[failed[0].index]
+            logger.error(
+                f"{len(failed)} of {len(segments)} segments of {audio_path} failed; first was segment "
+                f"{segment.index} ({segment.start_seconds:.1f}-{segment.end_seconds:.1f}s)"
+            )
+            raise failed[0].error
+
+        elapsed = time.perf_counter() - started
+        metrics.increment("transcription_segments.recordings")
+        metrics.increment("transcription_segments.segments", len(segments))
+        metrics.observe("transcription_segments.seconds", elapsed)
+        logger.info(
+            f"Transcribed {audio_path} as {len(segments)} segments "
+            f"(concurrency {self.max_concurrency}) in {elapsed:.2f}s"
+        )
+        return stitch_transcripts([result.text for result in results])
@@ -4,46 +4,80 @@ Transcription service for assembling audio chunks and triggering transcription.
 import os
 import asyncio
 import logging
-from typing import List, Optional
-from pydub import AudioSegment
+from typing import Callable, List, Optional
 
+from app.audio.encoding import TranscriptionEncoder
+from app.audio.engine import AudioEngine, get_audio_engine
+from app.audio.incremental import IncrementalAssembler
+from app.audio.vad import VadConfig
 from app.core.config import settings
+from app.llm.factory import get_llm_provider
 from app.llm.interface import LLMProvider
-from app.llm.requestyai_provider import RequestYaiProvider
-from app.llm.mock_provider import MockLLMProvider
+from app.llm.resilience import deadline_budget
+from app.services.live_transcription import get_live_transcription_queue
+from app.services.segmented_transcription import SegmentedTranscriber, find_overlap
 from app.repositories.mysql_recording_repository import MySQLRecordingRepository
 from app.models.recording import RecordingChunk
 
 logger = logging.getLogger(__name__)
 
+# Progress reported once the audio is assembled and once the transcript is ready;
+# segment transcription fills the range between them
+ASSEMBLED_PROGRESS = 10.0
+TRANSCRIBED_PROGRESS = 95.0
+
+# Interval for re-checking chunks another process is transcribing live
+LIVE_CLAIM_POLL_SECONDS = 0.5
+
 
 class TranscriptionService:
     """
     Service for handling audio assembly and transcription.
     """
     
-    def __init__(self, recording_repository: MySQLRecordingRepository, llm_provider: Optional[LLMProvider] = None):
+    def __init__(
+        self,
+        recording_repository: MySQLRecordingRepository,
+        llm_provider: Optional[LLMProvider] = None,
+        audio_engine: Optional[AudioEngine] = None
+    ):
         """
         Initialize transcription service.
         
         Args:
             recording_repository: Repository for recording operations
             llm_provider: Optional LLM provider (will create default if not provided)
+            audio_engine: Optional audio engine (the shared engine if not provided)
         """
         self.recording_repository = recording_repository
         self.llm_provider = llm_provider or self._create_default_provider()
+        self.audio_engine = audio_engine or get_audio_engine()
+        self.encoder = TranscriptionEncoder(self.audio_engine, vad_config=self._create_vad_config())
+        self.segmenter = SegmentedTranscriber.from_settings(self.llm_provider, self.audio_engine, self.encoder)
     
     def _create_default_provider(self) -> LLMProvider:
         """
-        Create default LLM provider based on configuration.
+        Get the shared LLM provider, which owns the pooled HTTP connections.
         
         Returns:
             LLM provider instance
         """
-        if settings.debug or settings.llm_provider == "mock":
-            return MockLLMProvider()
-        else:
-            return RequestYaiProvider(api_key=settings.llm_api_key)
+        return get_llm_provider()
+    
+    def _create_vad_config(self) -> Optional[VadConfig]:
+        """
+        Create the silence trimming configuration from settings.
+        
+        Returns:
+            VAD configuration, or None if trimming is disabled
+        """
+        if not settings.vad_enabled:
+            return None
+        return VadConfig(
+            min_silence_seconds=settings.vad_min_silence_seconds,
+            keep_silence_seconds=settings.vad_keep_silence_seconds,
+            energy_margin_db=settings.vad_energy_margin_db
+        )
     
     async def assemble_and_transcribe(self, recording_id: str) -> bool:
         """
@@ -56,39 +90,214 @@ class TranscriptionService:
             True if successful, False otherwise
         """
         try:
-            # Get recording and chunks
-            recording = self.recording_repository.get_recording(recording_id)
-            if not recording:
-                logger.error(f"Recording {recording_id} not found")
-                return False
-            
-            chunks = self.recording_repository.get_chunks(recording_id)
-            if not chunks:
-                logger.warning(f"No chunks found for recording {recording_id}")
-                return False
+            await self.transcribe_recording(recording_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error processing recording {recording_id}: {e}")
+            return False
+    
+    async def transcribe_recording(
+        self,
+        recording_id: str,
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> str:
+        """
+        Assemble audio chunks, transcribe the recording and store the transcript.
+        
+        Args:
+            recording_id: ID of the recording to process
+            on_progress: Called with the percentage of the work done
             
-            # Assemble audio chunks
-            assembled_audio_path = await self._assemble_chunks(recording_id, chunks)
-            if not assembled_audio_path:
-                logger.error(f"Failed to assemble chunks for recording {recording_id}")
-                return False
+        Returns:
+            The transcript
             
-            # Transcribe assembled audio
-            transcription = await self.llm_provider.transcribe_audio_async(assembled_audio_path)
+        Raises:
+            ValueError: If the recording, its chunks or the assembled audio are missing
+            Exception: If transcription fails
+        """
+        # Get recording and chunks
+        recording = self.recording_repository.get_recording(recording_id)
+        if not recording:
+            raise ValueError(f"Recording {recording_id} not found")
+        
+        chunks = self.recording_repository.get_chunks(recording_id)
+        if not chunks:
+            raise ValueError(f"No chunks found for recording {recording_id}")
+        
+        # Assemble audio chunks
+        assembled_audio_path = await self._assemble_chunks(recording_id, chunks)
+        if not assembled_audio_path:
+            raise ValueError(f"Failed to assemble chunks for recording {recording_id}")
+        
+        report = on_progress or (lambda percent: None)
+        report(ASSEMBLED_PROGRESS)
+        
+        # Transcribe assembled audio, or reuse the chunks' live transcripts;
+        # all provider calls for the recording share one deadline budget
+        with deadline_budget(settings.transcription_deadline_seconds):
+            if settings.live_transcription_enabled:
+                transcription = await self._collect_live_transcription(recording_id)
+            else:
+                transcription = await self._transcribe(
+                    assembled_audio_path,
+                    lambda fraction: report(ASSEMBLED_PROGRESS + fraction * (TRANSCRIBED_PROGRESS - ASSEMBLED_PROGRESS))
+                )
+        report(TRANSCRIBED_PROGRESS)
+        
+        # Update recording with transcription
+        self.recording_repository.update_recording_transcription(
+            recording_id=recording_id,
+            transcription_text=transcription,
+            audio_file_path=assembled_audio_path
+        )
+        
+        logger.info(f"Successfully transcribed recording {recording_id}")
+        return transcription
+    
+    async def _transcribe(self, audio_path: str, on_progress: Optional[Callable[[float], None]] = None) -> str:
+        """
+        Transcribe an assembled recording, uploading compact, segmented payloads when enabled.
+        
+        Args:
+            audio_path: Path to the assembled audio file
+            on_progress: Called with the fraction of segments transcribed
             
-            # Update recording with transcription
-            self.recording_repository.update_recording_transcription(
-                recording_id=recording_id,
-                transcription_text=transcription,
-                audio_file_path=assembled_audio_path
-            )
+        Returns:
+            Transcribed text
+        """
+        if not settings.transcription_encoding_enabled:
+            return await self.llm_provider.transcribe_audio_async(audio_path)
+        
+        supported_formats = getattr(self.llm_provider, "get_supported_formats", lambda: [".wav"])()
+        if settings.transcription_segment_seconds > 0:
+            return await self.segmenter.transcribe(audio_path, supported_formats, on_progress)
+        
+        encoded = await self.encoder.prepare(audio_path, supported_formats)
+        try:
+            return await self.llm_provider.transcribe_audio_async(encoded.path)
+        finally:
+            encoded.cleanup()
+    
+    async def transcribe_chunk(self, recording_id: str, chunk_index: int) -> Optional[str]:
+        """
+        Transcribe one chunk of a recording and store the text on the chunk.
+        
+        The chunk is claimed in the database first, so the API process and
+        the transcription workers never transcribe the same chunk at once.
+        When the previous chunk already has text, the end of its audio is
+        prepended as context and the words repeated from it are removed.
+        
+        Args:
+            recording_id: Recording the chunk belongs to
+            chunk_index: Index of the chunk to transcribe
             
-            logger.info(f"Successfully transcribed recording {recording_id}")
-            return True
+        Returns:
+            The chunk's new text, or None if the chunk does not exist, already
+            has text or is being transcribed by another process
+        """
+        chunks = {chunk.chunk_index: chunk for chunk in self.recording_repository.get_chunks(recording_id)}
+        chunk = chunks.get(chunk_index)
+        if chunk is None:
+            return None
+        if not self.recording_repository.claim_chunk_transcription(
+            chunk.id, settings.live_transcription_lease_seconds
+        ):
+            logger.debug(f"Chunk {chunk_index} of recording {recording_id} is transcribed elsewhere")
+            return None
+        
+        try:
+            return await self._transcribe_claimed_chunk(recording_id, chunk, chunks.get(chunk_index - 1))
+        except BaseException:
+            # Let the next process (or the finish) try the chunk right away
+            self.recording_repository.release_chunk_transcription(chunk.id)
+            raise
+    
+    async def _transcribe_claimed_chunk(
+        self,
+        recording_id: str,
+        chunk: RecordingChunk,
+        previous: Optional[RecordingChunk]
+    ) -> str:
+        """Transcribe a chunk this process has claimed; see ``transcribe_chunk``."""
+        if previous is not None and previous.transcription_text is None:
+            previous = None
+        
+        clip_path = f"{os.path.splitext(chunk.audio_blob_path)[0]}.live.wav"
+        await self.audio_engine.context_clip(
+            chunk.audio_blob_path,
+            clip_path,
+            previous.audio_blob_path if previous else None,
+            settings.live_transcription_context_seconds,
+            self.encoder.profile.sample_rate,
+            self.encoder.profile.channels
+        )
+        supported_formats = getattr(self.llm_provider, "get_supported_formats", lambda: [".wav"])()
+        payload_path, _ = await self.encoder.encode(clip_path, supported_formats)
+        try:
+            words = (await self.llm_provider.transcribe_audio_async(payload_path)).split()
+        finally:
+            for path in {clip_path, payload_path}:
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        if previous is not None:
+            previous_words = previous.transcription_text.split()
+            dropped, skipped = find_overlap(previous_words, words)
+            words = words[skipped:]
+            if dropped:
+                # The context transcribed a word clipped at the end of the previous chunk
+                self.recording_repository.update_chunk_transcription(
+                    previous.id, " ".join(previous_words[:len(previous_words) - dropped])
+                )
+        
+        text = " ".join(words)
+        self.recording_repository.update_chunk_transcription(chunk.id, text)
+        logger.info(f"Live transcribed chunk {chunk.chunk_index} of recording {recording_id}")
+        return text
+    
+    async def _collect_live_transcription(self, recording_id: str) -> str:
+        """
+        Build the recording transcript from its chunks' live transcripts.
+        
+        Waits for this process's queued chunk transcriptions, then
+        transcribes the chunks that are still missing text (normally just
+        the last one). The live queue may belong to another process (the
+        API, when a worker runs the job); chunks it has claimed are waited
+        for until they have text or their claim expires.
+        
+        Args:
+            recording_id: Recording to collect
             
-        except Exception as e:
-            logger.error(f"Error processing recording {recording_id}: {e}")
-            return False
+        Returns:
+            Concatenated transcript
+        """
+        await get_live_transcription_queue().wait(
+            recording_id, settings.live_transcription_finish_timeout_seconds
+        )
+        
+        transcribed = 0
+        while True:
+            missing = [
+                chunk.chunk_index
+                for chunk in self.recording_repository.get_chunks(recording_id)
+                if chunk.transcription_text is None
+            ]
+            claimed_elsewhere = False
+            for chunk_index in missing:
+                if await self.transcribe_chunk(recording_id, chunk_index) is None:
+                    claimed_elsewhere = True
+                else:
+                    transcribed += 1
+            if not claimed_elsewhere:
+                break
+            await asyncio.sleep(LIVE_CLAIM_POLL_SECONDS)
+        
+        chunks = self.recording_repository.get_chunks(recording_id)
+        logger.info(
+            f"Collected live transcription for recording {recording_id}: "
+            f"{len(chunks) - transcribed} chunks reused, {transcribed} transcribed at finish"
+        )
+        return " ".join(chunk.transcription_text for chunk in chunks if chunk.transcription_text)
     
     async def _assemble_chunks(self, recording_id: str, chunks: List[RecordingChunk]) -> Optional[str]:
         """
@@ -105,42 +314,42 @@ class TranscriptionService:
             # Sort chunks by index
             sorted_chunks = sorted(chunks, key=lambda x: x.chunk_index)
             
-            # Initialize combined audio
-            combined_audio = None
+            recording_dir = os.path.join(settings.audio_storage_path, recording_id)
+            output_base = os.path.join(recording_dir, "assembled_audio")
+            
+            # Chunks appended during upload only need their header patched here
+            result = await self.audio_engine.finalize(
+                recording_dir,
+                f"{output_base}.wav",
+                [chunk.chunk_index for chunk in sorted_chunks]
+            )
+            if result is not None:
+                logger.info(
+                    f"Finalized incrementally assembled audio: {result.output_path} "
+                    f"({result.chunk_count} chunks, {result.duration_seconds:.1f}s)"
+                )
+                return result.output_path
+            
+            IncrementalAssembler(recording_dir).discard()
             
-            for chunk in sorted_chunks:
-                if not os.path.exists(chunk.audio_blob_path):
-                    logger.warning(f"Chunk file not found: {chunk.audio_blob_path}")
-                    continue
-                
-                try:
-                    # Load audio chunk
-                    chunk_audio = AudioSegment.from_wav(chunk.audio_blob_path)
-                    
-                    if combined_audio is None:
-                        combined_audio = chunk_audio
-                    else:
-                        combined_audio += chunk_audio
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to load chunk {chunk.chunk_index}: {e}")
-                    continue
+            # Pick PCM copy, stream copy or decode per the chunks' containers,
+            # running in a worker process so memory and the event loop stay free
+            result = await self.audio_engine.concat(
+                [chunk.audio_blob_path for chunk in sorted_chunks],
+                output_base
+            )
             
-            if combined_audio is None:
+            if result is None:
                 logger.error(f"No valid chunks found for recording {recording_id}")
                 return None
             
-            # Save assembled audio
-            output_path = os.path.join(
-                settings.audio_storage_path, 
-                recording_id, 
-                "assembled_audio.wav"
+            logger.info(
+                f"Assembled audio saved to: {result.output_path} "
+                f"({result.chunk_count} chunks via {result.strategy}, "
+                f"{len(result.decoded_chunks)} decoded, {len(result.skipped_chunks)} skipped)"
             )
             
-            combined_audio.export(output_path, format="wav")
-            logger.info(f"Assembled audio saved to: {output_path}")
-            
-            return output_path
+            return result.output_path
             
         except Exception as e:
             logger.error(f"Error assembling chunks for recording {recording_id}: {e}")
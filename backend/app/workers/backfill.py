@@ -0,0 +1,82 @@
+"""
+Queue transcription backfills.
+
+Queues ended recordings at backfill priority, so workers only run them
+when no user is waiting for a transcript:
+
+    python -m app.workers.backfill              # recordings without a transcript
+    python -m app.workers.backfill --all        # re-transcribe every ended recording
+    python -m app.workers.backfill --recording <id> [--recording <id> ...]
+"""
+import argparse
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables
+from app.models.recording import Recording, RecordingStatus
+from app.models.transcription_job import TranscriptionJobPriority
+from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+from app.services.job_scheduling import estimate_recording_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def queue_backfill(db: Session, recording_ids: Optional[Iterable[str]] = None, include_transcribed: bool = False) -> List[str]:
+    """
+    Queue backfill jobs for ended recordings.
+
+    Args:
+        db: Database session
+        recording_ids: Recordings to queue; all ended recordings when omitted
+        include_transcribed: Also queue recordings that already have a transcript
+
+    Returns:
+        IDs of the queued jobs
+    """
+    query = db.query(Recording.id).filter(Recording.status == RecordingStatus.ENDED)
+    if recording_ids is not None:
+        query = query.filter(Recording.id.in_(list(recording_ids)))
+    if not include_transcribed:
+        query = query.filter(Recording.transcription_text.is_(None))
+
+    recordings = MySQLRecordingRepository(db)
+    jobs = MySQLTranscriptionJobRepository(db)
+    queued = []
+    for (recording_id,) in query.order_by(Recording.created_at).all():
+        job = jobs.enqueue(
+            recording_id,
+            max_attempts=settings.transcription_job_max_attempts,
+            audio_seconds=estimate_recording_seconds(recordings.get_chunks(recording_id)),
+            priority=TranscriptionJobPriority.BACKFILL
+        )
+        queued.append(job.id)
+    logger.info(f"Queued {len(queued)} backfill transcription jobs")
+    return queued
+
+
+def main():
+    """Entry point for ``python -m app.workers.backfill``."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", action="append", dest="recording_ids", help="Recording ID (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Include recordings that already have a transcript")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        queued = queue_backfill(db, args.recording_ids, include_transcribed=args.all)
+    finally:
+        db.close()
+    print(f"Queued {len(queued)} backfill jobs")
+
+
+if __name__ == "__main__":
+    main()
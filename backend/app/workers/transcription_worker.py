@@ -0,0 +1,293 @@
+"""
+Transcription worker process.
+
+Workers claim jobs from the ``transcription_jobs`` table, run them and record
+the outcome. While a job runs, the worker renews its lease with heartbeats.
+If a worker dies, the lease runs out and another worker picks the job up
+again, so no finished recording is lost to a restart or deploy. The API only
+queues jobs, so API and transcription capacity scale separately.
+
+Run one or more workers next to the API:
+
+    python -m app.workers.transcription_worker
+"""
+import os
+import uuid
+import signal
+import socket
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.audio.engine import get_audio_engine
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables
+from app.core.metrics import metrics
+from app.llm.factory import start_llm_provider, stop_llm_provider
+from app.models.transcription_job import TranscriptionJob, TranscriptionJobPriority, TranscriptionJobStatus
+from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+from app.services.recording_events import RecordingEventBroker, get_recording_event_broker, recording_event
+
+logger = logging.getLogger(__name__)
+
+# Progress is stored on the job row in steps of this many percent
+PROGRESS_STORE_STEP = 5.0
+
+
+def default_worker_id() -> str:
+    """Identify this worker process in job leases."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _priority_name(job: TranscriptionJob) -> str:
+    return TranscriptionJobPriority(job.priority).name.lower()
+
+
+def _create_transcription_service(db: Session):
+    from app.services.transcription_service import TranscriptionService
+
+    return TranscriptionService(MySQLRecordingRepository(db))
+
+
+class TranscriptionWorker:
+    """
+    Claims and runs transcription jobs, up to ``concurrency`` at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        retry_delay_seconds: Optional[float] = None,
+        drain_timeout: Optional[float] = None,
+        service_factory: Callable[[Session], object] = _create_transcription_service,
+        events: Optional[RecordingEventBroker] = None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            session_factory: Creates database sessions
+            worker_id: Lease owner name (host, pid and a random suffix by default)
+            concurrency: Jobs run at once
+            lease_seconds: How long a claim lasts without a heartbeat
+            heartbeat_seconds: Interval between lease renewals
+            poll_seconds: Sleep between claims while the queue is empty
+            retry_delay_seconds: Delay before the first retry of a failed job
+            drain_timeout: How long ``run`` lets running jobs finish after ``stop``
+            service_factory: Builds the transcription service for a session
+            events: Broker for status events; reaches clients of this process only
+        """
+        self.session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = max(1, concurrency or settings.transcription_worker_concurrency)
+        self.lease_seconds = lease_seconds or settings.transcription_job_lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds or settings.transcription_job_heartbeat_seconds
+        self.poll_seconds = poll_seconds or settings.transcription_worker_poll_seconds
+        self.retry_delay_seconds = (
+            settings.transcription_job_retry_delay_seconds if retry_delay_seconds is None else retry_delay_seconds
+        )
+        self.drain_timeout = settings.shutdown_drain_timeout_seconds if drain_timeout is None else drain_timeout
+        self.service_factory = service_factory
+        self.events = events or get_recording_event_broker()
+        self._stopping = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+
+    def _jobs(self, fn):
+        """Run ``fn`` with a job repository on a short-lived session."""
+        db = self.session_factory()
+        try:
+            return fn(MySQLTranscriptionJobRepository(db))
+        finally:
+            db.close()
+
+    def stop(self, force: bool = False):
+        """
+        Stop claiming jobs.
+
+        ``run`` returns once running jobs finish, or after ``drain_timeout``
+        with unfinished jobs released back to the queue.
+
+        Args:
+            force: Release running jobs now instead of letting them finish
+        """
+        if not self._stopping.is_set():
+            logger.info(f"Worker {self.worker_id} stopping")
+        self._stopping.set()
+        if force:
+            for task in self._running:
+                task.cancel()
+
+    async def run(self):
+        """Claim and run jobs until ``stop`` is called."""
+        logger.info(f"Transcription worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping.is_set():
+            started = False
+            while len(self._running) < self.concurrency and self._start_next():
+                started = True
+            if started:
+                continue
+            # Wake up on stop, when a slot frees up, or to poll for new jobs
+            wakers = [asyncio.ensure_future(self._stopping.wait()), *self._running]
+            await asyncio.wait(wakers, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+            wakers[0].cancel()
+
+        try:
+            if self._running:
+                logger.info(f"Worker {self.worker_id} draining {len(self._running)} jobs")
+                await asyncio.wait(set(self._running), timeout=self.drain_timeout)
+        finally:
+            await self._release_running()
+        logger.info(f"Transcription worker {self.worker_id} stopped")
+
+    async def _release_running(self):
+        """Cancel unfinished jobs, which returns them to the queue."""
+        running = [task for task in self._running if not task.done()]
+        if running:
+            logger.warning(f"Worker {self.worker_id} releasing {len(running)} unfinished jobs")
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def run_once(self) -> bool:
+        """
+        Claim and run a single job.
+
+        Returns:
+            True if a job was run, False if the queue had nothing runnable
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        await self._process(job)
+        return True
+
+    def _claim(self) -> Optional[TranscriptionJob]:
+        job = self._jobs(lambda jobs: jobs.claim(self.worker_id, self.lease_seconds))
+        if job is not None:
+            priority = _priority_name(job)
+            metrics.increment("transcription_jobs.claimed")
+            metrics.increment(f"transcription_jobs.{priority}.claimed")
+            metrics.observe(
+                f"transcription_jobs.{priority}.wait_seconds",
+                max(0.0, (datetime.utcnow() - job.run_after).total_seconds())
+            )
+        return job
+
+    def _start_next(self) -> bool:
+        job = self._claim()
+        if job is None:
+            return False
+        task = asyncio.create_task(self._process(job))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        metrics.set_gauge("transcription_worker.running", len(self._running))
+        return True
+
+    async def _heartbeat(self, job_id: str, task: asyncio.Task):
+        """Renew the lease until cancelled; cancel the job if the lease was lost."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            renewed = self._jobs(lambda jobs: jobs.heartbeat(job_id, self.worker_id, self.lease_seconds))
+            if not renewed:
+                logger.warning(f"Worker {self.worker_id} lost the lease on job {job_id}; abandoning it")
+                metrics.increment("transcription_jobs.leases_lost")
+                task.cancel()
+                return
+
+    def _progress_reporter(self, job_id: str, recording_id: str) -> Callable[[float], None]:
+        """Publish progress to local subscribers and, in coarser steps, to the job row."""
+        stored = [0.0]
+
+        def report(percent: float):
+            self.events.publish(recording_event(recording_id, TranscriptionJobStatus.RUNNING.value, percent))
+            if percent - stored[0] >= PROGRESS_STORE_STEP:
+                stored[0] = percent
+                self._jobs(lambda jobs: jobs.update_progress(job_id, self.worker_id, percent))
+
+        return report
+
+    async def _process(self, job: TranscriptionJob):
+        job_id, recording_id = job.id, job.recording_id
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, asyncio.current_task()))
+        db = self.session_factory()
+        self.events.publish(recording_event(recording_id, TranscriptionJobStatus.RUNNING.value))
+        try:
+            service = self.service_factory(db)
+            transcription = await service.transcribe_recording(
+                recording_id, on_progress=self._progress_reporter(job_id, recording_id)
+            )
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back. A lost lease makes this a no-op.
+            if self._jobs(lambda jobs: jobs.release(job_id, self.worker_id)):
+                metrics.increment("transcription_jobs.released")
+                self.events.publish(recording_event(recording_id, TranscriptionJobStatus.QUEUED.value))
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            failed = self._jobs(lambda jobs: jobs.fail(job_id, self.worker_id, error, self.retry_delay_seconds))
+            metrics.increment("transcription_jobs.failed_attempts")
+            if failed is not None:
+                final = failed.status == TranscriptionJobStatus.FAILED
+                if final:
+                    metrics.increment("transcription_jobs.failed")
+                self.events.publish(recording_event(recording_id, failed.status.value, error=error if final else None))
+        else:
+            if self._jobs(lambda jobs: jobs.complete(job_id, self.worker_id)):
+                metrics.increment("transcription_jobs.succeeded")
+                metrics.observe(
+                    f"transcription_jobs.{_priority_name(job)}.time_to_transcript_seconds",
+                    (datetime.utcnow() - job.created_at).total_seconds()
+                )
+                self.events.publish(recording_event(
+                    recording_id, TranscriptionJobStatus.SUCCEEDED.value, 100.0, transcription
+                ))
+                logger.info(f"Transcription job {job_id} for recording {recording_id} succeeded")
+        finally:
+            heartbeat.cancel()
+            db.close()
+            metrics.set_gauge("transcription_worker.running", max(0, len(self._running) - 1))
+
+
+async def serve():
+    """Run a worker until SIGTERM or SIGINT; a second signal skips the drain."""
+    await start_llm_provider()
+    worker = TranscriptionWorker()
+    loop = asyncio.get_running_loop()
+    signals = []
+
+    def handle_signal():
+        # A second signal releases running jobs instead of waiting for them
+        signals.append(True)
+        worker.stop(force=len(signals) > 1)
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, handle_signal)
+    try:
+        await worker.run()
+    finally:
+        await stop_llm_provider()
+        get_audio_engine().shutdown()
+
+
+def main():
+    """Entry point for ``python -m app.workers.transcription_worker``."""
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    os.makedirs(settings.audio_storage_path, exist_ok=True)
+    create_tables()
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
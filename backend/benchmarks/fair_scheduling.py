@@ -0,0 +1,134 @@
+"""
+Benchmark: time-to-transcript for normal users during one user's burst.
+
+One clinician finishes a batch of long recordings at once. Other users then
+finish one recording each, spread over the next few seconds. Two workers
+drain the queue from a temporary SQLite database. Transcription is
+simulated by sleeping for the recording's length times ``--time-scale``.
+The run is repeated with fair scheduling off (first in, first out) and on.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.fair_scheduling --burst 10 --users 8
+
+Sample run (10 x 600 s burst, 8 users with 180 s recordings, 2 workers):
+
+    mode   normal p50 s  normal p95 s  burst last s
+    fifo           2.37          2.74          3.11
+    fair           0.52          0.57          3.87
+
+With fair scheduling a normal user waits for one burst job in progress
+(0.6 s here) rather than for the whole burst.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models import Recording, RecordingStatus, User  # noqa: E402
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository  # noqa: E402
+from app.services.job_scheduling import classify_priority  # noqa: E402
+from app.workers.transcription_worker import TranscriptionWorker  # noqa: E402
+
+
+class SimulatedService:
+    """Sleeps for each recording's scaled length and records when it finished."""
+
+    def __init__(self, lengths, time_scale):
+        self.lengths = lengths
+        self.time_scale = time_scale
+        self.finished = {}
+
+    async def transcribe_recording(self, recording_id, on_progress=None):
+        await asyncio.sleep(self.lengths[recording_id] * self.time_scale)
+        self.finished[recording_id] = time.perf_counter()
+        return "text"
+
+
+async def run(args, fair: bool) -> dict:
+    settings.transcription_fair_scheduling_enabled = fair
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'queue.db')}", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = session_factory()
+        jobs = MySQLTranscriptionJobRepository(db)
+
+        def add_user(name):
+            user = User(google_id=name, email=f"{name}@example.com", display_name=name)
+            db.add(user)
+            db.commit()
+            return user.id
+
+        def finish(user_id, seconds):
+            recording = Recording(user_id=user_id, status=RecordingStatus.ENDED)
+            db.add(recording)
+            db.commit()
+            lengths[recording.id] = seconds
+            jobs.enqueue(recording.id, audio_seconds=seconds, priority=classify_priority(seconds))
+            return recording.id, time.perf_counter()
+
+        lengths = {}
+        service = SimulatedService(lengths, args.time_scale)
+        worker = TranscriptionWorker(
+            session_factory=session_factory, worker_id=f"bench-{fair}", concurrency=args.workers,
+            poll_seconds=0.01, service_factory=lambda session: service
+        )
+        runner = asyncio.create_task(worker.run())
+
+        heavy = add_user("heavy")
+        burst = [finish(heavy, args.burst_seconds) for _ in range(args.burst)]
+        normal = []
+        for index in range(args.users):
+            await asyncio.sleep(args.arrival_interval)
+            normal.append(finish(add_user(f"user{index}"), args.user_seconds))
+
+        everything = burst + normal
+        while len(service.finished) < len(everything):
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await runner
+        db.close()
+        engine.dispose()
+
+    waits = sorted(service.finished[recording_id] - queued for recording_id, queued in normal)
+    return {
+        "p50": statistics.median(waits),
+        "p95": waits[max(0, int(len(waits) * 0.95) - 1)],
+        "burst_last": max(service.finished[recording_id] for recording_id, _ in burst) - burst[0][1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=10, help="Recordings in the heavy user's burst")
+    parser.add_argument("--burst-seconds", type=float, default=600.0)
+    parser.add_argument("--users", type=int, default=8, help="Other users, one recording each")
+    parser.add_argument("--user-seconds", type=float, default=180.0)
+    parser.add_argument("--arrival-interval", type=float, default=0.25, help="Real seconds between other users")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=0.001, help="Real seconds per audio second")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'mode':<6} {'normal p50 s':>12} {'normal p95 s':>13} {'burst last s':>13}")
+    for fair in (False, True):
+        result = await run(args, fair)
+        print(f"{'fair' if fair else 'fifo':<6} {result['p50']:>12.2f} {result['p95']:>13.2f} {result['burst_last']:>13.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
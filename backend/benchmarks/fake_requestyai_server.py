@@ -0,0 +1,332 @@
+"""
+Local stand-in for the RequestYAI transcription API.
+
+Serves ``POST /v1/audio/transcriptions`` over real HTTP, so benchmarks run
+through RequestYaiProvider's full path: multipart streaming, the connection
+pool, timeouts, retries and rate limiting. Nothing leaves the machine.
+
+The server's behaviour is described by a ``FakeProviderProfile``:
+
+* latency is ``base_latency + latency_per_audio_second * duration``, with
+  optional uniform or log-normal jitter that keeps the mean unchanged;
+* 429 and 5xx responses can be injected at given rates; 429s carry Retry-After;
+* throughput caps: concurrent requests, requests per minute and audio seconds
+  per minute. Requests over a cap get a 429, like a real provider;
+* transcripts are derived from the audio's hash, so identical audio always
+  gets the same text, and their word count follows the audio length.
+
+``GET /stats`` returns request counters and the peak number of requests in flight.
+
+In process (e.g. from a benchmark):
+
+    async with FakeRequestYaiServer(FakeProviderProfile(latency_per_audio_second=0.05)) as url:
+        provider = RequestYaiProvider(api_key="fake", base_url=url)
+
+As a subprocess (from the backend directory):
+
+    python -m benchmarks.fake_requestyai_server --port 8089 --rate-limit-error-rate 0.05
+"""
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import subprocess
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, File, Form, Header, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio.wav import WavFormatError, read_wav_info  # noqa: E402
+
+VOCABULARY = (
+    "the patient reports mild pain in the lower back since last week no fever "
+    "blood pressure is normal follow up in two weeks continue current medication "
+    "sleep has improved appetite is good denies shortness of breath or chest pain"
+).split()
+
+# Payload byte rate assumed for compressed uploads, whose length is not in a header
+COMPRESSED_BYTES_PER_SECOND = 16000
+
+
+@dataclass
+class FakeProviderProfile:
+    """Latency, failure and capacity behaviour of the fake provider."""
+    base_latency: float = 0.2
+    latency_per_audio_second: float = 0.05
+    jitter: str = "lognormal"  # "none", "uniform" or "lognormal"
+    jitter_sigma: float = 0.25
+    rate_limit_error_rate: float = 0.0
+    server_error_rate: float = 0.0
+    server_error_status: int = 503
+    retry_after_seconds: float = 1.0
+    max_concurrency: int = 0  # 0 means unlimited
+    requests_per_minute: float = 0
+    audio_seconds_per_minute: float = 0
+    words_per_second: float = 2.5
+    seed: Optional[int] = None
+
+
+class _Bucket:
+    """Token bucket refilled continuously; a per-minute rate of 0 disables it."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> bool:
+        if self.per_minute <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.per_minute, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+        cost = min(cost, self.per_minute)
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+def transcript_for(digest: str, audio_seconds: float, words_per_second: float) -> str:
+    """
+    Deterministic transcript for a piece of audio.
+
+    Args:
+        digest: SHA-256 of the uploaded audio
+        audio_seconds: Length of the audio
+        words_per_second: Speaking rate
+
+    Returns:
+        Text with a word count proportional to the audio length
+    """
+    rng = random.Random(int(digest[:16], 16))
+    count = max(1, int(round(audio_seconds * words_per_second)))
+    return " ".join(rng.choice(VOCABULARY) for _ in range(count)) + "."
+
+
+def create_app(profile: FakeProviderProfile) -> FastAPI:
+    """
+    Build the fake API application.
+
+    Args:
+        profile: Behaviour of the fake provider
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Fake RequestYAI")
+    rng = random.Random(profile.seed)
+    requests_bucket = _Bucket(profile.requests_per_minute)
+    audio_bucket = _Bucket(profile.audio_seconds_per_minute)
+    stats: Dict[str, float] = {
+        "requests": 0, "ok": 0, "rate_limited": 0, "injected_rate_limited": 0,
+        "server_errors": 0, "unauthorized": 0, "in_flight": 0, "peak_in_flight": 0,
+        "audio_seconds": 0.0, "bytes": 0
+    }
+    app.state.stats = stats
+
+    def latency_for(audio_seconds: float) -> float:
+        mean = profile.base_latency + profile.latency_per_audio_second * audio_seconds
+        if profile.jitter == "uniform":
+            return mean * rng.uniform(1 - profile.jitter_sigma, 1 + profile.jitter_sigma)
+        if profile.jitter == "lognormal":
+            sigma = profile.jitter_sigma
+            return mean * math.exp(rng.gauss(-sigma * sigma / 2, sigma))
+        return mean
+
+    def throttled(retry_after: float) -> Response:
+        return JSONResponse(
+            {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+            status_code=429,
+            headers={"Retry-After": f"{max(1, math.ceil(retry_after))}"}
+        )
+
+    @app.head("/")
+    @app.get("/")
+    async def root():
+        return PlainTextResponse("ok")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(
+        request: Request,
+        file: UploadFile = File(...),
+        model: str = Form("whisper-1"),
+        language: Optional[str] = Form(None),
+        response_format: str = Form("json"),
+        temperature: float = Form(0.0),
+        authorization: Optional[str] = Header(None)
+    ):
+        stats["requests"] += 1
+        if not authorization or not authorization.startswith("Bearer "):
+            stats["unauthorized"] += 1
+            return JSONResponse({"error": {"message": "Missing API key"}}, status_code=401)
+
+        # Hash and measure the upload in blocks, as a real service would spool it
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            block = await file.read(256 * 1024)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+        try:
+            audio_seconds = read_wav_info(file.file).duration_seconds
+        except WavFormatError:
+            audio_seconds = size / COMPRESSED_BYTES_PER_SECOND
+        stats["bytes"] += size
+
+        if profile.max_concurrency and stats["in_flight"] >= profile.max_concurrency:
+            stats["rate_limited"] += 1
+            return throttled(profile.retry_after_seconds)
+        if not requests_bucket.take(1) or not audio_bucket.take(audio_seconds):
+            stats["rate_limited"] += 1
+            return throttled(profile.retry_after_seconds)
+
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            roll = rng.random()
+            if roll < profile.rate_limit_error_rate:
+                stats["rate_limited"] += 1
+                stats["injected_rate_limited"] += 1
+                await asyncio.sleep(profile.base_latency)
+                return throttled(profile.retry_after_seconds)
+            if roll < profile.rate_limit_error_rate + profile.server_error_rate:
+                stats["server_errors"] += 1
+                await asyncio.sleep(latency_for(audio_seconds))
+                return JSONResponse(
+                    {"error": {"message": "Injected server error"}}, status_code=profile.server_error_status
+                )
+
+            await asyncio.sleep(latency_for(audio_seconds))
+            text = transcript_for(digest.hexdigest(), audio_seconds, profile.words_per_second)
+            stats["ok"] += 1
+            stats["audio_seconds"] += audio_seconds
+            if response_format == "text":
+                return PlainTextResponse(text)
+            return {"text": text}
+        finally:
+            stats["in_flight"] -= 1
+
+    return app
+
+
+class FakeRequestYaiServer:
+    """The fake API served by uvicorn inside the current event loop."""
+
+    def __init__(self, profile: Optional[FakeProviderProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            profile: Behaviour of the fake provider
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+        """
+        self.profile = profile or FakeProviderProfile()
+        self.app = create_app(self.profile)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host=host, port=port, log_level="warning", lifespan="off"
+        ))
+        # The host process owns signal handling
+        self._server.install_signal_handlers = lambda: None
+        self._task: Optional[asyncio.Task] = None
+        self.url: Optional[str] = None
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Request counters since the server started."""
+        return self.app.state.stats
+
+    async def start(self) -> str:
+        """
+        Start serving.
+
+        Returns:
+            Base URL of the server
+        """
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        """Stop serving and wait for open requests to finish."""
+        self._server.should_exit = True
+        if self._task is not None:
+            await self._task
+
+    async def __aenter__(self) -> str:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def spawn_fake_server(port: int, profile: Optional[FakeProviderProfile] = None, timeout: float = 10.0) -> subprocess.Popen:
+    """
+    Run the fake API in a subprocess and wait until it answers.
+
+    Args:
+        port: Port to listen on
+        profile: Behaviour of the fake provider
+        timeout: Seconds to wait for the server to come up
+
+    Returns:
+        The server process; terminate it when done
+    """
+    arguments = [sys.executable, "-m", "benchmarks.fake_requestyai_server", "--port", str(port)]
+    for name, value in asdict(profile or FakeProviderProfile()).items():
+        if value is not None:
+            arguments += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(arguments, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Fake server exited with status {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Fake server did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    defaults = FakeProviderProfile()
+    for field in fields(FakeProviderProfile):
+        kind = int if field.type in (int, "int") else str if field.type in (str, "str") else float
+        if field.name == "seed":
+            kind = int
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=kind, default=getattr(defaults, field.name))
+    args = parser.parse_args()
+
+    profile = FakeProviderProfile(**{field.name: getattr(args, field.name) for field in fields(FakeProviderProfile)})
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark: pooled provider client versus a new HTTP client per transcription.
+
+Starts a small keep-alive HTTP server that counts accepted connections and
+answers transcription requests after a fixed delay, then runs the same
+concurrent load through RequestYaiProvider twice:
+
+* ``per-request``: a fresh provider (and so a fresh client) per call, which
+  is what the provider did before it owned a pooled client;
+* ``pooled``: one provider shared by every call.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.http_client_pool --requests 200 --concurrency 20
+
+Against the plain-HTTP local server the per-request cost is the TCP
+handshake plus building a client (httpx loads a TLS context for every new
+client). Pass ``--url`` with a TLS endpoint that accepts the request to
+include TLS handshakes as well; connection counts are then not available.
+
+Sample run (200 requests, concurrency 20, 5 ms server delay):
+
+    mode           wall s   mean ms    p95 ms  connections
+    per-request      4.99     489.2     588.7          200
+    pooled           0.52      47.0      73.9           20
+"""
+import os
+import sys
+import time
+import wave
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.llm.requestyai_provider import RequestYaiProvider  # noqa: E402
+
+
+class CountingServer:
+    """Minimal HTTP/1.1 keep-alive server that counts connections."""
+
+    def __init__(self, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value.strip())
+                # Discard the body in blocks so the server's memory stays flat
+                while length > 0:
+                    length -= len(await reader.readexactly(min(length, 64 * 1024)))
+                self.requests += 1
+                await asyncio.sleep(self.delay_seconds)
+                body = b"benchmark transcript"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n"
+                )
+                if not head.startswith(b"HEAD "):
+                    writer.write(body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def write_sample(path: str, seconds: float):
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(b"\x00\x00" * int(16000 * seconds))
+
+
+async def run_load(mode: str, url: str, audio_path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    shared = RequestYaiProvider(
+        api_key="benchmark", base_url=url, max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            provider = shared if mode == "pooled" else RequestYaiProvider(api_key="benchmark", base_url=url)
+            started = time.perf_counter()
+            try:
+                await provider.transcribe_audio_async(audio_path)
+            finally:
+                if provider is not shared:
+                    await provider.aclose()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+    await shared.aclose()
+
+    latencies.sort()
+    return {
+        "wall_seconds": elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--audio-seconds", type=float, default=1.0)
+    parser.add_argument("--server-delay", type=float, default=0.005, help="Simulated provider latency")
+    parser.add_argument("--url", help="Use an external endpoint instead of the local server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        audio_path = os.path.join(directory, "sample.wav")
+        write_sample(audio_path, args.audio_seconds)
+
+        print(f"{'mode':<12} {'wall s':>8} {'mean ms':>9} {'p95 ms':>9} {'connections':>12}")
+        for mode in ("per-request", "pooled"):
+            server = None
+            url = args.url
+            if url is None:
+                server = CountingServer(args.server_delay)
+                url = await server.start()
+            try:
+                result = await run_load(mode, url, audio_path, args.requests, args.concurrency)
+            finally:
+                if server is not None:
+                    await server.stop()
+            connections = str(server.connections) if server else "n/a"
+            print(
+                f"{mode:<12} {result['wall_seconds']:>8.2f} {result['mean_ms']:>9.1f} "
+                f"{result['p95_ms']:>9.1f} {connections:>12}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: peak memory per transcription upload, buffered versus streamed.
+
+Uploads the same file from several concurrent jobs to a local server and
+reports the tracemalloc peak:
+
+* ``buffered``: the file is read into memory and posted as ``files=``,
+  which is what the provider did before streaming;
+* ``streamed``: RequestYaiProvider's streaming multipart body.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.multipart_memory --file-mb 64 --concurrency 4
+
+Sample run (64 MB file, 4 concurrent jobs, 256 KiB blocks):
+
+    mode         peak MB   per job MB
+    buffered       558.3        139.6
+    streamed         3.4          0.8
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+import aiofiles
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.llm.requestyai_provider import RequestYaiProvider  # noqa: E402
+from benchmarks.http_client_pool import CountingServer  # noqa: E402
+
+
+async def buffered_upload(client: httpx.AsyncClient, url: str, audio_path: str):
+    async with aiofiles.open(audio_path, "rb") as audio_file:
+        audio_content = await audio_file.read()
+    await client.post(
+        f"{url}/v1/audio/transcriptions",
+        files={"file": (audio_path, audio_content, "audio/wav")},
+        data={"model": "whisper-1"}
+    )
+
+
+async def measure(mode: str, url: str, audio_path: str, concurrency: int, block_size: int) -> float:
+    provider = RequestYaiProvider(
+        api_key="benchmark", base_url=url, upload_block_size=block_size,
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    client = provider.async_client
+    # Open the connections first so pool set-up is not part of the peak
+    await asyncio.gather(*[client.head(url) for _ in range(concurrency)])
+
+    tracemalloc.start()
+    try:
+        if mode == "buffered":
+            jobs = [buffered_upload(client, url, audio_path) for _ in range(concurrency)]
+        else:
+            jobs = [provider.transcribe_audio_async(audio_path) for _ in range(concurrency)]
+        await asyncio.gather(*jobs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await provider.aclose()
+    return peak / (1024 * 1024)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file-mb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--block-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        audio_path = os.path.join(directory, "assembled_audio.wav")
+        with open(audio_path, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.file_mb):
+                f.write(block)
+
+        server = CountingServer(delay_seconds=0.0)
+        url = await server.start()
+        try:
+            print(f"{'mode':<10} {'peak MB':>9} {'per job MB':>12}")
+            for mode in ("buffered", "streamed"):
+                peak = await measure(mode, url, audio_path, args.concurrency, args.block_kb * 1024)
+                print(f"{mode:<10} {peak:>9.1f} {peak / args.concurrency:>12.1f}")
+        finally:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
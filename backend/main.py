@@ -1,14 +1,25 @@
 """
 Main FastAPI application entry point.
 """
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from sqlalchemy.orm import Session
+import asyncio
 import logging
 import os
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, get_db
+from app.core.lifecycle import DrainMiddleware, get_drain_coordinator
+from app.core.upload_limits import CHUNK_BATCH_UPLOAD_PATH, ChunkUploadLimitMiddleware
+from app.core.metrics import metrics
+from app.audio.engine import get_audio_engine
+from app.llm.factory import start_llm_provider, stop_llm_provider
+from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+from app.services.recording_events import DatabaseEventRelay, get_recording_event_broker
+from app.workers.transcription_worker import TranscriptionWorker
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +29,13 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Worker run inside the API process when transcription_worker_embedded is set
+_embedded_worker = None
+_embedded_worker_task = None
+
+# Relays job state from workers in other processes to event streams
+_event_relay = None
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -27,6 +45,13 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None
 )
 
+# Refuse new writes while shutting down; added first so CORS headers still reach browsers
+app.add_middleware(DrainMiddleware)
+
+# Reject oversized chunk uploads while they are received, not after
+app.add_middleware(ChunkUploadLimitMiddleware)
+app.add_middleware(ChunkUploadLimitMiddleware, path_pattern=CHUNK_BATCH_UPLOAD_PATH, batch=True)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +73,7 @@ async def startup_event():
     """
     Application startup event handler.
     """
+    global _event_relay, _embedded_worker, _embedded_worker_task
     logger.info(f"Starting {settings.app_name}")
     
     # Create audio storage directory
@@ -61,6 +87,26 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         raise
+    
+    # Open pooled connections to the transcription provider
+    await start_llm_provider()
+    
+    # Push job state written by worker processes to open event streams
+    if settings.recording_events_backend == "database":
+        _event_relay = DatabaseEventRelay(get_recording_event_broker())
+        _event_relay.start()
+    
+    # Single-process deployments run transcription jobs alongside the API
+    drain = get_drain_coordinator()
+    drain.reset()
+    if settings.transcription_worker_embedded:
+        _embedded_worker = TranscriptionWorker()
+        _embedded_worker_task = drain.track(asyncio.create_task(_embedded_worker.run()))
+        drain.on_drain(_embedded_worker.stop)
+        logger.info("Embedded transcription worker started")
+    
+    # Open event streams end on drain so that clients reconnect elsewhere
+    drain.on_drain(get_recording_event_broker().close_all)
 
 
 @app.on_event("shutdown")
@@ -69,6 +115,23 @@ async def shutdown_event():
     Application shutdown event handler.
     """
     logger.info(f"Shutting down {settings.app_name}")
+    
+    # Normally app.server has drained already; this covers other servers.
+    # The embedded worker and live chunk transcriptions get the rest of the
+    # drain timeout, then are cancelled and their jobs released to the queue.
+    drain = get_drain_coordinator()
+    drain.begin_drain()
+    await drain.wait_idle()
+    await drain.cancel_remaining()
+    
+    if _event_relay is not None:
+        await _event_relay.stop()
+    
+    # Stop audio worker processes
+    get_audio_engine().shutdown()
+    
+    # Close pooled provider connections
+    await stop_llm_provider()
 
 
 @app.get("/")
@@ -86,14 +149,27 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint.
+    Health check endpoint; reports 503 while draining so load balancers stop routing here.
     """
+    if get_drain_coordinator().draining:
+        return JSONResponse(status_code=503, content={"status": "draining"})
     return {
         "status": "healthy",
         "timestamp": "2025-11-05T00:00:00Z"
     }
 
 
+@app.get("/metrics")
+async def get_metrics(db: Session = Depends(get_db)):
+    """
+    In-process metrics for this worker, plus transcription queue depth and
+    wait per priority class, which are shared by all processes.
+    """
+    snapshot = metrics.snapshot()
+    snapshot["transcription_queue"] = MySQLTranscriptionJobRepository(db).queue_stats()
+    return snapshot
+
+
 # Import and include routers
 from app.api import auth, recordings
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
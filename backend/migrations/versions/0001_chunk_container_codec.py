@@ -0,0 +1,30 @@
+"""
+Add the detected container and codec to recording chunks.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("recording_chunks", "container"):
+        op.add_column("recording_chunks", sa.Column("container", sa.String(20), nullable=True))
+    if not _has_column("recording_chunks", "codec"):
+        op.add_column("recording_chunks", sa.Column("codec", sa.String(20), nullable=True))
+
+
+def downgrade():
+    op.drop_column("recording_chunks", "codec")
+    op.drop_column("recording_chunks", "container")
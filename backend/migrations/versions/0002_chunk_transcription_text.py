@@ -0,0 +1,27 @@
+"""
+Add the live transcription of each recording chunk.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("recording_chunks", "transcription_text"):
+        op.add_column("recording_chunks", sa.Column("transcription_text", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("recording_chunks", "transcription_text")
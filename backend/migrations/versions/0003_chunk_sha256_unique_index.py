@@ -0,0 +1,49 @@
+"""
+Add chunk checksums and allow one row per (recording_id, chunk_index).
+
+Retried uploads used to add a second row for the same chunk index; all
+but one of each such group are deleted before the unique index is built.
+They pointed at the same, overwritten file.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+UNIQUE_INDEX = "uq_recording_chunks_recording_index"
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_unique_index(table: str, name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    names = {c["name"] for c in inspector.get_unique_constraints(table)}
+    names |= {i["name"] for i in inspector.get_indexes(table)}
+    return name in names
+
+
+def upgrade():
+    if not _has_column("recording_chunks", "sha256"):
+        op.add_column("recording_chunks", sa.Column("sha256", sa.CHAR(64), nullable=True))
+    if not _has_unique_index("recording_chunks", UNIQUE_INDEX):
+        # The derived table lets MySQL delete from the table it selects from
+        op.execute(
+            "DELETE FROM recording_chunks WHERE id NOT IN ("
+            "SELECT id FROM (SELECT MIN(id) AS id FROM recording_chunks "
+            "GROUP BY recording_id, chunk_index) AS keep_rows)"
+        )
+        op.create_index(UNIQUE_INDEX, "recording_chunks", ["recording_id", "chunk_index"], unique=True)
+
+
+def downgrade():
+    op.drop_index(UNIQUE_INDEX, table_name="recording_chunks")
+    op.drop_column("recording_chunks", "sha256")
@@ -0,0 +1,29 @@
+"""
+Track which process is transcribing a chunk live.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("recording_chunks", "transcription_lease_expires_at"):
+        op.add_column(
+            "recording_chunks", sa.Column("transcription_lease_expires_at", sa.DateTime(), nullable=True)
+        )
+
+
+def downgrade():
+    op.drop_column("recording_chunks", "transcription_lease_expires_at")
@@ -0,0 +1,343 @@
+"""
+Tests for streaming audio assembly.
+"""
+import os
+import wave
+import pytest
+from unittest.mock import patch
+
+
+def write_wav(path, frames, channels=1, sample_rate=16000, sample_width=2):
+    """Write raw PCM frames to a WAV file."""
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frames)
+    return path
+
+
+def read_wav(path):
+    """Read a WAV file, returning (params, frames)."""
+    with wave.open(path, "rb") as wav_file:
+        return wav_file.getparams(), wav_file.readframes(wav_file.getnframes())
+
+
+class TestWavHeaders:
+    """Test WAV header helpers."""
+
+    def test_probe_wav(self, tmp_path):
+        """Test reading the header of a PCM WAV file."""
+        from app.audio.wav import probe_wav
+
+        path = write_wav(str(tmp_path / "a.wav"), b"\x01\x00" * 16000)
+        info = probe_wav(path)
+
+        assert info is not None
+        assert info.format.channels == 1
+        assert info.format.sample_rate == 16000
+        assert info.format.sample_width == 2
+        assert info.data_offset == 44
+        assert info.data_size == 32000
+        assert info.duration_seconds == pytest.approx(1.0)
+
+    def test_probe_wav_unknown_data_size(self, tmp_path):
+        """Test that a streaming header with a zero data size uses the file length."""
+        from app.audio.wav import WavFormat, build_wav_header, probe_wav
+
+        path = tmp_path / "stream.wav"
+        path.write_bytes(build_wav_header(WavFormat(1, 8000, 2), 0) + b"\x00" * 1001)
+
+        info = probe_wav(str(path))
+
+        # The trailing partial frame is dropped
+        assert info.data_size == 1000
+
+    def test_probe_wav_rejects_non_wav(self, tmp_path):
+        """Test that non-WAV files are not treated as PCM."""
+        from app.audio.wav import probe_wav
+
+        path = tmp_path / "chunk.webm"
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 100)
+
+        assert probe_wav(str(path)) is None
+
+
+class TestStreamingWavAssembler:
+    """Test the streaming WAV assembler."""
+
+    def test_assemble_copies_pcm_in_order(self, tmp_path):
+        """Test that matching chunks are concatenated frame-for-frame."""
+        from app.audio.assembler import StreamingWavAssembler
+
+        frames = [bytes([i]) * 3200 for i in range(5)]
+        paths = [write_wav(str(tmp_path / f"chunk_{i:04d}.wav"), f) for i, f in enumerate(frames)]
+        output_path = str(tmp_path / "assembled_audio.wav")
+
+        # A tiny block size forces many copy iterations per chunk
+        result = StreamingWavAssembler(block_size=100).assemble(paths, output_path)
+
+        params, data = read_wav(output_path)
+        assert data == b"".join(frames)
+        assert params.nchannels == 1
+        assert params.framerate == 16000
+        assert result.chunk_count == 5
+        assert result.data_size == len(data)
+        assert result.decoded_chunks == []
+        assert not os.path.exists(output_path + ".part")
+
+    def test_assemble_skips_missing_and_invalid_chunks(self, tmp_path):
+        """Test that unreadable chunks are skipped rather than failing assembly."""
+        from app.audio.assembler import StreamingWavAssembler
+
+        good = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x02\x00" * 100)
+        missing = str(tmp_path / "chunk_0001.wav")
+        invalid = tmp_path / "chunk_0002.wav"
+        invalid.write_bytes(b"not audio at all")
+        output_path = str(tmp_path / "assembled_audio.wav")
+
+        result = StreamingWavAssembler().assemble([good, missing, str(invalid)], output_path)
+
+        _, data = read_wav(output_path)
+        assert data == b"\x02\x00" * 100
+        assert result.chunk_count == 1
+        assert result.skipped_chunks == [missing, str(invalid)]
+
+    def test_assemble_decodes_mismatched_chunk(self, tmp_path):
+        """Test that a chunk with a different layout is converted via the fallback."""
+        from app.audio.assembler import StreamingWavAssembler
+
+        mono = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x00\x00" * 1600)
+        stereo = write_wav(str(tmp_path / "chunk_0001.wav"), b"\x00\x00" * 3200, channels=2)
+        output_path = str(tmp_path / "assembled_audio.wav")
+
+        result = StreamingWavAssembler().assemble([mono, stereo], output_path)
+
+        params, data = read_wav(output_path)
+        assert params.nchannels == 1
+        assert len(data) == 2 * 1600 * 2
+        assert result.decoded_chunks == [stereo]
+
+    def test_assemble_no_valid_chunks(self, tmp_path):
+        """Test that assembly returns None when nothing could be read."""
+        from app.audio.assembler import StreamingWavAssembler
+
+        output_path = str(tmp_path / "assembled_audio.wav")
+
+        result = StreamingWavAssembler().assemble([str(tmp_path / "missing.wav")], output_path)
+
+        assert result is None
+        assert not os.path.exists(output_path)
+        assert not os.path.exists(output_path + ".part")
+
+
+class TestIncrementalAssembler:
+    """Test incremental assembly during upload."""
+
+    def test_in_order_chunks_are_appended(self, tmp_path):
+        """Test that contiguous chunks are appended as they arrive."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        frames = [bytes([i + 1]) * 320 for i in range(3)]
+        for i, f in enumerate(frames):
+            state = assembler.add_chunk(i, write_wav(str(tmp_path / f"chunk_{i:04d}.wav"), f))
+
+        assert state["next_index"] == 3
+        assert state["pending"] == {}
+        assert state["data_size"] == 960
+
+        output_path = str(tmp_path / "assembled_audio.wav")
+        result = assembler.finalize(output_path, [0, 1, 2])
+
+        _, data = read_wav(output_path)
+        assert data == b"".join(frames)
+        assert result.chunk_count == 3
+        assert not os.path.exists(assembler.partial_path)
+        assert not os.path.exists(assembler.state_path)
+
+    def test_out_of_order_chunks_are_held(self, tmp_path):
+        """Test that a chunk ahead of a gap is held until the gap fills."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        paths = [write_wav(str(tmp_path / f"chunk_{i:04d}.wav"), bytes([i + 1]) * 320) for i in range(3)]
+
+        state = assembler.add_chunk(0, paths[0])
+        state = assembler.add_chunk(2, paths[2])
+        assert state["next_index"] == 1
+        assert list(state["pending"]) == ["2"]
+
+        state = assembler.add_chunk(1, paths[1])
+        assert state["next_index"] == 3
+        assert state["pending"] == {}
+        assert state["appended"] == [0, 1, 2]
+
+    def test_duplicate_chunks_are_ignored(self, tmp_path):
+        """Test that a retried chunk is not appended twice."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        path = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x01\x00" * 160)
+
+        assembler.add_chunk(0, path)
+        state = assembler.add_chunk(0, path)
+
+        assert state["data_size"] == 320
+
+    def test_finalize_appends_chunks_held_behind_gap(self, tmp_path):
+        """Test that held chunks are appended at finish when a chunk never arrived."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        assembler.add_chunk(0, write_wav(str(tmp_path / "chunk_0000.wav"), b"\x01\x00" * 160))
+        assembler.add_chunk(2, write_wav(str(tmp_path / "chunk_0002.wav"), b"\x03\x00" * 160))
+
+        output_path = str(tmp_path / "assembled_audio.wav")
+        result = assembler.finalize(output_path, [0, 2])
+
+        _, data = read_wav(output_path)
+        assert data == b"\x01\x00" * 160 + b"\x03\x00" * 160
+        assert result.chunk_count == 2
+
+    def test_finalize_requires_full_assembly_for_unknown_chunks(self, tmp_path):
+        """Test that finish falls back when a recorded chunk was never seen."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        assembler.add_chunk(0, write_wav(str(tmp_path / "chunk_0000.wav"), b"\x01\x00" * 160))
+
+        assert assembler.finalize(str(tmp_path / "assembled_audio.wav"), [0, 1]) is None
+
+    def test_non_pcm_chunk_disables_incremental_assembly(self, tmp_path):
+        """Test that a chunk that cannot be copied verbatim disables the fast path."""
+        from app.audio.incremental import IncrementalAssembler
+
+        assembler = IncrementalAssembler(str(tmp_path))
+        webm = tmp_path / "chunk_0000.webm"
+        webm.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 100)
+
+        state = assembler.add_chunk(0, str(webm))
+
+        assert state["disabled"] is True
+        assert assembler.finalize(str(tmp_path / "assembled_audio.wav"), [0]) is None
+
+
+WEBM_OPUS_HEADER = (
+    b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81\x01\x42\xf2\x81\x04"
+    b"\x42\xf3\x81\x08\x42\x82\x84webm\x42\x87\x81\x04\x42\x85\x81\x02"
+    + b"\x00" * 40 + b"\x86\x86A_OPUS" + b"\x00" * 100
+)
+
+
+class TestContainerSniffing:
+    """Test container detection from magic bytes."""
+
+    def test_sniff_wav(self, tmp_path):
+        """Test that PCM WAV is detected with its codec."""
+        from app.audio.formats import sniff_file
+
+        info = sniff_file(write_wav(str(tmp_path / "a.bin"), b"\x00\x00" * 10))
+
+        assert info.container == "wav"
+        assert info.codec == "pcm"
+        assert info.extension == ".wav"
+
+    def test_sniff_webm_opus(self):
+        """Test that MediaRecorder WebM/Opus output is detected."""
+        from app.audio.formats import sniff_container
+
+        info = sniff_container(WEBM_OPUS_HEADER, "audio/wav")
+
+        assert info.container == "webm"
+        assert info.codec == "opus"
+        assert info.extension == ".webm"
+
+    def test_sniff_ogg_opus(self):
+        """Test that Ogg/Opus is detected."""
+        from app.audio.formats import sniff_container
+
+        info = sniff_container(b"OggS\x00\x02" + b"\x00" * 22 + b"OpusHead" + b"\x00" * 20)
+
+        assert info.container == "ogg"
+        assert info.codec == "opus"
+
+    def test_sniff_falls_back_to_declared_type(self):
+        """Test that unrecognised bytes use the declared MIME type, then unknown."""
+        from app.audio.formats import sniff_container
+
+        assert sniff_container(b"fake audio data", "audio/webm;codecs=opus").extension == ".webm"
+        assert sniff_container(b"fake audio data").container == "unknown"
+
+    def test_mime_type_for_path(self):
+        """Test upload MIME types derived from the file extension."""
+        from app.audio.formats import mime_type_for_path
+
+        assert mime_type_for_path("/a/assembled_audio.wav") == "audio/wav"
+        assert mime_type_for_path("/a/assembled_audio.webm") == "audio/webm"
+        assert mime_type_for_path("/a/payload.flac") == "audio/flac"
+
+
+class TestContainerAwareAssembler:
+    """Test assembly strategy selection."""
+
+    def test_pcm_strategy_for_wav_chunks(self, tmp_path):
+        """Test that WAV chunks are concatenated as PCM."""
+        from app.audio.assembler import ContainerAwareAssembler
+
+        paths = [write_wav(str(tmp_path / f"chunk_{i:04d}.wav"), b"\x01\x00" * 10) for i in range(2)]
+
+        result = ContainerAwareAssembler().assemble(paths, str(tmp_path / "assembled_audio"))
+
+        assert result.strategy == "pcm"
+        assert result.output_path.endswith("assembled_audio.wav")
+
+    def test_stream_copy_strategy_for_webm_opus(self, tmp_path):
+        """Test that matching WebM/Opus chunks are remuxed without decoding."""
+        from app.audio.assembler import ContainerAwareAssembler
+
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"chunk_{i:04d}.webm"
+            path.write_bytes(WEBM_OPUS_HEADER)
+            paths.append(str(path))
+
+        def fake_stream_copy(chunk_paths, output_path):
+            with open(output_path, "wb") as f:
+                f.write(b"".join(open(p, "rb").read() for p in chunk_paths))
+            return True
+
+        with patch("app.audio.assembler.ffmpeg_available", return_value=True), \
+                patch("app.audio.assembler.stream_copy_concat", side_effect=fake_stream_copy) as copy, \
+                patch("app.audio.assembler.decode_chunk_to_pcm") as decode:
+            result = ContainerAwareAssembler().assemble(paths, str(tmp_path / "assembled_audio"))
+
+        copy.assert_called_once()
+        decode.assert_not_called()
+        assert result.strategy == "stream_copy"
+        assert result.container == "webm"
+        assert result.output_path.endswith("assembled_audio.webm")
+        assert result.chunk_count == 3
+
+    def test_decode_strategy_for_mixed_containers(self, tmp_path):
+        """Test that mixed containers fall back to decoding."""
+        from app.audio.assembler import ContainerAwareAssembler
+
+        wav = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x01\x00" * 10)
+        webm = tmp_path / "chunk_0001.webm"
+        webm.write_bytes(WEBM_OPUS_HEADER)
+
+        with patch("app.audio.assembler.ffmpeg_available", return_value=True):
+            strategy = ContainerAwareAssembler().plan([wav, str(webm)])
+
+        assert strategy == "decode"
+
+    def test_stream_copy_requires_ffmpeg(self, tmp_path):
+        """Test that stream copy is not chosen without ffmpeg."""
+        from app.audio.assembler import ContainerAwareAssembler
+
+        webm = tmp_path / "chunk_0000.webm"
+        webm.write_bytes(WEBM_OPUS_HEADER)
+
+        with patch("app.audio.assembler.ffmpeg_available", return_value=False):
+            assert ContainerAwareAssembler().plan([str(webm)]) == "decode"
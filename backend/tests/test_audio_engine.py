@@ -0,0 +1,321 @@
+"""
+Tests for the audio processing engine and file transforms.
+"""
+import asyncio
+import os
+import time
+import pytest
+
+from tests.test_audio_assembler import write_wav, read_wav
+
+
+class TestResample:
+    """Test streaming resampling."""
+
+    def test_resample_downmixes_and_resamples(self, tmp_path):
+        """Test that a stereo 48 kHz file becomes mono 16 kHz."""
+        from app.audio.transforms import resample_wav
+
+        source = write_wav(str(tmp_path / "in.wav"), b"\x10\x00\x20\x00" * 48000, channels=2, sample_rate=48000)
+        output_path = str(tmp_path / "out.wav")
+
+        # A small block size exercises resampler state carried across blocks
+        info = resample_wav(source, output_path, sample_rate=16000, channels=1, block_size=4096)
+
+        params, data = read_wav(output_path)
+        assert params.nchannels == 1
+        assert params.framerate == 16000
+        assert params.sampwidth == 2
+        assert abs(params.nframes - 16000) <= 2
+        assert info.data_size == len(data)
+
+    def test_resample_keeps_matching_format(self, tmp_path):
+        """Test that resampling to the source format copies the samples unchanged."""
+        from app.audio.transforms import resample_wav
+
+        frames = bytes(range(256)) * 10
+        source = write_wav(str(tmp_path / "in.wav"), frames, sample_rate=16000)
+        output_path = str(tmp_path / "out.wav")
+
+        resample_wav(source, output_path, sample_rate=16000, channels=1)
+
+        _, data = read_wav(output_path)
+        assert data == frames
+
+
+class TestAudioEngine:
+    """Test the audio engine task API."""
+
+    @pytest.mark.asyncio
+    async def test_thread_fallback_concat(self, tmp_path):
+        """Test concatenation through the in-process fallback executor."""
+        from app.audio.engine import AudioEngine
+
+        engine = AudioEngine(max_workers=0)
+        paths = [write_wav(str(tmp_path / f"chunk_{i}.wav"), bytes([i]) * 640) for i in range(3)]
+        try:
+            result = await engine.concat(paths, str(tmp_path / "assembled_audio"))
+        finally:
+            engine.shutdown()
+
+        assert result.chunk_count == 3
+        assert result.strategy == "pcm"
+        _, data = read_wav(result.output_path)
+        assert data == b"".join(bytes([i]) * 640 for i in range(3))
+
+    @pytest.mark.asyncio
+    @pytest.mark.slow
+    async def test_process_pool_keeps_event_loop_responsive(self, tmp_path):
+        """Test that concurrent assemblies in worker processes do not stall the loop."""
+        from app.audio.engine import AudioEngine
+
+        engine = AudioEngine(max_workers=2, block_size=4096)
+        chunk = write_wav(str(tmp_path / "chunk.wav"), b"\x01\x00" * 16000 * 30)
+
+        gaps = []
+
+        async def heartbeat(stop):
+            last = time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(heartbeat(stop))
+        try:
+            # Warm the pool so worker start-up is not part of the measurement
+            await engine.concat([chunk], str(tmp_path / "warmup"))
+            gaps.clear()
+            results = await asyncio.gather(*[
+                engine.concat([chunk] * 20, str(tmp_path / f"assembled_{i}"))
+                for i in range(3)
+            ])
+        finally:
+            stop.set()
+            await ticker
+            engine.shutdown()
+
+        assert all(result.chunk_count == 20 for result in results)
+        assert gaps
+        assert max(gaps) < 0.25
+
+
+class TestTranscriptionEncoder:
+    """Test the transcription encoding profile."""
+
+    def test_choose_format_prefers_flac(self):
+        """Test that the first preferred format the provider accepts is chosen."""
+        from app.audio.encoding import TranscriptionEncodingProfile
+
+        profile = TranscriptionEncodingProfile()
+
+        assert profile.choose_format(['.wav', '.mp3', '.ogg', '.flac']) == "flac"
+        assert profile.choose_format(['.wav', '.ogg']) == "opus"
+        assert profile.choose_format(['.wav']) is None
+
+    @pytest.mark.asyncio
+    async def test_prepare_without_ffmpeg_uploads_normalized_pcm(self, tmp_path):
+        """Test that the 16 kHz mono PCM is used when no encoder is available."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+
+        engine = AudioEngine(max_workers=0)
+        assembled = write_wav(
+            str(tmp_path / "assembled_audio.wav"), b"\x10\x00\x20\x00" * 48000, channels=2, sample_rate=48000
+        )
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                encoded = await TranscriptionEncoder(engine).prepare(assembled, ['.wav', '.flac'])
+        finally:
+            engine.shutdown()
+
+        params, _ = read_wav(encoded.path)
+        assert encoded.format == "wav"
+        assert encoded.path.endswith("assembled_audio.pcm.wav")
+        assert params.nchannels == 1
+        assert params.framerate == 16000
+        assert encoded.original_bytes == 48000 * 4 + 44
+        assert encoded.compression_ratio == pytest.approx(6.0, rel=0.01)
+        assert encoded.duration_seconds == pytest.approx(1.0, abs=0.01)
+
+        encoded.cleanup()
+        assert not os.path.exists(encoded.path)
+        assert os.path.exists(assembled)
+
+    @pytest.mark.asyncio
+    async def test_prepare_encodes_supported_format(self, tmp_path):
+        """Test that the payload is encoded with the chosen codec."""
+        from unittest.mock import AsyncMock, patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.core.metrics import metrics
+
+        engine = AudioEngine(max_workers=0)
+        assembled = write_wav(str(tmp_path / "assembled_audio.wav"), b"\x00\x00" * 16000)
+
+        async def fake_encode(input_path, output_path, format, **kwargs):
+            with open(output_path, "wb") as f:
+                f.write(b"fLaC" + b"\x00" * 96)
+            return 100
+
+        metrics.reset()
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=True), \
+                    patch.object(engine, "encode", AsyncMock(side_effect=fake_encode)) as encode:
+                encoded = await TranscriptionEncoder(engine).prepare(assembled, ['.wav', '.ogg', '.flac'])
+        finally:
+            engine.shutdown()
+
+        assert encoded.format == "flac"
+        assert encoded.path.endswith(".flac")
+        assert encoded.encoded_bytes == 100
+        assert encode.call_args.kwargs["codec"] == "flac"
+        assert encoded.intermediate_paths[0].endswith(".pcm.wav")
+        assert metrics.snapshot()["counters"]["transcription_encoding.encoded_bytes"] == 100
+
+        encoded.cleanup()
+        assert not any(os.path.exists(path) for path in [encoded.path] + encoded.intermediate_paths)
+
+
+def speech_like(seconds, sample_rate=16000, amplitude=8000):
+    """Build 16-bit mono PCM of a tone standing in for speech."""
+    import numpy as np
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+def silence(seconds, sample_rate=16000):
+    """Build 16-bit mono PCM of low-level noise."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    return rng.integers(-20, 20, int(seconds * sample_rate)).astype("<i2").tobytes()
+
+
+class TestVad:
+    """Test silence trimming."""
+
+    def test_trim_removes_long_silence(self, tmp_path):
+        """Test that long pauses are shortened and the offset map points back to the original."""
+        from app.audio.vad import VadConfig, trim_silence
+
+        # Durations are whole 30 ms frames so the cut points are exact
+        frames = speech_like(0.99) + silence(3.0) + speech_like(0.99)
+        source = write_wav(str(tmp_path / "in.wav"), frames)
+        config = VadConfig(hangover_ms=0, keep_silence_seconds=0.24)
+
+        result = trim_silence(source, str(tmp_path / "out.wav"), config)
+
+        params, data = read_wav(result.output_path)
+        assert params.framerate == 16000
+        assert result.original_seconds == pytest.approx(4.98)
+        assert result.removed_seconds == pytest.approx(3.0 - 2 * 0.24)
+        assert len(data) == params.nframes * 2
+        assert data[:31680] == frames[:31680]
+        # The second tone starts after 0.24 s of padding on each side of the cut
+        assert result.offset_map.to_original(1.47 + 0.5) == pytest.approx(4.49)
+        assert result.offset_map.to_original(0.5) == pytest.approx(0.5)
+
+    def test_short_pauses_are_kept(self, tmp_path):
+        """Test that pauses shorter than the minimum silence are left alone."""
+        from app.audio.vad import trim_silence
+
+        frames = speech_like(1.0) + silence(0.5) + speech_like(1.0)
+        source = write_wav(str(tmp_path / "in.wav"), frames)
+
+        result = trim_silence(source, str(tmp_path / "out.wav"))
+
+        _, data = read_wav(result.output_path)
+        assert data == frames
+        assert result.removed_seconds == pytest.approx(0.0)
+
+    def test_all_silence_keeps_nothing(self, tmp_path):
+        """Test that a silent recording is trimmed to nothing."""
+        from app.audio.vad import trim_silence
+
+        source = write_wav(str(tmp_path / "in.wav"), silence(3.0))
+
+        result = trim_silence(source, str(tmp_path / "out.wav"))
+
+        assert result.kept_seconds == 0
+        assert result.spans == []
+
+    def test_all_silence_with_partial_frame_has_no_spans(self, tmp_path):
+        """Test that the partial frame kept at the end does not count as speech."""
+        from app.audio.vad import trim_silence
+
+        # 3.01 s is not a whole number of 30 ms frames
+        source = write_wav(str(tmp_path / "in.wav"), silence(3.01))
+
+        result = trim_silence(source, str(tmp_path / "out.wav"))
+
+        assert result.kept_seconds > 0
+        assert result.spans == []
+
+    def test_offset_map_round_trip(self, tmp_path):
+        """Test that offset maps survive being saved and loaded."""
+        from app.audio.vad import OffsetMap
+
+        offset_map = OffsetMap(segments=[(0.0, 0.0, 1.25), (1.25, 3.75, 2.0)])
+        path = str(tmp_path / "offsets.json")
+        offset_map.save(path)
+
+        loaded = OffsetMap.load(path)
+        assert loaded == offset_map
+        assert loaded.to_original(2.0) == pytest.approx(4.5)
+        assert loaded.to_original(10.0) == pytest.approx(5.75)
+
+    @pytest.mark.asyncio
+    async def test_encoder_trims_and_saves_offsets(self, tmp_path):
+        """Test that the encoder uploads trimmed audio and keeps the offset map."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.audio.vad import VadConfig
+
+        engine = AudioEngine(max_workers=0)
+        assembled = write_wav(
+            str(tmp_path / "assembled_audio.wav"), speech_like(1.0) + silence(4.0) + speech_like(1.0)
+        )
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                encoded = await TranscriptionEncoder(engine, vad_config=VadConfig()).prepare(assembled, ['.wav'])
+        finally:
+            engine.shutdown()
+
+        assert encoded.path.endswith("assembled_audio.vad.wav")
+        assert encoded.vad.removed_seconds > 3.0
+        assert encoded.duration_seconds == pytest.approx(encoded.vad.kept_seconds)
+        assert os.path.exists(str(tmp_path / "assembled_audio.offsets.json"))
+
+        encoded.cleanup()
+        assert not os.path.exists(str(tmp_path / "assembled_audio.pcm.wav"))
+
+    @pytest.mark.asyncio
+    async def test_encoder_sends_untrimmed_audio_without_speech(self, tmp_path):
+        """Test that a recording with no detected speech is not dropped."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.audio.vad import VadConfig
+
+        engine = AudioEngine(max_workers=0)
+        # Not a whole number of frames, so the partial frame at the end survives trimming
+        assembled = write_wav(str(tmp_path / "assembled_audio.wav"), silence(3.01))
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                encoded = await TranscriptionEncoder(engine, vad_config=VadConfig()).prepare(assembled, ['.wav'])
+        finally:
+            engine.shutdown()
+
+        assert encoded.vad is None
+        assert encoded.path.endswith("assembled_audio.pcm.wav")
+        assert not os.path.exists(str(tmp_path / "assembled_audio.vad.wav"))
+        encoded.cleanup()
@@ -0,0 +1,335 @@
+"""
+Tests for streaming chunk uploads and their size limit.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_transcription_jobs import create_recording
+
+
+def wav_bytes(payload_size):
+    """A WAV header followed by ``payload_size`` bytes of silence."""
+    from app.audio.wav import WavFormat, write_wav_header
+
+    header = io.BytesIO()
+    write_wav_header(header, WavFormat(channels=1, sample_rate=16000, sample_width=2), payload_size)
+    return header.getvalue() + b"\x00" * payload_size
+
+
+async def blocks_of(data, size):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+class TestChunkWriter:
+    """Test writing a chunk as it streams in."""
+
+    def test_stores_chunk_with_size_and_checksum(self, tmp_path):
+        """Test that a streamed chunk is staged, then published under its sniffed container name."""
+        from app.audio.chunk_writer import publish_chunk, store_chunk
+
+        data = wav_bytes(200_000)
+
+        stored = asyncio.run(store_chunk(blocks_of(data, 1000), str(tmp_path), 3, max_bytes=1_000_000))
+
+        assert stored.path == os.path.join(str(tmp_path), "chunk_0003.wav")
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert stored.container_info.container == "wav"
+        assert not os.path.exists(stored.path)
+
+        publish_chunk(stored)
+
+        assert os.listdir(tmp_path) == ["chunk_0003.wav"]
+
+    def test_rejects_oversized_chunk_without_leaving_files(self, tmp_path):
+        """Test that the limit stops the upload at the first block past it."""
+        from app.audio.chunk_writer import ChunkTooLargeError, store_chunk
+
+        read = []
+
+        async def body():
+            async for block in blocks_of(wav_bytes(100_000), 1000):
+                read.append(block)
+                yield block
+
+        with pytest.raises(ChunkTooLargeError):
+            asyncio.run(store_chunk(body(), str(tmp_path), 0, max_bytes=10_000))
+
+        assert len(read) == 11
+        assert os.listdir(tmp_path) == []
+
+
+class TestChunkUploadLimitMiddleware:
+    """Test rejecting oversized bodies while they are received."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI, Request
+        from app.core.upload_limits import ChunkUploadLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+
+        app = FastAPI()
+        app.add_middleware(ChunkUploadLimitMiddleware, max_bytes=1024 * 1024)
+
+        @app.post("/recordings/{recording_id}/chunks")
+        async def upload(request: Request):
+            return {"size": len(await request.body())}
+
+        with TestClient(app) as client:
+            yield client, 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+
+    def test_rejects_large_content_length_up_front(self, client):
+        """Test that a declared oversized body is refused."""
+        client, limit = client
+
+        response = client.post("/recordings/rec/chunks", content=b"x" * (limit + 1))
+
+        assert response.status_code == 413
+        assert response.json() == {"detail": "Chunk exceeds the maximum size of 1 MB"}
+
+    def test_rejects_streamed_body_past_the_limit(self, client):
+        """Test that a body without Content-Length is cut off at the limit."""
+        client, limit = client
+
+        def body():
+            for _ in range(limit // 65536 + 2):
+                yield b"x" * 65536
+
+        assert client.post("/recordings/rec/chunks", content=body()).status_code == 413
+        assert client.post("/recordings/rec/chunks", content=b"x" * 1000).json() == {"size": 1000}
+
+
+class TestUploadChunkEndpoint:
+    """Test POST /recordings/{id}/chunks and PUT /recordings/{id}/chunks/{index}."""
+
+    @pytest.fixture
+    def local_client(self, test_db, tmp_path, monkeypatch):
+        # The trusted host middleware only admits localhost
+        from app.core.config import settings
+        from main import app
+
+        monkeypatch.setattr(settings, "audio_storage_path", str(tmp_path))
+        monkeypatch.setattr(settings, "max_chunk_size_mb", 1)
+        monkeypatch.setattr(settings, "live_transcription_enabled", False)
+        with TestClient(app, base_url="http://localhost") as client:
+            yield client
+
+    @pytest.fixture
+    def active_recording(self, test_db):
+        from app.core.security import create_access_token
+        from app.models.recording import RecordingStatus
+
+        recording = create_recording(test_db)
+        recording.status = RecordingStatus.ACTIVE
+        test_db.commit()
+        return recording.id, {"Authorization": f"Bearer {create_access_token({'sub': recording.user_id})}"}
+
+    def test_upload_reports_size_and_checksum(self, local_client, active_recording, tmp_path):
+        """Test that the response carries the stored size and SHA-256."""
+        recording_id, headers = active_recording
+        data = wav_bytes(300_000)
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks", headers=headers,
+            data={"chunk_index": "0"}, files={"audio_chunk": ("chunk.wav", data, "audio/wav")}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["file_size"] == len(data)
+        assert response.json()["sha256"] == hashlib.sha256(data).hexdigest()
+        with open(tmp_path / recording_id / "chunk_0000.wav", "rb") as f:
+            assert f.read() == data
+
+    def test_oversized_chunk_is_rejected(self, local_client, active_recording, tmp_path):
+        """Test that a chunk over max_chunk_size_mb gets 413 and is not stored."""
+        recording_id, headers = active_recording
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks", headers=headers,
+            data={"chunk_index": "0"}, files={"audio_chunk": ("chunk.wav", wav_bytes(1024 * 1024), "audio/wav")}
+        )
+
+        assert response.status_code == 413
+        assert not (tmp_path / recording_id / "chunk_0000.wav").exists()
+
+    def test_raw_body_upload(self, local_client, active_recording, tmp_path, test_db):
+        """Test that PUT stores the raw body under the chunk index from the path."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, headers = active_recording
+        data = wav_bytes(300_000)
+
+        response = local_client.put(
+            f"/recordings/{recording_id}/chunks/2", headers={**headers, "Content-Type": "audio/wav"},
+            params={"duration_seconds": 9.4}, content=data
+        )
+
+        assert response.status_code == 200
+        assert response.json()["chunk_index"] == 2
+        assert response.json()["sha256"] == hashlib.sha256(data).hexdigest()
+        chunk = test_db.query(RecordingChunk).filter(RecordingChunk.id == response.json()["chunk_id"]).one()
+        assert chunk.duration_seconds == 9.4
+        with open(tmp_path / recording_id / "chunk_0002.wav", "rb") as f:
+            assert f.read() == data
+
+    def test_raw_body_over_limit_is_rejected(self, local_client, active_recording, tmp_path):
+        """Test that the raw body is held to the same limit."""
+        recording_id, headers = active_recording
+
+        response = local_client.put(
+            f"/recordings/{recording_id}/chunks/0", headers=headers, content=wav_bytes(1024 * 1024)
+        )
+
+        assert response.status_code == 413
+        assert not (tmp_path / recording_id / "chunk_0000.wav").exists()
+
+    def test_batch_upload_stores_every_chunk(self, local_client, active_recording, tmp_path, test_db):
+        """Test that a batch stores all chunks and reports them in index order."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, headers = active_recording
+        chunks = {index: wav_bytes(1000 * (index + 1)) for index in (4, 2, 3)}
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks/batch", headers=headers,
+            data={"chunk_indexes": ["4", "2", "3"], "durations_seconds": ["3.0", "1.0", "2.0"]},
+            files=[("audio_chunks", (f"chunk{index}.wav", data, "audio/wav")) for index, data in chunks.items()]
+        )
+
+        assert response.status_code == 200
+        reported = response.json()["chunks"]
+        assert [chunk["chunk_index"] for chunk in reported] == [2, 3, 4]
+        assert [chunk["sha256"] for chunk in reported] == [hashlib.sha256(chunks[i]).hexdigest() for i in (2, 3, 4)]
+        rows = test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).all()
+        assert sorted((row.chunk_index, row.duration_seconds) for row in rows) == [(2, 1.0), (3, 2.0), (4, 3.0)]
+        for index, data in chunks.items():
+            with open(tmp_path / recording_id / f"chunk_{index:04d}.wav", "rb") as f:
+                assert f.read() == data
+
+    def test_batch_with_oversized_chunk_adds_nothing(self, local_client, active_recording, tmp_path, test_db):
+        """Test that one chunk over the limit fails the whole batch and leaves no files."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, headers = active_recording
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks/batch", headers=headers,
+            data={"chunk_indexes": ["0", "1"]},
+            files=[
+                ("audio_chunks", ("chunk0.wav", wav_bytes(1000), "audio/wav")),
+                ("audio_chunks", ("chunk1.wav", wav_bytes(1024 * 1024), "audio/wav")),
+            ]
+        )
+
+        assert response.status_code == 413
+        assert test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).count() == 0
+        assert os.listdir(tmp_path / recording_id) == []
+
+    def test_batch_rejects_mismatched_fields(self, local_client, active_recording):
+        """Test that every chunk needs an index."""
+        recording_id, headers = active_recording
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks/batch", headers=headers,
+            data={"chunk_indexes": ["0"]},
+            files=[("audio_chunks", (f"chunk{i}.wav", wav_bytes(100), "audio/wav")) for i in range(2)]
+        )
+
+        assert response.status_code == 400
+
+    def test_identical_retry_returns_the_stored_chunk(self, local_client, active_recording, tmp_path, test_db):
+        """Test that retrying an upload is a no-op that answers with the first one."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, headers = active_recording
+        data = wav_bytes(10_000)
+        url = f"/recordings/{recording_id}/chunks/0"
+
+        first = local_client.put(url, headers=headers, content=data)
+        stored_at = os.stat(tmp_path / recording_id / "chunk_0000.wav").st_mtime_ns
+        retry = local_client.put(url, headers=headers, content=data)
+
+        assert retry.status_code == 200
+        assert retry.json()["chunk_id"] == first.json()["chunk_id"]
+        assert retry.json()["message"] == "Chunk already uploaded"
+        assert test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).count() == 1
+        assert os.stat(tmp_path / recording_id / "chunk_0000.wav").st_mtime_ns == stored_at
+
+    def test_conflicting_retry_is_rejected(self, local_client, active_recording, tmp_path):
+        """Test that different content for a stored index gets 409 and leaves the chunk alone."""
+        recording_id, headers = active_recording
+        data = wav_bytes(10_000)
+        url = f"/recordings/{recording_id}/chunks/0"
+
+        local_client.put(url, headers=headers, content=data)
+        response = local_client.put(url, headers=headers, content=wav_bytes(20_000))
+
+        assert response.status_code == 409
+        with open(tmp_path / recording_id / "chunk_0000.wav", "rb") as f:
+            assert f.read() == data
+        assert [name for name in os.listdir(tmp_path / recording_id) if name.endswith(".part")] == []
+
+    def test_batch_skips_chunks_already_stored(self, local_client, active_recording, test_db):
+        """Test that a catch-up batch may repeat chunks the server already has."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, headers = active_recording
+        first = wav_bytes(1000)
+        stored = local_client.put(f"/recordings/{recording_id}/chunks/0", headers=headers, content=first)
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks/batch", headers=headers,
+            data={"chunk_indexes": ["0", "1"]},
+            files=[
+                ("audio_chunks", ("chunk0.wav", first, "audio/wav")),
+                ("audio_chunks", ("chunk1.wav", wav_bytes(2000), "audio/wav")),
+            ]
+        )
+
+        assert response.status_code == 200
+        assert response.json()["chunks"][0]["chunk_id"] == stored.json()["chunk_id"]
+        assert test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).count() == 2
+
+
+    def test_batch_failing_insert_leaves_no_files(self, local_client, active_recording, tmp_path, monkeypatch):
+        """Test that a database error on the bulk insert drops every staged file."""
+        from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+
+        recording_id, headers = active_recording
+
+        def fail(self, recording_id, chunks):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(MySQLRecordingRepository, "add_chunks", fail)
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/chunks/batch", headers=headers,
+            data={"chunk_indexes": ["0", "1"]},
+            files=[("audio_chunks", (f"chunk{i}.wav", wav_bytes(1000), "audio/wav")) for i in range(2)]
+        )
+
+        assert response.status_code == 500
+        assert os.listdir(tmp_path / recording_id) == []
+
+class TestChunkRepository:
+    """Test the one-row-per-chunk-index rule."""
+
+    def test_second_row_for_an_index_is_refused(self, test_db):
+        """Test that the unique (recording_id, chunk_index) index refuses a duplicate."""
+        from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+
+        recording = create_recording(test_db)
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(recording.id, 0, "/tmp/chunk_0000.wav", sha256="a" * 64)
+
+        with pytest.raises(ValueError):
+            repo.add_chunk(recording.id, 0, "/tmp/chunk_0000.wav", sha256="b" * 64)
+        with pytest.raises(ValueError):
+            repo.add_chunks(recording.id, [{"chunk_index": 0, "audio_blob_path": "/tmp/chunk_0000.wav"}])
+
+        assert repo.get_chunk(recording.id, 0).sha256 == "a" * 64
+        assert len(repo.get_chunks(recording.id)) == 1
@@ -0,0 +1,80 @@
+"""
+Tests for the local fake RequestYAI server used by the benchmarks.
+"""
+import pytest
+
+
+class TestFakeRequestYaiServer:
+    """Test the fake API through the real provider."""
+
+    @pytest.mark.asyncio
+    async def test_transcripts_are_deterministic_and_scale_with_length(self, tmp_path):
+        """Test that identical audio gets identical text and longer audio more words."""
+        from app.llm.requestyai_provider import RequestYaiProvider
+        from benchmarks.fake_requestyai_server import FakeProviderProfile, FakeRequestYaiServer
+        from benchmarks.http_client_pool import write_sample
+
+        short, long = str(tmp_path / "short.wav"), str(tmp_path / "long.wav")
+        write_sample(short, 2.0)
+        write_sample(long, 8.0)
+
+        async with FakeRequestYaiServer(FakeProviderProfile(base_latency=0, latency_per_audio_second=0)) as url:
+            provider = RequestYaiProvider(api_key="fake", base_url=url)
+            try:
+                first = await provider.transcribe_audio_async(short)
+                second = await provider.transcribe_audio_async(short)
+                longer = await provider.transcribe_audio_async(long)
+            finally:
+                await provider.aclose()
+
+        assert first == second
+        assert len(first.split()) == 5
+        assert len(longer.split()) == 20
+
+    @pytest.mark.asyncio
+    async def test_injected_rate_limits_carry_retry_after(self, temp_audio_file):
+        """Test that injected 429s reach the provider as ProviderError with Retry-After."""
+        from app.llm.interface import ProviderError
+        from app.llm.requestyai_provider import RequestYaiProvider
+        from benchmarks.fake_requestyai_server import FakeProviderProfile, FakeRequestYaiServer
+
+        profile = FakeProviderProfile(base_latency=0, rate_limit_error_rate=1.0, retry_after_seconds=3)
+        server = FakeRequestYaiServer(profile)
+        url = await server.start()
+        provider = RequestYaiProvider(api_key="fake", base_url=url)
+        try:
+            with pytest.raises(ProviderError) as exc_info:
+                await provider.transcribe_audio_async(temp_audio_file)
+        finally:
+            await provider.aclose()
+            await server.stop()
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after == 3.0
+        assert server.stats["injected_rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_rejects_excess_requests(self, tmp_path):
+        """Test that requests over the server's concurrency cap are throttled."""
+        import asyncio
+        from app.llm.requestyai_provider import RequestYaiProvider
+        from benchmarks.fake_requestyai_server import FakeProviderProfile, FakeRequestYaiServer
+        from benchmarks.http_client_pool import write_sample
+
+        audio_path = str(tmp_path / "sample.wav")
+        write_sample(audio_path, 1.0)
+        profile = FakeProviderProfile(base_latency=0.2, latency_per_audio_second=0, jitter="none", max_concurrency=2)
+        server = FakeRequestYaiServer(profile)
+        url = await server.start()
+        provider = RequestYaiProvider(api_key="fake", base_url=url)
+        try:
+            results = await asyncio.gather(
+                *[provider.transcribe_audio_async(audio_path) for _ in range(5)], return_exceptions=True
+            )
+        finally:
+            await provider.aclose()
+            await server.stop()
+
+        assert sum(isinstance(result, str) for result in results) == 2
+        assert server.stats["peak_in_flight"] == 2
+        assert server.stats["rate_limited"] == 3
@@ -0,0 +1,182 @@
+"""
+Tests for draining in-flight work on shutdown.
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from tests.test_transcription_jobs import create_recording, empty_queue  # noqa: F401  (autouse)
+
+
+class TestDrainCoordinator:
+    """Test tracking and draining in-flight work."""
+
+    def test_wait_idle_waits_for_requests_and_tasks(self):
+        """Test that draining waits until requests and tasks finish."""
+        from app.core.lifecycle import DrainCoordinator
+
+        drain = DrainCoordinator()
+
+        async def run():
+            finished = []
+
+            async def background():
+                await asyncio.sleep(0.05)
+                finished.append("task")
+
+            drain.track(asyncio.create_task(background()))
+            with drain.request():
+                drain.begin_drain()
+                assert drain.in_flight == 2
+                assert not await drain.wait_idle(timeout=0.01)
+            drained = await drain.wait_idle(timeout=1)
+            return drained, finished
+
+        assert asyncio.run(run()) == (True, ["task"])
+        assert drain.draining
+
+    def test_cancel_remaining_after_timeout(self):
+        """Test that tasks outliving the drain timeout are cancelled."""
+        from app.core.lifecycle import DrainCoordinator
+
+        drain = DrainCoordinator()
+
+        async def run():
+            task = drain.track(asyncio.create_task(asyncio.sleep(60)))
+            drain.begin_drain()
+            assert not await drain.wait_idle(timeout=0.05)
+            assert await drain.cancel_remaining() == 1
+            return task.cancelled(), drain.in_flight
+
+        assert asyncio.run(run()) == (True, 0)
+
+    def test_drain_callbacks_run_once(self):
+        """Test that drain callbacks run on the first begin_drain only."""
+        from app.core.lifecycle import DrainCoordinator
+
+        drain = DrainCoordinator()
+        calls = []
+        drain.on_drain(lambda: calls.append("drained"))
+
+        drain.begin_drain()
+        drain.begin_drain()
+
+        assert calls == ["drained"]
+
+
+class TestDrainMiddleware:
+    """Test refusing new writes while draining."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI
+        from app.core.lifecycle import DrainCoordinator, DrainMiddleware
+
+        app = FastAPI()
+        drain = DrainCoordinator()
+        app.add_middleware(DrainMiddleware, coordinator=drain)
+
+        @app.get("/items")
+        async def read_items():
+            return {"in_flight": drain.in_flight}
+
+        @app.post("/items")
+        async def create_item():
+            return {"in_flight": drain.in_flight}
+
+        with TestClient(app) as client:
+            yield client, drain
+
+    def test_counts_writes_in_flight(self, client):
+        """Test that writes count as in flight while they run."""
+        client, drain = client
+
+        assert client.post("/items").json() == {"in_flight": 1}
+        assert client.get("/items").json() == {"in_flight": 0}
+        assert drain.in_flight == 0
+
+    def test_rejects_writes_while_draining(self, client):
+        """Test that writes get 503 with Retry-After while reads are still served."""
+        client, drain = client
+        drain.begin_drain()
+
+        rejected = client.post("/items")
+
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "5"
+        assert client.get("/items").status_code == 200
+
+
+class TestWorkerDrain:
+    """Test that a stopped worker hands unfinished jobs back."""
+
+    def test_unfinished_job_is_released_without_using_an_attempt(self, test_db, test_engine):
+        """Test that a job still running after the drain timeout goes back to the queue."""
+        from app.models.transcription_job import TranscriptionJobStatus
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        from app.workers.transcription_worker import TranscriptionWorker
+
+        class SlowService:
+            async def transcribe_recording(self, recording_id, on_progress=None):
+                await asyncio.sleep(60)
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        job = jobs.enqueue(recording.id)
+        worker = TranscriptionWorker(
+            session_factory=sessionmaker(bind=test_engine), worker_id="draining-worker",
+            poll_seconds=0.01, drain_timeout=0.05, service_factory=lambda db: SlowService()
+        )
+
+        async def run():
+            runner = asyncio.create_task(worker.run())
+            while not jobs.get_job(job.id).lease_owner:
+                test_db.expire_all()
+                await asyncio.sleep(0.01)
+            worker.stop()
+            await asyncio.wait_for(runner, timeout=5)
+
+        asyncio.run(run())
+
+        test_db.expire_all()
+        released = jobs.get_job(job.id)
+        assert released.status == TranscriptionJobStatus.QUEUED
+        assert released.attempts == 0
+        assert released.lease_owner is None
+
+    def test_release_requires_the_lease(self, test_db):
+        """Test that a worker cannot release a job it no longer holds."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        jobs.enqueue(create_recording(test_db).id)
+        job = jobs.claim("worker-a", lease_seconds=60)
+
+        assert not jobs.release(job.id, "worker-b")
+        assert jobs.release(job.id, "worker-a")
+
+
+class TestEventStreamDrain:
+    """Test ending event streams on shutdown."""
+
+    def test_close_all_ends_open_streams(self):
+        """Test that closing the broker ends a stream without a final event."""
+        from app.services.recording_events import RecordingEventBroker, recording_event, stream_recording_events
+
+        broker = RecordingEventBroker()
+
+        async def run():
+            stream = stream_recording_events(recording_event("rec", "running", 20.0), broker)
+            messages = [await stream.__anext__(), await stream.__anext__()]
+            broker.close_all()
+
+            async def rest():
+                return [message async for message in stream]
+
+            return messages + await asyncio.wait_for(rest(), timeout=1)
+
+        messages = asyncio.run(run())
+
+        assert len(messages) == 2
+        assert broker.subscribed_recording_ids() == []
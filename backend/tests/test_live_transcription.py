@@ -0,0 +1,227 @@
+"""
+Tests for live transcription of chunks during an active recording.
+"""
+import asyncio
+import os
+import uuid
+import pytest
+from unittest.mock import MagicMock, patch
+
+from tests.test_audio_assembler import write_wav, read_wav
+
+
+class ScriptedProvider:
+    """Provider returning a fixed transcript per call, in order."""
+
+    def __init__(self, transcripts):
+        self.transcripts = list(transcripts)
+        self.paths = []
+
+    async def transcribe_audio_async(self, audio_path):
+        self.paths.append(audio_path)
+        return self.transcripts.pop(0)
+
+    def get_supported_formats(self):
+        return ['.wav']
+
+
+def create_recording_with_chunks(test_db, directory, count, texts=None):
+    """Create a recording with ``count`` one-second PCM chunks."""
+    from app.models import User
+    from app.models.recording import Recording, RecordingStatus
+    from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+
+    repo = MySQLRecordingRepository(test_db)
+    user = User(google_id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", display_name="Live User")
+    test_db.add(user)
+    test_db.commit()
+    recording = Recording(user_id=user.id, status=RecordingStatus.ACTIVE)
+    test_db.add(recording)
+    test_db.commit()
+
+    recording_dir = directory / recording.id
+    recording_dir.mkdir()
+    for index in range(count):
+        path = write_wav(str(recording_dir / f"chunk_{index:04d}.wav"), bytes([index + 1, 0]) * 16000)
+        chunk = repo.add_chunk(recording.id, index, path, duration_seconds=1.0)
+        if texts and texts[index] is not None:
+            repo.update_chunk_transcription(chunk.id, texts[index])
+    return repo, recording
+
+
+class TestContextClip:
+    """Test building chunk clips with context from the previous chunk."""
+
+    def test_prepends_end_of_previous_chunk(self, tmp_path):
+        """Test that the clip starts with the tail of the previous chunk."""
+        from app.audio.transforms import build_context_clip
+
+        previous = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x01\x00" * 8000 + b"\x02\x00" * 8000)
+        chunk = write_wav(str(tmp_path / "chunk_0001.wav"), b"\x03\x00" * 16000)
+        output_path = str(tmp_path / "chunk_0001.live.wav")
+
+        context = build_context_clip(chunk, output_path, previous, context_seconds=0.25)
+
+        params, data = read_wav(output_path)
+        assert context == pytest.approx(0.25)
+        assert params.nframes == 16000 + 4000
+        assert data == b"\x02\x00" * 4000 + b"\x03\x00" * 16000
+        assert sorted(os.listdir(tmp_path)) == ["chunk_0000.wav", "chunk_0001.live.wav", "chunk_0001.wav"]
+
+    def test_without_previous_chunk(self, tmp_path):
+        """Test that the first chunk is converted without context."""
+        from app.audio.transforms import build_context_clip
+
+        chunk = write_wav(str(tmp_path / "chunk_0000.wav"), b"\x03\x00\x04\x00" * 48000, channels=2, sample_rate=48000)
+        output_path = str(tmp_path / "chunk_0000.live.wav")
+
+        context = build_context_clip(chunk, output_path)
+
+        params, _ = read_wav(output_path)
+        assert context == 0
+        assert params.nchannels == 1
+        assert params.framerate == 16000
+
+
+class TestTranscribeChunk:
+    """Test transcribing single chunks."""
+
+    @pytest.mark.asyncio
+    async def test_removes_words_repeated_from_previous_chunk(self, test_db, tmp_path):
+        """Test that context words are removed and a clipped word is replaced."""
+        from app.audio.engine import AudioEngine
+        from app.services.transcription_service import TranscriptionService
+
+        repo, recording = create_recording_with_chunks(test_db, tmp_path, 2)
+        provider = ScriptedProvider(["we discussed the treat", "discussed the treatment plan today"])
+        engine = AudioEngine(max_workers=0)
+        service = TranscriptionService(repo, provider, audio_engine=engine)
+
+        try:
+            first = await service.transcribe_chunk(recording.id, 0)
+            second = await service.transcribe_chunk(recording.id, 1)
+        finally:
+            engine.shutdown()
+
+        chunks = repo.get_chunks(recording.id)
+        assert first == "we discussed the treat"
+        assert second == "treatment plan today"
+        assert chunks[0].transcription_text == "we discussed the"
+        assert chunks[1].transcription_text == "treatment plan today"
+        assert not any(path.endswith(".live.wav") for path in os.listdir(tmp_path / recording.id))
+
+    @pytest.mark.asyncio
+    async def test_finish_reuses_live_transcripts(self, test_db, tmp_path):
+        """Test that finishing only transcribes chunks without live text."""
+        from app.audio.engine import AudioEngine
+        from app.core.config import settings
+        from app.services.transcription_service import TranscriptionService
+
+        repo, recording = create_recording_with_chunks(
+            test_db, tmp_path, 3, texts=["hello there", "how are you", None]
+        )
+        provider = ScriptedProvider(["how are you doing today"])
+        engine = AudioEngine(max_workers=0)
+        service = TranscriptionService(repo, provider, audio_engine=engine)
+
+        try:
+            with patch.object(settings, "audio_storage_path", str(tmp_path)), \
+                    patch.object(settings, "live_transcription_enabled", True):
+                result = await service.assemble_and_transcribe(recording.id)
+        finally:
+            engine.shutdown()
+
+        assert result is True
+        assert len(provider.paths) == 1
+        assert repo.get_recording(recording.id).transcription_text == "hello there how are you doing today"
+
+
+class TestLiveTranscriptionClaims:
+    """Test that only one process transcribes a chunk."""
+
+    def test_claim_is_exclusive_until_the_lease_expires(self, test_db, tmp_path):
+        """Test that a held claim blocks others and an expired one does not."""
+        repo, recording = create_recording_with_chunks(test_db, tmp_path, 1)
+        chunk = repo.get_chunks(recording.id)[0]
+
+        assert repo.claim_chunk_transcription(chunk.id, lease_seconds=60) is True
+        assert repo.claim_chunk_transcription(chunk.id, lease_seconds=60) is False
+
+        repo.release_chunk_transcription(chunk.id)
+        assert repo.claim_chunk_transcription(chunk.id, lease_seconds=-1) is True
+        assert repo.claim_chunk_transcription(chunk.id, lease_seconds=60) is True
+
+        repo.update_chunk_transcription(chunk.id, "done")
+        assert repo.claim_chunk_transcription(chunk.id, lease_seconds=60) is False
+
+    @pytest.mark.asyncio
+    async def test_finish_waits_for_chunk_claimed_by_another_process(self, test_db, tmp_path):
+        """Test that collecting does not transcribe a chunk another process is working on."""
+        from app.services import transcription_service
+        from app.services.transcription_service import TranscriptionService
+
+        repo, recording = create_recording_with_chunks(test_db, tmp_path, 2, texts=["hello there", None])
+        chunk = repo.get_chunks(recording.id)[1]
+        # The API process claimed the last chunk; this worker's own queue is empty
+        repo.claim_chunk_transcription(chunk.id, lease_seconds=60)
+        provider = ScriptedProvider([])
+        service = TranscriptionService(repo, provider, audio_engine=MagicMock())
+
+        async def other_process_finishes():
+            await asyncio.sleep(0.05)
+            repo.update_chunk_transcription(chunk.id, "how are you")
+
+        with patch.object(transcription_service, "LIVE_CLAIM_POLL_SECONDS", 0.01):
+            finisher = asyncio.create_task(other_process_finishes())
+            text = await service._collect_live_transcription(recording.id)
+            await finisher
+
+        assert text == "hello there how are you"
+        assert provider.paths == []
+
+
+class TestLiveTranscriptionQueue:
+    """Test the background queue."""
+
+    @pytest.mark.asyncio
+    async def test_runs_chunks_of_a_recording_in_order(self):
+        """Test that chunk tasks for one recording are serialized in upload order."""
+        from app.services.live_transcription import LiveTranscriptionQueue
+        from app.services.transcription_service import TranscriptionService
+
+        order = []
+
+        async def fake_transcribe_chunk(self, recording_id, chunk_index):
+            # Earlier chunks take longer; ordering must still hold
+            await asyncio.sleep(0.03 * (3 - chunk_index))
+            order.append(chunk_index)
+
+        queue = LiveTranscriptionQueue(session_factory=MagicMock)
+        with patch.object(TranscriptionService, "transcribe_chunk", fake_transcribe_chunk):
+            for index in range(3):
+                queue.submit("recording-1", index)
+            assert queue.pending("recording-1") == 3
+            assert await queue.wait("recording-1", timeout=5) is True
+
+        assert order == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_isolated(self):
+        """Test that a failed chunk does not stop later chunks."""
+        from app.services.live_transcription import LiveTranscriptionQueue
+        from app.services.transcription_service import TranscriptionService
+
+        done = []
+
+        async def fake_transcribe_chunk(self, recording_id, chunk_index):
+            if chunk_index == 0:
+                raise RuntimeError("provider unavailable")
+            done.append(chunk_index)
+
+        queue = LiveTranscriptionQueue(session_factory=MagicMock)
+        with patch.object(TranscriptionService, "transcribe_chunk", fake_transcribe_chunk):
+            queue.submit("recording-2", 0)
+            queue.submit("recording-2", 1)
+            assert await queue.wait("recording-2", timeout=5) is True
+
+        assert done == [1]
@@ -2,7 +2,6 @@
 Tests for LLM providers.
 """
 import pytest
-import tempfile
 import os
 from unittest.mock import patch, AsyncMock
 
@@ -103,7 +102,7 @@ class TestRequestYaiProvider:
         from app.llm.requestyai_provider import RequestYaiProvider
         
         # Mock the HTTP response
-        mock_response = mock_client.return_value.__enter__.return_value.post.return_value
+        mock_response = mock_client.return_value.post.return_value
         mock_response.status_code = 200
         mock_response.text = "This is the transcribed text."
         
@@ -118,7 +117,7 @@ class TestRequestYaiProvider:
         from app.llm.requestyai_provider import RequestYaiProvider
         
         # Mock the HTTP response
-        mock_response = mock_client.return_value.__enter__.return_value.post.return_value
+        mock_response = mock_client.return_value.post.return_value
         mock_response.status_code = 400
         mock_response.text = "Bad Request"
         
@@ -136,14 +135,282 @@ class TestRequestYaiProvider:
         from app.llm.requestyai_provider import RequestYaiProvider
         
         # Mock the HTTP response
-        mock_response = mock_client.return_value.__aenter__.return_value.post.return_value
+        mock_response = mock_client.return_value.post.return_value
         mock_response.status_code = 200
         mock_response.text = "Async transcribed text."
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         provider = RequestYaiProvider(api_key="test_key")
         result = await provider.transcribe_audio_async(temp_audio_file)
         
         assert result == "Async transcribed text."
+    
+    @patch('httpx.AsyncClient')
+    @pytest.mark.asyncio
+    async def test_requestyai_provider_reuses_pooled_client(self, mock_client, temp_audio_file):
+        """Test that one pooled client serves every request until the provider is closed."""
+        from app.llm.requestyai_provider import RequestYaiProvider
+        
+        mock_response = mock_client.return_value.post.return_value
+        mock_response.status_code = 200
+        mock_response.text = "Pooled text."
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.aclose = AsyncMock()
+        
+        provider = RequestYaiProvider(api_key="test_key", max_connections=4, http2=True)
+        for _ in range(3):
+            assert await provider.transcribe_audio_async(temp_audio_file) == "Pooled text."
+        await provider.aclose()
+        
+        assert mock_client.call_count == 1
+        assert mock_client.call_args.kwargs["limits"].max_connections == 4
+        assert mock_client.return_value.post.await_count == 3
+        mock_client.return_value.aclose.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_requestyai_provider_streams_multipart_body(self, tmp_path):
+        """Test that the upload is a well-formed multipart body with a Content-Length."""
+        import httpx
+        from email.parser import BytesParser
+        from app.llm.requestyai_provider import RequestYaiProvider
+        
+        audio_path = tmp_path / "assembled_audio.flac"
+        audio_bytes = bytes(range(256)) * 1000
+        audio_path.write_bytes(audio_bytes)
+        seen = {}
+        
+        async def handler(request):
+            seen["headers"] = request.headers
+            seen["body"] = await request.aread()
+            return httpx.Response(200, text="Streamed text.")
+        
+        provider = RequestYaiProvider(api_key="test_key", upload_block_size=4096)
+        provider._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await provider.transcribe_audio_async(str(audio_path))
+        finally:
+            await provider.aclose()
+        
+        assert result == "Streamed text."
+        assert int(seen["headers"]["content-length"]) == len(seen["body"])
+        assert "transfer-encoding" not in seen["headers"]
+        
+        message = BytesParser().parsebytes(
+            b"Content-Type: " + seen["headers"]["content-type"].encode() + b"\r\n\r\n" + seen["body"]
+        )
+        parts = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+        assert parts["model"].get_payload() == "whisper-1"
+        assert parts["file"].get_filename() == "assembled_audio.flac"
+        assert parts["file"].get_content_type() == "audio/flac"
+        assert parts["file"].get_payload(decode=True) == audio_bytes
+
+
+class TestTranscriptionCache:
+    """Test the content-addressed transcription cache."""
+    
+    @pytest.mark.asyncio
+    async def test_hit_skips_provider(self, temp_audio_file, tmp_path):
+        """Test that identical audio is only sent to the provider once."""
+        from app.llm.cache import CachingLLMProvider, TranscriptionCache
+        from app.llm.mock_provider import MockLLMProvider
+        
+        inner = MockLLMProvider(mock_transcription="Cached text.", simulate_delay=False)
+        provider = CachingLLMProvider(inner, TranscriptionCache(max_entries=4, directory=str(tmp_path)))
+        copy_path = str(tmp_path / "copy.wav")
+        with open(temp_audio_file, "rb") as src, open(copy_path, "wb") as dst:
+            dst.write(src.read())
+        
+        with patch.object(inner, "transcribe_audio_async", AsyncMock(return_value="Cached text.")) as transcribe:
+            first = await provider.transcribe_audio_async(temp_audio_file)
+            second = await provider.transcribe_audio_async(copy_path)
+        
+        assert first == second == "Cached text."
+        assert transcribe.call_count == 1
+        assert provider.get_supported_formats() == inner.get_supported_formats()
+    
+    @pytest.mark.asyncio
+    async def test_key_includes_provider_settings(self, temp_audio_file):
+        """Test that a different model or language is a miss."""
+        from app.llm.cache import CachingLLMProvider, TranscriptionCache
+        from app.llm.requestyai_provider import RequestYaiProvider
+        
+        cache = TranscriptionCache(max_entries=4)
+        english = CachingLLMProvider(RequestYaiProvider(api_key="k", language="en"), cache)
+        spanish = CachingLLMProvider(RequestYaiProvider(api_key="k", language="es"), cache)
+        
+        with patch.object(english.provider, "transcribe_audio_async", AsyncMock(return_value="hello")), \
+                patch.object(spanish.provider, "transcribe_audio_async", AsyncMock(return_value="hola")) as spanish_call:
+            assert await english.transcribe_audio_async(temp_audio_file) == "hello"
+            assert await spanish.transcribe_audio_async(temp_audio_file) == "hola"
+        
+        assert spanish_call.call_count == 1
+        assert english.language == "en"
+    
+    def test_lru_eviction_and_disk_tier(self, tmp_path):
+        """Test that evicted entries are still served from disk and counted."""
+        from app.core.metrics import metrics
+        from app.llm.cache import TranscriptionCache
+        
+        metrics.reset()
+        cache = TranscriptionCache(max_entries=2, directory=str(tmp_path))
+        for key in ["a1", "b2", "c3"]:
+            cache.put(key, f"text {key}")
+        
+        counters = metrics.snapshot()["counters"]
+        assert counters["transcription_cache.evictions"] == 1
+        assert cache.get("c3") == "text c3"
+        assert cache.get("a1") == "text a1"
+        assert cache.get("zz") is None
+        
+        counters = metrics.snapshot()["counters"]
+        assert counters["transcription_cache.memory_hits"] == 1
+        assert counters["transcription_cache.disk_hits"] == 1
+        assert counters["transcription_cache.misses"] == 1
+        
+        # A fresh process only has the disk tier
+        assert TranscriptionCache(max_entries=2, directory=str(tmp_path)).get("b2") == "text b2"
+    
+    @pytest.mark.asyncio
+    async def test_key_uses_pcm_not_encoded_bytes(self, tmp_path):
+        """Test that re-encoding the same PCM hits even when the payload bytes differ."""
+        from app.llm.cache import CachingLLMProvider, TranscriptionCache
+        from app.llm.mock_provider import MockLLMProvider
+        from tests.test_audio_assembler import write_wav
+
+        inner = MockLLMProvider(simulate_delay=False)
+        provider = CachingLLMProvider(inner, TranscriptionCache())
+        payloads = []
+        for run, serial in enumerate([b"\x01", b"\x02"]):
+            directory = tmp_path / f"run{run}"
+            directory.mkdir()
+            write_wav(str(directory / "assembled_audio.pcm.wav"), b"\x05\x00" * 1600)
+            # Ogg streams carry a random serial, so each encoding differs
+            payload = directory / "assembled_audio.pcm.ogg"
+            payload.write_bytes(b"OggS" + serial)
+            payloads.append(str(payload))
+
+        with patch.object(inner, "transcribe_audio_async", AsyncMock(return_value="same")) as transcribe:
+            for payload in payloads:
+                assert await provider.transcribe_audio_async(payload) == "same"
+
+        assert transcribe.call_count == 1
+
+    def test_identity_looks_through_wrappers(self):
+        """Test that the key names the provider and model that produce the text."""
+        from app.llm.cache import provider_identity
+        from app.llm.requestyai_provider import RequestYaiProvider
+        from app.llm.resilience import create_resilient_provider
+        from app.llm.router import RoutingLLMProvider
+
+        whisper = RequestYaiProvider(api_key="k", model="whisper-1")
+        other = RequestYaiProvider(api_key="k", model="whisper-2")
+
+        assert provider_identity(create_resilient_provider(whisper)) == "RequestYaiProvider:whisper-1:en:0.0"
+        assert provider_identity(create_resilient_provider(other)) != provider_identity(whisper)
+        routed = RoutingLLMProvider([("a", whisper), ("b", other)])
+        assert provider_identity(routed) == f"{provider_identity(whisper)}|{provider_identity(other)}"
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """Test that the least recently used disk entries are pruned."""
+        import os
+        from app.core.metrics import metrics
+        from app.llm.cache import TranscriptionCache
+
+        metrics.reset()
+        cache = TranscriptionCache(max_entries=1, directory=str(tmp_path), max_disk_entries=10)
+        for index in range(10):
+            cache.put(f"{index:02d}", f"text {index}")
+            os.utime(cache._disk_path(f"{index:02d}"), (index, index))
+        # Reading an old entry makes it recent again
+        assert cache.get("00") == "text 0"
+
+        cache.put("10", "text 10")
+
+        remaining = sorted(name[:-len(".txt")] for _, _, names in os.walk(tmp_path) for name in names)
+        assert len(remaining) == 9
+        assert "00" in remaining and "10" in remaining
+        assert "01" not in remaining and "02" not in remaining
+        assert metrics.snapshot()["counters"]["transcription_cache.disk_evictions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, temp_audio_file):
+        """Test that a failed transcription is retried on the next call."""
+        from app.llm.cache import CachingLLMProvider, TranscriptionCache
+        from app.llm.mock_provider import MockLLMProvider
+        
+        inner = MockLLMProvider(simulate_delay=False)
+        provider = CachingLLMProvider(inner, TranscriptionCache())
+        
+        with patch.object(inner, "transcribe_audio_async", AsyncMock(side_effect=[Exception("boom"), "ok"])):
+            with pytest.raises(Exception, match="boom"):
+                await provider.transcribe_audio_async(temp_audio_file)
+            assert await provider.transcribe_audio_async(temp_audio_file) == "ok"
+
+
+class TestBatchTranscription:
+    """Test transcribe_many and transcribe_as_completed."""
+    
+    @pytest.mark.asyncio
+    async def test_results_in_order_with_isolated_errors(self, tmp_path):
+        """Test that one bad file is reported without failing the batch."""
+        from app.llm.mock_provider import MockLLMProvider
+        
+        paths = []
+        for name in ["a.wav", "b.wav", "c.wav"]:
+            path = tmp_path / name
+            path.write_bytes(b"RIFF")
+            paths.append(str(path))
+        paths.insert(1, str(tmp_path / "missing.wav"))
+        provider = MockLLMProvider(mock_transcription="Text.", simulate_delay=False)
+        
+        results = await provider.transcribe_many(paths, max_concurrency=2)
+        
+        assert [result.index for result in results] == [0, 1, 2, 3]
+        assert [result.ok for result in results] == [True, False, True, True]
+        assert isinstance(results[1].error, ValueError)
+        assert results[2].audio_path == paths[2]
+        assert results[2].text.startswith("Text.")
+    
+    @pytest.mark.asyncio
+    async def test_as_completed_respects_concurrency_cap(self, temp_audio_file):
+        """Test that results arrive as they finish and no more than the cap run at once."""
+        import asyncio
+        from app.llm.mock_provider import MockLLMProvider
+        
+        running, peak = 0, 0
+        delays = [0.05, 0.01, 0.03, 0.0]
+        
+        class Provider(MockLLMProvider):
+            async def transcribe_audio_async(self, audio_path):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(delays.pop(0))
+                running -= 1
+                return audio_path
+        
+        provider = Provider()
+        order = [result.index async for result in provider.transcribe_as_completed(
+            (temp_audio_file for _ in range(4)), max_concurrency=2
+        )]
+        
+        assert peak == 2
+        assert order == [1, 2, 3, 0]
+    
+    @pytest.mark.asyncio
+    async def test_wrappers_batch_through_their_own_calls(self, temp_audio_file, tmp_path):
+        """Test that a caching wrapper answers batch items from its cache."""
+        from app.llm.cache import CachingLLMProvider, TranscriptionCache
+        from app.llm.mock_provider import MockLLMProvider
+        
+        inner = MockLLMProvider(simulate_delay=False)
+        provider = CachingLLMProvider(inner, TranscriptionCache(directory=str(tmp_path)))
+        
+        with patch.object(inner, "transcribe_audio_async", AsyncMock(return_value="once")) as transcribe:
+            results = await provider.transcribe_many([temp_audio_file] * 3, max_concurrency=1)
+        
+        assert [result.text for result in results] == ["once"] * 3
+        assert transcribe.call_count == 1
 
 
 class TestTranscriptionService:
@@ -185,3 +452,51 @@ class TestTranscriptionService:
         result = await service.assemble_and_transcribe(test_recording.id)
         
         assert result is False
+    
+    @pytest.mark.asyncio
+    async def test_assemble_and_transcribe_with_chunks(self, test_db, mock_llm_provider, tmp_path):
+        """Test the full assemble, encode and transcribe pipeline."""
+        import uuid
+        import wave
+        from app.audio.engine import AudioEngine
+        from app.core.config import settings
+        from app.models import User
+        from app.models.recording import Recording, RecordingStatus
+        from app.services.transcription_service import TranscriptionService
+        from app.repositories.mysql_recording_repository import MySQLRecordingRepository
+        
+        repo = MySQLRecordingRepository(test_db)
+        user = User(google_id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", display_name="Pipeline User")
+        test_db.add(user)
+        test_db.commit()
+        recording = Recording(user_id=user.id, status=RecordingStatus.ENDED)
+        test_db.add(recording)
+        test_db.commit()
+        
+        recording_dir = tmp_path / recording.id
+        recording_dir.mkdir()
+        for index in range(2):
+            chunk_path = str(recording_dir / f"chunk_{index:04d}.wav")
+            with wave.open(chunk_path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(48000)
+                wav_file.writeframes(b"\x01\x00" * 48000)
+            repo.add_chunk(recording.id, index, chunk_path, duration_seconds=1.0)
+        
+        engine = AudioEngine(max_workers=0)
+        service = TranscriptionService(repo, mock_llm_provider, audio_engine=engine)
+        
+        try:
+            with patch.object(settings, "audio_storage_path", str(tmp_path)):
+                result = await service.assemble_and_transcribe(recording.id)
+        finally:
+            engine.shutdown()
+        
+        assert result is True
+        updated = repo.get_recording(recording.id)
+        assert "This is a test transcription." in updated.transcription_text
+        assert updated.audio_file_path == str(recording_dir / "assembled_audio.wav")
+        assert os.path.exists(updated.audio_file_path)
+        # Temporary transcription payloads are removed after upload
+        assert not (recording_dir / "assembled_audio.pcm.wav").exists()
@@ -0,0 +1,269 @@
+"""
+Tests for the provider rate limiter and its shared state stores.
+"""
+import time
+import asyncio
+import pytest
+from multiprocessing import get_context
+from unittest.mock import AsyncMock
+
+
+def hold_lease(path, acquired, release):
+    """Acquire one slot from a file-backed limiter in another process and hold it."""
+    from app.llm.rate_limiter import FileLimiterStore, ProviderRateLimiter
+
+    limiter = ProviderRateLimiter(store=FileLimiterStore(path), initial_concurrency=1)
+    lease = limiter.acquire_sync()
+    acquired.set()
+    release.wait(10)
+    limiter.release(lease)
+
+
+class TestProviderRateLimiter:
+    """Test token buckets and the AIMD concurrency limit."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_queues_calls(self):
+        """Test that no more than the limit run at once."""
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter(initial_concurrency=2, poll_interval=0.01)
+        running, peak = 0, 0
+
+        async def call():
+            nonlocal running, peak
+            lease = await limiter.acquire()
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            limiter.release(lease)
+
+        await asyncio.gather(*[call() for _ in range(6)])
+        assert peak == 2
+        assert limiter.snapshot()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_request_bucket_paces_calls(self):
+        """Test that an empty request bucket delays the next call."""
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        # 600 per minute is 10 per second: a burst of 600, then one every 100 ms
+        limiter = ProviderRateLimiter(requests_per_minute=600, initial_concurrency=1000)
+        limiter.store.update(lambda state: state.update(requests={"tokens": 0.0, "updated": time.time()}))
+
+        started = time.monotonic()
+        limiter.release(await limiter.acquire())
+        assert 0.05 <= time.monotonic() - started < 0.5
+
+    @pytest.mark.asyncio
+    async def test_audio_bucket_caps_large_requests_at_capacity(self):
+        """Test that a file longer than the per-minute budget is still admitted."""
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter(audio_seconds_per_minute=60)
+        lease = await asyncio.wait_for(limiter.acquire(audio_seconds=3600), timeout=1)
+        limiter.release(lease)
+
+    def test_aimd_grows_when_healthy_and_shrinks_on_overload(self):
+        """Test additive increase and multiplicative decrease."""
+        from app.core.metrics import metrics
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        metrics.reset()
+        limiter = ProviderRateLimiter(initial_concurrency=4, max_concurrency=8, decrease_cooldown_seconds=60)
+
+        for _ in range(8):
+            limiter.release(limiter.acquire_sync(audio_seconds=10), latency=1.0)
+        grown = limiter.snapshot()["limit"]
+        assert 5.5 < grown <= 8
+
+        limiter.release(limiter.acquire_sync(), overloaded=True)
+        assert limiter.snapshot()["limit"] == pytest.approx(grown / 2)
+        # A burst of 429s inside the cooldown counts once
+        limiter.release(limiter.acquire_sync(), overloaded=True)
+        assert limiter.snapshot()["limit"] == pytest.approx(grown / 2)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["llm_rate_limit.throttled"] == 2
+        assert snapshot["counters"]["llm_rate_limit.decreases"] == 1
+        assert snapshot["gauges"]["llm_rate_limit.concurrency_limit"] == pytest.approx(grown / 2)
+
+    def test_latency_spike_shrinks_the_limit(self):
+        """Test that a call much slower per audio second than usual counts as overload."""
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter(initial_concurrency=8, min_concurrency=2)
+        # Long audio taking proportionally longer is not a spike
+        limiter.release(limiter.acquire_sync(audio_seconds=10), latency=1.0)
+        limiter.release(limiter.acquire_sync(audio_seconds=100), latency=10.0)
+        assert limiter.snapshot()["limit"] > 8
+
+        limiter.release(limiter.acquire_sync(audio_seconds=10), latency=10.0)
+        assert limiter.snapshot()["limit"] < 5
+
+    def test_sustained_slowdown_becomes_the_new_baseline(self):
+        """Test that a provider that stays slower only shrinks the limit once."""
+        from app.core.metrics import metrics
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        metrics.reset()
+        limiter = ProviderRateLimiter(initial_concurrency=8, min_concurrency=1, decrease_cooldown_seconds=0)
+        for _ in range(5):
+            limiter.release(limiter.acquire_sync(audio_seconds=10), latency=1.0)
+
+        for _ in range(20):
+            limiter.release(limiter.acquire_sync(audio_seconds=10), latency=3.0)
+
+        assert metrics.snapshot()["counters"]["llm_rate_limit.decreases"] == 1
+        assert limiter.snapshot()["limit"] > 4
+
+    @pytest.mark.asyncio
+    async def test_expired_leases_are_reclaimed(self):
+        """Test that a slot held by a dead caller frees up after its lease."""
+        from app.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter(initial_concurrency=1, lease_seconds=0.05, poll_interval=0.01)
+        await limiter.acquire()  # never released
+
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+
+    @pytest.mark.asyncio
+    async def test_cancelled_acquire_does_not_leak_its_lease(self):
+        """Test that a lease admitted after the caller was cancelled is released."""
+        import threading
+        from app.llm.rate_limiter import InMemoryLimiterStore, ProviderRateLimiter
+
+        class SlowStore(InMemoryLimiterStore):
+            def __init__(self):
+                super().__init__()
+                self.entered = threading.Event()
+                self.proceed = threading.Event()
+
+            def update(self, fn):
+                self.entered.set()
+                self.proceed.wait(5)
+                return super().update(fn)
+
+        store = SlowStore()
+        limiter = ProviderRateLimiter(store=store, initial_concurrency=1)
+        acquiring = asyncio.create_task(limiter.acquire())
+        await asyncio.to_thread(store.entered.wait, 5)
+
+        # A hedge loser is cancelled while the store update is still running
+        acquiring.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await acquiring
+        store.proceed.set()
+
+        # The lease is recorded by the abandoned update, then released
+        for _ in range(100):
+            leases = store.update(lambda state: state.get("leases"))
+            if leases == {}:
+                break
+            await asyncio.sleep(0.01)
+        assert leases == {}
+
+
+class TestFileLimiterStore:
+    """Test sharing limiter state through a file."""
+
+    def test_state_is_shared_between_processes(self, tmp_path):
+        """Test that a slot held by another process counts against this one."""
+        from app.llm.rate_limiter import FileLimiterStore, ProviderRateLimiter
+
+        path = str(tmp_path / "limiter.json")
+        context = get_context("fork")
+        acquired, release = context.Event(), context.Event()
+        worker = context.Process(target=hold_lease, args=(path, acquired, release))
+        worker.start()
+        try:
+            assert acquired.wait(10)
+            limiter = ProviderRateLimiter(store=FileLimiterStore(path), initial_concurrency=1)
+            assert limiter.snapshot()["in_flight"] == 1
+            assert limiter.store.update(lambda state: limiter._try_acquire(state, "probe", 0.0)) > 0
+        finally:
+            release.set()
+            worker.join(10)
+
+        lease = limiter.acquire_sync()
+        assert limiter.snapshot()["in_flight"] == 1
+        limiter.release(lease)
+
+    @pytest.mark.asyncio
+    async def test_acquire_does_not_block_the_event_loop(self, tmp_path):
+        """Test that waiting on the file lock leaves the event loop free."""
+        import fcntl
+        from app.llm.rate_limiter import FileLimiterStore, ProviderRateLimiter
+
+        path = str(tmp_path / "limiter.json")
+        limiter = ProviderRateLimiter(store=FileLimiterStore(path))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        with open(path, "a+") as held:
+            # Another process holds the state file
+            fcntl.flock(held.fileno(), fcntl.LOCK_EX)
+            ticking = asyncio.create_task(ticker())
+            acquiring = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0.2)
+            assert not acquiring.done()
+            assert ticks >= 5
+            fcntl.flock(held.fileno(), fcntl.LOCK_UN)
+
+        lease = await asyncio.wait_for(acquiring, timeout=1)
+        ticking.cancel()
+        await limiter.release_async(lease)
+        assert limiter.snapshot()["in_flight"] == 0
+
+    def test_unreadable_state_is_reset(self, tmp_path):
+        """Test that a corrupt state file does not wedge the limiter."""
+        from app.llm.rate_limiter import FileLimiterStore, ProviderRateLimiter
+
+        path = tmp_path / "limiter.json"
+        path.write_text("{not json")
+        limiter = ProviderRateLimiter(store=FileLimiterStore(str(path)))
+
+        limiter.release(limiter.acquire_sync())
+        assert limiter.snapshot()["in_flight"] == 0
+
+
+class TestRateLimitedLLMProvider:
+    """Test the provider wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_throttled_calls_release_their_slot_and_shrink_the_limit(self, temp_audio_file):
+        """Test that a 429 frees the slot and halves the limit."""
+        from app.llm.interface import ProviderError
+        from app.llm.mock_provider import MockLLMProvider
+        from app.llm.rate_limiter import ProviderRateLimiter, RateLimitedLLMProvider
+
+        inner = MockLLMProvider(simulate_delay=False)
+        inner.transcribe_audio_async = AsyncMock(side_effect=[
+            ProviderError("Transcription failed: 429", status_code=429), "ok"
+        ])
+        limiter = ProviderRateLimiter(initial_concurrency=4)
+        provider = RateLimitedLLMProvider(inner, limiter)
+
+        with pytest.raises(ProviderError):
+            await provider.transcribe_audio_async(temp_audio_file)
+        assert limiter.snapshot() == {"limit": 2.0, "in_flight": 0}
+
+        assert await provider.transcribe_audio_async(temp_audio_file) == "ok"
+        assert limiter.snapshot()["limit"] == pytest.approx(2.5)
+
+    def test_estimate_audio_seconds(self, tmp_path, temp_audio_file):
+        """Test duration estimates for WAV and compressed payloads."""
+        from app.llm.rate_limiter import estimate_audio_seconds
+
+        flac = tmp_path / "payload.flac"
+        flac.write_bytes(b"\0" * 160000)
+
+        assert estimate_audio_seconds(str(flac)) == pytest.approx(10.0)
+        assert estimate_audio_seconds(temp_audio_file) >= 0
@@ -0,0 +1,231 @@
+"""
+Tests for retries, deadline budgets and the circuit breaker around LLM providers.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+
+
+def make_provider(side_effect, **kwargs):
+    """Wrap a mock provider whose async transcription follows ``side_effect``."""
+    from app.llm.mock_provider import MockLLMProvider
+    from app.llm.resilience import CircuitBreaker, ResilientLLMProvider, RetryPolicy
+
+    inner = MockLLMProvider(simulate_delay=False)
+    inner.transcribe_audio_async = AsyncMock(side_effect=side_effect)
+    kwargs.setdefault("policy", RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.01))
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=10, recovery_seconds=60))
+    return ResilientLLMProvider(inner, **kwargs), inner
+
+
+class TestRetries:
+    """Test retry classification and backoff."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, temp_audio_file):
+        """Test that 503s and connection errors are retried until success."""
+        import httpx
+        from app.core.metrics import metrics
+        from app.llm.interface import ProviderError
+
+        metrics.reset()
+        provider, inner = make_provider([
+            ProviderError("Transcription failed: 503", status_code=503),
+            httpx.ConnectError("connection refused"),
+            "recovered"
+        ])
+
+        assert await provider.transcribe_audio_async(temp_audio_file) == "recovered"
+        assert inner.transcribe_audio_async.await_count == 3
+        counters = metrics.snapshot()["counters"]
+        assert counters["llm_resilience.retries"] == 2
+        assert counters["llm_resilience.attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, temp_audio_file):
+        """Test that a 400 is raised after a single attempt."""
+        from app.llm.interface import ProviderError
+
+        provider, inner = make_provider([ProviderError("Transcription failed: 400", status_code=400)])
+
+        with pytest.raises(ProviderError, match="Transcription failed: 400"):
+            await provider.transcribe_audio_async(temp_audio_file)
+        assert inner.transcribe_audio_async.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, temp_audio_file):
+        """Test that the last error is raised once attempts run out."""
+        from app.llm.interface import ProviderError
+
+        provider, inner = make_provider(ProviderError("Transcription failed: 500", status_code=500))
+
+        with pytest.raises(ProviderError, match="500"):
+            await provider.transcribe_audio_async(temp_audio_file)
+        assert inner.transcribe_audio_async.await_count == 4
+
+    def test_backoff_honours_retry_after(self):
+        """Test that Retry-After is a lower bound on the delay, capped by max_delay."""
+        from app.llm.resilience import RetryPolicy
+
+        policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+
+        assert all(0 <= policy.delay(3) <= 4.0 for _ in range(50))
+        assert policy.delay(1, retry_after=12.0) >= 12.0
+        assert policy.delay(1, retry_after=600.0) == 30.0
+
+    def test_parse_retry_after(self):
+        """Test Retry-After in seconds and as an HTTP date."""
+        from email.utils import format_datetime
+        from datetime import datetime, timedelta, timezone
+        from app.llm.requestyai_provider import parse_retry_after
+
+        future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=120), usegmt=True)
+
+        assert parse_retry_after("7") == 7.0
+        assert 110 <= parse_retry_after(future) <= 120
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    @pytest.mark.asyncio
+    async def test_requestyai_raises_provider_error_with_retry_after(self, temp_audio_file):
+        """Test that API errors carry the status and Retry-After."""
+        import httpx
+        from app.llm.interface import ProviderError
+        from app.llm.requestyai_provider import RequestYaiProvider
+
+        provider = RequestYaiProvider(api_key="test_key")
+        provider._async_client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(429, headers={"Retry-After": "3"}, text="slow down")
+        ))
+        try:
+            with pytest.raises(ProviderError) as exc_info:
+                await provider.transcribe_audio_async(temp_audio_file)
+        finally:
+            await provider.aclose()
+
+        assert str(exc_info.value) == "Transcription failed: 429"
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after == 3.0
+
+
+class TestDeadlineBudget:
+    """Test per-job deadline budgets."""
+
+    @pytest.mark.asyncio
+    async def test_hanging_provider_is_cut_off_at_the_deadline(self, temp_audio_file):
+        """Test that a job cannot outlive its budget however long attempts take."""
+        from app.llm.resilience import DeadlineExceeded, deadline_budget
+
+        async def hang(audio_path):
+            await asyncio.sleep(10)
+
+        provider, _ = make_provider(hang, attempt_timeout=60)
+
+        started = time.monotonic()
+        with deadline_budget(0.2):
+            with pytest.raises(DeadlineExceeded):
+                await provider.transcribe_audio_async(temp_audio_file)
+        assert time.monotonic() - started < 1.0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_beyond_the_deadline_fails_fast(self, temp_audio_file):
+        """Test that a retry that cannot finish within the budget is not attempted."""
+        from app.llm.interface import ProviderError
+        from app.llm.resilience import DeadlineExceeded, RetryPolicy, deadline_budget
+
+        provider, inner = make_provider(
+            ProviderError("Transcription failed: 429", status_code=429, retry_after=20.0),
+            policy=RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=30.0)
+        )
+
+        with deadline_budget(5.0):
+            with pytest.raises(DeadlineExceeded):
+                await provider.transcribe_audio_async(temp_audio_file)
+        assert inner.transcribe_audio_async.await_count == 1
+
+    def test_nested_budgets_only_shorten(self):
+        """Test that an inner budget cannot extend the outer one."""
+        from app.llm.resilience import deadline_budget, remaining_budget
+
+        assert remaining_budget() is None
+        with deadline_budget(1.0):
+            with deadline_budget(100.0):
+                assert remaining_budget() <= 1.0
+            with deadline_budget(0.5):
+                assert remaining_budget() <= 0.5
+        assert remaining_budget() is None
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker."""
+
+    @pytest.mark.asyncio
+    async def test_opens_fails_fast_and_recovers(self, temp_audio_file):
+        """Test closed -> open -> half-open -> closed."""
+        from app.core.metrics import metrics
+        from app.llm.interface import ProviderError
+        from app.llm.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+        breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=0.05)
+        provider, inner = make_provider(
+            [ProviderError("down", status_code=502)] * 2 + ["back"],
+            policy=RetryPolicy(max_attempts=1),
+            breaker=breaker
+        )
+
+        for _ in range(2):
+            with pytest.raises(ProviderError, match="down"):
+                await provider.transcribe_audio_async(temp_audio_file)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert metrics.snapshot()["gauges"]["llm_circuit.state"] == 2
+
+        with pytest.raises(CircuitOpenError):
+            await provider.transcribe_audio_async(temp_audio_file)
+        assert inner.transcribe_audio_async.await_count == 2
+
+        await asyncio.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await provider.transcribe_audio_async(temp_audio_file) == "back"
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert metrics.snapshot()["gauges"]["llm_circuit.state"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_lets_a_new_trial_through(self, temp_audio_file):
+        """Test that cancelling a half-open trial does not leave the breaker stuck."""
+        from app.llm.resilience import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.0, half_open_calls=1)
+        breaker.record_failure()
+        started = asyncio.Event()
+
+        async def hang(audio_path):
+            started.set()
+            await asyncio.sleep(60)
+
+        provider, inner = make_provider(hang, breaker=breaker)
+        trial = asyncio.create_task(provider.transcribe_audio_async(temp_audio_file))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        inner.transcribe_audio_async.side_effect = ["back"]
+        assert await provider.transcribe_audio_async(temp_audio_file) == "back"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """Test that a failed trial call opens the breaker again."""
+        from app.llm.resilience import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.0, half_open_calls=1)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+
+        breaker.recovery_seconds = 60
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
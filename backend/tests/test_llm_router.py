@@ -0,0 +1,184 @@
+"""
+Tests for routing between several LLM providers.
+"""
+import asyncio
+import pytest
+
+
+def mock(delay, failure_rate=0.0, name="mock"):
+    """Mock provider answering with its name after ``delay`` seconds."""
+    from app.llm.mock_provider import MockLLMProvider
+
+    return MockLLMProvider(
+        mock_transcription=name,
+        simulate_delay=delay > 0,
+        delay_seconds=delay,
+        failure_rate=failure_rate,
+        seed=0
+    )
+
+
+class TestRoutingLLMProvider:
+    """Test provider selection, failover and hedging."""
+
+    @pytest.mark.asyncio
+    async def test_routes_to_the_faster_provider(self, temp_audio_file):
+        """Test that once both are measured, calls go to the faster provider."""
+        from app.llm.router import RoutingLLMProvider
+
+        router = RoutingLLMProvider(
+            [("slow", mock(0.05, name="slow")), ("fast", mock(0.01, name="fast"))],
+            hedging_enabled=False
+        )
+
+        # The first two calls measure each provider once
+        await router.transcribe_audio_async(temp_audio_file)
+        await router.transcribe_audio_async(temp_audio_file)
+
+        results = [await router.transcribe_audio_async(temp_audio_file) for _ in range(5)]
+        assert all(text.startswith("fast") for text in results)
+        assert router.ranked()[0][0] == "fast"
+
+    @pytest.mark.asyncio
+    async def test_fails_over_on_errors(self, temp_audio_file):
+        """Test that a failing provider's calls are answered by the next one."""
+        from app.core.metrics import metrics
+        from app.llm.router import RoutingLLMProvider
+
+        metrics.reset()
+        router = RoutingLLMProvider(
+            [("broken", mock(0, failure_rate=1.0, name="broken")), ("backup", mock(0, name="backup"))],
+            hedging_enabled=False
+        )
+
+        text = await router.transcribe_audio_async(temp_audio_file)
+
+        assert text.startswith("backup")
+        assert metrics.snapshot()["counters"]["llm_router.failovers"] == 1
+        assert router.stats["broken"].error_rate > 0
+        # The healthy provider is now preferred
+        assert router.ranked()[0][0] == "backup"
+
+    @pytest.mark.asyncio
+    async def test_error_rates_steer_traffic(self, temp_audio_file):
+        """Test that a flaky provider loses traffic to a reliable one of similar speed."""
+        from app.llm.router import RoutingLLMProvider
+
+        flaky = mock(0.005, failure_rate=0.6, name="flaky")
+        steady = mock(0.005, name="steady")
+        router = RoutingLLMProvider([("flaky", flaky), ("steady", steady)], hedging_enabled=False)
+
+        results = [await router.transcribe_audio_async(temp_audio_file) for _ in range(20)]
+
+        assert sum(text.startswith("steady") for text in results) >= 15
+
+    @pytest.mark.asyncio
+    async def test_raises_when_every_provider_fails(self, temp_audio_file):
+        """Test that the last error surfaces when nobody can answer."""
+        from app.llm.mock_provider import MockLLMProvider
+        from app.llm.router import RoutingLLMProvider
+
+        router = RoutingLLMProvider([
+            ("a", MockLLMProvider(simulate_delay=False, should_fail=True, failure_message="a down")),
+            ("b", MockLLMProvider(simulate_delay=False, should_fail=True, failure_message="b down"))
+        ])
+
+        with pytest.raises(Exception, match="b down"):
+            await router.transcribe_audio_async(temp_audio_file)
+
+    @pytest.mark.asyncio
+    async def test_hedges_slow_calls_on_short_recordings(self, temp_audio_file):
+        """Test that a second request goes out after the p95 delay and the first answer wins."""
+        from app.core.metrics import metrics
+        from app.llm.router import RoutingLLMProvider
+
+        metrics.reset()
+        primary = mock(0.01, name="primary")
+        secondary = mock(0.01, name="secondary")
+        router = RoutingLLMProvider(
+            [("primary", primary), ("secondary", secondary)],
+            hedge_min_delay=0.02, hedge_min_samples=3
+        )
+        for _ in range(3):
+            router.stats["primary"].record(0.01, failed=False)
+            router.stats["secondary"].record(0.05, failed=False)
+
+        # The primary stalls well past its usual latency
+        primary.delay_seconds = 1.0
+        started = asyncio.get_running_loop().time()
+        text = await router.transcribe_audio_async(temp_audio_file)
+
+        assert text.startswith("secondary")
+        assert asyncio.get_running_loop().time() - started < 0.5
+        counters = metrics.snapshot()["counters"]
+        assert counters["llm_router.hedges"] == 1
+        assert counters["llm_router.hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_long_recordings_are_not_hedged(self, temp_audio_file):
+        """Test that hedging is limited to short recordings."""
+        from app.core.metrics import metrics
+        from app.llm.router import RoutingLLMProvider
+
+        metrics.reset()
+        router = RoutingLLMProvider(
+            [("primary", mock(0.1, name="primary")), ("secondary", mock(0, name="secondary"))],
+            hedge_max_audio_seconds=-1, hedge_min_delay=0.01, hedge_min_samples=1
+        )
+        router.stats["primary"].record(0.001, failed=False)
+        router.stats["secondary"].record(0.002, failed=False)
+
+        text = await router.transcribe_audio_async(temp_audio_file)
+
+        assert text.startswith("primary")
+        assert "llm_router.hedges" not in metrics.snapshot()["counters"]
+
+    def test_sync_failover(self, temp_audio_file):
+        """Test failover on the synchronous path."""
+        from app.llm.router import RoutingLLMProvider
+
+        router = RoutingLLMProvider([
+            ("broken", mock(0, failure_rate=1.0, name="broken")),
+            ("backup", mock(0, name="backup"))
+        ])
+
+        assert router.transcribe_audio(temp_audio_file).startswith("backup")
+
+    def test_supported_formats_are_common_to_all_providers(self):
+        """Test that only formats every provider accepts are offered."""
+        from app.llm.requestyai_provider import RequestYaiProvider
+        from app.llm.router import RoutingLLMProvider
+
+        router = RoutingLLMProvider([("mock", mock(0)), ("requestyai", RequestYaiProvider(api_key="test_key"))])
+
+        assert ".mock" not in router.get_supported_formats()
+        assert ".flac" in router.get_supported_formats()
+
+
+class TestProviderFactory:
+    """Test building providers from settings."""
+
+    def test_comma_separated_providers_are_routed(self):
+        """Test that several configured providers are wrapped in a router."""
+        from unittest.mock import patch
+        from app.llm.factory import create_llm_provider
+        from app.llm.router import RoutingLLMProvider
+
+        with patch("app.llm.factory.settings.debug", False), \
+             patch("app.llm.factory.settings.llm_provider", "mock, requestyai"), \
+             patch("app.llm.factory.settings.transcription_cache_enabled", False):
+            provider = create_llm_provider()
+
+        router = provider.provider
+        assert isinstance(router, RoutingLLMProvider)
+        assert [name for name, _ in router.providers] == ["mock", "requestyai"]
+
+    def test_unknown_provider_is_rejected(self):
+        """Test that a typo in the provider list fails loudly."""
+        from unittest.mock import patch
+        from app.llm.factory import create_llm_provider
+
+        with patch("app.llm.factory.settings.debug", False), \
+             patch("app.llm.factory.settings.llm_provider", "requestyia"):
+            with pytest.raises(ValueError, match="Unknown LLM provider"):
+                create_llm_provider()
@@ -0,0 +1,69 @@
+"""
+Tests for the Alembic migrations.
+"""
+import os
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upgrade(url, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "mysql_url", url)
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+def chunk_columns(engine):
+    return {column["name"] for column in sa.inspect(engine).get_columns("recording_chunks")}
+
+
+class TestMigrations:
+    """Test upgrading existing databases."""
+
+    def test_upgrade_brings_original_chunk_table_up_to_date(self, tmp_path, monkeypatch):
+        """Test that a recording_chunks table from before the chunk columns is brought up to date."""
+        url = f"sqlite:///{tmp_path / 'old.db'}"
+        engine = sa.create_engine(url)
+        with engine.begin() as connection:
+            connection.execute(sa.text(
+                "CREATE TABLE recording_chunks ("
+                "id CHAR(36) PRIMARY KEY, recording_id CHAR(36) NOT NULL, chunk_index INTEGER NOT NULL, "
+                "audio_blob_path TEXT NOT NULL, duration_seconds FLOAT, uploaded_at DATETIME NOT NULL)"
+            ))
+            # A retried upload used to add a second row for the same index
+            for chunk_id, chunk_index in (("a", 0), ("b", 0), ("c", 1)):
+                connection.execute(sa.text(
+                    "INSERT INTO recording_chunks VALUES (:id, 'r', :chunk_index, '/x', NULL, '2024-01-01')"
+                ), {"id": chunk_id, "chunk_index": chunk_index})
+
+        upgrade(url, monkeypatch)
+
+        assert {"container", "codec", "transcription_text", "sha256", "transcription_lease_expires_at"} <= chunk_columns(engine)
+        with engine.begin() as connection:
+            rows = connection.execute(sa.text("SELECT id FROM recording_chunks ORDER BY id")).scalars().all()
+            assert rows == ["a", "c"]
+            with pytest.raises(sa.exc.IntegrityError):
+                connection.execute(sa.text(
+                    "INSERT INTO recording_chunks (id, recording_id, chunk_index, audio_blob_path, uploaded_at) "
+                    "VALUES ('d', 'r', 1, '/x', '2024-01-01')"
+                ))
+
+    def test_upgrade_of_current_schema_is_a_no_op(self, tmp_path, monkeypatch):
+        """Test that a database built by create_all upgrades without changes."""
+        from app.core.database import Base
+        import app.models  # noqa: F401
+
+        url = f"sqlite:///{tmp_path / 'new.db'}"
+        engine = sa.create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        before = chunk_columns(engine)
+
+        upgrade(url, monkeypatch)
+
+        assert chunk_columns(engine) == before
@@ -0,0 +1,284 @@
+"""
+Tests for pushing transcription status to clients.
+"""
+import asyncio
+import json
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from tests.test_transcription_jobs import create_recording, empty_queue  # noqa: F401  (autouse)
+
+
+def parse_sse(text):
+    """Split an SSE body into (event name, data) pairs."""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if "data" in fields:
+            events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+class TestRecordingEventStream:
+    """Test the broker and the SSE stream it feeds."""
+
+    def test_stream_sends_changes_until_transcript(self):
+        """Test that the stream skips repeated states and ends after the transcript."""
+        from app.services.recording_events import RecordingEventBroker, recording_event, stream_recording_events
+
+        broker = RecordingEventBroker()
+
+        async def run():
+            stream = stream_recording_events(recording_event("rec", "queued"), broker)
+            messages = [await stream.__anext__(), await stream.__anext__()]
+            for event in [
+                recording_event("rec", "running", 10.0),
+                recording_event("rec", "running", 10.0),
+                recording_event("other", "running", 50.0),
+                recording_event("rec", "running", 55.0),
+                recording_event("rec", "succeeded", 100.0, "Hello there."),
+            ]:
+                broker.publish(event)
+            messages += [message async for message in stream]
+            return messages
+
+        messages = asyncio.run(run())
+
+        assert messages[0].startswith("retry: ")
+        events = parse_sse("".join(messages[1:]))
+        assert [(name, data["progress"]) for name, data in events] == [
+            ("status", 0.0), ("status", 10.0), ("status", 55.0), ("transcript", 100.0)
+        ]
+        assert events[-1][1]["transcription_text"] == "Hello there."
+        assert broker.subscribed_recording_ids() == []
+
+    def test_publish_from_another_thread(self):
+        """Test that events published off the loop reach subscribers."""
+        from app.services.recording_events import RecordingEventBroker, recording_event
+
+        broker = RecordingEventBroker()
+
+        async def run():
+            queue = broker.subscribe("rec")
+            thread = threading.Thread(target=broker.publish, args=(recording_event("rec", "failed", error="boom"),))
+            thread.start()
+            event = await asyncio.wait_for(queue.get(), timeout=1)
+            thread.join()
+            return event
+
+        assert asyncio.run(run())["error"] == "boom"
+
+    def test_slow_subscriber_keeps_latest_events(self):
+        """Test that a full subscriber queue drops the oldest events."""
+        from app.services.recording_events import RecordingEventBroker, recording_event
+
+        broker = RecordingEventBroker(max_queued_events=2)
+
+        async def run():
+            queue = broker.subscribe("rec")
+            for progress in (10.0, 20.0, 30.0):
+                broker.publish(recording_event("rec", "running", progress))
+            await asyncio.sleep(0)
+            return [queue.get_nowait()["progress"] for _ in range(queue.qsize())]
+
+        assert asyncio.run(run()) == [20.0, 30.0]
+
+
+class TestEventFromState:
+    """Test describing a recording's transcription state."""
+
+    def test_queued_job_wins_over_an_earlier_transcript(self, test_db):
+        """Test that a backfill job for a transcribed recording reports its own status."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        from app.services.recording_events import event_from_state
+
+        recording = create_recording(test_db)
+        recording.transcription_text = "Old transcript."
+        test_db.commit()
+        job = MySQLTranscriptionJobRepository(test_db).enqueue(recording.id)
+
+        event = event_from_state(recording, job)
+
+        assert event["status"] == "queued"
+        assert event["transcription_text"] is None
+
+    def test_transcript_without_job_is_succeeded(self, test_db):
+        """Test that a recording transcribed before jobs existed reports its transcript."""
+        from app.services.recording_events import event_from_state
+
+        recording = create_recording(test_db)
+        recording.transcription_text = "Old transcript."
+        test_db.commit()
+
+        event = event_from_state(recording, None)
+
+        assert (event["status"], event["progress"], event["transcription_text"]) == (
+            "succeeded", 100.0, "Old transcript."
+        )
+
+
+class TestDatabaseEventRelay:
+    """Test relaying job state written by other processes."""
+
+    def test_poll_publishes_subscribed_recordings(self, test_db, test_engine):
+        """Test that one poll publishes the job state of each subscribed recording."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        from app.services.recording_events import DatabaseEventRelay, RecordingEventBroker
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        running = create_recording(test_db)
+        done = create_recording(test_db)
+        unwatched = create_recording(test_db)
+        for recording in (running, unwatched):
+            jobs.enqueue(recording.id)
+        job = jobs.claim("worker-a", lease_seconds=60)
+        jobs.update_progress(job.id, "worker-a", 40.0)
+        done.transcription_text = "All done."
+        test_db.commit()
+
+        broker = RecordingEventBroker()
+        relay = DatabaseEventRelay(broker, sessionmaker(bind=test_engine))
+
+        async def run():
+            queues = {recording.id: broker.subscribe(recording.id) for recording in (running, done)}
+            relay.poll()
+            await asyncio.sleep(0)
+            return {recording_id: queue.get_nowait() for recording_id, queue in queues.items()}
+
+        events = asyncio.run(run())
+
+        assert events[running.id]["status"] == "running"
+        assert events[running.id]["progress"] == 40.0
+        assert events[done.id]["status"] == "succeeded"
+        assert events[done.id]["transcription_text"] == "All done."
+
+    def test_poll_without_subscribers_skips_database(self):
+        """Test that an idle relay does not query."""
+        from app.services.recording_events import DatabaseEventRelay, RecordingEventBroker
+
+        def no_sessions():
+            raise AssertionError("queried without subscribers")
+
+        assert DatabaseEventRelay(RecordingEventBroker(), no_sessions).poll() == 0
+
+
+class TestWorkerEvents:
+    """Test that the worker publishes progress and the transcript."""
+
+    def test_worker_publishes_progress_and_transcript(self, test_db, test_engine):
+        """Test the events of one successful job."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        from app.services.recording_events import RecordingEventBroker
+        from app.workers.transcription_worker import TranscriptionWorker
+
+        class Service:
+            async def transcribe_recording(self, recording_id, on_progress=None):
+                for percent in (10.0, 50.0, 95.0):
+                    on_progress(percent)
+                return "Transcript."
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        job = jobs.enqueue(recording.id)
+        broker = RecordingEventBroker()
+        worker = TranscriptionWorker(
+            session_factory=sessionmaker(bind=test_engine), worker_id="events-worker",
+            service_factory=lambda db: Service(), events=broker
+        )
+
+        async def run():
+            queue = broker.subscribe(recording.id)
+            await worker.run_once()
+            await asyncio.sleep(0)
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        events = asyncio.run(run())
+
+        assert [(event["status"], event["progress"]) for event in events] == [
+            ("running", 0.0), ("running", 10.0), ("running", 50.0), ("running", 95.0), ("succeeded", 100.0)
+        ]
+        assert events[-1]["transcription_text"] == "Transcript."
+        assert jobs.get_job(job.id).progress == 100.0
+
+
+class TestRecordingEventsEndpoint:
+    """Test GET /recordings/{id}/events."""
+
+    @pytest.fixture
+    def local_client(self, test_db):
+        # The trusted host middleware only admits localhost
+        from main import app
+
+        with TestClient(app, base_url="http://localhost") as client:
+            yield client
+
+    def token_for(self, user_id):
+        from app.core.security import create_access_token
+
+        return create_access_token({"sub": user_id})
+
+    def stream_token_for(self, client, recording_id, user_id):
+        response = client.post(
+            f"/recordings/{recording_id}/events/token",
+            headers={"Authorization": f"Bearer {self.token_for(user_id)}"}
+        )
+        assert response.status_code == 200
+        return response.json()["stream_token"]
+
+    def test_finished_recording_streams_transcript(self, local_client, test_db):
+        """Test that a transcribed recording gets its transcript and the stream closes."""
+        recording = create_recording(test_db)
+        recording.transcription_text = "Finished text."
+        test_db.commit()
+        recording_id = recording.id
+        token = self.stream_token_for(local_client, recording_id, recording.user_id)
+
+        response = local_client.get(f"/recordings/{recording_id}/events", params={"stream_token": token})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert parse_sse(response.text) == [("transcript", {
+            "recording_id": recording_id, "status": "succeeded", "progress": 100.0,
+            "transcription_text": "Finished text.", "error": None
+        })]
+
+    def test_requires_token(self, local_client, test_db):
+        """Test that streams are authenticated."""
+        recording = create_recording(test_db)
+
+        response = local_client.get(f"/recordings/{recording.id}/events")
+
+        assert response.status_code == 401
+
+    def test_access_token_is_not_accepted_in_the_url(self, local_client, test_db):
+        """Test that only stream tokens may be passed in the query string."""
+        recording = create_recording(test_db)
+        token = self.token_for(recording.user_id)
+
+        for params in ({"access_token": token}, {"stream_token": token}):
+            response = local_client.get(f"/recordings/{recording.id}/events", params=params)
+            assert response.status_code == 401
+
+    def test_stream_token_is_single_purpose(self, local_client, test_db):
+        """Test that a stream token opens only its own recording's events."""
+        recording = create_recording(test_db)
+        other = create_recording(test_db, user_id=recording.user_id)
+        recording_id, other_id = recording.id, other.id
+        token = self.stream_token_for(local_client, recording_id, recording.user_id)
+
+        response = local_client.get(f"/recordings/{other_id}/events", params={"stream_token": token})
+        assert response.status_code == 401
+
+        response = local_client.get(f"/recordings/{recording_id}", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+    def test_other_users_recording_is_forbidden(self, local_client, test_db):
+        """Test that users cannot follow other users' recordings."""
+        recording = create_recording(test_db)
+        other = create_recording(test_db)
+        headers = {"Authorization": f"Bearer {self.token_for(other.user_id)}"}
+
+        assert local_client.post(f"/recordings/{recording.id}/events/token", headers=headers).status_code == 403
+        assert local_client.get(f"/recordings/{recording.id}/events", headers=headers).status_code == 403
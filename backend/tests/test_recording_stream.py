@@ -0,0 +1,218 @@
+"""
+Tests for continuous audio ingest over the recording WebSocket.
+"""
+import hashlib
+import os
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from tests.test_chunk_uploads import wav_bytes
+from tests.test_transcription_jobs import create_recording, empty_queue  # noqa: F401  (autouse)
+
+
+def stream_url(recording_id, stream_token):
+    # websocket_connect ignores the client's base_url, and only localhost is a trusted host
+    return f"ws://localhost/recordings/{recording_id}/stream?stream_token={stream_token}"
+
+
+def open_stream_url(client, recording_id, token):
+    """Get a stream token with the access token and build the WebSocket URL."""
+    response = client.post(
+        f"/recordings/{recording_id}/stream/token", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    return stream_url(recording_id, response.json()["stream_token"])
+
+
+class TestStreamedChunk:
+    """Test resumable chunk files."""
+
+    def test_reopen_drops_bytes_after_checkpoint(self, tmp_path):
+        """Test that a resumed chunk continues from its last checkpoint."""
+        from app.audio.chunk_writer import StreamedChunk, pending_stream_chunks, publish_chunk
+
+        chunk = StreamedChunk(str(tmp_path), 1, max_bytes=1_000_000)
+        assert chunk.open() == 0
+        chunk.append(b"a" * 100)
+        assert chunk.checkpoint() == 100
+        chunk.append(b"b" * 50)
+        chunk.close()
+
+        resumed = StreamedChunk(str(tmp_path), 1, max_bytes=1_000_000)
+        assert pending_stream_chunks(str(tmp_path)) == [1]
+        assert resumed.open() == 100
+        resumed.append(b"c" * 10)
+        stored = publish_chunk(resumed.finish())
+
+        assert stored.size == 110
+        assert stored.sha256 == hashlib.sha256(b"a" * 100 + b"c" * 10).hexdigest()
+        assert os.listdir(tmp_path) == ["chunk_0001.bin"]
+
+
+class TestRecordingStreamEndpoint:
+    """Test WS /recordings/{id}/stream."""
+
+    @pytest.fixture
+    def local_client(self, test_db, tmp_path, monkeypatch):
+        # The trusted host middleware only admits localhost
+        from app.core.config import settings
+        from main import app
+
+        monkeypatch.setattr(settings, "audio_storage_path", str(tmp_path))
+        monkeypatch.setattr(settings, "live_transcription_enabled", False)
+        monkeypatch.setattr(settings, "recording_stream_checkpoint_seconds", 0.05)
+        with TestClient(app, base_url="http://localhost") as client:
+            yield client
+
+    @pytest.fixture
+    def active_recording(self, test_db):
+        from app.core.security import create_access_token
+        from app.models.recording import RecordingStatus
+
+        recording = create_recording(test_db)
+        recording.status = RecordingStatus.ACTIVE
+        test_db.commit()
+        return recording.id, create_access_token({"sub": recording.user_id})
+
+    def test_streamed_chunk_is_acknowledged_and_committed(self, local_client, active_recording, tmp_path, test_db):
+        """Test one chunk sent in frames, acknowledged at checkpoints and stored at its end."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, token = active_recording
+        data = wav_bytes(48_000)
+
+        with local_client.websocket_connect(open_stream_url(local_client, recording_id, token)) as ws:
+            ws.send_json({"type": "start", "chunk_index": 0})
+            assert ws.receive_json() == {"type": "ready", "chunk_index": 0, "offset": 0}
+            for offset in range(0, len(data), 4096):
+                ws.send_bytes(data[offset:offset + 4096])
+            assert ws.receive_json() == {"type": "ack", "chunk_index": 0, "offset": len(data)}
+            ws.send_json({"type": "end", "chunk_index": 0, "duration_seconds": 1.5})
+            committed = ws.receive_json()
+
+        assert committed["type"] == "committed"
+        assert committed["sha256"] == hashlib.sha256(data).hexdigest()
+        chunk = test_db.query(RecordingChunk).filter(RecordingChunk.id == committed["chunk_id"]).one()
+        assert (chunk.chunk_index, chunk.duration_seconds, chunk.container) == (0, 1.5, "wav")
+        with open(tmp_path / recording_id / "chunk_0000.wav", "rb") as f:
+            assert f.read() == data
+
+    def test_reconnect_resumes_from_acknowledged_offset(self, local_client, active_recording):
+        """Test that a dropped stream resumes where the last ack left off."""
+        recording_id, token = active_recording
+        url = open_stream_url(local_client, recording_id, token)
+
+        with local_client.websocket_connect(url) as ws:
+            ws.send_json({"type": "start", "chunk_index": 3})
+            ws.receive_json()
+            ws.send_bytes(b"x" * 1000)
+            assert ws.receive_json()["offset"] == 1000
+
+        with local_client.websocket_connect(url) as ws:
+            ws.send_json({"type": "start", "chunk_index": 3})
+            assert ws.receive_json() == {"type": "ready", "chunk_index": 3, "offset": 1000}
+            ws.send_json({"type": "end", "chunk_index": 3})
+            assert ws.receive_json()["file_size"] == 1000
+
+            # A retried start of a stored chunk is answered without reopening it
+            ws.send_json({"type": "start", "chunk_index": 3})
+            assert ws.receive_json()["type"] == "committed"
+
+    def test_finish_stores_unfinished_stream(self, local_client, active_recording, test_db):
+        """Test that audio checkpointed before the client vanished is kept at finish."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, token = active_recording
+
+        with local_client.websocket_connect(open_stream_url(local_client, recording_id, token)) as ws:
+            ws.send_json({"type": "start", "chunk_index": 0})
+            ws.receive_json()
+            ws.send_bytes(wav_bytes(8_000))
+            ws.receive_json()
+
+        response = local_client.post(
+            f"/recordings/{recording_id}/finish", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 200
+        chunks = test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).all()
+        assert [(chunk.chunk_index, chunk.container) for chunk in chunks] == [(0, "wav")]
+
+    def test_finish_ends_an_open_stream_first(self, local_client, active_recording, test_db):
+        """Test that finishing while a stream is open closes it before its chunk is stored."""
+        from app.models.recording import RecordingChunk
+
+        recording_id, token = active_recording
+
+        with local_client.websocket_connect(open_stream_url(local_client, recording_id, token)) as ws:
+            ws.send_json({"type": "start", "chunk_index": 0})
+            ws.receive_json()
+            ws.send_bytes(wav_bytes(8_000))
+            ws.receive_json()
+
+            response = local_client.post(
+                f"/recordings/{recording_id}/finish", headers={"Authorization": f"Bearer {token}"}
+            )
+
+            assert ws.receive_json() == {"type": "error", "detail": "Recording finished"}
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+
+        assert response.status_code == 200
+        assert closed.value.code == 4409
+        chunks = test_db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).all()
+        assert [(chunk.chunk_index, chunk.sha256) for chunk in chunks] == [
+            (0, hashlib.sha256(wav_bytes(8_000)).hexdigest())
+        ]
+
+    def test_invalid_token_closes_stream(self, local_client, active_recording):
+        """Test that the socket is closed with 4401 for a bad token."""
+        recording_id, _ = active_recording
+
+        with local_client.websocket_connect(stream_url(recording_id, "bad")) as ws:
+            assert ws.receive_json()["type"] == "error"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+
+        assert closed.value.code == 4401
+
+    def test_access_token_is_not_accepted_in_the_url(self, local_client, active_recording):
+        """Test that a full access token in the query string is rejected."""
+        recording_id, token = active_recording
+
+        for url in (
+            f"ws://localhost/recordings/{recording_id}/stream?access_token={token}",
+            stream_url(recording_id, token),
+        ):
+            with local_client.websocket_connect(url) as ws:
+                assert ws.receive_json()["type"] == "error"
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    ws.receive_json()
+            assert closed.value.code == 4401
+
+    def test_events_token_does_not_open_the_audio_stream(self, local_client, active_recording):
+        """Test that stream tokens are limited to their own kind of stream."""
+        recording_id, token = active_recording
+        events_token = local_client.post(
+            f"/recordings/{recording_id}/events/token", headers={"Authorization": f"Bearer {token}"}
+        ).json()["stream_token"]
+
+        with local_client.websocket_connect(stream_url(recording_id, events_token)) as ws:
+            assert ws.receive_json()["type"] == "error"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+
+        assert closed.value.code == 4401
+
+    def test_audio_before_start_is_a_protocol_error(self, local_client, active_recording):
+        """Test that frames outside a chunk close the stream."""
+        recording_id, token = active_recording
+
+        with local_client.websocket_connect(open_stream_url(local_client, recording_id, token)) as ws:
+            ws.send_bytes(b"audio")
+            assert ws.receive_json() == {"type": "error", "detail": "Send start before audio"}
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+
+        assert closed.value.code == 1008
@@ -1,9 +1,7 @@
 """
 Tests for recording endpoints.
 """
-import pytest
 import io
-from unittest.mock import patch
 
 
 class TestRecordingEndpoints:
@@ -105,16 +103,19 @@ class TestRecordingEndpoints:
         data = response.json()
         assert data["status"] == "paused"
     
-    def test_finish_recording(self, client, auth_headers, test_recording):
-        """Test finishing a recording."""
-        with patch('app.api.recordings.TranscriptionService') as mock_service:
-            mock_service.return_value.process_recording_async.return_value = None
-            
-            response = client.post(f"/recordings/{test_recording.id}/finish", headers=auth_headers)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ended"
+    def test_finish_recording(self, client, auth_headers, test_recording, test_db):
+        """Test finishing a recording queues its transcription."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        
+        response = client.post(f"/recordings/{test_recording.id}/finish", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ended"
+        
+        job = MySQLTranscriptionJobRepository(test_db).get_latest_job(test_recording.id)
+        assert job is not None
+        assert job.status.value == "queued"
     
     def test_update_recording_notes(self, client, auth_headers, test_recording):
         """Test updating recording notes."""
@@ -0,0 +1,188 @@
+"""
+Tests for segmented transcription of long recordings.
+"""
+import asyncio
+import os
+import pytest
+
+from tests.test_audio_assembler import write_wav, read_wav
+from tests.test_audio_engine import speech_like, silence
+
+
+class TestSplitAtSilence:
+    """Test splitting PCM at quiet points."""
+
+    def test_short_recording_is_one_segment(self, tmp_path):
+        """Test that a recording shorter than a segment is not split."""
+        from app.audio.segments import split_at_silence
+
+        source = write_wav(str(tmp_path / "in.wav"), speech_like(2.0))
+
+        segments = split_at_silence(source, str(tmp_path / "seg"), segment_seconds=5.0, search_seconds=1.0)
+
+        assert len(segments) == 1
+        assert segments[0].path == source
+        assert segments[0].duration_seconds == pytest.approx(2.0)
+
+    def test_cuts_at_pauses_with_overlap(self, tmp_path):
+        """Test that cuts land in pauses and segments overlap."""
+        from app.audio.segments import split_at_silence
+
+        # Pauses centred at 4.5 s and 9.5 s; the target boundary is every 5 s
+        frames = speech_like(4.2) + silence(0.6) + speech_like(4.4) + silence(0.6) + speech_like(4.2)
+        source = write_wav(str(tmp_path / "in.wav"), frames)
+
+        segments = split_at_silence(
+            source, str(tmp_path / "seg"), segment_seconds=5.0, overlap_seconds=0.3, search_seconds=1.0
+        )
+
+        assert len(segments) == 3
+        assert 4.2 <= segments[0].end_seconds <= 4.8
+        assert 9.2 <= segments[1].end_seconds <= 9.8
+        assert segments[1].start_seconds == pytest.approx(segments[0].end_seconds - 0.3)
+        assert segments[2].end_seconds == pytest.approx(14.0)
+
+        params, data = read_wav(segments[1].path)
+        assert params.framerate == 16000
+        start = int(segments[1].start_seconds * 16000) * 2
+        assert data == frames[start:start + len(data)]
+
+
+class TestStitchTranscripts:
+    """Test joining segment transcripts."""
+
+    def test_removes_duplicated_boundary_words(self):
+        """Test that words repeated by the overlap appear once."""
+        from app.services.segmented_transcription import stitch_transcripts
+
+        text = stitch_transcripts([
+            "The patient reports mild pain in the left knee.",
+            "In the left knee, worse in the morning.",
+            "the morning; stiffness lasts an hour."
+        ])
+
+        assert text == "The patient reports mild pain in the left knee. worse in the morning. stiffness lasts an hour."
+
+    def test_tolerates_clipped_word(self):
+        """Test that a word cut at the end of a segment is replaced by the complete one."""
+        from app.services.segmented_transcription import stitch_transcripts
+
+        text = stitch_transcripts(["we discussed the treat", "discussed the treatment plan"])
+
+        assert text == "we discussed the treatment plan"
+
+    def test_without_overlap_concatenates(self):
+        """Test that unrelated transcripts are joined unchanged."""
+        from app.services.segmented_transcription import stitch_transcripts
+
+        assert stitch_transcripts(["first part.", "second part."]) == "first part. second part."
+        assert stitch_transcripts([]) == ""
+
+
+class TestSegmentedTranscriber:
+    """Test concurrent transcription of segments."""
+
+    @pytest.mark.asyncio
+    async def test_transcribes_segments_concurrently_in_order(self, tmp_path):
+        """Test that segments run under the concurrency limit and are stitched in order."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.llm.mock_provider import MockLLMProvider
+        from app.services.segmented_transcription import SegmentedTranscriber
+
+        class RecordingProvider(MockLLMProvider):
+            def __init__(self):
+                super().__init__()
+                self.in_flight = 0
+                self.max_in_flight = 0
+                self.calls = 0
+
+            async def transcribe_audio_async(self, audio_path):
+                self.calls += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                index = int(os.path.splitext(audio_path)[0].rsplit("_", 1)[1])
+                # Later segments finish first to check ordering
+                await asyncio.sleep(0.05 * (4 - index))
+                self.in_flight -= 1
+                return f"segment {index}"
+
+        provider = RecordingProvider()
+        engine = AudioEngine(max_workers=0)
+        frames = b"".join(speech_like(1.8) + silence(0.4) for _ in range(4))
+        assembled = write_wav(str(tmp_path / "assembled_audio.wav"), frames)
+        transcriber = SegmentedTranscriber(
+            provider, engine, TranscriptionEncoder(engine),
+            segment_seconds=2.0, overlap_seconds=0.0, search_seconds=0.5, max_concurrency=2
+        )
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                text = await transcriber.transcribe(assembled, ['.wav'])
+        finally:
+            engine.shutdown()
+
+        assert provider.calls == 4
+        assert provider.max_in_flight == 2
+        assert text == "segment 0 segment 1 segment 2 segment 3"
+        assert sorted(os.listdir(tmp_path)) == ["assembled_audio.wav"]
+
+    @pytest.mark.asyncio
+    async def test_segment_failure_fails_transcription(self, tmp_path):
+        """Test that a failed segment fails the recording and cleans up."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.llm.mock_provider import MockLLMProvider
+        from app.services.segmented_transcription import SegmentedTranscriber
+
+        engine = AudioEngine(max_workers=0)
+        assembled = write_wav(str(tmp_path / "assembled_audio.wav"), speech_like(1.0))
+        transcriber = SegmentedTranscriber(
+            MockLLMProvider(should_fail=True), engine, TranscriptionEncoder(engine), segment_seconds=300.0
+        )
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                with pytest.raises(Exception, match="Mock transcription failure"):
+                    await transcriber.transcribe(assembled, ['.wav'])
+        finally:
+            engine.shutdown()
+
+        assert sorted(os.listdir(tmp_path)) == ["assembled_audio.wav"]
+
+    @pytest.mark.asyncio
+    async def test_records_encoding_statistics(self, tmp_path):
+        """Test that the segmented path publishes the same encoding metrics as a single upload."""
+        from unittest.mock import patch
+        from app.audio.encoding import TranscriptionEncoder
+        from app.audio.engine import AudioEngine
+        from app.core.metrics import metrics
+        from app.llm.mock_provider import MockLLMProvider
+        from app.services.segmented_transcription import SegmentedTranscriber
+
+        metrics.reset()
+        engine = AudioEngine(max_workers=0)
+        # Stereo 48 kHz is downmixed and resampled, so the payloads are smaller
+        assembled = write_wav(
+            str(tmp_path / "assembled_audio.wav"), b"\x01\x00\x02\x00" * 48000 * 3,
+            channels=2, sample_rate=48000
+        )
+        original_bytes = os.path.getsize(assembled)
+        transcriber = SegmentedTranscriber(
+            MockLLMProvider(simulate_delay=False), engine, TranscriptionEncoder(engine),
+            segment_seconds=2.0, overlap_seconds=0.0
+        )
+
+        try:
+            with patch("app.audio.encoding.ffmpeg_available", return_value=False):
+                await transcriber.transcribe(assembled, ['.wav'])
+        finally:
+            engine.shutdown()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["transcription_encoding.jobs"] == 1
+        assert snapshot["counters"]["transcription_encoding.original_bytes"] == original_bytes
+        assert 0 < snapshot["counters"]["transcription_encoding.encoded_bytes"] < original_bytes / 4
+        assert "transcription_encoding.seconds" in snapshot["summaries"]
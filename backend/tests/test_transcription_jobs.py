@@ -0,0 +1,335 @@
+"""
+Tests for the durable transcription job queue and its worker.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def session_factory(test_engine):
+    """Independent sessions, one per simulated worker."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+
+def create_recording(test_db, user_id=None):
+    """Create an ended recording, owned by a fresh user unless ``user_id`` is given."""
+    from app.models import User
+    from app.models.recording import Recording, RecordingStatus
+
+    if user_id is None:
+        user = User(google_id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", display_name="Queue User")
+        test_db.add(user)
+        test_db.commit()
+        user_id = user.id
+    recording = Recording(user_id=user_id, status=RecordingStatus.ENDED)
+    test_db.add(recording)
+    test_db.commit()
+    return recording
+
+
+def claim_all(session_factory, worker_id):
+    """Claim every runnable job with a fresh session."""
+    from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+    jobs = MySQLTranscriptionJobRepository(session_factory())
+    claimed = []
+    while True:
+        job = jobs.claim(worker_id, lease_seconds=60)
+        if job is None:
+            return claimed
+        claimed.append(job.id)
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(test_db):
+    """Start each test with no runnable jobs left over from other tests."""
+    from app.models import TranscriptionJob
+
+    test_db.query(TranscriptionJob).delete()
+    test_db.commit()
+
+
+class TestTranscriptionJobRepository:
+    """Test queueing, claiming and finishing jobs."""
+
+    def test_enqueue_reuses_unfinished_job(self, test_db):
+        """Test that finishing a recording twice queues one job."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+
+        first = jobs.enqueue(recording.id, max_attempts=2)
+        second = jobs.enqueue(recording.id)
+
+        assert first.id == second.id
+        assert first.status.value == "queued"
+        assert first.max_attempts == 2
+
+    def test_claim_takes_lease(self, test_db):
+        """Test that a claim marks the job running under the worker's lease."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        queued = jobs.enqueue(recording.id)
+
+        job = jobs.claim("worker-a", lease_seconds=60)
+
+        assert job.id == queued.id
+        assert job.status.value == "running"
+        assert job.attempts == 1
+        assert job.lease_owner == "worker-a"
+        assert job.lease_expires_at > datetime.utcnow() + timedelta(seconds=50)
+        assert jobs.claim("worker-b", lease_seconds=60) is None
+
+    def test_concurrent_workers_claim_distinct_jobs(self, test_db, session_factory):
+        """Test that two workers never claim the same job."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        queued = {jobs.enqueue(create_recording(test_db).id).id for _ in range(4)}
+
+        worker_a = MySQLTranscriptionJobRepository(session_factory())
+        worker_b = MySQLTranscriptionJobRepository(session_factory())
+        claimed = []
+        for _ in range(2):
+            claimed.append(worker_a.claim("worker-a", lease_seconds=60).id)
+            claimed.append(worker_b.claim("worker-b", lease_seconds=60).id)
+
+        assert sorted(claimed) == sorted(queued)
+        assert worker_a.claim("worker-a", lease_seconds=60) is None
+
+    def test_expired_lease_is_reclaimed(self, test_db, session_factory):
+        """Test that a job whose worker died goes to another worker."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        jobs.enqueue(recording.id)
+        job = jobs.claim("worker-a", lease_seconds=60)
+        job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        test_db.commit()
+
+        other = MySQLTranscriptionJobRepository(session_factory())
+        reclaimed = other.claim("worker-b", lease_seconds=60)
+
+        assert reclaimed.id == job.id
+        assert reclaimed.lease_owner == "worker-b"
+        assert reclaimed.attempts == 2
+        # The old owner can no longer renew or complete the job
+        assert not jobs.heartbeat(job.id, "worker-a", lease_seconds=60)
+        assert not jobs.complete(job.id, "worker-a")
+        assert other.heartbeat(job.id, "worker-b", lease_seconds=60)
+
+    def test_expired_lease_on_final_attempt_fails_job(self, test_db):
+        """Test that a job is not retried past its attempt limit."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        jobs.enqueue(recording.id, max_attempts=1)
+        job = jobs.claim("worker-a", lease_seconds=60)
+        job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        test_db.commit()
+
+        assert jobs.claim("worker-b", lease_seconds=60) is None
+        assert jobs.get_job(job.id).status.value == "failed"
+
+    def test_fail_retries_with_backoff_then_gives_up(self, test_db):
+        """Test that failed attempts back off exponentially until max attempts."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        jobs.enqueue(recording.id, max_attempts=2)
+
+        job = jobs.claim("worker-a", lease_seconds=60)
+        failed = jobs.fail(job.id, "worker-a", "provider down", retry_delay_seconds=30)
+
+        assert failed.status.value == "queued"
+        assert failed.last_error == "provider down"
+        assert failed.run_after > datetime.utcnow() + timedelta(seconds=25)
+        assert jobs.claim("worker-a", lease_seconds=60) is None
+
+        failed.run_after = datetime.utcnow() - timedelta(seconds=1)
+        test_db.commit()
+        job = jobs.claim("worker-a", lease_seconds=60)
+        assert job.attempts == 2
+
+        failed = jobs.fail(job.id, "worker-a", "provider down", retry_delay_seconds=30)
+        assert failed.status.value == "failed"
+        assert failed.finished_at is not None
+
+
+class TestFairScheduling:
+    """Test claim order across users and priority classes."""
+
+    def test_burst_from_one_user_does_not_block_others(self, test_db):
+        """Test that another user's recording is claimed right after the job in progress."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        heavy_user = create_recording(test_db).user_id
+        burst = [jobs.enqueue(create_recording(test_db, heavy_user).id, audio_seconds=600).id for _ in range(5)]
+        other = jobs.enqueue(create_recording(test_db).id, audio_seconds=600).id
+
+        order = claim_all(lambda: test_db, "worker-a")
+
+        assert order[:3] == [burst[0], other, burst[1]]
+        assert sorted(order) == sorted(burst + [other])
+
+    def test_users_share_in_proportion_to_audio_seconds(self, test_db):
+        """Test that a user with short recordings gets more turns per audio second."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        long_user = create_recording(test_db).user_id
+        short_user = create_recording(test_db).user_id
+        long_jobs = [jobs.enqueue(create_recording(test_db, long_user).id, audio_seconds=900).id for _ in range(2)]
+        short_jobs = [jobs.enqueue(create_recording(test_db, short_user).id, audio_seconds=300).id for _ in range(4)]
+
+        order = claim_all(lambda: test_db, "worker-a")
+
+        # Three 300 s jobs are charged as much as one 900 s job
+        assert order == [short_jobs[0], short_jobs[1], long_jobs[0], short_jobs[2], short_jobs[3], long_jobs[1]]
+
+    def test_priority_classes_are_claimed_in_order(self, test_db):
+        """Test that short recordings go first and backfills last."""
+        from app.models import TranscriptionJobPriority
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+        from app.services.job_scheduling import classify_priority
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        backfill = jobs.enqueue(
+            create_recording(test_db).id, audio_seconds=10, priority=classify_priority(10, backfill=True)
+        ).id
+        interactive = jobs.enqueue(create_recording(test_db).id, audio_seconds=1800, priority=classify_priority(1800)).id
+        short = jobs.enqueue(create_recording(test_db).id, audio_seconds=30, priority=classify_priority(30)).id
+
+        assert classify_priority(30) == TranscriptionJobPriority.SHORT
+        assert claim_all(lambda: test_db, "worker-a") == [short, interactive, backfill]
+
+    def test_fifo_when_fair_scheduling_disabled(self, test_db, monkeypatch):
+        """Test that disabling fair scheduling claims jobs in arrival order."""
+        from app.core.config import settings
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        monkeypatch.setattr(settings, "transcription_fair_scheduling_enabled", False)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        heavy_user = create_recording(test_db).user_id
+        queued = [jobs.enqueue(create_recording(test_db, heavy_user).id, audio_seconds=600).id for _ in range(3)]
+        queued.append(jobs.enqueue(create_recording(test_db).id, audio_seconds=600).id)
+
+        assert claim_all(lambda: test_db, "worker-a") == queued
+
+    def test_queue_stats_per_class(self, test_db):
+        """Test that queue depth and running jobs are reported per priority class."""
+        from app.models import TranscriptionJobPriority
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        for _ in range(3):
+            jobs.enqueue(create_recording(test_db).id, priority=TranscriptionJobPriority.SHORT)
+        jobs.enqueue(create_recording(test_db).id, priority=TranscriptionJobPriority.BACKFILL)
+        jobs.claim("worker-a", lease_seconds=60)
+
+        stats = jobs.queue_stats()
+
+        assert stats["short"]["queued"] == 2
+        assert stats["short"]["running"] == 1
+        assert stats["short"]["oldest_wait_seconds"] >= 0
+        assert stats["interactive"]["queued"] == 0
+        assert stats["backfill"]["queued"] == 1
+
+
+class TestTranscriptionWorker:
+    """Test the worker loop with a stub transcription service."""
+
+    def make_worker(self, session_factory, service, **kwargs):
+        from app.workers.transcription_worker import TranscriptionWorker
+
+        return TranscriptionWorker(
+            session_factory=session_factory,
+            worker_id="test-worker",
+            retry_delay_seconds=0,
+            service_factory=lambda db: service,
+            **kwargs
+        )
+
+    def test_run_once_completes_job(self, test_db, session_factory):
+        """Test that a successful transcription completes the job."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        class Service:
+            calls = []
+
+            async def transcribe_recording(self, recording_id, on_progress=None):
+                self.calls.append(recording_id)
+                return "text"
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        job = jobs.enqueue(recording.id)
+        service = Service()
+        worker = self.make_worker(session_factory, service)
+
+        assert asyncio.run(worker.run_once())
+        assert not asyncio.run(worker.run_once())
+        assert service.calls == [recording.id]
+        assert jobs.get_job(job.id).status.value == "succeeded"
+
+    def test_failures_are_retried_then_recorded(self, test_db, session_factory):
+        """Test that a failing transcription is retried up to max attempts."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        class Service:
+            async def transcribe_recording(self, recording_id, on_progress=None):
+                raise RuntimeError("provider down")
+
+        recording = create_recording(test_db)
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        job = jobs.enqueue(recording.id, max_attempts=2)
+        worker = self.make_worker(session_factory, Service())
+
+        assert asyncio.run(worker.run_once())
+        assert jobs.get_job(job.id).status.value == "queued"
+        assert asyncio.run(worker.run_once())
+
+        finished = jobs.get_job(job.id)
+        assert finished.status.value == "failed"
+        assert finished.attempts == 2
+        assert finished.last_error == "provider down"
+
+    def test_run_drains_queue_until_stopped(self, test_db, session_factory):
+        """Test that the loop runs queued jobs concurrently and stops cleanly."""
+        from app.repositories.mysql_transcription_job_repository import MySQLTranscriptionJobRepository
+
+        class Service:
+            active = 0
+            peak = 0
+
+            async def transcribe_recording(self, recording_id, on_progress=None):
+                Service.active += 1
+                Service.peak = max(Service.peak, Service.active)
+                await asyncio.sleep(0.05)
+                Service.active -= 1
+                return "text"
+
+        jobs = MySQLTranscriptionJobRepository(test_db)
+        queued = [jobs.enqueue(create_recording(test_db).id).id for _ in range(4)]
+        worker = self.make_worker(session_factory, Service(), concurrency=2, poll_seconds=0.01)
+
+        async def run():
+            runner = asyncio.create_task(worker.run())
+            while any(jobs.get_job(job_id).status.value != "succeeded" for job_id in queued):
+                await asyncio.sleep(0.01)
+            worker.stop()
+            await asyncio.wait_for(runner, timeout=5)
+
+        asyncio.run(run())
+
+        assert Service.peak == 2
@@ -9,20 +9,22 @@ import {
 import WaveformVisualizer from './WaveformVisualizer';
 import TranscriptionDisplay from './TranscriptionDisplay';
 import apiService from '../services/apiService';
+import RecordingStream from '../services/recordingStream';
 
 const { Title, Text } = Typography;
 
 const RecordingInterface = ({ recording, onRecordingUpdate }) => {
   const [isRecording, setIsRecording] = useState(false);
   const [isPaused, setIsPaused] = useState(false);
-  const [chunkIndex, setChunkIndex] = useState(0);
   const [recordingTime, setRecordingTime] = useState(0);
   const [uploading, setUploading] = useState(false);
 
   const mediaRecorderRef = useRef(null);
   const streamRef = useRef(null);
   const timerRef = useRef(null);
-  const chunksRef = useRef([]);
+  const recordingStreamRef = useRef(null);
+  const nextChunkRef = useRef(0);
+  const chunkIntervalRef = useRef(null);
 
   useEffect(() => {
     // Cleanup on unmount
@@ -44,13 +46,11 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
         setIsRecording(false);
         setIsPaused(false);
         setRecordingTime(0);
-        setChunkIndex(0);
       }
     } else {
       setIsRecording(false);
       setIsPaused(false);
       setRecordingTime(0);
-      setChunkIndex(0);
     }
   }, [recording]);
 
@@ -67,6 +67,53 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
     }
   };
 
+  // Record one chunk (a fresh MediaRecorder, so it starts with its own
+  // container header) and stream its audio every second as it is recorded.
+  // The handlers keep this chunk's index: after a rotation the old recorder's
+  // last data and stop events fire once the next chunk has started.
+  const startChunkRecorder = () => {
+    const recordingStream = recordingStreamRef.current;
+    const mediaRecorder = new MediaRecorder(streamRef.current, {
+      mimeType: 'audio/webm;codecs=opus'
+    });
+    const startedAt = Date.now();
+    const chunkIndex = nextChunkRef.current;
+
+    recordingStream.startChunk(chunkIndex);
+    nextChunkRef.current += 1;
+
+    mediaRecorder.ondataavailable = (event) => {
+      if (event.data.size > 0) {
+        recordingStream.sendAudio(chunkIndex, event.data);
+      }
+    };
+
+    mediaRecorder.onstop = () => {
+      recordingStream.endChunk(chunkIndex, (Date.now() - startedAt) / 1000);
+    };
+
+    mediaRecorderRef.current = mediaRecorder;
+    mediaRecorder.start(1000);
+  };
+
+  // Start a new chunk every 30 seconds
+  const startChunkRotation = () => {
+    stopChunkRotation();
+    chunkIntervalRef.current = setInterval(() => {
+      if (mediaRecorderRef.current && mediaRecorderRef.current.state === 'recording') {
+        mediaRecorderRef.current.stop();
+        startChunkRecorder();
+      }
+    }, 30000);
+  };
+
+  const stopChunkRotation = () => {
+    if (chunkIntervalRef.current) {
+      clearInterval(chunkIntervalRef.current);
+      chunkIntervalRef.current = null;
+    }
+  };
+
   const startRecording = async () => {
     if (!recording) {
       message.error('Please create a recording session first');
@@ -83,64 +130,21 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
       });
       
       streamRef.current = stream;
-      
-      const mediaRecorder = new MediaRecorder(stream, {
-        mimeType: 'audio/webm;codecs=opus'
+
+      // One connection for the whole recording; it resumes after network drops
+      const recordingStream = new RecordingStream(() => apiService.recordingStreamUrl(recording.id), {
+        onError: (reason) => message.error(`Audio upload stopped: ${reason}`)
       });
-      
-      mediaRecorderRef.current = mediaRecorder;
-      chunksRef.current = [];
-
-      mediaRecorder.ondataavailable = (event) => {
-        if (event.data.size > 0) {
-          chunksRef.current.push(event.data);
-        }
-      };
-
-      mediaRecorder.onstop = async () => {
-        if (chunksRef.current.length > 0) {
-          await uploadChunk();
-        }
-      };
-
-      // Start recording and set up chunk intervals (every 30 seconds)
-      mediaRecorder.start();
+      recordingStream.connect();
+      recordingStreamRef.current = recordingStream;
+      nextChunkRef.current = 0;
+
+      startChunkRecorder();
+      startChunkRotation();
       setIsRecording(true);
       setIsPaused(false);
       startTimer();
 
-      // Set up automatic chunk upload every 30 seconds
-      const chunkInterval = setInterval(() => {
-        if (mediaRecorderRef.current && mediaRecorderRef.current.state === 'recording') {
-          mediaRecorderRef.current.stop();
-          setTimeout(() => {
-            if (streamRef.current && isRecording) {
-              const newRecorder = new MediaRecorder(streamRef.current, {
-                mimeType: 'audio/webm;codecs=opus'
-              });
-              
-              newRecorder.ondataavailable = (event) => {
-                if (event.data.size > 0) {
-                  chunksRef.current = [event.data];
-                }
-              };
-
-              newRecorder.onstop = async () => {
-                if (chunksRef.current.length > 0) {
-                  await uploadChunk();
-                }
-              };
-
-              mediaRecorderRef.current = newRecorder;
-              newRecorder.start();
-            }
-          }, 100);
-        }
-      }, 30000);
-
-      // Store interval reference for cleanup
-      mediaRecorderRef.current.chunkInterval = chunkInterval;
-
       message.success('Recording started');
     } catch (error) {
       console.error('Error starting recording:', error);
@@ -154,10 +158,7 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
     try {
       mediaRecorderRef.current.stop();
       stopTimer();
-      
-      if (mediaRecorderRef.current.chunkInterval) {
-        clearInterval(mediaRecorderRef.current.chunkInterval);
-      }
+      stopChunkRotation();
 
       setIsPaused(true);
       setIsRecording(false);
@@ -174,29 +175,11 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
   };
 
   const resumeRecording = async () => {
-    if (!recording || !streamRef.current) return;
+    if (!recording || !streamRef.current || !recordingStreamRef.current) return;
 
     try {
-      const mediaRecorder = new MediaRecorder(streamRef.current, {
-        mimeType: 'audio/webm;codecs=opus'
-      });
-      
-      mediaRecorderRef.current = mediaRecorder;
-      chunksRef.current = [];
-
-      mediaRecorder.ondataavailable = (event) => {
-        if (event.data.size > 0) {
-          chunksRef.current.push(event.data);
-        }
-      };
-
-      mediaRecorder.onstop = async () => {
-        if (chunksRef.current.length > 0) {
-          await uploadChunk();
-        }
-      };
-
-      mediaRecorder.start();
+      startChunkRecorder();
+      startChunkRotation();
       setIsRecording(true);
       setIsPaused(false);
       startTimer();
@@ -214,18 +197,23 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
     try {
       setUploading(true);
       
-      mediaRecorderRef.current.stop();
-      stopTimer();
-      
-      if (mediaRecorderRef.current.chunkInterval) {
-        clearInterval(mediaRecorderRef.current.chunkInterval);
+      if (mediaRecorderRef.current.state !== 'inactive') {
+        mediaRecorderRef.current.stop();
       }
+      stopTimer();
+      stopChunkRotation();
 
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(track => track.stop());
         streamRef.current = null;
       }
 
+      // Wait for the last chunk to be stored before finishing
+      if (recordingStreamRef.current) {
+        await recordingStreamRef.current.close();
+        recordingStreamRef.current = null;
+      }
+
       setIsRecording(false);
       setIsPaused(false);
 
@@ -234,7 +222,6 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
       onRecordingUpdate(updatedRecording);
 
       setRecordingTime(0);
-      setChunkIndex(0);
 
       message.success('Recording finished. Transcription in progress...');
     } catch (error) {
@@ -245,29 +232,6 @@ const RecordingInterface = ({ recording, onRecordingUpdate }) => {
     }
   };
 
-  const uploadChunk = async () => {
-    if (!recording || chunksRef.current.length === 0) return;
-
-    try {
-      const blob = new Blob(chunksRef.current, { type: 'audio/webm' });
-      
-      await apiService.uploadChunk(
-        recording.id,
-        chunkIndex,
-        blob,
-        30 // Approximate duration in seconds
-      );
-
-      setChunkIndex(prev => prev + 1);
-      chunksRef.current = [];
-      
-      console.log(`Uploaded chunk ${chunkIndex}`);
-    } catch (error) {
-      console.error('Error uploading chunk:', error);
-      message.error('Failed to upload audio chunk');
-    }
-  };
-
   const formatTime = (seconds) => {
     const mins = Math.floor(seconds / 60);
     const secs = seconds % 60;
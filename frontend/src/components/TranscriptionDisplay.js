@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { Card, Button, message, Spin, Typography } from 'antd';
+import { Card, Button, message, Progress, Spin, Typography } from 'antd';
 import { CopyOutlined, DownloadOutlined, ReloadOutlined } from '@ant-design/icons';
 import apiService from '../services/apiService';
 
@@ -8,11 +8,76 @@ const { Text, Paragraph } = Typography;
 const TranscriptionDisplay = ({ recording }) => {
   const [refreshing, setRefreshing] = useState(false);
   const [localRecording, setLocalRecording] = useState(recording);
+  const [progress, setProgress] = useState(null);
+  const [failure, setFailure] = useState(null);
 
   useEffect(() => {
     setLocalRecording(recording);
+    setFailure(null);
   }, [recording]);
 
+  const waitingForTranscript = recording?.status === 'ended' && !localRecording?.transcription_text;
+
+  // Follow the transcription over one idle connection instead of polling
+  useEffect(() => {
+    if (!waitingForTranscript || !recording?.id || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+
+    let events = null;
+    let stopped = false;
+    let reopenTimer = null;
+
+    const open = async () => {
+      try {
+        events = await apiService.openRecordingEvents(recording.id);
+      } catch (error) {
+        // Refresh remains available as a fallback
+        console.error('Error opening transcription events:', error);
+        return;
+      }
+      if (stopped) {
+        events.close();
+        return;
+      }
+
+      events.addEventListener('status', (event) => {
+        const data = JSON.parse(event.data);
+        setProgress(data.status === 'running' ? data.progress : null);
+      });
+      events.addEventListener('transcript', (event) => {
+        const data = JSON.parse(event.data);
+        events.close();
+        setProgress(null);
+        setLocalRecording((current) => ({ ...current, transcription_text: data.transcription_text }));
+        message.success('Transcription completed!');
+      });
+      events.addEventListener('failed', (event) => {
+        const data = JSON.parse(event.data);
+        events.close();
+        setProgress(null);
+        setFailure(data.error || 'Transcription failed');
+      });
+      // The browser reconnects with the same URL; once the stream token has
+      // expired that fails for good, so open a new stream with a new token
+      events.addEventListener('error', () => {
+        if (events.readyState === EventSource.CLOSED && !stopped) {
+          reopenTimer = setTimeout(open, 3000);
+        }
+      });
+    };
+
+    open();
+
+    return () => {
+      stopped = true;
+      clearTimeout(reopenTimer);
+      if (events) {
+        events.close();
+      }
+    };
+  }, [recording?.id, waitingForTranscript]);
+
   const handleRefresh = async () => {
     if (!recording?.id) return;
 
@@ -57,7 +122,7 @@ const TranscriptionDisplay = ({ recording }) => {
     return null;
   }
 
-  const isProcessing = recording.status === 'ended' && !localRecording?.transcription_text;
+  const isProcessing = waitingForTranscript && !failure;
   const hasTranscription = localRecording?.transcription_text;
 
   return (
@@ -106,6 +171,13 @@ const TranscriptionDisplay = ({ recording }) => {
                 Processing audio and generating transcription...
               </Text>
             </div>
+            {progress !== null && (
+              <Progress
+                percent={Math.round(progress)}
+                size="small"
+                style={{ maxWidth: '320px', margin: '16px auto 0' }}
+              />
+            )}
             <div style={{ marginTop: '8px', fontSize: '12px', color: '#999' }}>
               This may take a few minutes depending on the recording length
             </div>
@@ -139,8 +211,10 @@ const TranscriptionDisplay = ({ recording }) => {
         ) : recording.status === 'ended' ? (
           <div className="transcription-display empty">
             <div style={{ textAlign: 'center' }}>
-              <Text type="secondary">
-                Recording finished. Transcription will appear here once processing is complete.
+              <Text type={failure ? 'danger' : 'secondary'}>
+                {failure
+                  ? `Transcription failed: ${failure}`
+                  : 'Recording finished. Transcription will appear here once processing is complete.'}
               </Text>
               <div style={{ marginTop: '12px' }}>
                 <Button
@@ -88,18 +88,18 @@ describe('ApiService', () => {
       });
     });
 
-    test('uploadChunk creates FormData correctly', async () => {
+    test('uploadChunk sends the chunk as the raw body', async () => {
       const mockClient = mockedAxios.create();
-      mockClient.post.mockResolvedValue({ success: true });
+      mockClient.put.mockResolvedValue({ success: true });
 
       const mockBlob = new Blob(['test'], { type: 'audio/wav' });
       
       await apiService.uploadChunk('recording-id', 0, mockBlob, 30);
 
-      expect(mockClient.post).toHaveBeenCalledWith(
-        '/recordings/recording-id/chunks',
-        expect.any(FormData),
-        { headers: { 'Content-Type': 'multipart/form-data' } }
+      expect(mockClient.put).toHaveBeenCalledWith(
+        '/recordings/recording-id/chunks/0',
+        mockBlob,
+        { params: { duration_seconds: 30 }, headers: { 'Content-Type': 'audio/wav' } }
       );
     });
 
@@ -0,0 +1,156 @@
+import RecordingStream from '../recordingStream';
+
+class FakeWebSocket {
+  static instances = [];
+  static OPEN = 1;
+
+  constructor(url) {
+    this.url = url;
+    this.readyState = 0;
+    this.sent = [];
+    FakeWebSocket.instances.push(this);
+  }
+
+  send(data) {
+    this.sent.push(data);
+  }
+
+  close() {
+    this.readyState = 3;
+  }
+
+  open() {
+    this.readyState = FakeWebSocket.OPEN;
+    this.onopen();
+  }
+
+  receive(message) {
+    this.onmessage({ data: JSON.stringify(message) });
+  }
+
+  drop(code = 1006) {
+    this.readyState = 3;
+    this.onclose({ code });
+  }
+
+  messages() {
+    return this.sent.filter((data) => typeof data === 'string').map((data) => JSON.parse(data));
+  }
+}
+
+// Let pending promise callbacks run (timers are faked)
+const flushPromises = async () => {
+  for (let i = 0; i < 10; i += 1) {
+    await Promise.resolve();
+  }
+};
+
+describe('RecordingStream', () => {
+  beforeEach(() => {
+    jest.useFakeTimers();
+    FakeWebSocket.instances = [];
+    global.WebSocket = FakeWebSocket;
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  test('sends audio once the server is ready and ends the chunk', () => {
+    const stream = new RecordingStream('ws://test/recordings/r/stream');
+    stream.connect();
+    const socket = FakeWebSocket.instances[0];
+    socket.open();
+
+    stream.startChunk(0);
+    stream.sendAudio(0, new Blob(['early']));
+    expect(socket.messages()).toEqual([{ type: 'start', chunk_index: 0 }]);
+
+    socket.receive({ type: 'ready', chunk_index: 0, offset: 0 });
+    stream.sendAudio(0, new Blob(['later']));
+    stream.endChunk(0, 30);
+
+    expect(socket.sent.filter((data) => data instanceof Blob)).toHaveLength(2);
+    expect(socket.messages()[1]).toEqual({ type: 'end', chunk_index: 0, duration_seconds: 30 });
+  });
+
+  test('resumes an unfinished chunk after reconnecting', () => {
+    const stream = new RecordingStream('ws://test/recordings/r/stream');
+    stream.connect();
+    FakeWebSocket.instances[0].open();
+    stream.startChunk(0);
+    FakeWebSocket.instances[0].receive({ type: 'ready', chunk_index: 0, offset: 0 });
+    stream.sendAudio(0, new Blob(['abcdef']));
+
+    FakeWebSocket.instances[0].drop();
+    jest.advanceTimersByTime(1000);
+    const socket = FakeWebSocket.instances[1];
+    socket.open();
+    socket.receive({ type: 'ready', chunk_index: 0, offset: 4 });
+
+    expect(socket.messages()).toEqual([{ type: 'start', chunk_index: 0 }]);
+    const resent = socket.sent.find((data) => data instanceof Blob);
+    expect(resent.size).toBe(2);
+  });
+
+  test('keeps a rotated chunk\'s late audio and end with that chunk', () => {
+    const stream = new RecordingStream('ws://test/recordings/r/stream');
+    stream.connect();
+    const socket = FakeWebSocket.instances[0];
+    socket.open();
+    stream.startChunk(0);
+    socket.receive({ type: 'ready', chunk_index: 0, offset: 0 });
+    stream.sendAudio(0, new Blob(['first']));
+
+    // The next recorder starts before the old one's last data and stop events
+    stream.startChunk(1);
+    stream.sendAudio(0, new Blob(['tail']));
+    stream.endChunk(0, 30);
+    stream.sendAudio(1, new Blob(['second']));
+
+    expect(socket.messages()).toEqual([
+      { type: 'start', chunk_index: 0 },
+      { type: 'end', chunk_index: 0, duration_seconds: 30 },
+    ]);
+    expect(socket.sent.filter((data) => data instanceof Blob)).toHaveLength(2);
+
+    socket.receive({ type: 'committed', chunk_index: 0 });
+    socket.receive({ type: 'ready', chunk_index: 1, offset: 0 });
+
+    expect(socket.messages()[2]).toEqual({ type: 'start', chunk_index: 1 });
+    const resent = socket.sent.filter((data) => data instanceof Blob);
+    expect(resent).toHaveLength(3);
+    expect(resent[2].size).toBe('second'.length);
+    expect(stream.findChunk(1).ended).toBe(false);
+  });
+
+  test('gets a fresh URL for every connection', async () => {
+    const getUrl = jest.fn()
+      .mockResolvedValueOnce('ws://test/recordings/r/stream?stream_token=first')
+      .mockResolvedValueOnce('ws://test/recordings/r/stream?stream_token=second');
+    const stream = new RecordingStream(getUrl);
+    stream.connect();
+    await flushPromises();
+
+    FakeWebSocket.instances[0].drop();
+    jest.advanceTimersByTime(1000);
+    await flushPromises();
+
+    expect(FakeWebSocket.instances.map((socket) => socket.url)).toEqual([
+      'ws://test/recordings/r/stream?stream_token=first',
+      'ws://test/recordings/r/stream?stream_token=second',
+    ]);
+  });
+
+  test('stops reconnecting when the server rejects the stream', () => {
+    const onError = jest.fn();
+    const stream = new RecordingStream('ws://test/recordings/r/stream', { onError });
+    stream.connect();
+
+    FakeWebSocket.instances[0].drop(4401);
+    jest.advanceTimersByTime(20000);
+
+    expect(onError).toHaveBeenCalled();
+    expect(FakeWebSocket.instances).toHaveLength(1);
+  });
+});
@@ -75,21 +75,29 @@ class ApiService {
     return this.client.get(`/recordings/${recordingId}`);
   }
 
+  // Send the chunk as the raw request body; the server writes it straight to
+  // storage without multipart parsing
   async uploadChunk(recordingId, chunkIndex, audioBlob, durationSeconds = null) {
-    const formData = new FormData();
-    formData.append('chunk_index', chunkIndex);
-    formData.append('audio_chunk', audioBlob, `chunk_${chunkIndex}.wav`);
-    if (durationSeconds !== null) {
-      formData.append('duration_seconds', durationSeconds);
-    }
-
-    return this.client.post(`/recordings/${recordingId}/chunks`, formData, {
+    const params = durationSeconds !== null ? { duration_seconds: durationSeconds } : {};
+
+    return this.client.put(`/recordings/${recordingId}/chunks/${chunkIndex}`, audioBlob, {
+      params,
       headers: {
-        'Content-Type': 'multipart/form-data',
+        'Content-Type': audioBlob.type || 'application/octet-stream',
       },
     });
   }
 
+  // WebSocket URL for streaming a recording's audio. Browsers cannot set
+  // headers on WebSockets, so the URL carries a short-lived token that only
+  // opens this stream, never the access token. Call it for every connection.
+  async recordingStreamUrl(recordingId) {
+    const { stream_token: streamToken } = await this.client.post(`/recordings/${recordingId}/stream/token`);
+    const params = new URLSearchParams({ stream_token: streamToken });
+    const base = API_BASE_URL.replace(/^http/, 'ws');
+    return `${base}/recordings/${recordingId}/stream?${params}`;
+  }
+
   async pauseRecording(recordingId) {
     return this.client.patch(`/recordings/${recordingId}/pause`);
   }
@@ -98,6 +106,15 @@ class ApiService {
     return this.client.post(`/recordings/${recordingId}/finish`);
   }
 
+  // Server-Sent Events stream of transcription status, progress and the final
+  // transcript. EventSource cannot send headers, so the URL carries a
+  // short-lived token that only opens this stream, never the access token.
+  async openRecordingEvents(recordingId) {
+    const { stream_token: streamToken } = await this.client.post(`/recordings/${recordingId}/events/token`);
+    const params = new URLSearchParams({ stream_token: streamToken });
+    return new EventSource(`${API_BASE_URL}/recordings/${recordingId}/events?${params}`);
+  }
+
   async updateRecordingNotes(recordingId, notes) {
     return this.client.patch(`/recordings/${recordingId}/notes`, {
       notes,
@@ -0,0 +1,162 @@
+// Continuous upload of a recording's audio over one WebSocket.
+//
+// Audio is sent as MediaRecorder produces it, grouped into chunks (each
+// recorder start is one chunk, since it begins with its own container
+// header). The server acknowledges durable byte offsets; after a dropped
+// connection the stream reconnects and resends each unfinished chunk from
+// the offset the server reports. A chunk's audio is kept here until the
+// server confirms it was stored.
+//
+// Audio and the end of a chunk are addressed by chunk index: when chunks are
+// rotated, the old recorder's last data and stop events arrive after the next
+// chunk has already started.
+//
+// The URL may be given as a function returning (a promise of) the URL. It is
+// called for every connection, since the token in the URL is short-lived.
+
+const RECONNECT_DELAY_MS = 1000;
+const MAX_RECONNECT_DELAY_MS = 15000;
+
+class RecordingStream {
+  constructor(url, { onError } = {}) {
+    this.url = url;
+    this.onError = onError;
+    this.socket = null;
+    this.chunks = [];
+    this.current = null;
+    this.closed = false;
+    this.reconnectDelay = RECONNECT_DELAY_MS;
+    this.drainWaiters = [];
+  }
+
+  connect() {
+    if (typeof this.url !== 'function') {
+      this.open(this.url);
+      return;
+    }
+    Promise.resolve()
+      .then(() => this.url())
+      .then((url) => {
+        if (!this.closed) this.open(url);
+      })
+      .catch((error) => {
+        console.error('Could not get a recording stream URL:', error);
+        this.scheduleReconnect();
+      });
+  }
+
+  scheduleReconnect() {
+    if (this.closed) return;
+    setTimeout(() => this.connect(), this.reconnectDelay);
+    this.reconnectDelay = Math.min(this.reconnectDelay * 2, MAX_RECONNECT_DELAY_MS);
+  }
+
+  open(url) {
+    const socket = new WebSocket(url);
+    this.socket = socket;
+    this.current = null;
+
+    socket.onopen = () => {
+      this.reconnectDelay = RECONNECT_DELAY_MS;
+      this.advance();
+    };
+
+    socket.onmessage = (event) => this.handleMessage(JSON.parse(event.data));
+
+    socket.onclose = (event) => {
+      this.current = null;
+      if (event.code >= 4000) {
+        // Rejected (authentication, access, recording state); retrying will not help
+        if (this.onError) this.onError(event.reason || `Stream closed with ${event.code}`);
+        this.resolveDrain();
+        return;
+      }
+      this.scheduleReconnect();
+    };
+  }
+
+  isOpen() {
+    return this.socket && this.socket.readyState === WebSocket.OPEN;
+  }
+
+  startChunk(index) {
+    this.chunks.push({ index, blobs: [], ready: false, ended: false, durationSeconds: null });
+    this.advance();
+  }
+
+  findChunk(index) {
+    return this.chunks.find((chunk) => chunk.index === index);
+  }
+
+  sendAudio(index, blob) {
+    const chunk = this.findChunk(index);
+    if (!chunk || chunk.ended) return;
+    chunk.blobs.push(blob);
+    if (chunk === this.current && chunk.ready && this.isOpen()) {
+      this.socket.send(blob);
+    }
+  }
+
+  endChunk(index, durationSeconds) {
+    const chunk = this.findChunk(index);
+    if (!chunk || chunk.ended) return;
+    chunk.ended = true;
+    chunk.durationSeconds = durationSeconds;
+    if (chunk === this.current && chunk.ready && this.isOpen()) {
+      this.sendEnd(chunk);
+    }
+  }
+
+  // The server keeps one chunk open at a time, so chunks are sent in order
+  advance() {
+    if (!this.isOpen() || this.current || this.chunks.length === 0) return;
+    const chunk = this.chunks[0];
+    chunk.ready = false;
+    this.current = chunk;
+    this.socket.send(JSON.stringify({ type: 'start', chunk_index: chunk.index }));
+  }
+
+  sendEnd(chunk) {
+    this.socket.send(JSON.stringify({
+      type: 'end',
+      chunk_index: chunk.index,
+      duration_seconds: chunk.durationSeconds,
+    }));
+  }
+
+  handleMessage(message) {
+    const chunk = this.current;
+    if (message.type === 'ready' && chunk && chunk.index === message.chunk_index) {
+      chunk.ready = true;
+      const unsent = new Blob(chunk.blobs).slice(message.offset);
+      if (unsent.size > 0) this.socket.send(unsent);
+      if (chunk.ended) this.sendEnd(chunk);
+    } else if (message.type === 'committed') {
+      this.chunks = this.chunks.filter((pending) => pending.index !== message.chunk_index);
+      if (chunk && chunk.index === message.chunk_index) this.current = null;
+      if (this.chunks.length === 0) this.resolveDrain();
+      this.advance();
+    } else if (message.type === 'error') {
+      console.error('Recording stream error:', message.detail);
+    }
+  }
+
+  resolveDrain() {
+    this.drainWaiters.forEach((resolve) => resolve());
+    this.drainWaiters = [];
+  }
+
+  // Wait until every chunk is stored (or the timeout passes), then close
+  async close(timeoutMs = 10000) {
+    if (this.chunks.length > 0) {
+      await new Promise((resolve) => {
+        this.drainWaiters.push(resolve);
+        setTimeout(resolve, timeoutMs);
+      });
+    }
+    this.closed = true;
+    if (this.socket) this.socket.close();
+  }
+}
+
+export default RecordingStream;